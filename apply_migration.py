@@ -1,7 +1,12 @@
 import sqlite3
 import os
+import sys
 
-db_path = r"D:\Kael Kodes\Tree Kingdoms\tree_kingdoms.db"
+from src.database.db_manager import DB_PATH
+from src.database.migrations import migrate, current_version
+
+# Thin wrapper around src/database/migrations.py (see tools/migrate.py for options)
+db_path = sys.argv[1] if len(sys.argv) > 1 else DB_PATH
 
 if not os.path.exists(db_path):
     print(f"ERROR: Database not found at {db_path}")
@@ -10,27 +15,8 @@ if not os.path.exists(db_path):
 print(f"Connecting to {db_path}...")
 try:
     conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # Check for is_hq
-    cursor.execute("PRAGMA table_info(cities)")
-    columns = cursor.fetchall()
-    col_names = [c[1] for c in columns]
-    
-    if "is_hq" not in col_names:
-        print("Adding is_hq column...")
-        cursor.execute("ALTER TABLE cities ADD COLUMN is_hq INTEGER DEFAULT 0")
-    else:
-        print("is_hq already exists.")
-
-    if "decay_turns" not in col_names:
-        print("Adding decay_turns column...")
-        cursor.execute("ALTER TABLE cities ADD COLUMN decay_turns INTEGER DEFAULT 0")
-    else:
-        print("decay_turns already exists.")
-
-    conn.commit()
-    print("Migration applied successfully.")
+    applied = migrate(conn, verbose=True)
+    print(f"Migration applied successfully ({len(applied)} new, schema version {current_version(conn)}).")
     conn.close()
 except Exception as e:
     print(f"ERROR: {e}")
@@ -0,0 +1,265 @@
+import hashlib
+import json
+import os
+import sqlite3
+
+import numpy as np
+
+from src.assets.png import downscale, read_png, write_png
+from src.simulation.portraits import TILESET_PATH, PortraitIndex
+
+# Texture atlases for the portrait sheets and town art.
+# The game loads Assets/Portraits as eight loose sheets addressed through the
+# CustomOfficers.tres tileset, and every town as its own 1536x1024 texture; list
+# views (officer lists, city pickers) draw them at a fraction of that size.
+#
+# AtlasBuilder cuts each valid portrait cell (PortraitIndex) out of its sheet and
+# packs the cells onto power-of-two pages with extruded padding; downscaled
+# thumbnails of the portraits and the towns get their own pages. The coordinates go to a JSON index
+# and an `atlas_sprites` SQLite table keyed like the officers' portrait columns
+# (source_id + "x,y"). Every group records a content hash of its inputs and
+# parameters, so a rebuild skips groups whose art, tileset and settings did not change.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.abspath(os.path.join(BASE_DIR, "../.."))
+TOWNS_DIR = os.path.join(PROJECT_DIR, "Assets", "Towns")
+OUTPUT_DIR = os.path.join(PROJECT_DIR, "build", "atlases")
+INDEX_JSON = "atlas_index.json"
+INDEX_DB = "atlas_index.db"
+
+PIPELINE_VERSION = 1        # bump when the packing or output format changes, to invalidate old builds
+MAX_PAGE = 4096             # largest page side most GPUs accept
+PADDING = 2                 # extruded border around each sprite against filtering bleed
+THUMB_SIZES = {"portraits": 64, "towns": 256}   # thumbnails fit inside a square of this side
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _pow2(n):
+    return 1 << max(0, int(n) - 1).bit_length()
+
+
+def shelf_pack(sizes, width):
+    """Shelf-packs (w, h) boxes, tallest first, into rows of `width`. Returns ([(x, y)], used height)."""
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0], i))
+    positions = [None] * len(sizes)
+    x = y = shelf = 0
+    for i in order:
+        w, h = sizes[i]
+        if x + w > width:
+            x, y, shelf = 0, y + shelf, 0
+        positions[i] = (x, y)
+        x += w
+        shelf = max(shelf, h)
+    return positions, y + shelf
+
+
+def pack(sizes, max_size=MAX_PAGE):
+    """Packs (w, h) boxes onto power-of-two pages.
+
+    Returns ([(page, x, y)], [(page_w, page_h)]). A single page picks the width with
+    the smallest power-of-two area (then the squarest); what does not fit in one max_size page is split
+    across several.
+    """
+    if not sizes:
+        return [], []
+    if any(w > max_size or h > max_size for w, h in sizes):
+        raise ValueError(f"a sprite is larger than the {max_size}px page limit")
+    best = None
+    width = _pow2(max(w for w, _ in sizes))
+    while width <= max_size:
+        positions, height = shelf_pack(sizes, width)
+        page = (width, _pow2(height))
+        cost = (page[0] * page[1], max(page) // min(page))      # smallest area, then the squarest
+        if page[1] <= max_size and (best is None or cost < best[2]):
+            best = (positions, page, cost)
+        width *= 2
+    if best is not None:
+        return [(0, x, y) for x, y in best[0]], [best[1]]
+
+    # Several pages: fill one max_size page at a time with the tallest boxes left
+    placements = [None] * len(sizes)
+    remaining = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0], i))
+    pages = []
+    while remaining:
+        x = y = shelf = 0
+        placed, rest = [], []
+        for i in remaining:
+            w, h = sizes[i]
+            if x + w > max_size:
+                x, y, shelf = 0, y + shelf, 0
+            if y + h > max_size:
+                rest.append(i)
+                continue
+            placements[i] = (len(pages), x, y)
+            placed.append(i)
+            x += w
+            shelf = max(shelf, h)
+        used_w = max(placements[i][1] + sizes[i][0] for i in placed)
+        used_h = max(placements[i][2] + sizes[i][1] for i in placed)
+        pages.append((_pow2(used_w), _pow2(used_h)))
+        remaining = rest
+    return placements, pages
+
+
+def portrait_sprites(tileset=TILESET_PATH):
+    """[(name, source path, rect, extra)] for every valid portrait cell; name is "source_id:x,y"."""
+    index = PortraitIndex.load(tileset)
+    sprites = []
+    for source_id, coords in sorted(index.cells, key=lambda cell: (cell[0], cell[1])):
+        path, rect = index.region(source_id, coords)
+        if path is not None:
+            sprites.append((f"{source_id}:{coords}", path, rect, {"source_id": source_id, "coords": coords}))
+    return sprites, [tileset]
+
+
+def town_sprites(directory=TOWNS_DIR):
+    """[(name, source path, None, extra)]: each town image is one whole sprite."""
+    names = sorted(f for f in os.listdir(directory) if f.lower().endswith(".png")) if os.path.isdir(directory) else []
+    return [(os.path.splitext(f)[0], os.path.join(directory, f), None, {}) for f in names], []
+
+
+# group -> (sprite lister, pack full-size sprites). Full-size towns stay loose: eleven
+# 1536x1024 images only fit two 4096x4096 pages, twice their texture memory.
+GROUPS = {
+    "portraits": (portrait_sprites, True),
+    "towns": (town_sprites, False),
+}
+
+
+def load_index(out_dir=OUTPUT_DIR):
+    path = os.path.join(out_dir, INDEX_JSON)
+    if not os.path.exists(path):
+        return {"version": PIPELINE_VERSION, "groups": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class AtlasBuilder:
+    """Builds atlas pages, thumbnail pages and the coordinate index for GROUPS."""
+
+    def __init__(self, out_dir=OUTPUT_DIR, max_size=MAX_PAGE, padding=PADDING, thumb_sizes=None):
+        self.out_dir = out_dir
+        self.max_size = max_size
+        self.padding = padding
+        self.thumb_sizes = dict(THUMB_SIZES, **(thumb_sizes or {}))
+        self._images = {}
+
+    def _image(self, path):
+        if path not in self._images:
+            self._images[path] = read_png(path)
+        return self._images[path]
+
+    def group_hash(self, group, sprites, extra_inputs):
+        """Content hash of a group's input files, sprite list and build parameters."""
+        files = sorted({path for _, path, _, _ in sprites} | set(extra_inputs))
+        key = {
+            "version": PIPELINE_VERSION,
+            "params": [self.max_size, self.padding, self.thumb_sizes[group], GROUPS[group][1]],
+            "inputs": {os.path.basename(p): file_hash(p) for p in files},
+            "sprites": [[name, rect] for name, _, rect, _ in sprites],
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+    def _write_pages(self, prefix, images):
+        """Packs (h, w, 4) images with padding. Returns ([page file], [(w, h)], [(page, x, y, w, h)])."""
+        pad = self.padding
+        placements, sizes = pack([(im.shape[1] + 2 * pad, im.shape[0] + 2 * pad) for im in images], self.max_size)
+        pages = [np.zeros((h, w, 4), dtype=np.uint8) for w, h in sizes]
+        rects = []
+        for image, (page, x, y) in zip(images, placements):
+            h, w = image.shape[:2]
+            padded = np.pad(image, ((pad, pad), (pad, pad), (0, 0)), mode="edge") if pad else image
+            pages[page][y:y + h + 2 * pad, x:x + w + 2 * pad] = padded
+            rects.append((page, x + pad, y + pad, w, h))
+        files = []
+        for number, page in enumerate(pages):
+            files.append(f"{prefix}_{number}.png")
+            write_png(os.path.join(self.out_dir, files[-1]), page)
+        return files, sizes, rects
+
+    def build_group(self, group, sprites, content_hash):
+        images = []
+        for _, path, rect, _ in sprites:
+            image = self._image(path)
+            if rect is not None:
+                x, y, w, h = rect
+                image = image[y:y + h, x:x + w]
+            images.append(image)
+        box = self.thumb_sizes[group]
+        thumbs = []
+        for image in images:
+            h, w = image.shape[:2]
+            scale = min(box / w, box / h, 1.0)
+            thumbs.append(downscale(image, max(1, round(w * scale)), max(1, round(h * scale))))
+
+        if GROUPS[group][1]:
+            pages, page_sizes, rects = self._write_pages(group, images)
+        else:
+            pages, page_sizes = [], []
+            rects = [(None, 0, 0, image.shape[1], image.shape[0]) for image in images]
+        thumb_pages, thumb_sizes, thumb_rects = self._write_pages(f"{group}_thumb", thumbs)
+        entries = {}
+        for (name, path, _, extra), rect, thumb in zip(sprites, rects, thumb_rects):
+            entries[name] = dict(extra, source=os.path.basename(path),
+                                 page=None if rect[0] is None else pages[rect[0]], rect=list(rect[1:]),
+                                 thumb_page=thumb_pages[thumb[0]], thumb_rect=list(thumb[1:]))
+        return {"hash": content_hash, "pages": pages, "page_sizes": [list(s) for s in page_sizes],
+                "thumb_pages": thumb_pages, "thumb_page_sizes": [list(s) for s in thumb_sizes],
+                "inputs": sorted({os.path.basename(path) for _, path, _, _ in sprites}),
+                "sprites": entries}
+
+    def build(self, groups=None, force=False):
+        """Builds `groups` (default all), skipping unchanged ones. Returns ({group: "built"|"skipped"}, index)."""
+        os.makedirs(self.out_dir, exist_ok=True)
+        index = load_index(self.out_dir)
+        if index.get("version") != PIPELINE_VERSION:
+            index = {"version": PIPELINE_VERSION, "groups": {}}
+        status = {}
+        for group in groups or list(GROUPS):
+            sprites, extra_inputs = GROUPS[group][0]()
+            content_hash = self.group_hash(group, sprites, extra_inputs)
+            previous = index["groups"].get(group)
+            if not force and previous and previous["hash"] == content_hash and all(
+                    os.path.exists(os.path.join(self.out_dir, f)) for f in previous["pages"] + previous["thumb_pages"]):
+                status[group] = "skipped"
+                continue
+            if previous:
+                for stale in previous["pages"] + previous["thumb_pages"]:
+                    if os.path.exists(os.path.join(self.out_dir, stale)):
+                        os.remove(os.path.join(self.out_dir, stale))
+            index["groups"][group] = self.build_group(group, sprites, content_hash)
+            status[group] = "built"
+        self._images.clear()
+        with open(os.path.join(self.out_dir, INDEX_JSON), "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+            f.write("\n")
+        write_index_db(index, os.path.join(self.out_dir, INDEX_DB))
+        return status, index
+
+
+def write_index_db(index, path):
+    """Writes the coordinate index as the `atlas_sprites` table of a SQLite file (replacing it)."""
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("DROP TABLE IF EXISTS atlas_sprites")
+        conn.execute("""CREATE TABLE atlas_sprites (
+            asset_group TEXT NOT NULL, name TEXT NOT NULL, source_id INTEGER, coords TEXT,
+            source_file TEXT, page_file TEXT, x INTEGER, y INTEGER, w INTEGER, h INTEGER,
+            thumb_file TEXT, thumb_x INTEGER, thumb_y INTEGER, thumb_w INTEGER, thumb_h INTEGER,
+            PRIMARY KEY (asset_group, name))""")
+        conn.execute("CREATE INDEX ix_atlas_sprites_portrait ON atlas_sprites (source_id, coords)")
+        conn.executemany(
+            "INSERT INTO atlas_sprites VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(group, name, s.get("source_id"), s.get("coords"), s["source"], s["page"], *s["rect"],
+              s["thumb_page"], *s["thumb_rect"])
+             for group, data in sorted(index["groups"].items()) for name, s in sorted(data["sprites"].items())])
+        conn.commit()
+    finally:
+        conn.close()
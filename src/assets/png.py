@@ -0,0 +1,148 @@
+import struct
+import zlib
+
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; the NumPy codec below covers the game's PNGs
+    Image = None
+
+# Minimal PNG reading and writing for the asset pipeline.
+# The art is 8-bit, non-interlaced RGB or RGBA. Rows are unfiltered along
+# anti-diagonals: a pixel's Sub/Up/Average/Paeth predictor only needs its left,
+# upper and upper-left neighbours, so every pixel on one diagonal can be decoded
+# in a single NumPy step (about w + h steps per image instead of w * h). Images
+# are returned as (h, w, 4) uint8 RGBA. Pillow is used instead when installed.
+
+SIGNATURE = b"\x89PNG\r\n\x1a\n"
+CHANNELS = {0: 1, 2: 3, 4: 2, 6: 4}         # colour type -> samples per pixel (grey, RGB, grey+alpha, RGBA)
+
+
+def read_size(path):
+    """(width, height) from the IHDR chunk without decoding."""
+    with open(path, "rb") as f:
+        header = f.read(24)
+    if header[:8] != SIGNATURE:
+        raise ValueError(f"{path} is not a PNG")
+    return struct.unpack(">II", header[16:24])
+
+
+def _chunks(data):
+    pos = len(SIGNATURE)
+    while pos < len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        yield kind, data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+
+
+def _unfilter(filtered, types):
+    """Reverses PNG row filters. `filtered` is (h, w, bpp) uint8, `types` the per-row filter bytes."""
+    h, w, bpp = filtered.shape
+    if not types.any():
+        return filtered
+    out = np.zeros((h + 1, w + 1, bpp), dtype=np.int16)   # zero row/column for the missing neighbours
+    filtered = filtered.astype(np.int16)
+    types = types.astype(np.int16)
+    for k in range(h + w - 1):
+        ys = np.arange(max(0, k - w + 1), min(h - 1, k) + 1)
+        xs = k - ys
+        a, b, c = out[ys + 1, xs], out[ys, xs + 1], out[ys, xs]
+        kind = types[ys][:, None]
+        p = a + b - c
+        pa, pb, pc = np.abs(p - a), np.abs(p - b), np.abs(p - c)
+        paeth = np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+        predictor = np.select([kind == 1, kind == 2, kind == 3, kind == 4], [a, b, (a + b) >> 1, paeth], 0)
+        out[ys + 1, xs + 1] = (filtered[ys, xs] + predictor) & 0xFF
+    return out[1:, 1:].astype(np.uint8)
+
+
+def _to_rgba(pixels, channels):
+    h, w = pixels.shape[:2]
+    if channels == 4:
+        return pixels
+    rgba = np.full((h, w, 4), 255, dtype=np.uint8)
+    if channels == 3:
+        rgba[..., :3] = pixels
+    elif channels == 2:
+        rgba[..., :3] = pixels[..., :1]
+        rgba[..., 3] = pixels[..., 1]
+    else:
+        rgba[..., :3] = pixels
+    return rgba
+
+
+def read_png(path):
+    """(h, w, 4) uint8 RGBA pixels of a PNG file."""
+    if Image is not None:
+        with Image.open(path) as image:
+            return np.asarray(image.convert("RGBA"))
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:8] != SIGNATURE:
+        raise ValueError(f"{path} is not a PNG")
+    idat = []
+    for kind, body in _chunks(data):
+        if kind == b"IHDR":
+            w, h, depth, colour, _, _, interlace = struct.unpack(">IIBBBBB", body)
+        elif kind == b"IDAT":
+            idat.append(body)
+    if depth != 8 or colour not in CHANNELS or interlace:
+        raise ValueError(f"{path}: only 8-bit non-interlaced grey/RGB(A) PNGs are supported without Pillow")
+    channels = CHANNELS[colour]
+    raw = np.frombuffer(zlib.decompress(b"".join(idat)), dtype=np.uint8).reshape(h, 1 + w * channels)
+    pixels = _unfilter(raw[:, 1:].reshape(h, w, channels), raw[:, 0])
+    return _to_rgba(pixels, channels)
+
+
+def _chunk(kind, body):
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body) & 0xFFFFFFFF)
+
+
+def write_png(path, pixels, level=6):
+    """Writes (h, w, 4) uint8 RGBA pixels as a PNG (Paeth filter on every row)."""
+    pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+    if Image is not None:
+        Image.fromarray(pixels, "RGBA").save(path, compress_level=level)
+        return
+    h, w, channels = pixels.shape
+    x = pixels.astype(np.int16)
+    a = np.zeros_like(x)
+    a[:, 1:] = x[:, :-1]
+    b = np.zeros_like(x)
+    b[1:] = x[:-1]
+    c = np.zeros_like(x)
+    c[1:, 1:] = x[:-1, :-1]
+    p = a + b - c
+    pa, pb, pc = np.abs(p - a), np.abs(p - b), np.abs(p - c)
+    paeth = np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+    rows = np.empty((h, 1 + w * channels), dtype=np.uint8)
+    rows[:, 0] = 4
+    rows[:, 1:] = ((x - paeth) & 0xFF).astype(np.uint8).reshape(h, w * channels)
+    header = struct.pack(">IIBBBBB", w, h, 8, 6, 0, 0, 0)
+    with open(path, "wb") as f:
+        f.write(SIGNATURE + _chunk(b"IHDR", header) + _chunk(b"IDAT", zlib.compress(rows.tobytes(), level))
+                + _chunk(b"IEND", b""))
+
+
+def downscale(pixels, width, height):
+    """Area-average resize of (h, w, 4) pixels to (height, width, 4)."""
+    def weights(old, new):
+        # weights[i, j]: share of source pixel j inside target pixel i
+        edges = np.arange(new + 1) * (old / new)
+        lo, hi = edges[:-1, None], edges[1:, None]
+        j = np.arange(old)[None, :]
+        return np.clip(np.minimum(hi, j + 1) - np.maximum(lo, j), 0, None) / (old / new)
+    wy = weights(pixels.shape[0], height).astype(np.float32)
+    wx = weights(pixels.shape[1], width).astype(np.float32)
+
+    def resize(channels):
+        # rows then columns, as two matrix products
+        rows = (wy @ channels.reshape(channels.shape[0], -1)).reshape(height, channels.shape[1], -1)
+        return (rows.transpose(0, 2, 1) @ wx.T).transpose(0, 2, 1)
+    image = pixels.astype(np.float32)
+    rgb = image[..., :3] * (image[..., 3:] / 255.0)          # premultiply so transparent edges do not darken
+    alpha = resize(image[..., 3:])
+    rgb = resize(rgb)
+    rgb = np.where(alpha > 0, rgb * 255.0 / np.maximum(alpha, 1e-6), 0)
+    return np.clip(np.rint(np.concatenate([rgb, alpha], axis=2)), 0, 255).astype(np.uint8)
@@ -1,6 +1,15 @@
 import os
-from sqlalchemy import create_engine
+import re
+import json
+import time
+import sqlite3
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
 from src.database.models import Base
 
 # Get the absolute path to the directory containing this script (src/database/)
@@ -9,9 +18,288 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.abspath(os.path.join(BASE_DIR, "../../tree_kingdoms.db"))
 DATABASE_URL = f"sqlite:///{DB_PATH}"
 
+# Performance Profiles
+# PRAGMAs are applied to every new DBAPI connection. WAL lets the running game keep reading
+# while tools write, and busy_timeout makes writers wait for the lock instead of failing.
+# cache_size is negative = KiB (SQLite convention).
+PROFILES = {
+    "interactive": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -65536,      # 64 MB
+            "mmap_size": 268435456,    # 256 MB
+            "temp_store": "MEMORY",
+            "busy_timeout": 5000,
+        },
+        "pool_size": 5,
+        "max_overflow": 5,
+    },
+    "bulk-load": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "OFF",      # Regenerable data; trade durability for write speed
+            "cache_size": -262144,     # 256 MB
+            "mmap_size": 1073741824,   # 1 GB
+            "temp_store": "MEMORY",
+            "busy_timeout": 30000,
+        },
+        "pool_size": 1,                # Single writer
+        "max_overflow": 0,
+    },
+    "read-only analytics": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -131072,     # 128 MB
+            "mmap_size": 1073741824,   # 1 GB
+            "temp_store": "MEMORY",
+            "busy_timeout": 10000,
+            "query_only": "ON",
+        },
+        "pool_size": 8,
+        "max_overflow": 8,
+    },
+}
+
+DEFAULT_PROFILE = "interactive"
+
+# SQL profiling (opt-in: DatabaseManager(..., profiler=QueryProfiler())).
+# Statements are grouped by shape (literals and IN lists folded to ?) under the phase
+# label active when they ran. A shape that runs N_PLUS_ONE_THRESHOLD or more times
+# inside one phase block is an N+1 candidate: one query per row where one set-based
+# query would do. Statements from SQLAlchemy are timed by the before/after_cursor_execute
+# events; the raw sqlite3 connections the simulator takes from engine.raw_connection()
+# bypass those events, so the manager's connections are opened as ProfiledConnection
+# and their cursors time execute() themselves. Both count the rows fetched. For a
+# connection opened elsewhere, profile_connection() falls back to a trace callback,
+# which sees every statement but cannot time it or count its rows.
+N_PLUS_ONE_THRESHOLD = 20
+UNLABELLED = "unlabelled"
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def statement_shape(sql):
+    """`sql` with whitespace collapsed, literals as ? and IN (?, ?, ...) lists as IN (?...)."""
+    shape = _NUMBER.sub("?", _STRING.sub("?", sql))
+    return _IN_LIST.sub("IN (?...)", _SPACE.sub(" ", shape).strip())
+
+
+class QueryProfiler:
+    """Per-phase statement statistics of every connection it is attached to."""
+
+    def __init__(self, threshold=N_PLUS_ONE_THRESHOLD):
+        self.threshold = threshold
+        self.stats = {}              # (phase, shape) -> [count, [seconds], rows]
+        self.candidates = {}         # (phase, shape) -> [blocks flagged, most runs in one block]
+        self._blocks = [(UNLABELLED, Counter())]
+
+    @contextmanager
+    def phase(self, label):
+        """Labels every statement run inside the block with `label`."""
+        self._blocks.append((label, Counter()))
+        try:
+            yield self
+        finally:
+            self._close_block(*self._blocks.pop())
+
+    def _close_block(self, label, counts):
+        for shape, runs in counts.items():
+            if runs >= self.threshold:
+                flagged = self.candidates.setdefault((label, shape), [0, 0])
+                flagged[0] += 1
+                flagged[1] = max(flagged[1], runs)
+
+    def record(self, sql, seconds=None, rows=None):
+        """Counts one statement under the current phase. Returns its stats entry
+        (rows fetched later are added to entry[2])."""
+        label, counts = self._blocks[-1]
+        shape = statement_shape(sql)
+        counts[shape] += 1
+        entry = self.stats.get((label, shape))
+        if entry is None:
+            entry = self.stats[(label, shape)] = [0, [], 0]
+        entry[0] += 1
+        if seconds is not None:
+            entry[1].append(seconds)
+        if rows is not None and rows > 0:
+            entry[2] += rows
+        return entry
+
+    def reset(self):
+        self.stats.clear()
+        self.candidates.clear()
+        self._blocks = [(UNLABELLED, Counter())]
+
+    def report(self):
+        """{"phases": {label: {statements, seconds, shapes: [...]}}, "n_plus_one": [...]} as plain data."""
+        candidates = {key: list(value) for key, value in self.candidates.items()}
+        for label, counts in self._blocks[1:]:   # open phase blocks count as they stand
+            for shape, runs in counts.items():
+                if runs >= self.threshold:
+                    flagged = candidates.setdefault((label, shape), [0, 0])
+                    flagged[0] += 1
+                    flagged[1] = max(flagged[1], runs)
+        phases = {}
+        for (label, shape), (count, seconds, rows) in self.stats.items():
+            phase = phases.setdefault(label, {"statements": 0, "seconds": 0.0, "shapes": []})
+            timed = sorted(seconds)
+            total = sum(timed)
+            phase["statements"] += count
+            phase["seconds"] += total
+            phase["shapes"].append({
+                "shape": shape, "count": count, "rows": rows,
+                "total_ms": total * 1000 if timed else None,
+                "p95_ms": timed[min(len(timed) - 1, int(0.95 * len(timed)))] * 1000 if timed else None,
+            })
+        for phase in phases.values():
+            phase["shapes"].sort(key=lambda s: (-(s["total_ms"] or 0), -s["count"]))
+        n_plus_one = [{"phase": label, "shape": shape, "blocks": blocks, "max_per_block": most,
+                       "count": self.stats[(label, shape)][0] if (label, shape) in self.stats else most}
+                      for (label, shape), (blocks, most) in candidates.items()]
+        n_plus_one.sort(key=lambda c: -c["count"])
+        return {"threshold": self.threshold, "phases": phases, "n_plus_one": n_plus_one}
+
+    def dump(self, path):
+        """Writes report() as JSON."""
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """sqlite3 cursor that records its statements with the connection's profiler."""
+
+    entry = None                 # stats entry of the statement this cursor last ran
+    via_sqlalchemy = False       # set by the cursor events, which record SQLAlchemy's statements
+
+    def execute(self, sql, parameters=()):
+        profiler = self.connection.profiler
+        if profiler is None or self.via_sqlalchemy:
+            return super().execute(sql, parameters)
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        self.entry = profiler.record(sql, time.perf_counter() - start, max(self.rowcount, 0))
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        profiler = self.connection.profiler
+        if profiler is None or self.via_sqlalchemy:
+            return super().executemany(sql, seq_of_parameters)
+        start = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        # One batched call is one statement: batching is what fixes an N+1
+        self.entry = profiler.record(sql, time.perf_counter() - start, max(self.rowcount, 0))
+        return self
+
+    def _fetched(self, rows):
+        if self.entry is not None:
+            self.entry[2] += rows
+
+    def __next__(self):
+        row = super().__next__()
+        self._fetched(1)
+        return row
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            self._fetched(1)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        self._fetched(len(rows))
+        return rows
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """sqlite3 connection (factory=) whose cursors record to `profiler` once it is set."""
+
+    profiler = None
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    # The C shortcuts create a plain Cursor, so route them through cursor()
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def profile_connection(conn, profiler):
+    """Records `conn`'s statements with `profiler`. A ProfiledConnection is fully profiled;
+    any other sqlite3 connection gets a trace callback (counts only: no latency, no rows)."""
+    if isinstance(conn, ProfiledConnection):
+        conn.profiler = profiler
+    else:
+        conn.set_trace_callback(lambda sql: profiler.record(sql))
+
+
 class DatabaseManager:
-    def __init__(self, db_url=DATABASE_URL):
-        self.engine = create_engine(db_url)
+    def __init__(self, db_url=DATABASE_URL, profile=DEFAULT_PROFILE, profiler=None):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown database profile '{profile}'. Expected one of: {', '.join(PROFILES)}")
+        self.profile = profile
+        settings = PROFILES[profile]
+
+        self.profiler = profiler
+        connect_args = {"check_same_thread": False}
+        if profiler is not None:
+            connect_args["factory"] = ProfiledConnection
+
+        url = make_url(db_url)
+        is_memory = url.database in (None, "", ":memory:")
+        if is_memory:
+            # A private in-memory DB only exists on its one connection, so share it
+            self.engine = create_engine(db_url, poolclass=StaticPool, connect_args=connect_args)
+        else:
+            self.engine = create_engine(
+                db_url,
+                poolclass=QueuePool,
+                pool_size=settings["pool_size"],
+                max_overflow=settings["max_overflow"],
+                connect_args=connect_args,
+            )
+
+        pragmas = dict(settings["pragmas"])
+        if is_memory:
+            pragmas.pop("journal_mode")  # WAL is not available for :memory:
+            pragmas.pop("mmap_size")
+        self.pragmas = pragmas
+
+        @event.listens_for(self.engine, "connect")
+        def _apply_pragmas(dbapi_conn, connection_record):
+            cursor = dbapi_conn.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+            cursor.close()
+            if profiler is not None:
+                dbapi_conn.profiler = profiler
+
+        if profiler is not None:
+            @event.listens_for(self.engine, "before_cursor_execute")
+            def _before_execute(conn, cursor, statement, parameters, context, executemany):
+                # Kept on the cursor, so a statement that raises leaves nothing behind
+                cursor.via_sqlalchemy = True
+                cursor.query_start = time.perf_counter()
+
+            @event.listens_for(self.engine, "after_cursor_execute")
+            def _after_execute(conn, cursor, statement, parameters, context, executemany):
+                elapsed = time.perf_counter() - cursor.query_start
+                cursor.entry = profiler.record(statement, elapsed, max(cursor.rowcount, 0))
+
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
 
     def init_db(self):
@@ -22,5 +310,11 @@ class DatabaseManager:
         """Returns a new session."""
         return self.SessionLocal()
 
+    def get_pragmas(self):
+        """Returns the effective PRAGMA values of a pooled connection (for verifying a profile)."""
+        with self.engine.connect() as conn:
+            raw = conn.connection.dbapi_connection
+            return {name: raw.execute(f"PRAGMA {name}").fetchone()[0] for name in self.pragmas}
+
 # Global instance
 db = DatabaseManager()
@@ -0,0 +1,182 @@
+import re
+import json
+import hashlib
+
+# Game design tables compiled from the design workbook (TreeKingdoms.xlsx).
+# Every workbook table is a column spec ("Column Name" / "Type" / "Description").
+# Each one becomes a typed SQLite table named design_<title> with a primary key on
+# its identifier and an index per foreign key, and its spec is stored in
+# design_columns. design_tables keeps a content hash per table so a rebuild skips
+# tables whose spec has not changed. Tuning rows written into a design_* table
+# survive rebuilds: a changed spec copies the rows over for the columns it keeps.
+# Compile with tools/compile_design.py.
+
+META_TABLES = [
+    """CREATE TABLE IF NOT EXISTS design_tables (
+        table_name TEXT PRIMARY KEY,
+        source_title TEXT NOT NULL,
+        content_hash TEXT NOT NULL,
+        column_count INTEGER NOT NULL,
+        compiled_at TEXT DEFAULT CURRENT_TIMESTAMP)""",
+    """CREATE TABLE IF NOT EXISTS design_columns (
+        table_name TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        column_name TEXT NOT NULL,
+        declared_type TEXT,
+        sql_type TEXT NOT NULL,
+        is_primary_key INTEGER DEFAULT 0,
+        is_foreign_key INTEGER DEFAULT 0,
+        is_nullable INTEGER DEFAULT 1,
+        enum_values TEXT,
+        description TEXT,
+        PRIMARY KEY (table_name, column_name))""",
+]
+
+# Workbook type (before any "(FK, nullable)" suffix) -> SQLite column type
+SQL_TYPES = {
+    "int": "INTEGER",
+    "float": "REAL",
+    "bool": "INTEGER",
+    "string": "TEXT",
+    "enum": "TEXT",
+}
+
+IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def table_name_for(title):
+    """'UnitTypes (Refinement of Units)' -> 'design_unit_types'."""
+    name = title.split('(')[0].strip()
+    name = re.sub(r"(?<=[a-z0-9])(?=[A-Z])", "_", name)
+    name = re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_").lower()
+    return f"design_{name}"
+
+
+def parse_columns(rows):
+    """Column specs from a table's rows. Rows without a type (the next table's
+    title/description picked up by the extractor) or with an invalid name are skipped."""
+    columns, seen = [], set()
+    for row in rows:
+        name, declared = (row[0], row[1]) if len(row) > 1 else (row[0], None)
+        description = row[2] if len(row) > 2 else None
+        if name is None or declared is None:
+            continue
+        name, declared = str(name).strip(), str(declared).strip()
+        if not IDENTIFIER.match(name) or name.lower() in seen:
+            continue
+        seen.add(name.lower())
+        base = declared.split("(")[0].strip().lower()
+        flags = declared[len(declared.split("(")[0]):].lower()
+        is_fk = "fk" in flags
+        enum_values = None
+        if base == "enum" and description:
+            enum_values = [v.strip() for v in str(description).split("/") if v.strip()]
+        columns.append({
+            "column_name": name,
+            "declared_type": declared,
+            "sql_type": SQL_TYPES.get(base, "TEXT"),
+            "is_primary_key": False,
+            "is_foreign_key": is_fk,
+            "is_nullable": not is_fk or "nullable" in flags,
+            "enum_values": enum_values,
+            "description": None if description is None else str(description),
+        })
+    # The first non-FK integer column is the identifier ("Unique identifier")
+    for col in columns[:1]:
+        if col["sql_type"] == "INTEGER" and not col["is_foreign_key"]:
+            col["is_primary_key"] = True
+            col["is_nullable"] = False
+    return columns
+
+
+def content_hash(title, columns):
+    payload = json.dumps([title, columns], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _create_sql(table_name, columns):
+    parts = []
+    for col in columns:
+        ddl = f'"{col["column_name"]}" {col["sql_type"]}'
+        if col["is_primary_key"]:
+            ddl += " PRIMARY KEY"
+        parts.append(ddl)
+    return f'CREATE TABLE "{table_name}" ({", ".join(parts)})'
+
+
+def compile_table(conn, title, columns, table_name=None):
+    """Creates or migrates one design table. Returns 'compiled', 'unchanged' or 'empty'.
+
+    `conn` is a DBAPI (sqlite3) connection; the caller commits.
+    """
+    if not columns:
+        return "empty"
+    table_name = table_name or table_name_for(title)
+    digest = content_hash(title, columns)
+    row = conn.execute("SELECT content_hash FROM design_tables WHERE table_name = ?", (table_name,)).fetchone()
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)).fetchone()
+    if row and row[0] == digest and exists:
+        return "unchanged"
+
+    if exists:
+        # Keep any tuning rows for the columns that survive the new spec
+        old_cols = {r[1] for r in conn.execute(f'PRAGMA table_info("{table_name}")')}
+        keep = [c["column_name"] for c in columns if c["column_name"] in old_cols]
+        conn.execute(f'ALTER TABLE "{table_name}" RENAME TO "{table_name}__old"')
+        conn.execute(_create_sql(table_name, columns))
+        if keep:
+            cols = ", ".join(f'"{c}"' for c in keep)
+            conn.execute(f'INSERT INTO "{table_name}" ({cols}) SELECT {cols} FROM "{table_name}__old"')
+        conn.execute(f'DROP TABLE "{table_name}__old"')
+    else:
+        conn.execute(_create_sql(table_name, columns))
+    for col in columns:
+        if col["is_foreign_key"]:
+            conn.execute(f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_{col["column_name"]}" '
+                         f'ON "{table_name}" ("{col["column_name"]}")')
+
+    conn.execute("DELETE FROM design_columns WHERE table_name = ?", (table_name,))
+    conn.executemany("""
+        INSERT INTO design_columns (table_name, position, column_name, declared_type, sql_type,
+                                    is_primary_key, is_foreign_key, is_nullable, enum_values, description)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""", [
+        (table_name, i, c["column_name"], c["declared_type"], c["sql_type"], int(c["is_primary_key"]),
+         int(c["is_foreign_key"]), int(c["is_nullable"]),
+         json.dumps(c["enum_values"]) if c["enum_values"] else None, c["description"])
+        for i, c in enumerate(columns)])
+    conn.execute("""
+        INSERT INTO design_tables (table_name, source_title, content_hash, column_count, compiled_at)
+        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(table_name) DO UPDATE SET source_title = excluded.source_title,
+            content_hash = excluded.content_hash, column_count = excluded.column_count,
+            compiled_at = excluded.compiled_at""", (table_name, title, digest, len(columns)))
+    return "compiled"
+
+
+def ensure_meta_tables(conn):
+    for ddl in META_TABLES:
+        conn.execute(ddl)
+
+
+# --- Runtime lookups ---
+
+def load_columns(conn, table_name):
+    """Column specs for one design table, in workbook order (one indexed query)."""
+    rows = conn.execute("""
+        SELECT column_name, declared_type, sql_type, is_primary_key, is_foreign_key, is_nullable, enum_values, description
+        FROM design_columns WHERE table_name = ? ORDER BY position""", (table_name,)).fetchall()
+    keys = ["column_name", "declared_type", "sql_type", "is_primary_key", "is_foreign_key", "is_nullable",
+            "enum_values", "description"]
+    specs = [dict(zip(keys, r)) for r in rows]
+    for spec in specs:
+        spec["enum_values"] = json.loads(spec["enum_values"]) if spec["enum_values"] else None
+    return specs
+
+
+def load_rows(conn, table_name):
+    """All tuning rows of a design table as dicts keyed by column name."""
+    if conn.execute("SELECT 1 FROM design_tables WHERE table_name = ?", (table_name,)).fetchone() is None:
+        raise KeyError(f"Unknown design table '{table_name}'")
+    cursor = conn.execute(f'SELECT * FROM "{table_name}"')
+    names = [d[0] for d in cursor.description]
+    return [dict(zip(names, r)) for r in cursor.fetchall()]
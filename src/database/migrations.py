@@ -0,0 +1,326 @@
+import time
+
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.schema import CreateTable, CreateIndex
+
+from src.database.models import Base
+
+# Versioned schema migrations (Python side of DatabaseMigration.cs).
+# The game probes PRAGMA table_info and tries an ALTER TABLE for every column on
+# every start. Here each migration runs once, in its own transaction, and is
+# recorded in schema_version, so an up-to-date database costs one SELECT.
+# Steps are idempotent: a save that the game already migrated (no schema_version
+# yet) is brought in line without errors on its first run, only stamping versions.
+#
+# Step kinds:
+#   ("columns", table, ["name TYPE DEFAULT x", ...])  add missing columns
+#   ("table", ddl)                                     CREATE TABLE IF NOT EXISTS ...
+#   ("rename", table, old, new)                        rename a column if the old one exists
+#   ("sql", table, statement)                          data fix-up, skipped if the table is missing
+
+SCHEMA_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        description TEXT NOT NULL,
+        applied_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        duration_ms REAL)"""
+
+# Adding at least this many columns to a table that models.py fully describes
+# rebuilds it from the model (one new table + copy) instead of one ALTER each
+REBUILD_THRESHOLD = 4
+
+MIGRATIONS = [
+    (1, "City conquest and management columns", [
+        ("columns", "cities", [
+            "is_hq INTEGER DEFAULT 0",
+            "decay_turns INTEGER DEFAULT 0",
+            "commerce INTEGER DEFAULT 0",
+            "agriculture INTEGER DEFAULT 0",
+            "technology INTEGER DEFAULT 0",
+            "public_order INTEGER DEFAULT 50",
+            "governor_id INTEGER DEFAULT 0",
+        ]),
+    ]),
+    (2, "Deferred battle resolution", [
+        ("table", """CREATE TABLE IF NOT EXISTS pending_battles (
+            location_id INTEGER PRIMARY KEY,
+            attacker_faction_id INTEGER)"""),
+        ("columns", "pending_battles", [
+            "source_location_id INTEGER DEFAULT 0",
+            "leader_id INTEGER DEFAULT 0",
+        ]),
+    ]),
+    (3, "Relationship system and troops", [
+        ("columns", "officers", ["troops INTEGER DEFAULT 0"]),
+        ("table", """CREATE TABLE IF NOT EXISTS officer_relations (
+            officer_1_id INTEGER,
+            officer_2_id INTEGER,
+            value INTEGER DEFAULT 0,
+            PRIMARY KEY (officer_1_id, officer_2_id))"""),
+        ("table", """CREATE TABLE IF NOT EXISTS officer_faction_relations (
+            officer_id INTEGER,
+            faction_id INTEGER,
+            value INTEGER DEFAULT 0,
+            PRIMARY KEY (officer_id, faction_id))"""),
+        ("columns", "factions", ["leader_id INTEGER DEFAULT 0"]),
+    ]),
+    (4, "ActionManager officer columns", [
+        ("columns", "officers", [
+            "destination_city_id INTEGER DEFAULT NULL",
+            "gold INTEGER DEFAULT 200",
+            "reputation INTEGER DEFAULT 0",
+            "battles_won INTEGER DEFAULT 0",
+            "battles_lost INTEGER DEFAULT 0",
+            "days_service INTEGER DEFAULT 0",
+            "last_promotion_day INTEGER DEFAULT 0",
+            "max_troops INTEGER DEFAULT 1000",
+            "is_commander INTEGER DEFAULT 0",
+            "current_action_points INTEGER DEFAULT 3",
+            "max_action_points INTEGER DEFAULT 3",
+        ]),
+        ("table", "CREATE TABLE IF NOT EXISTS wine_dine_history (player_id INTEGER, target_id INTEGER, count INTEGER, PRIMARY KEY(player_id, target_id))"),
+        ("sql", "officers", "UPDATE officers SET max_action_points = 5 WHERE is_commander = 1 OR rank = 'Sovereign'"),
+        ("sql", "officers", "UPDATE officers SET max_action_points = 3 WHERE max_action_points IS NULL"),
+        ("sql", "officers", "UPDATE officers SET current_action_points = max_action_points WHERE current_action_points IS NULL"),
+    ]),
+    (5, "RotTK8 stat names and charisma", [
+        ("rename", "officers", "combat", "strength"),
+        ("rename", "officers", "strategy", "intelligence"),
+        ("columns", "officers", ["charisma INTEGER DEFAULT 50"]),
+    ]),
+    (6, "Stat allocation", [
+        ("columns", "officers", [
+            "stat_points INTEGER DEFAULT 0",
+            "base_strength INTEGER DEFAULT 50",
+            "base_leadership INTEGER DEFAULT 50",
+            "base_intelligence INTEGER DEFAULT 50",
+            "base_politics INTEGER DEFAULT 50",
+            "base_charisma INTEGER DEFAULT 50",
+        ]),
+        ("sql", "officers", """UPDATE officers SET base_strength = strength, base_leadership = leadership,
+            base_intelligence = intelligence, base_politics = politics, base_charisma = charisma
+            WHERE base_strength IS NULL OR base_strength = 0 OR base_strength = 50"""),
+    ]),
+    (7, "Portraits, formations and troop types", [
+        ("columns", "officers", [
+            "portrait_source_id INTEGER DEFAULT 0",
+            "portrait_coords VARCHAR DEFAULT '0,0'",
+            "formation_type INTEGER DEFAULT 0",
+            "last_mentored_day INTEGER DEFAULT 0",
+            "main_troop_type INTEGER DEFAULT 0",
+            "officer_type INTEGER DEFAULT 0",
+        ]),
+    ]),
+    (8, "Mistwood connects to South Fields instead of River Port", [
+        ("sql", "routes", """DELETE FROM routes
+            WHERE (start_city_id = (SELECT city_id FROM cities WHERE name = 'Mistwood') AND end_city_id = (SELECT city_id FROM cities WHERE name = 'River Port'))
+               OR (start_city_id = (SELECT city_id FROM cities WHERE name = 'River Port') AND end_city_id = (SELECT city_id FROM cities WHERE name = 'Mistwood'))"""),
+        ("sql", "routes", """INSERT INTO routes (start_city_id, end_city_id, distance, route_type, is_chokepoint)
+            SELECT c1.city_id, c2.city_id, 2.0, 'Road', 0 FROM cities c1, cities c2
+            WHERE c1.name = 'Mistwood' AND c2.name = 'South Fields'
+              AND NOT EXISTS (SELECT 1 FROM routes r
+                              WHERE (r.start_city_id = c1.city_id AND r.end_city_id = c2.city_id)
+                                 OR (r.start_city_id = c2.city_id AND r.end_city_id = c1.city_id))"""),
+        ("sql", "routes", """INSERT INTO routes (start_city_id, end_city_id, distance, route_type, is_chokepoint)
+            SELECT c2.city_id, c1.city_id, 2.0, 'Road', 0 FROM cities c1, cities c2
+            WHERE c1.name = 'Mistwood' AND c2.name = 'South Fields'
+              AND NOT EXISTS (SELECT 1 FROM routes r WHERE r.start_city_id = c2.city_id AND r.end_city_id = c1.city_id)"""),
+    ]),
+    (9, "Grand strategy logistics", [
+        ("columns", "factions", [
+            "gold_treasury INTEGER DEFAULT 5000",
+            "supplies INTEGER DEFAULT 10000",
+            "tax_rate FLOAT DEFAULT 0.1",
+            "tactician_id INTEGER DEFAULT 0",
+        ]),
+        ("columns", "officers", [
+            "satisfaction INTEGER DEFAULT 100",
+            "current_mission TEXT DEFAULT NULL",
+            "merit_score INTEGER DEFAULT 0",
+        ]),
+        ("columns", "cities", ["draft_population INTEGER DEFAULT 1000"]),
+    ]),
+    (10, "Domestic skills and troop tiers", [
+        ("columns", "officers", [
+            "farming INTEGER DEFAULT 0",
+            "business INTEGER DEFAULT 0",
+            "inventing INTEGER DEFAULT 0",
+            "fortification INTEGER DEFAULT 0",
+            "security INTEGER DEFAULT 0",
+            "troop_tier INTEGER DEFAULT 1",
+            "troop_variant TEXT DEFAULT 'Standard'",
+        ]),
+    ]),
+    (11, "Unified public order, governance and assignments", [
+        ("columns", "officers", [
+            "governance INTEGER DEFAULT 0",
+            "public_attitude INTEGER DEFAULT 0",
+            "current_assignment TEXT DEFAULT NULL",
+            "assignment_target_id INTEGER DEFAULT 0",
+        ]),
+        ("columns", "cities", ["max_stats INTEGER DEFAULT 1000"]),
+        ("sql", "officers", "UPDATE officers SET current_mission = current_assignment WHERE current_mission IS NULL AND current_assignment IS NOT NULL"),
+    ]),
+    (12, "City security and stability", [
+        ("columns", "cities", [
+            "security INTEGER DEFAULT 50",
+            "stability INTEGER DEFAULT 50",
+        ]),
+    ]),
+    (13, "Covering index for officer relation lookups", [
+        ("sql", "officer_relations",
+         "CREATE INDEX IF NOT EXISTS ix_officer_relations_officer_2 ON officer_relations (officer_2_id, officer_1_id, value)"),
+    ]),
+    (14, "Indexes for the game's hot lookups (see src/database/query_plans.py)", [
+        ("sql", "officers",
+         "CREATE INDEX IF NOT EXISTS ix_officers_location ON officers (location_id, faction_id)"),
+        ("sql", "officers",
+         "CREATE INDEX IF NOT EXISTS ix_officers_faction ON officers (faction_id, is_commander)"),
+        ("sql", "officers",
+         "CREATE INDEX IF NOT EXISTS ix_officers_assignment ON officers (assignment_target_id, current_assignment)"),
+        ("sql", "officers",
+         "CREATE INDEX IF NOT EXISTS ix_officers_player ON officers (is_player) WHERE is_player = 1"),
+        ("sql", "cities",
+         "CREATE INDEX IF NOT EXISTS ix_cities_faction ON cities (faction_id, is_hq)"),
+        ("sql", "cities",
+         "CREATE INDEX IF NOT EXISTS ix_cities_governor ON cities (governor_id)"),
+        ("sql", "cities",
+         "CREATE INDEX IF NOT EXISTS ix_cities_name ON cities (name)"),
+        ("sql", "routes",
+         "CREATE INDEX IF NOT EXISTS ix_routes_start ON routes (start_city_id, end_city_id)"),
+        ("sql", "routes",
+         "CREATE INDEX IF NOT EXISTS ix_routes_end ON routes (end_city_id, start_city_id)"),
+        ("sql", "pending_battles",
+         "CREATE INDEX IF NOT EXISTS ix_pending_battles_attacker ON pending_battles (attacker_faction_id)"),
+        # Saves from before the one-battle-per-city layout key pending_battles by battle_id
+        ("sql", "pending_battles",
+         "CREATE INDEX IF NOT EXISTS ix_pending_battles_location ON pending_battles (location_id, source_location_id)"),
+        ("sql", "faction_relations",
+         "CREATE INDEX IF NOT EXISTS ix_faction_relations_pair ON faction_relations (source_faction_id, target_faction_id, value)"),
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn):
+    """Highest applied migration, 0 for a database that has never been migrated."""
+    try:
+        row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    except Exception:  # No schema_version table yet
+        return 0
+    return row[0] or 0
+
+
+def pending_migrations(conn):
+    version = current_version(conn)
+    return [m for m in MIGRATIONS if m[0] > version]
+
+
+def _columns(conn, table):
+    return [r[1] for r in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _table_exists(conn, table):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone() is not None
+
+
+def _rebuild_from_model(conn, table, existing):
+    """SQLite table-rebuild pattern: create the model's table, copy rows, swap names."""
+    model = Base.metadata.tables[table]
+    dialect = sqlite.dialect()
+    indexes = [r[0] for r in conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,))]
+    ddl = str(CreateTable(model).compile(dialect=dialect)).replace(f"CREATE TABLE {table} ", f"CREATE TABLE {table}__new ", 1)
+    conn.execute(ddl)
+    cols = ", ".join(existing)
+    conn.execute(f"INSERT INTO {table}__new ({cols}) SELECT {cols} FROM {table}")
+    conn.execute(f"DROP TABLE {table}")
+    conn.execute(f"ALTER TABLE {table}__new RENAME TO {table}")
+    for sql in indexes:
+        conn.execute(sql)
+    for index in model.indexes:
+        conn.execute(str(CreateIndex(index).compile(dialect=dialect)).replace("CREATE INDEX", "CREATE INDEX IF NOT EXISTS", 1))
+
+
+def _add_columns(conn, table, definitions):
+    existing = _columns(conn, table)
+    if not existing:
+        return 0  # Table not created yet (e.g. a partial save); nothing to extend
+    missing = [d for d in definitions if d.split(" ")[0] not in existing]
+    if not missing:
+        return 0
+    model = Base.metadata.tables.get(table)
+    covered = model is not None and set(existing) <= set(model.c.keys()) and \
+        all(d.split(" ")[0] in model.c for d in missing)
+    if len(missing) >= REBUILD_THRESHOLD and covered:
+        _rebuild_from_model(conn, table, existing)
+    else:
+        for definition in missing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {definition}")
+    return len(missing)
+
+
+def _apply_step(conn, step):
+    kind = step[0]
+    if kind == "columns":
+        _add_columns(conn, step[1], step[2])
+    elif kind == "table":
+        conn.execute(step[1])
+    elif kind == "rename":
+        _, table, old, new = step
+        cols = _columns(conn, table)
+        if old in cols and new not in cols:
+            conn.execute(f"ALTER TABLE {table} RENAME COLUMN {old} TO {new}")
+    elif kind == "sql":
+        if _table_exists(conn, step[1]):
+            conn.execute(step[2])
+    else:
+        raise ValueError(f"Unknown migration step '{kind}'")
+
+
+def migrate(conn, target=LATEST_VERSION, verbose=False):
+    """Applies pending migrations up to `target`, one transaction each.
+
+    `conn` is a sqlite3 connection. Returns the list of applied versions; when the
+    database is current this is a single SELECT and returns [].
+    """
+    version = current_version(conn)
+    if version >= target:
+        return []
+
+    conn.commit()  # Start from a clean transaction state
+    old_isolation = conn.isolation_level
+    conn.isolation_level = None  # Explicit BEGIN/COMMIT so DDL and DML share one transaction
+    applied = []
+    try:
+        conn.execute(SCHEMA_VERSION_TABLE)
+        for number, description, steps in MIGRATIONS:
+            if number <= version or number > target:
+                continue
+            start = time.perf_counter()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for step in steps:
+                    _apply_step(conn, step)
+                elapsed = (time.perf_counter() - start) * 1000
+                conn.execute("INSERT INTO schema_version (version, description, duration_ms) VALUES (?, ?, ?)",
+                             (number, description, elapsed))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            applied.append(number)
+            if verbose:
+                print(f"  [{number:>3}] {description} ({elapsed:.1f}ms)")
+    finally:
+        conn.isolation_level = old_isolation
+    return applied
+
+
+def stamp(conn, version=LATEST_VERSION):
+    """Marks a database built straight from models.py (init_db) as fully migrated."""
+    conn.execute(SCHEMA_VERSION_TABLE)
+    conn.executemany("INSERT OR IGNORE INTO schema_version (version, description, duration_ms) VALUES (?, ?, 0)",
+                     [(n, d) for n, d, _ in MIGRATIONS if n <= version])
+    conn.commit()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Enum as SqEnum
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, CheckConstraint, Index, text, Enum as SqEnum
 from sqlalchemy.orm import relationship, declarative_base
 import enum
 
@@ -30,6 +30,10 @@ class Faction(Base):
     gold_treasury = Column(Integer, default=5000)
     supplies = Column(Integer, default=10000)
     tax_rate = Column(Float, default=0.1)
+
+    # Leadership (set by WorldGenerator / council)
+    leader_id = Column(Integer, default=0, server_default="0")
+    tactician_id = Column(Integer, default=0, server_default="0")
     
     # Relationships
     officers = relationship("Officer", back_populates="faction")
@@ -103,14 +107,49 @@ class Officer(Base):
     base_politics = Column(Integer, default=50)
     base_charisma = Column(Integer, default=50)
 
+    # Service Record
+    battles_won = Column(Integer, default=0, server_default="0")
+    battles_lost = Column(Integer, default=0, server_default="0")
+    days_service = Column(Integer, default=0, server_default="0")
+    last_promotion_day = Column(Integer, default=0, server_default="0")
+    last_mentored_day = Column(Integer, default=0, server_default="0")
+    merit_score = Column(Integer, default=0, server_default="0") # Weekly merit review
+    satisfaction = Column(Integer, default=100, server_default="100")
+    current_mission = Column(String) # Mirrors current_assignment
+
+    # Portrait (sprite sheet + cell)
+    portrait_source_id = Column(Integer, default=0, server_default="0")
+    portrait_coords = Column(String, default="0,0", server_default="0,0")
+
+    # Domestic Skills
+    farming = Column(Integer, default=0, server_default="0")
+    business = Column(Integer, default=0, server_default="0")
+    inventing = Column(Integer, default=0, server_default="0")
+    fortification = Column(Integer, default=0, server_default="0")
+    security = Column(Integer, default=0, server_default="0")
+    governance = Column(Integer, default=0, server_default="0")
+    public_attitude = Column(Integer, default=0, server_default="0")
+
     # Combat Config
     formation_type = Column(Integer, default=0) # FormationShape enum
+    main_troop_type = Column(Integer, default=0, server_default="0")
+    officer_type = Column(Integer, default=0, server_default="0")
+    troop_tier = Column(Integer, default=1, server_default="1")
+    troop_variant = Column(String, default="Standard", server_default="Standard")
     
     # Relationships
     faction = relationship("Faction", back_populates="officers")
     current_city = relationship("City", back_populates="officers", foreign_keys=[location_id])
     unit_type = relationship("UnitType")
 
+    # Hot lookups from the C# side (migration 14, src/database/query_plans.py)
+    __table_args__ = (
+        Index('ix_officers_location', 'location_id', 'faction_id'),
+        Index('ix_officers_faction', 'faction_id', 'is_commander'),
+        Index('ix_officers_assignment', 'assignment_target_id', 'current_assignment'),
+        Index('ix_officers_player', 'is_player', sqlite_where=text('is_player = 1')),
+    )
+
 class GameState(Base):
     __tablename__ = 'game_state'
     
@@ -139,6 +178,12 @@ class City(Base):
     # Conquest Logic
     is_hq = Column(Integer, default=0) # 0 = False, 1 = True
     decay_turns = Column(Integer, default=0)
+
+    # Administration
+    governor_id = Column(Integer, default=0, server_default="0")
+    draft_population = Column(Integer, default=1000, server_default="1000") # Pool for auto-draft
+    security = Column(Integer, default=50, server_default="50")
+    stability = Column(Integer, default=50, server_default="50")
     
     # Relationships
     faction = relationship("Faction", back_populates="cities")
@@ -147,6 +192,12 @@ class City(Base):
     # Routes (Outgoing)
     routes = relationship("Route", foreign_keys="[Route.start_city_id]", back_populates="start_city")
 
+    __table_args__ = (
+        Index('ix_cities_faction', 'faction_id', 'is_hq'),
+        Index('ix_cities_governor', 'governor_id'),
+        Index('ix_cities_name', 'name'),
+    )
+
 class Route(Base):
     __tablename__ = 'routes'
     
@@ -163,6 +214,12 @@ class Route(Base):
     start_city = relationship("City", foreign_keys=[start_city_id], back_populates="routes")
     end_city = relationship("City", foreign_keys=[end_city_id])
 
+    # Routes are undirected: lookups come from either end
+    __table_args__ = (
+        Index('ix_routes_start', 'start_city_id', 'end_city_id'),
+        Index('ix_routes_end', 'end_city_id', 'start_city_id'),
+    )
+
 class BattleMapTemplate(Base):
     __tablename__ = 'battle_map_templates'
     
@@ -217,11 +274,35 @@ class FactionRelation(Base):
     source_faction = relationship("Faction", foreign_keys=[source_faction_id])
     target_faction = relationship("Faction", foreign_keys=[target_faction_id])
 
+    __table_args__ = (
+        Index('ix_faction_relations_pair', 'source_faction_id', 'target_faction_id', 'value'),
+    )
+
+class OfficerRelation(Base):
+    __tablename__ = 'officer_relations'
+
+    # One row per pair, smaller officer_id first (RelationshipManager keys it that way)
+    officer_1_id = Column(Integer, ForeignKey('officers.officer_id'), primary_key=True)
+    officer_2_id = Column(Integer, ForeignKey('officers.officer_id'), primary_key=True)
+
+    # -100 (Sworn Enemy) to 100 (Sworn Brother), 0 when no row exists
+    value = Column(Integer, default=0, server_default="0")
+
+    __table_args__ = (
+        CheckConstraint('officer_1_id < officer_2_id', name='ck_officer_relations_pair_order'),
+        # Covers lookups from the larger id's side; the primary key covers the other
+        Index('ix_officer_relations_officer_2', 'officer_2_id', 'officer_1_id', 'value'),
+    )
+
 class PendingBattle(Base):
     __tablename__ = 'pending_battles'
     
-    battle_id = Column(Integer, primary_key=True)
-    location_id = Column(Integer, ForeignKey('cities.city_id'), nullable=False)
+    # One pending battle per city, as created by DatabaseMigration.cs
+    location_id = Column(Integer, ForeignKey('cities.city_id'), primary_key=True)
     attacker_faction_id = Column(Integer, ForeignKey('factions.faction_id'), nullable=False)
-    source_location_id = Column(Integer, ForeignKey('cities.city_id'), nullable=True)
-    leader_id = Column(Integer, ForeignKey('officers.officer_id'), nullable=True)
+    source_location_id = Column(Integer, ForeignKey('cities.city_id'), nullable=True, server_default="0")
+    leader_id = Column(Integer, ForeignKey('officers.officer_id'), nullable=True, server_default="0")
+
+    __table_args__ = (
+        Index('ix_pending_battles_attacker', 'attacker_faction_id'),
+    )
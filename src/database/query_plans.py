@@ -0,0 +1,147 @@
+import re
+import sqlite3
+import statistics
+import time
+
+# Query-plan audit for the game's hot SQL.
+# The C# side filters officers, cities, routes and pending_battles by foreign key
+# on every turn (ProcessCityDecay, GetOfficersInCity, the council and AI screens,
+# route checks before every move), but the schema only has primary keys, so each
+# of those is a full table scan that grows with the world. HOT_QUERIES is a
+# catalogue of those statements, copied from the .cs files with the parameter
+# names normalised to $cid/$cid2/$fid/$fid2/$oid/$oid2. audit() runs EXPLAIN QUERY PLAN
+# for each one and flags full scans; migration 14 adds the indexes that remove them.
+
+# (name, C# source, sql, expected scans): tables (as named in the plan) that the
+# query reads most of anyway, so a scan of them is the right plan and is not flagged
+HOT_QUERIES = [
+    ("officers_in_city", "FactionAI.GetCityDefenseStrength",
+     "SELECT officer_id FROM officers WHERE location_id = $cid", ()),
+    ("officers_in_city_faction", "FactionAI.GetOfficersInCity",
+     "SELECT officer_id, name, strength, leadership, politics, intelligence, troop_tier, main_troop_type "
+     "FROM officers WHERE location_id = $cid AND faction_id = $fid", ()),
+    ("count_officers_in_city_faction", "TurnManager.ProcessCityDecay",
+     "SELECT count(*) FROM officers WHERE location_id = $cid AND faction_id = $fid", ()),
+    ("count_hostile_officers", "CityMenu.CheckEnemyPresence",
+     "SELECT COUNT(*) FROM officers WHERE location_id = $cid AND faction_id != $fid AND faction_id IS NOT NULL", ()),
+    ("ronin_in_city", "FactionAI.FindRoninInCity",
+     "SELECT officer_id FROM officers WHERE location_id = $cid AND faction_id IS NULL LIMIT 1", ()),
+    ("troops_in_city", "FactionAI.GetCityDefenseStrength",
+     "SELECT SUM(troops) FROM officers WHERE location_id = $cid", ()),
+    ("faction_officers", "FactionAI.RepositionOfficers",
+     "SELECT officer_id, name, strength, politics, intelligence, leadership, is_commander, current_action_points, "
+     "location_id, main_troop_type, troop_tier FROM officers WHERE faction_id = $fid AND is_player = 0", ()),
+    ("faction_commander", "FactionAI.GetFactionLeader",
+     "SELECT name, intelligence, strength, politics, leadership, current_action_points, officer_id "
+     "FROM officers WHERE faction_id = $fid AND is_commander = 1 LIMIT 1", ()),
+    ("assigned_officers", "FactionAI.GetOfficersWithAssignments",
+     "SELECT officer_id, name, location_id, current_action_points, current_assignment, assignment_target_id "
+     "FROM officers WHERE faction_id = $fid AND current_assignment IS NOT NULL AND current_action_points > 0", ()),
+    ("attack_troops", "FactionAI.AssignOfficerTasks",
+     "SELECT SUM(troops) FROM officers WHERE (current_assignment = 'CaptureCity' OR current_assignment = 'SupportAttack') "
+     "AND assignment_target_id = $cid", ()),
+    ("player", "CityMenu.GetPlayerId",
+     "SELECT officer_id FROM officers WHERE is_player = 1 LIMIT 1", ()),
+    ("player_location", "TurnManager.IsPlayerFaction",
+     "SELECT location_id FROM officers WHERE is_player = 1", ()),
+    ("same_location", "ActionManager.PerformTalk",
+     "SELECT (o1.location_id = o2.location_id) FROM officers o1, officers o2 "
+     "WHERE o1.officer_id = $oid AND o2.officer_id = $oid2", ()),
+    ("faction_cities", "WorldGraph.GetOwnedCities",
+     "SELECT city_id FROM cities WHERE faction_id = $fid", ()),
+    ("faction_hq", "WorldGraph.GetFactionHQ",
+     "SELECT city_id FROM cities WHERE faction_id = $fid AND is_hq = 1 LIMIT 1", ()),
+    ("governed_city", "TurnManager.IsPlayerFaction",
+     "SELECT city_id, faction_id FROM cities WHERE governor_id = (SELECT officer_id FROM officers WHERE is_player = 1)", ()),
+    ("city_by_name", "WorldMap.GetCityId",
+     "SELECT city_id FROM cities WHERE name = $name", ()),
+    ("decaying_cities", "TurnManager.ProcessCityDecay",
+     "SELECT city_id, name, faction_id, decay_turns FROM cities WHERE faction_id > 0", ("cities",)),
+    ("route_exists", "ActionManager.PerformMove",
+     "SELECT COUNT(*) FROM routes WHERE (start_city_id = $cid AND end_city_id = $cid2) "
+     "OR (start_city_id = $cid2 AND end_city_id = $cid)", ()),
+    ("neighbours", "FactionAI.FindNextHopToward",
+     "SELECT (CASE WHEN start_city_id = $cid THEN end_city_id ELSE start_city_id END) FROM routes "
+     "WHERE start_city_id = $cid OR end_city_id = $cid", ()),
+    ("pending_battle", "BattleManager.CreateContext",
+     "SELECT leader_id, attacker_faction_id FROM pending_battles WHERE location_id = $cid AND source_location_id = $cid2", ()),
+    ("faction_battles", "ActionManager.DeclareAttack",
+     "SELECT COUNT(*) FROM pending_battles WHERE attacker_faction_id = $fid", ()),
+    ("relation", "RelationshipManager.GetRelation",
+     "SELECT value FROM officer_relations WHERE officer_1_id = $oid AND officer_2_id = $oid2", ()),
+    ("faction_relation", "DiplomacyManager.GetRelation",
+     "SELECT value FROM faction_relations WHERE source_faction_id = $fid AND target_faction_id = $fid2", ()),
+    ("city_overview", "WorldMap.GetCitiesFromDB",
+     "SELECT c.name, f.color, "
+     "(SELECT COUNT(*) FROM officers o WHERE o.location_id = c.city_id AND o.is_player = 1) as has_player, "
+     "(SELECT COUNT(*) FROM pending_battles pb WHERE pb.location_id = c.city_id) as is_pending "
+     "FROM cities c LEFT JOIN factions f ON c.faction_id = f.faction_id", ("c",)),
+]
+
+_PARAMETER = re.compile(r"\$(\w+)")
+
+
+def sample_params(conn):
+    """Realistic values for the catalogue's parameters: the busiest city and faction, officers and a neighbour
+    there, and another faction."""
+    cid, fid = conn.execute("""
+        SELECT location_id, faction_id FROM officers WHERE location_id IS NOT NULL AND faction_id IS NOT NULL
+        GROUP BY location_id, faction_id ORDER BY COUNT(*) DESC LIMIT 1""").fetchone() or (0, 0)
+    officers = [r[0] for r in conn.execute(
+        "SELECT officer_id FROM officers WHERE location_id = ? ORDER BY officer_id LIMIT 2", (cid,))] + [0, 0]
+    neighbour = conn.execute(
+        "SELECT end_city_id FROM routes WHERE start_city_id = ? LIMIT 1", (cid,)).fetchone()
+    name = conn.execute("SELECT name FROM cities WHERE city_id = ?", (cid,)).fetchone()
+    rival = conn.execute(
+        "SELECT faction_id FROM factions WHERE faction_id != ? ORDER BY faction_id LIMIT 1", (fid,)).fetchone()
+    return {"cid": cid, "cid2": neighbour[0] if neighbour else 0, "fid": fid, "fid2": rival[0] if rival else 0,
+            "oid": min(officers[:2]), "oid2": max(officers[:2]), "name": name[0] if name else ""}
+
+
+def bind(sql, params):
+    """The subset of `params` that `sql` refers to."""
+    return {name: params[name] for name in _PARAMETER.findall(sql)}
+
+
+def explain(conn, sql, params):
+    """EXPLAIN QUERY PLAN detail lines for one statement."""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", bind(sql, params))]
+
+
+def full_scans(plan, expected=()):
+    """Plan lines that read a whole table (`SCAN t` without an index), other than the `expected` tables."""
+    scans = [line for line in plan if line.startswith("SCAN ") and " USING " not in line]
+    return [line for line in scans if line.split()[1] not in expected]
+
+
+def latency(conn, sql, params, repeat=200, budget=1.0):
+    """Median seconds per execution (fetching every row), over up to `repeat` runs or `budget` seconds."""
+    bound = bind(sql, params)
+    samples = []
+    deadline = time.perf_counter() + budget
+    while len(samples) < repeat and (not samples or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        conn.execute(sql, bound).fetchall()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def audit(conn, queries=HOT_QUERIES, params=None, repeat=0):
+    """One result dict per catalogue entry: name, source, plan, unexpected scans and (when repeat > 0) seconds.
+
+    Statements whose tables are missing from this save get plan None.
+    """
+    params = params or sample_params(conn)
+    results = []
+    for name, source, sql, expected in queries:
+        result = {"name": name, "source": source, "sql": sql, "plan": None, "scans": [], "seconds": None}
+        try:
+            result["plan"] = explain(conn, sql, params)
+        except sqlite3.OperationalError:
+            results.append(result)
+            continue
+        result["scans"] = full_scans(result["plan"], expected)
+        if repeat:
+            result["seconds"] = latency(conn, sql, params, repeat)
+        results.append(result)
+    return results
@@ -0,0 +1,272 @@
+import base64
+import json
+import os
+import re
+import sqlite3
+import time
+import zlib
+from contextlib import contextmanager
+
+# Save slots for the single live database.
+# The game keeps its whole state in tree_kingdoms.db with one game_state row, so
+# the only way to keep a save was a copy of the whole file, and every copy grows
+# with the world. A save directory instead holds one full base save, taken with
+# the online backup API a few pages per step so a running game is never locked out
+# for the whole copy, plus one small file per slot. A slot file is the zlib-compressed
+# row-level diff of the mutable tables against that base: deleted rowids and the
+# full new row of every inserted or changed row, behind a one-line JSON header
+# (base, day, row count) that listing slots reads without decompressing. Loading a slot rebuilds every
+# table from the base and applies the diff in one write transaction, so readers
+# see either the old state or the slot, never a mix.
+#
+# A slot whose diff grows past REBASE_RATIO of the base takes a new base instead.
+# Older bases are kept while any slot still refers to them.
+
+SAVE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../saves"))
+SAVE_TABLES = ["officers", "cities", "factions", "officer_relations", "faction_relations",
+               "officer_faction_relations", "pending_battles", "game_state", "wine_dine_history"]
+PAGES_PER_STEP = 256         # backup pages copied per step (4 KiB pages: 1 MiB)
+REBASE_RATIO = 0.5           # diff size (compressed) / base size that triggers a new base
+COMPRESS_LEVEL = 1           # zlib level of slot bodies; higher levels cost more than they save here
+SLOT_FORMAT = 1
+
+_SLOT_NAME = re.compile(r"^\w+$")
+_BASE_PATTERN = re.compile(r"^base_(\d+)\.db$")
+
+
+def _default(value):
+    if isinstance(value, bytes):
+        return {"$blob": base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"Cannot save a value of type {type(value).__name__}")
+
+
+def _hook(obj):
+    return base64.b64decode(obj["$blob"]) if len(obj) == 1 and "$blob" in obj else obj
+
+
+def read_state(conn, tables):
+    """({table: columns}, {table: {rowid: row}}) of the tables present, read in one transaction."""
+    existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    owns_transaction = not conn.in_transaction
+    if owns_transaction:
+        conn.execute("BEGIN")
+    try:
+        columns, rows = {}, {}
+        for table in tables:
+            if table not in existing:
+                continue
+            cursor = conn.execute(f"SELECT rowid, * FROM {table}")
+            columns[table] = [d[0] for d in cursor.description[1:]]
+            rows[table] = {row[0]: row[1:] for row in cursor}
+        return columns, rows
+    finally:
+        if owns_transaction:
+            conn.execute("COMMIT")
+
+
+class SaveManager:
+    """Base + diff save slots of a DatabaseManager's database, kept in `directory`."""
+
+    def __init__(self, manager, directory=SAVE_DIR, tables=SAVE_TABLES, pages=PAGES_PER_STEP,
+                 rebase_ratio=REBASE_RATIO):
+        self.manager = manager
+        self.directory = directory
+        self.tables = list(tables)
+        self.pages = pages
+        self.rebase_ratio = rebase_ratio
+        os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def _connection(self):
+        raw = self.manager.engine.raw_connection()
+        try:
+            yield raw.driver_connection
+        finally:
+            raw.close()
+
+    # --- Bases ---
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def bases(self):
+        """Base file names, oldest first."""
+        found = [(int(m[1]), name) for name in os.listdir(self.directory) if (m := _BASE_PATTERN.match(name))]
+        return [name for _, name in sorted(found)]
+
+    def take_base(self, progress=None):
+        """Writes a new full base save with the backup API, `pages` pages per step.
+
+        `progress(remaining, total)` is called after every step. Returns the base name.
+        """
+        existing = self.bases()
+        number = int(_BASE_PATTERN.match(existing[-1])[1]) + 1 if existing else 1
+        name = f"base_{number:04d}.db"
+        partial = self._path(name + ".partial")
+        target = sqlite3.connect(partial)
+        try:
+            with self._connection() as conn:
+                conn.backup(target, pages=self.pages,
+                            progress=(lambda status, remaining, total: progress(remaining, total)) if progress else None)
+        finally:
+            target.close()
+        os.replace(partial, self._path(name))
+        return name
+
+    @contextmanager
+    def _attached(self, conn, base):
+        """`conn` with `base` attached as save_base. Commits any open transaction first (ATTACH needs none)."""
+        conn.commit()
+        conn.execute("ATTACH DATABASE ? AS save_base", (self._path(base),))
+        try:
+            yield conn
+        finally:
+            conn.execute("DETACH DATABASE save_base")
+
+    # --- Slots ---
+
+    def _slot_path(self, slot):
+        if not _SLOT_NAME.match(slot):
+            raise ValueError(f"Invalid slot name {slot!r} (letters, digits and _ only)")
+        return self._path(f"{slot}.slot")
+
+    def _open_slot(self, slot):
+        path = self._slot_path(slot)
+        if not os.path.exists(path):
+            raise ValueError(f"No save in slot {slot!r}")
+        f = open(path, "rb")
+        header = json.loads(f.readline())
+        if header.get("format") != SLOT_FORMAT:
+            f.close()
+            raise ValueError(f"Slot {slot!r} has unsupported format {header.get('format')!r}")
+        return header, f
+
+    def _read_slot(self, slot):
+        """(header, {table: {"deleted": [rowid], "rows": [[rowid, *row]]}}) of a slot."""
+        header, f = self._open_slot(slot)
+        with f:
+            return header, json.loads(zlib.decompress(f.read()), object_hook=_hook)
+
+    def save(self, slot, progress=None):
+        """Saves the current state into `slot`. Returns the slot's header (see slots()).
+
+        The diff is computed inside SQLite (EXCEPT against the attached base), so only
+        the changed rows ever reach Python.
+        """
+        start = time.perf_counter()
+        existing = self.bases()
+        base = existing[-1] if existing else self.take_base(progress)
+        with self._connection() as conn:
+            with self._attached(conn, base):
+                header, tables = self._diff(conn, slot, base)
+        payload = self._encode(header, tables) if tables is not None else None
+        if payload is None or len(payload) > self.rebase_ratio * os.path.getsize(self._path(base)):
+            # Diff too large, or the schema moved on (a migration) since the base: start a new base
+            base = self.take_base(progress)
+            header.update(base=base, rows=0)
+            payload = self._encode(header, {})
+        path = self._slot_path(slot)
+        with open(path + ".partial", "wb") as f:
+            f.write(payload)
+        os.replace(path + ".partial", path)
+        self.prune()
+        info = self.slot_info(slot)
+        info["seconds"] = time.perf_counter() - start
+        return info
+
+    def _diff(self, conn, slot, base):
+        """(header, {table: {"deleted", "rows"}}) of the live tables against the attached base;
+        tables is None when their columns no longer match the base."""
+        conn.execute("BEGIN")
+        try:
+            live = {r[0] for r in conn.execute("SELECT name FROM main.sqlite_master WHERE type = 'table'")}
+            row = conn.execute("SELECT current_day FROM main.game_state LIMIT 1").fetchone() \
+                if "game_state" in live else None
+            header = {"format": SLOT_FORMAT, "slot": slot, "base": base, "day": row[0] if row else None,
+                      "saved_at": time.time(), "rows": 0}
+            tables = {}
+            for table in (t for t in self.tables if t in live):
+                columns = [r[1] for r in conn.execute(f"PRAGMA main.table_info({table})")]
+                if columns != [r[1] for r in conn.execute(f"PRAGMA save_base.table_info({table})")]:
+                    return header, None
+                deleted = [r[0] for r in conn.execute(
+                    f"SELECT rowid FROM save_base.{table} EXCEPT SELECT rowid FROM main.{table}")]
+                changed = [list(r) for r in conn.execute(
+                    f"SELECT rowid, * FROM main.{table} EXCEPT SELECT rowid, * FROM save_base.{table}")]
+                if deleted or changed:
+                    tables[table] = {"deleted": deleted, "rows": changed}
+                    header["rows"] += len(deleted) + len(changed)
+            return header, tables
+        finally:
+            conn.execute("COMMIT")
+
+    def _encode(self, header, tables):
+        body = json.dumps(tables, default=_default, separators=(",", ":")).encode("utf-8")
+        return json.dumps(header).encode("utf-8") + b"\n" + zlib.compress(body, COMPRESS_LEVEL)
+
+    def load(self, slot):
+        """Restores `slot` into the database in one write transaction. Returns the saved day."""
+        header, tables = self._read_slot(slot)
+        base_path = self._path(header["base"])
+        if not os.path.exists(base_path):
+            raise ValueError(f"Slot {slot!r} refers to missing base {header['base']}")
+        with self._connection() as conn, self._attached(conn, header["base"]):
+            base_tables = [r[0] for r in conn.execute(
+                "SELECT name FROM save_base.sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+            live = {r[0] for r in conn.execute("SELECT name FROM main.sqlite_master WHERE type = 'table'")}
+            missing = [t for t in base_tables if t not in live]
+            if missing:
+                raise ValueError(f"The database has no table(s) {', '.join(missing)} to restore into")
+            columns = {t: [f'"{r[1]}"' for r in conn.execute(f"PRAGMA save_base.table_info({t})")] for t in base_tables}
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # The slot's rows go into the emptied tables first; the base then fills in
+                # every other rowid (OR IGNORE skips the ones the slot replaced)
+                for table in base_tables:
+                    conn.execute(f"DELETE FROM main.{table}")
+                for table, change in tables.items():
+                    names = ", ".join(columns[table])
+                    marks = ", ".join("?" * (len(columns[table]) + 1))
+                    conn.executemany(f"INSERT INTO main.{table} (rowid, {names}) VALUES ({marks})", change["rows"])
+                for table in base_tables:
+                    names = ", ".join(columns[table])
+                    conn.execute(f"INSERT OR IGNORE INTO main.{table} (rowid, {names}) SELECT rowid, {names} "
+                                 f"FROM save_base.{table}")
+                for table, change in tables.items():
+                    conn.executemany(f"DELETE FROM main.{table} WHERE rowid = ?", [(r,) for r in change["deleted"]])
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return header["day"]
+
+    def slot_info(self, slot):
+        """{slot, base, day, saved_at, bytes, rows} of one slot."""
+        header, f = self._open_slot(slot)
+        f.close()
+        info = {key: header[key] for key in ("slot", "base", "day", "saved_at", "rows")}
+        info["bytes"] = os.path.getsize(self._slot_path(slot))
+        return info
+
+    def slots(self):
+        """slot_info() of every slot, newest first."""
+        names = [name[:-5] for name in os.listdir(self.directory) if name.endswith(".slot")]
+        return sorted((self.slot_info(name) for name in names), key=lambda info: -info["saved_at"])
+
+    def delete(self, slot):
+        os.remove(self._slot_path(slot))
+        self.prune()
+
+    def prune(self):
+        """Removes bases no slot refers to (the newest base is always kept). Returns their names."""
+        bases = self.bases()
+        used = {info["base"] for info in self.slots()} | set(bases[-1:])
+        removed = [name for name in bases if name not in used]
+        for name in removed:
+            os.remove(self._path(name))
+        return removed
+
+    def disk_usage(self):
+        """Bytes used by bases and slot files."""
+        return sum(os.path.getsize(self._path(name)) for name in os.listdir(self.directory)
+                   if _BASE_PATTERN.match(name) or name.endswith(".slot"))
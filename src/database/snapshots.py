@@ -0,0 +1,191 @@
+import os
+import re
+import struct
+import zipfile
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; snapshots fall back to NumPy .npz
+    pa = pq = None
+
+# Read-only columnar snapshots of the world for analysis.
+# Balance checks used to run one hardcoded query at a time against the live save
+# (debug_state.py, check_player_stats.py, verify_updates.py). A snapshot reads each
+# table once inside a single read transaction, so the tables agree with each other
+# and the lock is held only for the copy, and writes one file per table with the
+# day in the name: Parquet when pyarrow is installed, otherwise an uncompressed
+# .npz whose members read_columns() memory-maps in place. Writing a snapshot every
+# day of a long simulation gives a directory of per-day files that analyses can
+# open column by column without touching the database.
+
+SNAPSHOT_TABLES = ["officers", "cities", "factions", "routes", "officer_relations", "game_state"]
+NULL_SUFFIX = "__null"       # .npz member holding a column's NULL mask (only when it has NULLs)
+FORMATS = ("parquet", "npz")
+
+_FILE_PATTERN = re.compile(r"^(?P<table>\w+)_day(?P<day>\d+)\.(?P<ext>parquet|npz)$")
+
+
+def default_format():
+    return "parquet" if pa is not None else "npz"
+
+
+def snapshot_path(directory, table, day, fmt):
+    return os.path.join(directory, f"{table}_day{day:05d}.{fmt}")
+
+
+def _column(values):
+    """(NumPy array, NULL mask) for one column of SQLite values.
+
+    Integer columns stay int64 and REAL columns float64 (NULL stored as 0 / NaN);
+    anything else becomes a fixed-width unicode array ("" for NULL) so it can be
+    memory-mapped.
+    """
+    nulls = np.fromiter((v is None for v in values), dtype=bool, count=len(values))
+    kinds = {type(v) for v in values if v is not None}
+    if kinds <= {int, bool}:
+        array = np.array([0 if v is None else v for v in values], dtype=np.int64)
+    elif kinds <= {int, bool, float}:
+        array = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    else:
+        text = ["" if v is None else v.hex() if isinstance(v, bytes) else str(v) for v in values]
+        array = np.array(text, dtype=str) if text else np.zeros(0, dtype="U1")
+    return array, nulls
+
+
+def read_tables(conn, tables=SNAPSHOT_TABLES):
+    """{table: {column: (array, nulls)}} read in one transaction; missing tables are skipped."""
+    existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    owns_transaction = not conn.in_transaction
+    if owns_transaction:
+        conn.execute("BEGIN")
+    try:
+        result = {}
+        for table in tables:
+            if table not in existing:
+                continue
+            cursor = conn.execute(f"SELECT * FROM {table}")
+            names = [d[0] for d in cursor.description]
+            rows = cursor.fetchall()
+            columns = list(zip(*rows)) if rows else [()] * len(names)
+            result[table] = {name: _column(list(values)) for name, values in zip(names, columns)}
+        return result
+    finally:
+        if owns_transaction:
+            conn.execute("COMMIT")
+
+
+def _write_npz(path, columns):
+    members = {}
+    for name, (array, nulls) in columns.items():
+        members[name] = array
+        if nulls.any():
+            members[name + NULL_SUFFIX] = nulls
+    np.savez(path, **members)
+
+
+def _write_parquet(path, columns, day):
+    arrays = {name: pa.array(array, mask=nulls if nulls.any() else None) for name, (array, nulls) in columns.items()}
+    table = pa.table(arrays).replace_schema_metadata({"day": str(day)})
+    pq.write_table(table, path)
+
+
+class SnapshotWriter:
+    """Writes one file per table per day into `directory`.
+
+    `fmt` is "parquet" or "npz"; by default Parquet when pyarrow is available.
+    """
+
+    def __init__(self, directory, tables=SNAPSHOT_TABLES, fmt=None):
+        fmt = fmt or default_format()
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown snapshot format {fmt!r}")
+        if fmt == "parquet" and pa is None:
+            raise ValueError("Parquet snapshots need pyarrow; use fmt='npz'")
+        self.directory = directory
+        self.tables = list(tables)
+        self.fmt = fmt
+        self.written = []            # (day, table, path)
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, conn, day=None):
+        """Snapshots every table for `day` (game_state.current_day when None). Returns {table: path}."""
+        if day is None:
+            row = conn.execute("SELECT current_day FROM game_state LIMIT 1").fetchone()
+            day = row[0] if row and row[0] is not None else 0
+        paths = {}
+        for table, columns in read_tables(conn, self.tables).items():
+            path = snapshot_path(self.directory, table, day, self.fmt)
+            if self.fmt == "parquet":
+                _write_parquet(path, columns, day)
+            else:
+                _write_npz(path, columns)
+            paths[table] = path
+            self.written.append((day, table, path))
+        return paths
+
+
+# --- Reading ---
+
+def list_snapshots(directory, table):
+    """[(day, path)] for every snapshot of `table` in `directory`, by day."""
+    found = []
+    for name in os.listdir(directory) if os.path.isdir(directory) else ():
+        match = _FILE_PATTERN.match(name)
+        if match and match["table"] == table:
+            found.append((int(match["day"]), os.path.join(directory, name)))
+    return sorted(found)
+
+
+def _mmap_npz(path):
+    """Memory-maps every stored (uncompressed) member of an .npz; compressed members are read normally."""
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member)
+                continue
+            f.seek(info.header_offset)
+            name_length, extra_length = struct.unpack("<HH", f.read(30)[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            if dtype.hasobject or 0 in shape:
+                arrays[name] = np.zeros(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=f.tell(), shape=shape,
+                                         order="F" if fortran else "C")
+    return arrays
+
+
+def read_columns(path, columns=None):
+    """{column: array} from one snapshot file, NULLs masked (np.ma) where a column has any.
+
+    .npz columns are memory-mapped; Parquet files are opened with memory_map=True
+    and only `columns` are read.
+    """
+    if path.endswith(".parquet"):
+        if pq is None:
+            raise ValueError("Reading Parquet snapshots needs pyarrow")
+        table = pq.read_table(path, columns=columns, memory_map=True)
+        result = {}
+        for name in table.column_names:
+            column = table.column(name)
+            values = column.to_numpy()
+            result[name] = np.ma.MaskedArray(values, mask=column.is_null().to_numpy()) if column.null_count else values
+        return result
+
+    members = _mmap_npz(path)
+    names = [n for n in members if not n.endswith(NULL_SUFFIX)]
+    result = {}
+    for name in names if columns is None else [c for c in columns if c in members]:
+        nulls = members.get(name + NULL_SUFFIX)
+        result[name] = members[name] if nulls is None else np.ma.MaskedArray(members[name], mask=nulls)
+    return result
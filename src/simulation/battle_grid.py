@@ -0,0 +1,268 @@
+import heapq
+import math
+from collections import deque
+
+import numpy as np
+
+# Headless port of BattleGrid (ui/BattleGrid.cs): the 30x20 tile map, the siege and
+# control-point map generators and A* pathing. Tiles are a NumPy array indexed
+# [y, x]; cells are numbered y * width + x. Besides the A* port (kept as the
+# reference) the grid can build a BFS distance field towards any target cell: every
+# unit heading for that cell then takes its next step by looking at four
+# neighbours, instead of running its own A* each time it is given a target.
+
+MAP_WIDTH, MAP_HEIGHT = 30, 20
+TILE_SIZE = 64
+PLAINS, FOREST = 0, 1
+UNREACHABLE = -1
+
+# ControlPoint.CPType
+HQ, SUPPLY_DEPOT, OUTPOST, GATE = "HQ", "SupplyDepot", "Outpost", "Gate"
+CP_HEALTH = 500
+GATE_BASE_HEALTH = 2000              # + defense_level * 10
+
+# battle_node_templates.node_type -> CPType (the game has no "Standard" or "Tower")
+NODE_TYPES = {"HQ": HQ, "Depot": SUPPLY_DEPOT, "Tower": OUTPOST, "Standard": OUTPOST}
+TEMPLATE_MARGIN = 2                  # Keeps the HQ clearing (radius 2) on the map
+
+# BattleGrid.GetNeighbors order: Up, Down, Left, Right
+DIRECTIONS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+
+class ControlPoint:
+    """ControlPoint without the node: position, type, owner and gate health."""
+
+    __slots__ = ("x", "y", "type", "owner", "max_health", "health", "connections")
+
+    def __init__(self, x, y, cp_type, owner):
+        self.x, self.y = x, y
+        self.type = cp_type
+        self.owner = owner               # faction_id, 0 = neutral
+        self.max_health = self.health = CP_HEALTH
+        self.connections = []
+
+    @property
+    def is_destroyed(self):
+        return self.health <= 0
+
+    def set_max_health(self, hp):
+        self.max_health = self.health = hp
+
+    def take_damage(self, amount):
+        """Only gates can be damaged."""
+        if self.type != GATE or self.is_destroyed:
+            return
+        self.health = max(0, self.health - amount)
+
+    def connect(self, other):
+        if other not in self.connections:
+            self.connections.append(other)
+        if self not in other.connections:
+            other.connections.append(self)
+
+
+class BattleGrid:
+    """Walkability grid plus the map generators and path queries of BattleGrid.cs.
+
+    `version` goes up whenever terrain changes, so anything cached from the tiles
+    (neighbour lists, distance fields) can tell it is stale.
+    """
+
+    def __init__(self, width=MAP_WIDTH, height=MAP_HEIGHT):
+        self.width, self.height = width, height
+        self.tiles = np.full((height, width), FOREST, dtype=np.uint8)
+        self.version = 0
+        self._neighbours = None
+        self._neighbours_version = -1
+
+    # --- Generation ---
+
+    @classmethod
+    def siege_map(cls, defender_id, attacker_id, defense_level, width=MAP_WIDTH, height=MAP_HEIGHT):
+        """GenerateSiegeMap: HQs at both ends, a gate at x = 10 and a corridor through it.
+
+        Returns (grid, control points) with the points in the game's order:
+        defender HQ, attacker HQ, gate.
+        """
+        grid = cls(width, height)
+        def_hq = grid._create_cp(2, height // 2, HQ, defender_id)
+        att_hq = grid._create_cp(width - 3, height // 2, HQ, attacker_id)
+        gate = grid._create_cp(10, height // 2, GATE, defender_id)
+        gate.set_max_health(GATE_BASE_HEALTH + (defense_level or 0) * 10)
+
+        grid.carve_area(def_hq.x, def_hq.y, 6)
+        grid.carve_area(att_hq.x, att_hq.y, 8)
+        gate.connect(def_hq)
+        gate.connect(att_hq)
+        grid.carve_path((def_hq.x, def_hq.y), (gate.x, gate.y))
+        grid.carve_path((gate.x, gate.y), (att_hq.x, att_hq.y))
+        return grid, [def_hq, att_hq, gate]
+
+    @classmethod
+    def from_template(cls, conn, template_id, defender_id, attacker_id, width=MAP_WIDTH, height=MAP_HEIGHT):
+        """A map built from battle_map_templates, the way GenerateMapWithCPs builds its random one.
+
+        Node coordinates (0-100, y pointing north) are scaled onto the grid, every
+        node becomes a control point with a radius-2 clearing and every link is
+        carved as a 3-wide path. HQ nodes flagged as a spawn belong to that side;
+        everything else starts neutral. Returns (grid, control points) in node_id order.
+        """
+        nodes = conn.execute("""
+            SELECT node_id, x, y, node_type, is_attacker_spawn, is_defender_spawn
+            FROM battle_node_templates WHERE template_id = ? ORDER BY node_id""", (template_id,)).fetchall()
+        if not nodes:
+            raise ValueError(f"Battle map template {template_id} has no nodes")
+        links = conn.execute(
+            "SELECT source_node_id, target_node_id FROM battle_link_templates WHERE template_id = ? ORDER BY link_id",
+            (template_id,)).fetchall()
+
+        grid = cls(width, height)
+        span_x, span_y = width - 1 - 2 * TEMPLATE_MARGIN, height - 1 - 2 * TEMPLATE_MARGIN
+        by_node = {}
+        cps = []
+        for node_id, x, y, node_type, attacker_spawn, defender_spawn in nodes:
+            gx = TEMPLATE_MARGIN + round((x or 0) / 100 * span_x)
+            gy = TEMPLATE_MARGIN + round((100 - (y or 0)) / 100 * span_y)
+            cp_type = NODE_TYPES.get(node_type, OUTPOST)
+            owner = 0
+            if cp_type == HQ:
+                owner = attacker_id if attacker_spawn else defender_id if defender_spawn else 0
+            cp = grid._create_cp(gx, gy, cp_type, owner)
+            by_node[node_id] = cp
+            cps.append(cp)
+        for source, target in links:
+            a, b = by_node.get(source), by_node.get(target)
+            if a is not None and b is not None:
+                a.connect(b)
+                grid.carve_path((a.x, a.y), (b.x, b.y))
+        return grid, cps
+
+    def _create_cp(self, x, y, cp_type, owner):
+        self.carve_area(x, y, 2)
+        return ControlPoint(x, y, cp_type, owner)
+
+    def carve_area(self, cx, cy, radius):
+        x0, x1 = max(0, cx - radius), min(self.width, cx + radius + 1)
+        y0, y1 = max(0, cy - radius), min(self.height, cy + radius + 1)
+        if x0 < x1 and y0 < y1:
+            self.tiles[y0:y1, x0:x1] = PLAINS
+            self.version += 1
+
+    def carve_path(self, start, end):
+        for x, y in line(start, end):
+            self.carve_area(x, y, 1)
+
+    # --- Queries ---
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_walkable(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height and self.tiles[y, x] == PLAINS
+
+    @staticmethod
+    def grid_to_world(x, y):
+        """Centre of the tile in pixels."""
+        return x * TILE_SIZE + TILE_SIZE / 2, y * TILE_SIZE + TILE_SIZE / 2
+
+    def neighbours(self):
+        """Per cell, the walkable 4-neighbours in GetNeighbors order (rebuilt after terrain changes)."""
+        if self._neighbours_version != self.version:
+            walkable = (self.tiles == PLAINS).ravel().tolist()
+            w, h = self.width, self.height
+            result = []
+            for c in range(w * h):
+                x, y = c % w, c // w
+                result.append([(y + dy) * w + x + dx for dx, dy in DIRECTIONS
+                               if 0 <= x + dx < w and 0 <= y + dy < h and walkable[(y + dy) * w + x + dx]])
+            self._neighbours, self._neighbours_version = result, self.version
+        return self._neighbours
+
+    def distance_field(self, tx, ty):
+        """BFS steps from every cell to (tx, ty) as an int16 array of width * height.
+
+        Blocked and unreachable cells are UNREACHABLE. An unwalkable target is
+        replaced by its walkable neighbours, as GetPath does (it keeps only the one
+        nearest the start; a field has no start, so all of them are goals).
+        """
+        w, h = self.width, self.height
+        dist = [UNREACHABLE] * (w * h)
+        if self.is_walkable(tx, ty):
+            goals = [ty * w + tx]
+        else:
+            goals = [(ty + dy) * w + tx + dx for dx, dy in DIRECTIONS if self.is_walkable(tx + dx, ty + dy)]
+        neighbours = self.neighbours()
+        queue = deque(goals)
+        for c in goals:
+            dist[c] = 0
+        while queue:
+            c = queue.popleft()
+            step = dist[c] + 1
+            for n in neighbours[c]:
+                if dist[n] == UNREACHABLE:
+                    dist[n] = step
+                    queue.append(n)
+        return np.array(dist, dtype=np.int16)
+
+    def get_path(self, start, end):
+        """BattleGrid.GetPath: A* over 4-neighbours with a Euclidean heuristic.
+
+        Returns the list of (x, y) steps after `start`, or None when there is no
+        path. Kept as the reference for the distance fields.
+        """
+        if not self.is_walkable(*end):
+            candidates = [(end[0] + dx, end[1] + dy) for dx, dy in DIRECTIONS]
+            candidates = [c for c in candidates if self.is_walkable(*c)]
+            if not candidates:
+                return None
+            end = min(candidates, key=lambda c: math.dist(c, start))
+
+        counter = 0
+        open_set = [(math.dist(start, end), counter, start)]
+        open_hash = {start}
+        came_from = {}
+        g_score = {start: 0}
+        while open_set:
+            _, _, current = heapq.heappop(open_set)
+            open_hash.discard(current)
+            if current == end:
+                path = [current]
+                while current in came_from:
+                    current = came_from[current]
+                    path.append(current)
+                path.reverse()
+                return path[1:]
+            for dx, dy in DIRECTIONS:
+                neighbour = (current[0] + dx, current[1] + dy)
+                if not self.is_walkable(*neighbour):
+                    continue
+                tentative = g_score[current] + 1
+                if tentative < g_score.get(neighbour, math.inf):
+                    came_from[neighbour] = current
+                    g_score[neighbour] = tentative
+                    if neighbour not in open_hash:
+                        counter += 1
+                        heapq.heappush(open_set, (tentative + math.dist(neighbour, end), counter, neighbour))
+                        open_hash.add(neighbour)
+        return None
+
+
+def line(start, end):
+    """BattleGrid.GetLine: Bresenham cells from start to end inclusive."""
+    x0, y0 = start
+    x1, y1 = end
+    dx, sx = abs(x1 - x0), 1 if x0 < x1 else -1
+    dy, sy = -abs(y1 - y0), 1 if y0 < y1 else -1
+    err = dx + dy
+    points = []
+    while True:
+        points.append((x0, y0))
+        if x0 == x1 and y0 == y1:
+            return points
+        e2 = 2 * err
+        if e2 >= dy:
+            err += dy
+            x0 += sx
+        if e2 <= dx:
+            err += dx
+            y0 += sy
@@ -0,0 +1,209 @@
+import hashlib
+import os
+
+import numpy as np
+
+from src.simulation.battle_grid import PLAINS, UNREACHABLE, DIRECTIONS
+
+# Distance-field cache for battle grids.
+# BattleGrid.GetPath runs a separate A* for every unit whenever its target changes,
+# although most units head for the same few control points. Here each target cell
+# gets one BFS distance field (int16, UNREACHABLE for blocked cells) plus a
+# next-step table from a 4-neighbour argmin, so any unit's next step is one list
+# lookup. Fields for every control point of a map are built in one vectorised pass
+# and can be saved as a .npy file per map (template id, grid size and a hash of the
+# tiles in the name), so later battles on the same map memory-map them. Grids with
+# more cells than int16 can count get int32 fields (see field_dtype()).
+#
+# Fields are only valid for one walkability version: (grid.version, CP version).
+# Terrain edits bump grid.version. When a `walls` rule makes CP state block cells
+# (gates, say), cps_changed() after a capture or a breach bumps the CP version.
+# Either one drops every cached field.
+
+FIELD_DTYPE = np.int16        # Fields of grids up to 32767 cells
+LARGE_FIELD_DTYPE = np.int32  # Bigger grids, where a BFS distance may not fit in int16
+NO_STEP = -1
+_FAR = np.iinfo(np.int32).max
+
+
+def goal_cells(walkable, tx, ty):
+    """The BFS seeds for a target: the target itself, or its walkable neighbours when it is blocked (as GetPath)."""
+    h, w = walkable.shape
+    if 0 <= tx < w and 0 <= ty < h and walkable[ty, tx]:
+        return [(tx, ty)]
+    return [(tx + dx, ty + dy) for dx, dy in DIRECTIONS
+            if 0 <= tx + dx < w and 0 <= ty + dy < h and walkable[ty + dy, tx + dx]]
+
+
+def field_dtype(height, width):
+    """int16 while no BFS distance can exceed it (a path visits each cell at most once), else int32."""
+    return FIELD_DTYPE if height * width <= np.iinfo(FIELD_DTYPE).max else LARGE_FIELD_DTYPE
+
+
+def distance_fields(walkable, targets):
+    """BFS steps to each target, for all targets at once. Returns a (targets, h * w) array of field_dtype()."""
+    h, w = walkable.shape
+    k = len(targets)
+    dist = np.full((k, h, w), UNREACHABLE, dtype=field_dtype(h, w))
+    frontier = np.zeros((k, h, w), dtype=bool)
+    for i, (tx, ty) in enumerate(targets):
+        for x, y in goal_cells(walkable, tx, ty):
+            frontier[i, y, x] = True
+    dist[frontier] = 0
+    seen = frontier.copy()
+    step = 0
+    while frontier.any():
+        step += 1
+        grown = np.zeros_like(frontier)
+        grown[:, 1:, :] |= frontier[:, :-1, :]
+        grown[:, :-1, :] |= frontier[:, 1:, :]
+        grown[:, :, 1:] |= frontier[:, :, :-1]
+        grown[:, :, :-1] |= frontier[:, :, 1:]
+        grown &= walkable
+        grown &= ~seen
+        dist[grown] = step
+        seen |= grown
+        frontier = grown
+    return dist.reshape(k, h * w)
+
+
+def next_steps(field, width, height):
+    """Per cell, the neighbour one step closer to the target (Up, Down, Left, Right on ties), else NO_STEP."""
+    d = field.reshape(height, width).astype(np.int32)
+    padded = np.pad(np.where(d < 0, _FAR, d), 1, constant_values=_FAR)
+    neighbours = np.stack([padded[:-2, 1:-1], padded[2:, 1:-1], padded[1:-1, :-2], padded[1:-1, 2:]])
+    choice = neighbours.argmin(axis=0)
+    offsets = np.array([-width, width, -1, 1])
+    cells = np.arange(height * width).reshape(height, width) + offsets[choice]
+    valid = (d > 0) & (neighbours.min(axis=0) == d - 1)
+    return np.where(valid, cells, NO_STEP).ravel()
+
+
+def tiles_hash(walkable):
+    digest = hashlib.sha256()
+    digest.update(np.asarray(walkable.shape, dtype=np.int64).tobytes())
+    digest.update(np.packbits(walkable).tobytes())
+    return digest.hexdigest()
+
+
+class FlowFieldCache:
+    """Distance fields and next-step tables per target cell for one BattleGrid.
+
+    `cps` are the map's control points (fields for them are what warm() and
+    save() cover). `walls`, when given, maps the control points to extra blocked
+    (x, y) cells; without it CP state never affects a field. `builds`, `hits` and
+    `loaded` count how fields were obtained.
+    """
+
+    def __init__(self, grid, cps=(), walls=None):
+        self.grid = grid
+        self.cps = list(cps)
+        self.walls = walls
+        self.cp_version = 0
+        self.fields = {}                 # (x, y) -> int16 (int32 on large grids) field
+        self.steps = {}                  # (x, y) -> next-step list
+        self.builds = self.hits = self.loaded = 0
+        self._version = None
+        self._walkable = None
+
+    @property
+    def version(self):
+        return self.grid.version, self.cp_version
+
+    def walkable(self):
+        """Grid walkability minus the walls rule, as an (h, w) bool array."""
+        self._check_version()
+        if self._walkable is None:
+            walkable = self.grid.tiles == PLAINS
+            if self.walls is not None:
+                for x, y in self.walls(self.cps):
+                    if self.grid.in_bounds(x, y):
+                        walkable[y, x] = False
+            self._walkable = walkable
+        return self._walkable
+
+    def _check_version(self):
+        if self._version != self.version:
+            self.fields, self.steps = {}, {}
+            self._walkable = None
+            self._version = self.version
+
+    def cps_changed(self):
+        """Call after a capture, type change or breach. Only matters when a walls rule is set."""
+        if self.walls is not None:
+            self.cp_version += 1
+
+    # --- Queries ---
+
+    def field(self, tx, ty):
+        self._check_version()
+        key = (tx, ty)
+        field = self.fields.get(key)
+        if field is None:
+            field = self.fields[key] = distance_fields(self.walkable(), [key])[0]
+            self.builds += 1
+        else:
+            self.hits += 1
+        return field
+
+    def next_steps(self, tx, ty):
+        """Next cell towards (tx, ty) for every cell (NO_STEP at the goal or when unreachable), as a list."""
+        self._check_version()
+        key = (tx, ty)
+        steps = self.steps.get(key)
+        if steps is None:
+            steps = self.steps[key] = next_steps(self.field(tx, ty), self.grid.width, self.grid.height).tolist()
+        return steps
+
+    def step(self, x, y, tx, ty):
+        """(x, y) of the next tile from (x, y) towards (tx, ty), or None."""
+        n = self.next_steps(tx, ty)[y * self.grid.width + x]
+        return None if n == NO_STEP else (n % self.grid.width, n // self.grid.width)
+
+    # --- Control points ---
+
+    def cp_targets(self):
+        return [(cp.x, cp.y) for cp in self.cps]
+
+    def warm(self):
+        """Builds the fields of every control point not cached yet in one pass. Returns how many were built."""
+        self._check_version()
+        missing = [t for t in dict.fromkeys(self.cp_targets()) if t not in self.fields]
+        if missing:
+            for target, field in zip(missing, distance_fields(self.walkable(), missing)):
+                self.fields[target] = field
+            self.builds += len(missing)
+        return len(missing)
+
+    def file_name(self, name):
+        h, w = self.grid.height, self.grid.width
+        return f"{name}_{w}x{h}_{tiles_hash(self.walkable())[:16]}.npy"
+
+    def save(self, directory, name):
+        """Writes the control-point fields (in CP order) to `directory`. Returns the path."""
+        self.warm()
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, self.file_name(name))
+        np.save(path, np.stack([self.fields[t] for t in self.cp_targets()]) if self.cps else
+                np.zeros((0, self.grid.width * self.grid.height), dtype=field_dtype(self.grid.height, self.grid.width)))
+        return path
+
+    def load(self, directory, name):
+        """Memory-maps the saved control-point fields for this exact map, if present. Returns True when loaded.
+
+        The tiles hash in the file name means a file saved for different terrain
+        (or a different walls rule outcome) is never picked up.
+        """
+        path = os.path.join(directory, self.file_name(name))
+        if not os.path.exists(path):
+            return False
+        stored = np.load(path, mmap_mode="r")
+        targets = self.cp_targets()
+        if (stored.shape != (len(targets), self.grid.width * self.grid.height)
+                or stored.dtype != field_dtype(self.grid.height, self.grid.width)):
+            return False
+        for target, field in zip(targets, stored):
+            if target not in self.fields:
+                self.fields[target] = field
+                self.loaded += 1
+        return True
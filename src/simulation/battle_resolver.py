@@ -0,0 +1,196 @@
+from collections import defaultdict
+
+import numpy as np
+
+from src.simulation import game_constants as gc
+
+# Batch version of BattleManager.SimulateBattle for AI battles.
+# The game resolves pending_battles one at a time: sides are gathered with several
+# queries, strength is sum(strength + troops / 100) (+20 for defenders, 40 for an
+# empty neutral town), the attacker wins on strength + Next(-20, 20) > defence,
+# and every participant gets its own UPDATE and CheckPromotions. Here all pending
+# battles and their participants are loaded with one query each, N Monte Carlo
+# trials per battle run as one NumPy array op for odds, and the chosen outcomes
+# are written with executemany inside a single transaction.
+
+ROLL_LOW, ROLL_HIGH = -20, 20        # Random.Next(-20, 20): upper bound exclusive
+DEFENDER_BONUS = 20
+NEUTRAL_MILITIA = 40
+WINNER_LOSS = (0.1, 0.2)             # 0.1 + NextDouble() * 0.2 of troops lost
+LOSER_LOSS = (0.7, 0.2)              # 0.7 + NextDouble() * 0.2
+WINNER_REP, LOSER_REP = 50, 5
+
+# Participant columns, in this order
+OFFICER_COLUMNS = "officer_id, faction_id, location_id, strength, troops, rank, reputation, max_troops, politics"
+
+
+class BattleResolver:
+    """Loads every pending battle, estimates odds and resolves them in one batch.
+
+    `conn` is a DBAPI (sqlite3) connection and `adjacency` maps city_id to its
+    neighbours (loaded from routes when omitted). Sides follow DetermineSides for AI
+    battles: officers at the target and the source city, plus the attacker's
+    officers in cities next to the target; only officers with troops fight.
+
+    The batch is resolved against the state at load() time. When the game runs
+    battles in sequence an officer could fight twice in one tick; here each officer
+    joins only the first battle (in pending_battles order) that claims them.
+    """
+
+    def __init__(self, conn, adjacency=None, rng_seed=None):
+        self.conn = conn
+        self.adjacency = adjacency if adjacency is not None else self._load_adjacency(conn)
+        self.rng = np.random.default_rng(rng_seed)
+        self.battles = []                  # (city_id, attacker_fid, source_id, defender_fid)
+        self.attackers = []                # per battle: list of officer rows
+        self.defenders = []
+        self.attack_strength = np.zeros(0)
+        self.defence_strength = np.zeros(0)
+        self.attack_troops = np.zeros(0)
+        self.defence_troops = np.zeros(0)
+
+    @staticmethod
+    def _load_adjacency(conn):
+        adjacency = defaultdict(set)
+        for start, end in conn.execute("SELECT start_city_id, end_city_id FROM routes"):
+            adjacency[start].add(end)
+            adjacency[end].add(start)
+        return adjacency
+
+    def load(self):
+        pending = self.conn.execute(
+            "SELECT location_id, attacker_faction_id, source_location_id FROM pending_battles").fetchall()
+        if not pending:
+            self.battles, self.attackers, self.defenders = [], [], []
+            self.attack_strength = self.defence_strength = self.attack_troops = self.defence_troops = np.zeros(0)
+            return self
+        owners = dict(self.conn.execute("SELECT city_id, faction_id FROM cities").fetchall())
+
+        by_city = defaultdict(list)
+        for row in self.conn.execute(f"SELECT {OFFICER_COLUMNS} FROM officers WHERE troops > 0 AND faction_id > 0"):
+            by_city[row[2]].append(row)
+
+        self.battles, self.attackers, self.defenders = [], [], []
+        claimed = set()
+        for city_id, attacker_fid, source_id in pending:
+            attacker_fid, source_id = attacker_fid or 0, source_id or 0
+            defender_fid = owners.get(city_id) or 0
+            home = by_city[city_id] + (by_city[source_id] if source_id > 0 and source_id != city_id else [])
+            nearby = [o for n in self.adjacency[city_id] if n not in (city_id, source_id) for o in by_city[n]]
+            attackers, defenders = [], []
+            if not (attacker_fid == defender_fid and attacker_fid > 0):  # Already ours: nobody fights
+                for o in home + nearby:
+                    if o[0] in claimed:
+                        continue
+                    if attacker_fid > 0 and o[1] == attacker_fid:
+                        attackers.append(o)
+                        claimed.add(o[0])
+                    elif defender_fid > 0 and o[1] == defender_fid and o[2] in (city_id, source_id):
+                        defenders.append(o)
+                        claimed.add(o[0])
+            self.battles.append((city_id, attacker_fid, source_id, defender_fid))
+            self.attackers.append(attackers)
+            self.defenders.append(defenders)
+
+        def strength(side):
+            return sum((o[3] or 0) + (o[4] or 0) // 100 for o in side)
+
+        self.attack_strength = np.array([strength(a) for a in self.attackers], dtype=np.float64)
+        self.defence_strength = np.array(
+            [NEUTRAL_MILITIA if not d and b[3] == 0 else strength(d) + DEFENDER_BONUS
+             for b, d in zip(self.battles, self.defenders)], dtype=np.float64)
+        self.attack_troops = np.array([sum(o[4] or 0 for o in a) for a in self.attackers], dtype=np.float64)
+        self.defence_troops = np.array([sum(o[4] or 0 for o in d) for d in self.defenders], dtype=np.float64)
+        return self
+
+    def _contested(self):
+        """False for battles the game skips (the attacker already owns the city)."""
+        return np.array([not (b[1] == b[3] and b[1] > 0) for b in self.battles], dtype=bool)
+
+    def _draw(self, shape):
+        """Attacker-win flags plus winner/loser loss fractions, same distributions as the game."""
+        trials = (slice(None),) + (None,) * (len(shape) - 1)  # Broadcast per-battle strengths over trials
+        rolls = self.rng.integers(ROLL_LOW, ROLL_HIGH, size=shape)
+        wins = self.attack_strength[trials] + rolls > self.defence_strength[trials]
+        winner_loss = WINNER_LOSS[0] + self.rng.random(shape) * WINNER_LOSS[1]
+        loser_loss = LOSER_LOSS[0] + self.rng.random(shape) * LOSER_LOSS[1]
+        return wins, winner_loss, loser_loss
+
+    def odds(self, trials=1000):
+        """Monte Carlo estimate per battle.
+
+        Returns a list of dicts (one per pending battle, in load order) with the
+        attacker's win probability and the expected troops lost by each side.
+        """
+        if not self.battles:
+            return []
+        wins, winner_loss, loser_loss = self._draw((len(self.battles), trials))
+        att_loss = self.attack_troops[:, None] * np.where(wins, winner_loss, loser_loss)
+        def_loss = self.defence_troops[:, None] * np.where(wins, loser_loss, winner_loss)
+        win_prob = np.where(self._contested(), wins.mean(axis=1), 0.0)
+        results = []
+        for i, (city_id, attacker_fid, source_id, defender_fid) in enumerate(self.battles):
+            results.append({
+                "city_id": city_id,
+                "attacker_faction_id": attacker_fid,
+                "defender_faction_id": defender_fid,
+                "attack_strength": float(self.attack_strength[i]),
+                "defence_strength": float(self.defence_strength[i]),
+                "attacker_win_prob": float(win_prob[i]),
+                "expected_attacker_losses": float(att_loss[i].mean()),
+                "expected_defender_losses": float(def_loss[i].mean()),
+            })
+        return results
+
+    def resolve(self):
+        """Draws one outcome per battle. Returns (attacker_wins, winner_loss, loser_loss) arrays."""
+        wins, winner_loss, loser_loss = self._draw((len(self.battles),))
+        return wins & self._contested(), winner_loss, loser_loss
+
+    def apply(self, outcome=None, day=None):
+        """Writes outcomes (default: a fresh resolve()). Nothing is committed: the caller owns the transaction.
+
+        Updates troops, reputation and promotions for every participant, hands
+        captured cities to the attacker (is_hq cleared) and clears pending_battles.
+        Follow-up moves (new governor, retreats, faction elimination) are left to
+        the caller. Returns a list of (city_id, defender_fid, attacker_fid, attacker_won).
+        """
+        wins, winner_loss, loser_loss = outcome if outcome is not None else self.resolve()
+        if day is None:
+            row = self.conn.execute("SELECT current_day FROM game_state LIMIT 1").fetchone()
+            day = row[0] if row else 0
+
+        battle_rows, promotion_rows, capture_rows, results = [], [], [], []
+        for i, (city_id, attacker_fid, source_id, defender_fid) in enumerate(self.battles):
+            won = bool(wins[i])
+            for side, side_won in ((self.attackers[i], won), (self.defenders[i], not won)):
+                keep = 1.0 - (winner_loss[i] if side_won else loser_loss[i])
+                gain = WINNER_REP if side_won else LOSER_REP
+                for oid, _, _, _, troops, rank, rep, max_troops, _ in side:
+                    troops = int((troops or 0) * keep)
+                    battle_rows.append((troops, gain, oid))
+                    level = gc.get_level_by_rank_name(rank)
+                    target = gc.get_promotion_level(level, (rep or 0) + gain)
+                    if target > level:
+                        new_max = gc.get_max_troops_by_level(target)
+                        promotion_rows.append((gc.get_rank_title(target), new_max,
+                                               min(new_max, troops + new_max - (max_troops or 0)), day, oid))
+            if won:
+                capture_rows.append((attacker_fid if attacker_fid > 0 else None, city_id))
+            results.append((city_id, defender_fid, attacker_fid, won))
+
+        # last_promotion_day is added by the game's runtime migration; seed_db worlds lack it
+        has_promotion_day = any(r[1] == "last_promotion_day" for r in self.conn.execute("PRAGMA table_info(officers)"))
+        self.conn.executemany("UPDATE officers SET troops = ?, reputation = reputation + ? WHERE officer_id = ?",
+                              battle_rows)
+        if has_promotion_day:
+            self.conn.executemany("""
+                UPDATE officers SET rank = ?, max_troops = ?, troops = ?, last_promotion_day = ?
+                WHERE officer_id = ?""", promotion_rows)
+        else:
+            self.conn.executemany("UPDATE officers SET rank = ?, max_troops = ?, troops = ? WHERE officer_id = ?",
+                                  [row[:3] + row[4:] for row in promotion_rows])
+        self.conn.executemany("UPDATE cities SET faction_id = ?, is_hq = 0 WHERE city_id = ?", capture_rows)
+        self.conn.executemany("DELETE FROM pending_battles WHERE location_id = ?",
+                              [(b[0],) for b in self.battles])
+        return results
@@ -0,0 +1,164 @@
+from collections import defaultdict, deque
+
+# Incremental version of WorldGraph.IsConnectedToHQ.
+# The game re-reads the faction's cities and every route and runs a BFS from the HQ
+# on each check. Here ownership, HQ flags and adjacency are read once and each
+# faction's HQ-connected ("supplied") set is kept up to date as cities change hands:
+# a capture only touches the losing and gaining factions, and only the component
+# around the captured city is re-walked. is_connected_bfs() is the game's rule,
+# kept as the reference for cross-checks (see tools/check_connectivity.py).
+
+
+def _hq_of(owned, hq_flags):
+    """GetFactionHQ: the lowest marked HQ, else the first owned city, else None."""
+    marked = [cid for cid in owned if cid in hq_flags]
+    if marked:
+        return min(marked)
+    return min(owned) if owned else None
+
+
+def is_connected_bfs(adjacency, owner, hq_flags, faction_id, city_id):
+    """Reference: fresh BFS from the HQ through the faction's own cities."""
+    owned = {cid for cid, fid in owner.items() if fid == faction_id}
+    hq = _hq_of(owned, hq_flags)
+    if hq is None:
+        return True  # No HQ defined: the game allows everything
+    if hq == city_id:
+        return True
+    visited = {hq}
+    queue = deque([hq])
+    while queue:
+        current = queue.popleft()
+        if current == city_id:
+            return True
+        for n in adjacency[current]:
+            if n not in visited and n in owned:
+                visited.add(n)
+                queue.append(n)
+    return False
+
+
+class ConnectivityIndex:
+    """Per-faction sets of cities connected to the faction HQ over friendly cities.
+
+    Mirror ownership changes with set_owner() (and set_hq() for HQ flags); queries
+    are set lookups. Neutral cities have faction_id None.
+    """
+
+    def __init__(self, adjacency, owner, hq_flags):
+        self.adjacency = adjacency      # city_id -> set of neighbouring city_ids
+        self.owner = dict(owner)        # city_id -> faction_id or None
+        self.hq_flags = set(hq_flags)   # city_ids with is_hq = 1
+        self.owned = defaultdict(set)
+        for cid, fid in self.owner.items():
+            if fid is not None:
+                self.owned[fid].add(cid)
+        self.hq = {}
+        self.connected = {}
+        for fid in list(self.owned):
+            self._rebuild(fid)
+
+    @classmethod
+    def load(cls, conn):
+        adjacency = defaultdict(set)
+        for start, end in conn.execute("SELECT start_city_id, end_city_id FROM routes"):
+            adjacency[start].add(end)
+            adjacency[end].add(start)
+        owner, hq_flags = {}, set()
+        for cid, fid, is_hq in conn.execute("SELECT city_id, faction_id, is_hq FROM cities"):
+            owner[cid] = fid
+            if is_hq == 1:
+                hq_flags.add(cid)
+        return cls(adjacency, owner, hq_flags)
+
+    # --- Queries ---
+
+    def is_connected(self, faction_id, city_id):
+        """IsConnectedToHQ: True if city_id is the HQ or reachable from it through owned cities."""
+        hq = self.hq.get(faction_id)
+        if hq is None:
+            return True
+        return city_id in self.connected[faction_id]
+
+    def connected_cities(self, faction_id):
+        return frozenset(self.connected.get(faction_id, ()))
+
+    def cut_off_cities(self, faction_id):
+        """Owned cities with no friendly path back to the HQ."""
+        return self.owned.get(faction_id, set()) - self.connected.get(faction_id, set())
+
+    def get_hq(self, faction_id):
+        return self.hq.get(faction_id)
+
+    # --- Updates ---
+
+    def set_owner(self, city_id, faction_id, is_hq=False):
+        """Moves city_id to faction_id (None = neutral). Like a capture, the HQ flag is reset unless is_hq."""
+        old = self.owner.get(city_id)
+        was_hq = city_id in self.hq_flags
+        self.owner[city_id] = faction_id
+        if is_hq:
+            self.hq_flags.add(city_id)
+        else:
+            self.hq_flags.discard(city_id)
+        if old == faction_id:
+            if was_hq != bool(is_hq) and faction_id is not None:
+                self._rebuild(faction_id)
+            return
+        if old is not None:
+            self.owned[old].discard(city_id)
+            self._on_lost(old, city_id)
+        if faction_id is not None:
+            self.owned[faction_id].add(city_id)
+            self._on_gained(faction_id, city_id)
+
+    def set_hq(self, city_id, is_hq=True):
+        self.set_owner(city_id, self.owner.get(city_id), is_hq)
+
+    def _rebuild(self, fid):
+        """Full BFS for one faction (HQ change or first load)."""
+        owned = self.owned[fid]
+        hq = _hq_of(owned, self.hq_flags)
+        self.hq[fid] = hq
+        self.connected[fid] = self._walk(hq, owned, set()) if hq is not None else set()
+
+    def _walk(self, start, owned, seen):
+        """Adds the owned component around start to seen and returns seen."""
+        seen.add(start)
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            for n in self.adjacency[current]:
+                if n not in seen and n in owned:
+                    seen.add(n)
+                    queue.append(n)
+        return seen
+
+    def _on_lost(self, fid, city_id):
+        if self.hq.get(fid) == city_id:
+            self._rebuild(fid)  # HQ lost: the fallback HQ may be anywhere
+            return
+        connected = self.connected[fid]
+        if city_id not in connected:
+            return  # Was already cut off; the supplied set is unchanged
+        connected.discard(city_id)
+        # A city with a single supplied neighbour was a leaf of the supplied set
+        if sum(1 for n in self.adjacency[city_id] if n in connected) <= 1:
+            return
+        # Re-walk from the HQ, only within the component that contained the city
+        self.connected[fid] = self._walk(self.hq[fid], connected, set())
+
+    def _on_gained(self, fid, city_id):
+        hq = self.hq.get(fid)
+        # The new city becomes the HQ if it outranks the current one (marked first, then lowest id)
+        if city_id in self.hq_flags:
+            new_hq = hq is None or hq not in self.hq_flags or city_id < hq
+        else:
+            new_hq = hq is None or (hq not in self.hq_flags and city_id < hq)
+        if new_hq:
+            self._rebuild(fid)
+            return
+        connected = self.connected[fid]
+        if any(n in connected for n in self.adjacency[city_id]):
+            # Joins the supplied set and may reconnect cut-off cities behind it
+            self._walk(city_id, self.owned[fid], connected)
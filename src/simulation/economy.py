@@ -0,0 +1,145 @@
+import numpy as np
+
+from src.simulation import game_constants as gc
+
+# Vectorised version of TurnManager.ProcessMonthlyEconomics / ProcessQuarterlyHarvest.
+# The game runs one correlated subquery per faction (and a rank CASE per officer);
+# here SQLite aggregates cities and officers in one GROUP BY pass each, so only a
+# handful of rows (one per faction, or per faction and rank) reach Python. Those are
+# folded into per-faction totals with np.bincount and the factions table is written
+# with one executemany. Reading every city and officer row into Python was slower
+# than the game's SQL at every world size.
+# The *_SQL statements below are the game's originals, kept as the reference
+# implementation for equivalence checks (see tools/bench_economy.py).
+
+MONTHLY_TAX_SQL = """
+    UPDATE factions SET gold_treasury = gold_treasury + (
+        SELECT SUM(CASE WHEN c.public_order < 20 THEN 0 ELSE c.commerce * (c.public_order / 100.0) END)
+        FROM cities c
+        WHERE c.faction_id = factions.faction_id
+    )
+    WHERE faction_id IN (SELECT DISTINCT faction_id FROM cities)"""
+
+SALARY_CASE = "CASE " + " ".join(
+    f"WHEN o.rank = '{rank}' THEN {salary}" for rank, salary in gc.RANK_SALARIES.items()
+) + f" ELSE {gc.DEFAULT_SALARY} END"
+
+MONTHLY_SALARY_SQL = f"""
+    UPDATE factions SET gold_treasury = gold_treasury - (
+        SELECT SUM({SALARY_CASE})
+        FROM officers o
+        WHERE o.faction_id = factions.faction_id
+    )"""
+
+QUARTERLY_HARVEST_SQL = """
+    UPDATE factions SET supplies = supplies + (
+        SELECT SUM(CASE WHEN c.public_order < 20 THEN 0 ELSE c.agriculture * 10 * (c.public_order / 100.0) END)
+        FROM cities c
+        WHERE c.faction_id = factions.faction_id
+    )
+    WHERE faction_id IN (SELECT DISTINCT faction_id FROM cities)"""
+
+REVOLT_THRESHOLD = 20  # Cities below this public order yield nothing
+
+
+def apply_monthly_sql(conn):
+    """Reference: the game's tax and salary statements."""
+    conn.execute(MONTHLY_TAX_SQL)
+    conn.execute(MONTHLY_SALARY_SQL)
+
+
+def apply_harvest_sql(conn):
+    """Reference: the game's harvest statement."""
+    conn.execute(QUARTERLY_HARVEST_SQL)
+
+
+class EconomyEngine:
+    """Computes faction treasury/supply deltas from SQL group totals.
+
+    `conn` is a DBAPI (sqlite3) connection; nothing is committed here so callers
+    control the transaction. Totals are read by load() and reused until the next
+    load(), so callers reload after cities/officers change.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.faction_ids = None
+        self.tax = None           # Per faction, aligned with faction_ids
+        self.harvest = None
+        self.salary = None
+        self.owns_city = None
+        self.has_officers = None
+
+    def load(self):
+        self.faction_ids = np.array([r[0] for r in self.conn.execute("SELECT faction_id FROM factions ORDER BY faction_id")],
+                                    dtype=np.int64)
+
+        # Same yield expressions as the game's statements; TOTAL() skips NULLs like the
+        # SUM() does but never returns NULL itself
+        rows = self.conn.execute(f"""
+            SELECT faction_id,
+                   TOTAL(CASE WHEN public_order < {REVOLT_THRESHOLD} THEN 0 ELSE commerce * (public_order / 100.0) END),
+                   TOTAL(CASE WHEN public_order < {REVOLT_THRESHOLD} THEN 0 ELSE agriculture * 10 * (public_order / 100.0) END),
+                   COUNT(*)
+            FROM cities WHERE faction_id IS NOT NULL GROUP BY faction_id""").fetchall()
+        cols = np.array(rows, dtype=np.float64).reshape(-1, 4)
+        idx = self._group(cols[:, 0])
+        self.tax = self._group_sum(idx, cols[:, 1])
+        self.harvest = self._group_sum(idx, cols[:, 2])
+        self.owns_city = self._group_sum(idx, cols[:, 3]) > 0
+
+        # Ronin never draw a salary, so only faction officers are counted
+        rows = self.conn.execute("SELECT faction_id, rank, COUNT(*) FROM officers WHERE faction_id IS NOT NULL "
+                                 "GROUP BY faction_id, rank").fetchall()
+        idx = self._group(np.array([r[0] for r in rows], dtype=np.float64))
+        counts = np.array([r[2] for r in rows], dtype=np.float64)
+        # Exact-match lookup like the SQL CASE; NULL/unknown ranks fall to the ELSE branch
+        salaries = gc.RANK_SALARIES
+        pay = np.array([salaries.get(r[1], gc.DEFAULT_SALARY) for r in rows], dtype=np.float64)
+        self.salary = self._group_sum(idx, counts * pay)
+        self.has_officers = self._group_sum(idx, counts) > 0
+        return self
+
+    def _group(self, fids):
+        """Maps faction_id values to positions in faction_ids; -1 where unknown/NULL."""
+        idx = np.full(len(fids), -1, dtype=np.int64)
+        valid = ~np.isnan(fids)
+        if len(self.faction_ids) and valid.any():
+            keys = fids[valid].astype(np.int64)
+            pos = np.clip(np.searchsorted(self.faction_ids, keys), 0, len(self.faction_ids) - 1)
+            idx[np.flatnonzero(valid)] = np.where(self.faction_ids[pos] == keys, pos, -1)
+        return idx
+
+    def _group_sum(self, idx, weights):
+        n = len(self.faction_ids)
+        mask = idx >= 0
+        return np.bincount(idx[mask], weights=weights[mask], minlength=n)[:n]
+
+    def monthly_deltas(self):
+        """Returns (faction_ids, tax, salary, owns_city, has_officers) arrays."""
+        if self.faction_ids is None:
+            self.load()
+        return self.faction_ids, self.tax, self.salary, self.owns_city, self.has_officers
+
+    def apply_monthly(self):
+        """Taxes then salaries, written back in one batched UPDATE. Returns {faction_id: delta}."""
+        faction_ids, tax, salary, owns_city, has_officers = self.monthly_deltas()
+        rows = []
+        for fid, t, s, owns, staffed in zip(faction_ids.tolist(), tax.tolist(), salary.tolist(), owns_city, has_officers):
+            if not staffed:
+                delta = None  # Like the SQL: SUM() over no officers is NULL, so the treasury becomes NULL
+            elif owns:
+                delta = t - s  # REAL, as the tax SUM is
+            else:
+                delta = -int(s)  # Salaries alone stay INTEGER
+            rows.append((delta, fid))
+        self.conn.executemany("UPDATE factions SET gold_treasury = gold_treasury + ? WHERE faction_id = ?", rows)
+        return {fid: delta for delta, fid in rows}
+
+    def apply_harvest(self):
+        """Quarterly harvest into supplies, one batched UPDATE. Returns {faction_id: harvest}."""
+        if self.faction_ids is None:
+            self.load()
+        rows = [(h, fid) for fid, h, owns in zip(self.faction_ids.tolist(), self.harvest.tolist(), self.owns_city) if owns]
+        self.conn.executemany("UPDATE factions SET supplies = supplies + ? WHERE faction_id = ?", rows)
+        return {fid: h for h, fid in rows}
@@ -0,0 +1,103 @@
+# Python mirror of romance-of-tree-kingdoms/scripts/logic/GameConstants.cs.
+# Keep these tables in sync with the C# source; the headless tools rely on them
+# to reproduce the game's rank, salary and promotion rules exactly.
+
+# Rank Names (index = rank level)
+RANK_TITLES = [
+    "Volunteer",   # 0
+    "Recruit",     # 1
+    "Soldier",     # 2
+    "Veteran",     # 3
+    "Sergeant",    # 4
+    "Lieutenant",  # 5
+    "Captain",     # 6
+    "Major",       # 7
+    "General",     # 8
+    "Commander",   # 9
+    "Sovereign",   # 10
+]
+
+RANK_VOLUNTEER = RANK_TITLES[0]
+RANK_RECRUIT = RANK_TITLES[1]
+RANK_SOVEREIGN = RANK_TITLES[10]
+
+# Legacy Support (Mapping)
+RANK_REGULAR = RANK_RECRUIT
+LEGACY_RANK_LEVELS = {"Regular": 1, "Officer": 4}
+
+MAX_RANK_LEVEL = 10
+
+# Troop Limits (GetMaxTroopsByLevel)
+MAX_TROOPS_BY_LEVEL = [500, 1000, 2000, 3000, 4500, 6000, 8000, 10000, 13000, 16000, 20000]
+TROOPS_VOLUNTEER = MAX_TROOPS_BY_LEVEL[0]
+TROOPS_REGULAR = MAX_TROOPS_BY_LEVEL[1]
+
+# Reputation needed to reach each level (GetRequiredRep, index = target level)
+REQUIRED_REP = [0, 50, 150, 300, 500, 800, 1200, 1800, 2500, 3500, 5000]
+
+# Monthly salary paid from the faction treasury (TurnManager.ProcessMonthlyEconomics)
+RANK_SALARIES = {
+    "Volunteer": 0,
+    "Recruit": 50,
+    "Soldier": 80,
+    "Veteran": 120,
+    "Sergeant": 200,
+    "Lieutenant": 300,
+    "Captain": 450,
+    "Major": 600,
+    "General": 800,
+    "Commander": 1000,
+    "Sovereign": 1500,
+}
+DEFAULT_SALARY = 50  # ELSE branch of the salary CASE
+
+# Action Point (AP) Limits
+AP_BASELINE = 3
+
+
+def get_rank_title(level):
+    if 0 <= level <= MAX_RANK_LEVEL:
+        return RANK_TITLES[level]
+    return RANK_RECRUIT
+
+
+def get_max_troops_by_level(level):
+    if 0 <= level <= MAX_RANK_LEVEL:
+        return MAX_TROOPS_BY_LEVEL[level]
+    return TROOPS_VOLUNTEER
+
+
+def get_level_by_rank_name(rank_name):
+    if not rank_name:
+        return 0
+    # Strip markers if present (e.g., "Recruit (9th)" -> "Recruit")
+    clean_name = rank_name.split(" ")[0]
+    if clean_name in LEGACY_RANK_LEVELS:
+        return LEGACY_RANK_LEVELS[clean_name]
+    if clean_name in RANK_TITLES:
+        return RANK_TITLES.index(clean_name)
+    return 1
+
+
+def get_required_rep(target_level):
+    if 1 <= target_level <= MAX_RANK_LEVEL:
+        return REQUIRED_REP[target_level]
+    return 0
+
+
+def get_salary(rank_name):
+    """Exact-match salary lookup, like the SQL CASE (no marker stripping)."""
+    return RANK_SALARIES.get(rank_name, DEFAULT_SALARY)
+
+
+def get_promotion_level(level, reputation):
+    """Level CheckPromotions promotes to: the highest level whose reputation is met, never below `level`."""
+    if level >= MAX_RANK_LEVEL:
+        return level
+    target = level
+    for lvl in range(1, MAX_RANK_LEVEL + 1):
+        if reputation >= get_required_rep(lvl):
+            target = lvl
+        else:
+            break
+    return max(target, level)
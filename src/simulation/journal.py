@@ -0,0 +1,552 @@
+import hashlib
+import os
+import sqlite3
+import struct
+import zlib
+
+import numpy as np
+
+# Append-only event journal of a simulated campaign.
+# The game changes state with UPDATEs scattered across ActionManager, BattleManager
+# and TurnManager and keeps no history, so a bad AI day can only be inspected in
+# its final state. The journal records, for every day, the RNG state and
+# initiative order the day started from. It then records every row that day
+# changed as typed events: travel, ownership change, relation change, other stat
+# change, inserted/deleted row, and battle result. The changes come from diffing
+# the journaled tables against the previous day, so no write path can be missed.
+#
+# Format: MAGIC + version byte, then frames of <u32 payload length><u8 type><payload>.
+# SCHEMA frames at the start name each table's columns. Events are columnar: a day
+# writes one frame per changed (table, column) holding the rowids as one int64
+# array and the values as one int64 or float64 array (tagged NULL / int / float /
+# text / blob values when the column mixes types), and one INSERT and one DELETE
+# frame per table. On a bulk world nearly every officer row changes every day, and
+# a frame per changed cell cost more to encode than the simulation step itself.
+# Replaying the frames onto the base snapshot rebuilds the state at the end of any
+# day, one executemany per frame. Every CHECKPOINT_DAYS days the journaled tables
+# also go, zlib-compressed and in the same column layout, into a CHECKPOINT frame
+# of a separate checkpoints file (same framing) together with the events-file
+# offset of the next day, so rebuilding a day restores the nearest checkpoint and
+# replays at most that many days from there.
+
+MAGIC = b"RTKJ"
+VERSION = 3
+CHECKPOINT_DAYS = 30
+BASE_NAME = "base.db"
+EVENTS_NAME = "events.rtkj"
+CHECKPOINTS_NAME = "checkpoints.rtkj"
+
+JOURNAL_TABLES = ["officers", "cities", "factions", "officer_relations", "faction_relations",
+                  "officer_faction_relations", "pending_battles", "game_state", "wine_dine_history"]
+
+SCHEMA, DAY, TRAVEL, OWNERSHIP, BATTLE, STAT, RELATION, INSERT, DELETE, DIGEST, CHECKPOINT = range(11)
+EVENT_NAMES = {DAY: "day", TRAVEL: "travel", OWNERSHIP: "ownership", BATTLE: "battle", STAT: "stat",
+               RELATION: "relation", INSERT: "insert", DELETE: "delete", DIGEST: "digest"}
+
+_FRAME = struct.Struct("<IB")
+_ROWS = struct.Struct("<BI")          # table id, row count (INSERT / DELETE)
+_COLUMN = struct.Struct("<BHI")       # table id, column index, row count (TRAVEL / OWNERSHIP / RELATION / STAT)
+_BATTLE = struct.Struct("<qqqB")      # city, defender faction, attacker faction, attacker won
+_DAY = struct.Struct("<iqH")          # day, campaign seed (-1 = none), initiative order length
+_CHECKPOINT = struct.Struct("<iQ")    # day, events-file offset of the following day
+_TABLE = struct.Struct("<BI")         # table id, row count (CHECKPOINT body)
+_NONE, _INT, _FLOAT, _TEXT, _BLOB, _MIXED = range(6)
+_ARRAYS = {_INT: np.dtype("<i8"), _FLOAT: np.dtype("<f8")}
+
+
+def _encode(value):
+    if value is None:
+        return b"\x00"
+    if isinstance(value, bool) or isinstance(value, int):
+        return struct.pack("<Bq", _INT, value)
+    if isinstance(value, float):
+        return struct.pack("<Bd", _FLOAT, value)
+    data = value if isinstance(value, bytes) else str(value).encode("utf-8")
+    return struct.pack("<BI", _BLOB if isinstance(value, bytes) else _TEXT, len(data)) + data
+
+
+def _decode(buf, pos):
+    """(value, next position) of one tagged value."""
+    tag = buf[pos]
+    if tag == _NONE:
+        return None, pos + 1
+    if tag == _INT:
+        return struct.unpack_from("<q", buf, pos + 1)[0], pos + 9
+    if tag == _FLOAT:
+        return struct.unpack_from("<d", buf, pos + 1)[0], pos + 9
+    (size,) = struct.unpack_from("<I", buf, pos + 1)
+    data = bytes(buf[pos + 5:pos + 5 + size])
+    return (data.decode("utf-8") if tag == _TEXT else data), pos + 5 + size
+
+
+def _pack_column(values):
+    """One column of values: a tag byte, then a packed array when every value is an int
+    (or every value a float), otherwise tagged values one by one."""
+    kinds = set(map(type, values))
+    if kinds == {int}:
+        return bytes([_INT]) + np.array(values, dtype=_ARRAYS[_INT]).tobytes()
+    if kinds == {float}:
+        return bytes([_FLOAT]) + np.array(values, dtype=_ARRAYS[_FLOAT]).tobytes()
+    return bytes([_MIXED]) + b"".join(map(_encode, values))
+
+
+def _unpack_column(buf, pos, count):
+    """(list of `count` values, next position) of a _pack_column() block."""
+    tag = buf[pos]
+    if tag == _MIXED:
+        return _values(buf, pos + 1, count)
+    dtype = _ARRAYS[tag]
+    return np.frombuffer(buf, dtype, count, pos + 1).tolist(), pos + 1 + count * dtype.itemsize
+
+
+def _pack_rowids(rowids):
+    return np.array(rowids, dtype=_ARRAYS[_INT]).tobytes()
+
+
+def _unpack_rowids(buf, pos, count):
+    return np.frombuffer(buf, _ARRAYS[_INT], count, pos).tolist(), pos + 8 * count
+
+
+def _pack_rng(state):
+    version, internal, gauss = state
+    return struct.pack(f"<B{len(internal)}IBd", version, *internal, gauss is not None, gauss or 0.0)
+
+
+def _unpack_rng(data):
+    count = (len(data) - 10) // 4
+    values = struct.unpack(f"<B{count}IBd", data)
+    return values[0], tuple(values[1:1 + count]), values[-1] if values[-2] else None
+
+
+def read_rows(conn, table):
+    """{rowid: row tuple} of a whole table."""
+    return {row[0]: row[1:] for row in conn.execute(f"SELECT rowid, * FROM {table}")}
+
+
+def _values(buf, pos, count):
+    """(count tagged values, next position)."""
+    values = []
+    for _ in range(count):
+        value, pos = _decode(buf, pos)
+        values.append(value)
+    return values, pos
+
+
+def digest_of(tables):
+    """SHA-1 over {table: {rowid: row}} in table and rowid order."""
+    h = hashlib.sha1()
+    for table in sorted(tables):
+        h.update(repr(sorted(tables[table].items())).encode())
+    return h.digest()
+
+
+class JournalWriter:
+    """Appends one campaign's days to an events file.
+
+    begin(conn) writes the schema and takes the starting rows; each simulated day is
+    then day_start(...), any battle(...) calls, and day_end(conn, day).
+    """
+
+    def __init__(self, path, seed=None, tables=JOURNAL_TABLES, checkpoint_path=None, checkpoint_days=CHECKPOINT_DAYS):
+        self.path = path
+        self.seed = seed
+        self.tables = tables
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_days = checkpoint_days
+        self.checkpoint_file = None
+        self.columns = {}
+        self.state = {}
+        self.counts = {}   # Frames written per type
+        self.events = {}   # Rows those frames carry, per type
+        self.file = None
+        self.days = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _frame(self, kind, payload, file=None, rows=1):
+        (file or self.file).write(_FRAME.pack(len(payload), kind) + payload)
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+        self.events[kind] = self.events.get(kind, 0) + rows
+
+    def begin(self, conn):
+        existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.tables = [t for t in self.tables if t in existing]
+        self.file = open(self.path, "wb")
+        self.file.write(MAGIC + bytes([VERSION]))
+        if self.checkpoint_path is not None:
+            self.checkpoint_file = open(self.checkpoint_path, "wb")
+            self.checkpoint_file.write(MAGIC + bytes([VERSION]))
+        for table_id, table in enumerate(self.tables):
+            self.columns[table] = [r[1] for r in conn.execute(f"PRAGMA table_info({table})")]
+            self._frame(SCHEMA, bytes([table_id]) + b"".join(_encode(v) for v in [table] + self.columns[table]))
+            self.state[table] = read_rows(conn, table)
+
+    def day_start(self, day, rng_state=None, turn_queue=()):
+        rng = _pack_rng(rng_state) if rng_state is not None else b""
+        payload = _DAY.pack(day, -1 if self.seed is None else self.seed, len(turn_queue))
+        payload += struct.pack(f"<{len(turn_queue)}q", *turn_queue) + struct.pack("<I", len(rng)) + rng
+        self._frame(DAY, payload)
+
+    def battle(self, city_id, defender_fid, attacker_fid, won):
+        self._frame(BATTLE, _BATTLE.pack(city_id, defender_fid or 0, attacker_fid or 0, bool(won)))
+
+    def day_end(self, conn, day=None, digest=False):
+        """Diffs every journaled table against the previous day and writes the changes;
+        every `checkpoint_days` days (when `day` is given) also a checkpoint."""
+        for table_id, table in enumerate(self.tables):
+            old_rows, new_rows = self.state[table], read_rows(conn, table)
+            columns = self.columns[table]
+            deleted = list(old_rows.keys() - new_rows.keys())
+            inserted, changed = [], {}   # changed: {column index: ([rowid], [before], [after])}
+            for rowid, row in new_rows.items():
+                old = old_rows.get(rowid)
+                if old is None:
+                    inserted.append(rowid)
+                elif old != row:
+                    for col, (before, after) in enumerate(zip(old, row)):
+                        if before != after:
+                            rowids, befores, afters = changed.setdefault(col, ([], [], []))
+                            rowids.append(rowid)
+                            befores.append(before)
+                            afters.append(after)
+            if deleted:
+                self._frame(DELETE, _ROWS.pack(table_id, len(deleted)) + _pack_rowids(deleted), rows=len(deleted))
+            if inserted:
+                payload = _ROWS.pack(table_id, len(inserted)) + _pack_rowids(inserted)
+                payload += b"".join(_pack_column(list(values)) for values in zip(*(new_rows[r] for r in inserted)))
+                self._frame(INSERT, payload, rows=len(inserted))
+            for col, (rowids, befores, afters) in sorted(changed.items()):
+                kind = self._kind(table, columns[col])
+                payload = _COLUMN.pack(table_id, col, len(rowids)) + _pack_rowids(rowids)
+                if kind != STAT:
+                    payload += _pack_column(befores)
+                self._frame(kind, payload + _pack_column(afters), rows=len(rowids))
+            self.state[table] = new_rows
+        if digest:
+            self._frame(DIGEST, struct.pack("<i", day if day is not None else -1) + digest_of(self.state))
+        self.days += 1
+        self.file.flush()
+        if self.checkpoint_file is not None and day is not None and self.days % self.checkpoint_days == 0:
+            self.checkpoint(day)
+
+    def checkpoint(self, day):
+        """Writes every journaled table as it stands at the end of `day` to the checkpoints file."""
+        body = []
+        for table_id, table in enumerate(self.tables):
+            rows = self.state[table]
+            body.append(_TABLE.pack(table_id, len(rows)) + _pack_rowids(list(rows)))
+            columns = list(zip(*rows.values())) or [()] * len(self.columns[table])  # Empty tables still get their blocks
+            body.extend(_pack_column(list(values)) for values in columns)
+        payload = _CHECKPOINT.pack(day, self.file.tell()) + zlib.compress(b"".join(body), 1)
+        self._frame(CHECKPOINT, payload, self.checkpoint_file)
+        self.checkpoint_file.flush()
+
+    @staticmethod
+    def _kind(table, column):
+        """Event type of a change to `column`; all but STAT also keep the old values."""
+        if table == "officers" and column == "location_id":
+            return TRAVEL
+        if table == "cities" and column == "faction_id":
+            return OWNERSHIP
+        if column == "value" and table.endswith("relations"):
+            return RELATION
+        return STAT
+
+    def close(self):
+        for f in (self.file, self.checkpoint_file):
+            if f is not None:
+                f.close()
+        self.file = self.checkpoint_file = None
+
+
+class JournalReader:
+    """Streams the frames of an events file and replays them onto a base snapshot.
+
+    Frames are read one at a time from the file, so memory does not grow with the
+    journal. The first lookup by day scans the frames once and keeps each day's file
+    offset; later lookups seek straight to it. replay() starts from the nearest
+    entry of `checkpoint_path` when given.
+    """
+
+    def __init__(self, path, checkpoint_path=None):
+        self.path = path
+        self.checkpoint_path = checkpoint_path
+        self.tables = []
+        self.columns = {}
+        self.day_offsets = None   # {day: file offset of its DAY frame}, built by index()
+
+    def _open(self, path=None):
+        path = path or self.path
+        f = open(path, "rb")
+        if f.read(len(MAGIC) + 1) != MAGIC + bytes([VERSION]):
+            f.close()
+            raise ValueError(f"{path} is not a version {VERSION} event journal")
+        return f
+
+    def _read_frame(self, f):
+        """(type, payload) of the frame at the file position, or None at the end of the file."""
+        header = f.read(_FRAME.size)
+        if not header:
+            return None
+        if len(header) < _FRAME.size:
+            raise ValueError(f"{self.path} ends in a truncated frame header")
+        size, kind = _FRAME.unpack(header)
+        payload = f.read(size)
+        if len(payload) < size:
+            raise ValueError(f"{self.path} ends in a truncated frame")
+        return kind, payload
+
+    def _schema(self, payload):
+        values, at = [], 1
+        while at < len(payload):
+            value, at = _decode(payload, at)
+            values.append(value)
+        self.tables.append(values[0])
+        self.columns[values[0]] = values[1:]
+
+    def frames(self, offset=None):
+        """Yields (type, decoded event) in file order, from `offset` (a frame start) or
+        the beginning; SCHEMA frames are absorbed into tables/columns."""
+        with self._open() as f:
+            if offset is None:
+                self.tables, self.columns = [], {}
+            else:
+                if not self.tables:
+                    self._schema_only()
+                f.seek(offset)
+            while (frame := self._read_frame(f)) is not None:
+                kind, payload = frame
+                if kind == SCHEMA:
+                    self._schema(payload)
+                else:
+                    yield kind, self._event(kind, payload)
+
+    def index(self):
+        """Reads the schema and every DAY frame's offset."""
+        self.tables, self.columns, self.day_offsets = [], {}, {}
+        with self._open() as f:
+            offset = f.tell()
+            while len(header := f.read(_FRAME.size)) == _FRAME.size:
+                size, kind = _FRAME.unpack(header)
+                payload = f.read(size)
+                if kind == SCHEMA:
+                    self._schema(payload)
+                elif kind == DAY:
+                    self.day_offsets[_DAY.unpack_from(payload)[0]] = offset
+                offset += _FRAME.size + size
+        return self.day_offsets
+
+    def _schema_only(self):
+        """Reads just the SCHEMA frames at the start of the events file."""
+        self.tables, self.columns = [], {}
+        with self._open() as f:
+            while (frame := self._read_frame(f)) is not None and frame[0] == SCHEMA:
+                self._schema(frame[1])
+
+    def checkpoint_before(self, day=None):
+        """(checkpoint day, events offset, frame offset in the checkpoints file) of the last
+        checkpoint at or before `day` (the last one when None), or None."""
+        if self.checkpoint_path is None or not os.path.exists(self.checkpoint_path):
+            return None
+        found = None
+        with self._open(self.checkpoint_path) as f:
+            offset = f.tell()
+            while len(header := f.read(_FRAME.size)) == _FRAME.size:
+                size, _ = _FRAME.unpack(header)
+                at_day, events_offset = _CHECKPOINT.unpack(f.read(_CHECKPOINT.size))
+                if day is not None and at_day > day:
+                    break
+                found = (at_day, events_offset, offset)
+                f.seek(size - _CHECKPOINT.size, os.SEEK_CUR)
+                offset += _FRAME.size + size
+        return found
+
+    def _event(self, kind, payload):
+        if kind == DAY:
+            day, seed, queued = _DAY.unpack_from(payload)
+            at = _DAY.size
+            queue = list(struct.unpack_from(f"<{queued}q", payload, at))
+            at += 8 * queued
+            (size,) = struct.unpack_from("<I", payload, at)
+            rng = _unpack_rng(bytes(payload[at + 4:at + 4 + size])) if size else None
+            return {"day": day, "seed": None if seed < 0 else seed, "turn_queue": queue, "rng_state": rng}
+        if kind == BATTLE:
+            city, defender, attacker, won = _BATTLE.unpack_from(payload)
+            return {"city_id": city, "defender": defender, "attacker": attacker, "won": bool(won)}
+        if kind == DIGEST:
+            return {"day": struct.unpack_from("<i", payload)[0], "digest": bytes(payload[4:])}
+        if kind in (DELETE, INSERT):
+            table_id, count = _ROWS.unpack_from(payload)
+            table = self.tables[table_id]
+            rowids, at = _unpack_rowids(payload, _ROWS.size, count)
+            event = {"table": table, "rowids": rowids}
+            if kind == INSERT:
+                event["rows"] = list(zip(*self._columns(payload, at, count, len(self.columns[table]))[0]))
+            return event
+        table_id, col, count = _COLUMN.unpack_from(payload)
+        table = self.tables[table_id]
+        rowids, at = _unpack_rowids(payload, _COLUMN.size, count)
+        event = {"table": table, "column": self.columns[table][col], "rowids": rowids}
+        if kind != STAT:
+            event["old"], at = _unpack_column(payload, at, count)
+        event["values"] = _unpack_column(payload, at, count)[0]
+        return event
+
+    @staticmethod
+    def _columns(buf, pos, count, width):
+        """(`width` consecutive _pack_column() blocks of `count` values each, next position)."""
+        columns = []
+        for _ in range(width):
+            values, pos = _unpack_column(buf, pos, count)
+            columns.append(values)
+        return columns, pos
+
+    def days(self):
+        """[(day, event counts by name)] in journal order."""
+        out = []
+        for kind, event in self.frames():
+            if kind == DAY:
+                out.append((event["day"], {}))
+            elif out:
+                counts = out[-1][1]
+                rows = len(event["rowids"]) if "rowids" in event else 1
+                counts[EVENT_NAMES[kind]] = counts.get(EVENT_NAMES[kind], 0) + rows
+        return out
+
+    def day_events(self, day):
+        """(DAY frame, [(type, event)]) of one day, or (None, []) if it was not journaled."""
+        if self.day_offsets is None:
+            self.index()
+        if day not in self.day_offsets:
+            return None, []
+        frames = self.frames(self.day_offsets[day])
+        _, header = next(frames)
+        events = []
+        for kind, event in frames:
+            if kind == DAY:
+                break
+            events.append((kind, event))
+        frames.close()
+        return header, events
+
+    def replay_days(self, conn, until_day=None, offset=None):
+        """Applies the journal onto `conn` (holding the base snapshot, or a restored
+        checkpoint when `offset` is the events offset it records) one day at a time,
+        committing and yielding each day number once its changes are in."""
+        pending, day = _Pending(), None
+        for kind, event in self.frames(offset):
+            if kind == DAY:
+                if day is not None:
+                    pending.flush(conn, self.columns)
+                    conn.commit()
+                    yield day
+                if until_day is not None and event["day"] > until_day:
+                    return
+                day = event["day"]
+            elif kind not in (BATTLE, DIGEST):
+                pending.add(kind, event)
+        if day is not None:
+            pending.flush(conn, self.columns)
+            conn.commit()
+            yield day
+
+    def replay(self, conn, until_day=None):
+        """Applies every journaled day up to and including `until_day` (all by default),
+        starting from the last checkpoint at or before it."""
+        self._schema_only()
+        checkpoint = self.checkpoint_before(until_day)
+        offset = None
+        if checkpoint is not None:
+            _, offset, frame_offset = checkpoint
+            self.restore(conn, frame_offset)
+        for _ in self.replay_days(conn, until_day, offset):
+            pass
+
+    def restore(self, conn, frame_offset):
+        """Replaces every journaled table in `conn` with the rows of the checkpoint frame at `frame_offset`."""
+        with self._open(self.checkpoint_path) as f:
+            f.seek(frame_offset)
+            _, payload = self._read_frame(f)
+        body, at = zlib.decompress(payload[_CHECKPOINT.size:]), 0
+        while at < len(body):
+            table_id, count = _TABLE.unpack_from(body, at)
+            at += _TABLE.size
+            table = self.tables[table_id]
+            columns = self.columns[table]
+            rowids, at = _unpack_rowids(body, at, count)
+            values, at = self._columns(body, at, count, len(columns))
+            rows = list(zip(rowids, *values))
+            names = ", ".join(f'"{c}"' for c in columns)
+            conn.execute(f"DELETE FROM {table}")
+            conn.executemany(f"INSERT INTO {table} (rowid, {names}) VALUES ({', '.join('?' * (len(columns) + 1))})", rows)
+        conn.commit()
+
+
+class _Pending:
+    """One day's row changes, grouped for executemany (one per frame)."""
+
+    def __init__(self):
+        self.deletes, self.inserts, self.updates = {}, {}, {}
+
+    def add(self, kind, event):
+        table = event["table"]
+        if kind == DELETE:
+            self.deletes.setdefault(table, []).extend((rowid,) for rowid in event["rowids"])
+        elif kind == INSERT:
+            self.inserts.setdefault(table, []).extend((rowid, *row) for rowid, row in zip(event["rowids"], event["rows"]))
+        else:
+            self.updates.setdefault((table, event["column"]), []).extend(zip(event["values"], event["rowids"]))
+
+    def flush(self, conn, columns):
+        for table, rows in self.deletes.items():
+            conn.executemany(f"DELETE FROM {table} WHERE rowid = ?", rows)
+        for table, rows in self.inserts.items():
+            names = ", ".join(f'"{c}"' for c in columns[table])
+            marks = ", ".join("?" * (len(columns[table]) + 1))
+            conn.executemany(f"INSERT INTO {table} (rowid, {names}) VALUES ({marks})", rows)
+        for (table, column), rows in self.updates.items():
+            conn.executemany(f'UPDATE {table} SET "{column}" = ? WHERE rowid = ?', rows)
+        self.deletes, self.inserts, self.updates = {}, {}, {}
+
+
+def record(sim, directory, days, seed=None, digests=False):
+    """Simulates `days` days with `sim`, writing base.db, events.rtkj and checkpoints.rtkj into `directory`.
+    Returns the JournalWriter (its counts hold frames written per type)."""
+    os.makedirs(directory, exist_ok=True)
+    base_path = os.path.join(directory, BASE_NAME)
+    if os.path.exists(base_path):
+        os.remove(base_path)
+    base = sqlite3.connect(base_path)
+    try:
+        sim.conn.commit()
+        sim.conn.backup(base)
+    finally:
+        base.close()
+    with JournalWriter(os.path.join(directory, EVENTS_NAME), seed,
+                       checkpoint_path=os.path.join(directory, CHECKPOINTS_NAME)) as journal:
+        journal.begin(sim.conn)
+        for _ in range(days):
+            day = sim.current_day()
+            journal.day_start(day, *sim.loop_state())
+            first = len(sim.battles)
+            sim.step_day()
+            for _, city_id, defender, attacker, won in sim.battles[first:]:
+                journal.battle(city_id, defender, attacker, won)
+            journal.day_end(sim.conn, day, digest=digests)
+    return journal
+
+
+def load_state(directory, day=None):
+    """In-memory sqlite3 connection holding the journaled state at the end of `day` (last day by default)."""
+    conn = sqlite3.connect(":memory:")
+    base = sqlite3.connect(os.path.join(directory, BASE_NAME))
+    try:
+        base.backup(conn)
+    finally:
+        base.close()
+    JournalReader(os.path.join(directory, EVENTS_NAME), os.path.join(directory, CHECKPOINTS_NAME)).replay(conn, day)
+    return conn
@@ -0,0 +1,249 @@
+import time
+from collections import defaultdict
+
+from src.simulation import game_constants as gc
+
+# Batch version of ActionManager.ProcessAllOfficerTurns.
+# The game walks every non-player officer and issues one or more UPDATEs per action
+# point (stat training, AP bookkeeping, PerformWorkMission) plus one UPSERT per
+# ModifyRelation and one query per FindRandomOfficerInCity. Here the officers,
+# cities and factions the phase reads are loaded with one query each, every roll is
+# made in memory in the same order (so the same RNG gives the same day), and the
+# results are flushed with a handful of executemany statements in one transaction.
+
+# ActionManager.DomesticType -> (stat column, city column, skill column)
+DOMESTIC_TYPES = {
+    "Commerce": ("politics", "commerce", "business"),
+    "Agriculture": ("politics", "agriculture", "farming"),
+    "Defense": ("leadership", "defense_level", "fortification"),
+    "PublicOrder": ("strength", "public_order", "security"),
+    "Technology": ("intelligence", "technology", "inventing"),
+    "Stability": ("politics", "public_order", "governance"),
+    "Security": ("strength", "public_order", "security"),
+}
+
+# ActionManager.PerformWorkMission: mission name -> DomesticType
+WORK_MISSIONS = {
+    "Commerce": "Commerce",
+    "Farming": "Agriculture",
+    "Science": "Technology",
+    "Defense": "Defense",
+    "Order": "PublicOrder",
+    "Security": "Security",
+    "Stability": "Stability",
+}
+
+TRAINABLE_STATS = ["strength", "leadership", "intelligence", "politics", "charisma"]
+SKILL_COLUMNS = ["farming", "business", "inventing", "fortification", "security", "governance"]
+CITY_COLUMNS = ["commerce", "agriculture", "defense_level", "public_order", "technology"]
+
+WORK_COST = 100
+SOCIAL_GAIN = 10
+
+# Every officer: enough to pick social targets, count linking bonuses and spend AP
+ROSTER_COLUMNS = "officer_id, location_id, is_player, current_mission, current_action_points, satisfaction"
+# Officers on a mission: everything PerformDomesticAction and CheckPromotions read or write
+WORKER_COLUMNS = ["officer_id", "location_id", "faction_id", "current_mission", "current_action_points",
+                  "public_attitude", "gold", "reputation", "merit_score", "days_service", "rank", "max_troops",
+                  "troops", "last_promotion_day"] + TRAINABLE_STATS + SKILL_COLUMNS
+WORKER_UPDATE = ["current_action_points", "gold", "reputation", "merit_score", "days_service", "rank", "max_troops",
+                 "troops", "last_promotion_day"] + TRAINABLE_STATS + SKILL_COLUMNS
+CITY_FIELDS = ["city_id", "faction_id", "governor_id", "max_stats"] + CITY_COLUMNS
+
+
+def _add(value, delta):
+    """value + delta with SQL NULL semantics."""
+    return None if value is None else value + delta
+
+
+class OfficerPhase:
+    """Runs one officer phase per run() against a sqlite3 connection.
+
+    `rng` is a random.Random shared with the caller; draws are made in exactly the
+    order the per-officer path makes them. Expects a migrated database
+    (src/database/migrations.py).
+
+    Relation deltas from one phase are summed per pair and written as one UPSERT
+    each. That matches applying them one by one because every delta in this phase
+    is positive and stored values are always clamped to [-100, 100].
+
+    Nothing is committed here: the writes join the caller's transaction (the
+    simulated day), as with EconomyEngine.
+    """
+
+    def __init__(self, conn, rng):
+        self.conn = conn
+        self.rng = rng
+        self.timings = defaultdict(float)   # load / roll / flush, summed over runs
+        self.counts = defaultdict(int)      # work / social / train actions, summed over runs
+
+    def run(self):
+        start = time.perf_counter()
+        self._load()
+        loaded = time.perf_counter()
+        self._roll()
+        rolled = time.perf_counter()
+        self._flush()
+        done = time.perf_counter()
+        self.timings["load"] += loaded - start
+        self.timings["roll"] += rolled - loaded
+        self.timings["flush"] += done - rolled
+        return self
+
+    # --- Load ---
+
+    def _load(self):
+        self.roster = self.conn.execute(f"SELECT {ROSTER_COLUMNS} FROM officers ORDER BY officer_id").fetchall()
+        self.by_city = defaultdict(list)        # location_id -> officer ids (everyone, for social targets)
+        self.linking = defaultdict(int)         # (location_id, current_mission) -> officers
+        for oid, loc, _, mission, _, _ in self.roster:
+            self.by_city[loc].append(oid)
+            if mission:
+                self.linking[(loc, mission)] += 1
+
+        # Full rows only for officers that may work today, and the cities they work in
+        self.workers = {row[0]: dict(zip(WORKER_COLUMNS, row)) for row in self.conn.execute(
+            f"SELECT {', '.join(WORKER_COLUMNS)} FROM officers WHERE current_mission IS NOT NULL AND is_player = 0 "
+            "ORDER BY officer_id")}
+        self.cities = {row[0]: dict(zip(CITY_FIELDS, row)) for row in self.conn.execute(f"""
+            SELECT {', '.join(CITY_FIELDS)} FROM cities
+            WHERE city_id IN (SELECT location_id FROM officers WHERE current_mission IS NOT NULL AND is_player = 0)""")}
+        self.factions = {row[0]: {"leader_id": row[1], "gold_treasury": row[2]}
+                         for row in self.conn.execute("SELECT faction_id, leader_id, gold_treasury FROM factions")}
+        row = self.conn.execute("SELECT current_day FROM game_state").fetchone()
+        self.day = row[0] if row else None
+
+        self.ap = {}                              # officer_id -> AP left, for officers that acted
+        self.trained = defaultdict(lambda: [0] * len(TRAINABLE_STATS))  # non-workers: stat deltas
+        self.changed_workers = set()
+        self.touched_cities, self.touched_factions = set(), set()
+        self.relation_deltas = defaultdict(int)   # (officer_1_id, officer_2_id) -> delta
+        self.opinion_deltas = defaultdict(int)    # (officer_id, faction_id) -> delta
+
+    # --- Roll (ProcessSingleOfficerTurn) ---
+
+    def _roll(self):
+        rng = self.rng
+        for oid, loc, is_player, mission, ap, satisfaction in self.roster:
+            if is_player:
+                continue
+            ap = ap or 0
+            worker = self.workers.get(oid)
+            # 1. Work duty (if assigned and satisfied)
+            if mission and (satisfaction if satisfaction is not None else 100) > 30 and ap > 0:
+                kind = WORK_MISSIONS.get(mission)
+                if kind:
+                    self._work(worker, kind)
+                ap -= 1
+            # 2. Remaining AP on personal actions
+            while ap > 0:
+                roll = rng.random()
+                if roll < 0.5:
+                    others = self.by_city[loc]
+                    if len(others) > 1:
+                        target = oid
+                        while target == oid:
+                            target = rng.choice(others)
+                        self.relation_deltas[(min(oid, target), max(oid, target))] += SOCIAL_GAIN
+                        self.counts["social"] += 1
+                elif roll < 0.8:
+                    stat = rng.choice(TRAINABLE_STATS)
+                    if worker is not None:
+                        worker[stat] = _add(worker[stat], 1)
+                    else:
+                        self.trained[oid][TRAINABLE_STATS.index(stat)] += 1
+                    self.counts["train"] += 1
+                ap -= 1
+                if worker is not None:
+                    worker["current_action_points"] = ap
+                    self.changed_workers.add(oid)
+                else:
+                    self.ap[oid] = ap
+
+    def _work(self, o, kind):
+        """ActionManager.PerformDomesticAction for one officer, against the in-memory state."""
+        if (o["current_action_points"] or 0) <= 0:
+            return
+        oid, city_id = o["officer_id"], o["location_id"]
+        stat_col, target_col, skill_col = DOMESTIC_TYPES[kind]
+        fid = o["faction_id"] or 0
+
+        city = self.cities.get(city_id)
+        gov_id, city_fid = (city["governor_id"] or 0, city["faction_id"] or 0) if city else (0, 0)
+        faction = self.factions.get(city_fid) if city_fid else None
+        leader_id, treasury = (faction["leader_id"] or 0, faction["gold_treasury"] or 0) if faction else (0, 0)
+
+        # Governors and the ruler spend treasury gold; everyone else pays personally
+        is_assigned = oid in (gov_id, leader_id) and fid == city_fid
+        if (treasury if is_assigned else (o["gold"] or 0)) < WORK_COST:
+            return
+        current = city[target_col]
+        cap = 100 if kind == "PublicOrder" else (city["max_stats"] or 1000)
+        if current >= cap:
+            return
+
+        linking = self.linking[(city_id, kind)] - (1 if o["current_mission"] == kind else 0)
+        stat = o[stat_col]
+        gain = int(stat * 0.5) + int((o[skill_col] or 0) * 0.2) + int((o["public_attitude"] or 0) * 0.1) \
+            + linking * 5 + self.rng.randint(5, 15)
+        merit = 20 if gain > int(stat * 0.6) else 10
+        rep = 10 + gain // 10
+        train = self.rng.randint(1, 10) == 1
+
+        city[target_col] = min(cap, current + gain)
+        self.touched_cities.add(city_id)
+        o["current_action_points"] -= 1
+        o["reputation"] = _add(o["reputation"], rep)
+        o["merit_score"] = _add(o["merit_score"], merit)
+        o["days_service"] = _add(o["days_service"], 1)
+        if not is_assigned:
+            o["gold"] = _add(o["gold"], -WORK_COST)
+        if train:
+            o[stat_col] = _add(o[stat_col], 1)
+        o[skill_col] = _add(o[skill_col], 1)
+        self.changed_workers.add(oid)
+        self.counts["work"] += 1
+
+        if is_assigned and faction:
+            faction["gold_treasury"] = _add(faction["gold_treasury"], -WORK_COST)
+            self.touched_factions.add(city_fid)
+        if fid > 0:
+            for other in self.by_city[city_id]:
+                self.opinion_deltas[(other, fid)] += 1
+        self._check_promotion(o)
+
+    def _check_promotion(self, o):
+        level = gc.get_level_by_rank_name(o["rank"])
+        target = gc.get_promotion_level(level, o["reputation"] or 0)
+        if target > level:
+            new_max = gc.get_max_troops_by_level(target)
+            troops = _add(o["troops"], new_max - (o["max_troops"] or 0))
+            o["rank"] = gc.get_rank_title(target)
+            o["max_troops"] = new_max
+            o["troops"] = None if troops is None else min(new_max, troops)
+            o["last_promotion_day"] = self.day
+
+    # --- Flush ---
+
+    def _flush(self):
+        self.conn.executemany(f"""
+            UPDATE officers SET current_action_points = ?,
+                {', '.join(f'{c} = {c} + ?' for c in TRAINABLE_STATS)}
+            WHERE officer_id = ?""",
+            [(ap, *self.trained.get(oid, (0,) * len(TRAINABLE_STATS)), oid) for oid, ap in self.ap.items()])
+        self.conn.executemany(
+            f"UPDATE officers SET {', '.join(f'{c} = ?' for c in WORKER_UPDATE)} WHERE officer_id = ?",
+            [[self.workers[oid][c] for c in WORKER_UPDATE] + [oid] for oid in self.changed_workers])
+        self.conn.executemany(
+            f"UPDATE cities SET {', '.join(f'{c} = ?' for c in CITY_COLUMNS)} WHERE city_id = ?",
+            [[self.cities[cid][c] for c in CITY_COLUMNS] + [cid] for cid in self.touched_cities])
+        self.conn.executemany("UPDATE factions SET gold_treasury = ? WHERE faction_id = ?",
+                              [(self.factions[fid]["gold_treasury"], fid) for fid in self.touched_factions])
+        self.conn.executemany("""
+            INSERT INTO officer_relations (officer_1_id, officer_2_id, value) VALUES (?, ?, MAX(-100, MIN(100, ?)))
+            ON CONFLICT(officer_1_id, officer_2_id) DO UPDATE SET value = MAX(-100, MIN(100, value + ?))""",
+            [(a, b, delta, delta) for (a, b), delta in self.relation_deltas.items()])
+        self.conn.executemany("""
+            INSERT INTO officer_faction_relations (officer_id, faction_id, value) VALUES (?, ?, MAX(-100, MIN(100, ?)))
+            ON CONFLICT(officer_id, faction_id) DO UPDATE SET value = MAX(-100, MIN(100, value + ?))""",
+            [(oid, fid, delta, delta) for (oid, fid), delta in self.opinion_deltas.items()])
@@ -0,0 +1,256 @@
+import os
+import random
+import re
+import struct
+
+# Portrait assignment (WorldGenerator.GetPortraitFor) and validation.
+# Portraits are cells of the TileSetAtlasSources in CustomOfficers.tres, stored on
+# officers as portrait_source_id + portrait_coords ("x,y"); OfficerCard logs an
+# error and shows nothing when the cell does not exist. WorldGenerator hardcodes
+# each atlas's grid size for its generic pool, and that guess offers two Other1
+# cells (2,1 and 3,1) the tileset does not define. Repairs were one-off scripts
+# issuing a SELECT and an UPDATE per officer name.
+#
+# PortraitIndex reads the cells each source declares from the .tres and keeps those
+# whose region fits inside the PNG, so the index cannot drift from the art.
+# PortraitAssigner loads every officer in one query, decides in memory, and writes
+# all changes with one set-based UPDATE through a temp table.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.abspath(os.path.join(BASE_DIR, "../.."))
+TILESET_PATH = os.path.join(PROJECT_DIR, "romance-of-tree-kingdoms", "assets", "Portraits", "CustomOfficers.tres")
+PORTRAIT_DIRS = [os.path.join(PROJECT_DIR, "Assets", "Portraits"),
+                 os.path.join(PROJECT_DIR, "romance-of-tree-kingdoms", "assets", "Portraits")]
+
+PLAYER_PORTRAIT = (0, "0,0")     # GetPortraitFor locks the player to Custom 0,0 (also the fallback)
+
+# WorldGenerator._fixedPortraits
+FIXED_PORTRAITS = {
+    # Shu (Source 5)
+    "Liu Bei": (5, "0,0"), "Guan Yu": (5, "1,0"), "Zhang Fei": (5, "2,0"),
+    "Zhuge Liang": (5, "3,0"), "Zhao Yun": (5, "0,1"), "Huang Zhong": (5, "1,1"),
+    # Wei (Source 6)
+    "Cao Cao": (6, "0,0"), "Guo Jia": (6, "1,0"), "Zhang Liao": (6, "2,0"),
+    "Xiahou Yuan": (6, "3,0"), "Sima Yi": (6, "0,1"), "Xu Huang": (6, "1,1"),
+    # Other1 (Source 3)
+    "Xu Shu": (3, "0,0"), "Lu Bu": (3, "1,0"), "Diaochan": (3, "2,0"),
+    "Chen Gong": (3, "3,0"), "Yuan Shao": (3, "0,1"), "Ma Chao": (3, "1,1"),
+    "Hu Ji": (3, "0,2"),
+    # Other2 (Source 4)
+    "Fisherman": (4, "2,1"), "Lin Zhi": (4, "3,1"),
+    # More1 (Source 2)
+    "Pang Tong": (2, "1,0"), "Xun Yu": (2, "2,0"),
+    "Wei Yan": (2, "0,1"), "Deng Ai": (2, "1,1"),
+    "Jiang Wei": (2, "0,2"), "Taishi Ci": (2, "1,2"),
+    # More2 (Source 8)
+    "Xiahou Dun": (8, "0,0"), "Dong Zhuo": (8, "2,0"), "Lu Su": (8, "3,0"),
+    # Custom (Source 0)
+    "Han De": (0, "2,2"), "Zhong Hui": (0, "2,0"), "Dian Wei": (0, "1,0"),
+    # Wu (Source 7)
+    "Zhou Yu": (7, "3,0"), "Sun Quan": (7, "2,0"), "Sun Ce": (7, "0,0"),
+    "Sun Jian": (7, "0,0"), "Lu Meng": (7, "0,1"), "Lu Zun": (7, "1,1"),
+}
+
+# Sources WorldGenerator draws generic portraits from, in the order it adds them
+GENERIC_SOURCES = (0, 1, 7, 3, 2, 8)
+
+_SECTION = re.compile(r"^\[(?P<kind>\w+)(?P<attrs>[^\]]*)\]$")
+_ATTR = re.compile(r'(\w+)=("[^"]*"|\S+)')
+_VECTOR = re.compile(r"Vector2i\((-?\d+),\s*(-?\d+)\)")
+_TILE = re.compile(r"^(\d+):(\d+)/0\s*=")
+
+
+def png_size(path):
+    """(width, height) from a PNG's IHDR chunk."""
+    with open(path, "rb") as f:
+        header = f.read(24)
+    if header[:8] != b"\x89PNG\r\n\x1a\n":
+        raise ValueError(f"{path} is not a PNG")
+    return struct.unpack(">II", header[16:24])
+
+
+def parse_tileset(path=TILESET_PATH):
+    """{source_id: {name, texture, region, separation, margins, tiles}} from a Godot TileSet .tres."""
+    textures, subresources, sources = {}, {}, {}
+    current = None
+    with open(path, encoding="utf-8") as f:
+        for raw in f:
+            line = raw.strip()
+            section = _SECTION.match(line)
+            if section:
+                attrs = {k: v.strip('"') for k, v in _ATTR.findall(section["attrs"])}
+                current = None
+                if section["kind"] == "ext_resource":
+                    textures[attrs.get("id")] = attrs.get("path", "")
+                elif section["kind"] == "sub_resource" and attrs.get("type") == "TileSetAtlasSource":
+                    current = subresources[attrs["id"]] = {
+                        "name": None, "texture": None, "region": (16, 16),
+                        "separation": (0, 0), "margins": (0, 0), "tiles": set()}
+                elif section["kind"] == "resource":
+                    current = "resource"
+                continue
+            if current == "resource":
+                match = re.match(r'sources/(\d+)\s*=\s*SubResource\("([^"]+)"\)', line)
+                if match:
+                    sources[int(match[1])] = match[2]
+            elif current is not None:
+                tile = _TILE.match(line)
+                if tile:
+                    current["tiles"].add((int(tile[1]), int(tile[2])))
+                elif line.startswith("resource_name"):
+                    current["name"] = line.split("=", 1)[1].strip().strip('"')
+                elif line.startswith("texture ="):
+                    current["texture"] = textures.get(re.search(r'ExtResource\("([^"]+)"\)', line)[1])
+                else:
+                    for key in ("region", "separation", "margins"):
+                        prefix = "texture_region_size" if key == "region" else key
+                        if line.startswith(prefix + " ="):
+                            x, y = _VECTOR.search(line).groups()
+                            current[key] = (int(x), int(y))
+    return {source_id: subresources[sub] for source_id, sub in sources.items() if sub in subresources}
+
+
+def _texture_file(texture):
+    name = os.path.basename(texture or "")
+    for directory in PORTRAIT_DIRS:
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+class PortraitIndex:
+    """Valid (source_id, "x,y") portrait cells.
+
+    A cell is valid when the tileset declares it and its region lies inside the
+    atlas image. Sources whose image cannot be found keep every declared cell.
+    """
+
+    def __init__(self, sources):
+        self.sources = sources
+        self.cells = set()
+        self.clipped = []           # (source_id, x, y) declared but outside the image
+        for source_id, source in sources.items():
+            path = _texture_file(source["texture"])
+            size = png_size(path) if path else None
+            for x, y in sorted(source["tiles"]):
+                if size is not None and not self._fits(source, x, y, size):
+                    self.clipped.append((source_id, x, y))
+                    continue
+                self.cells.add((source_id, f"{x},{y}"))
+
+    @classmethod
+    def load(cls, path=TILESET_PATH):
+        return cls(parse_tileset(path))
+
+    @classmethod
+    def from_atlas(cls, atlas_index, path=TILESET_PATH):
+        """Index limited to the cells packed into a portrait atlas (src/assets/atlas.py load_index())."""
+        index = cls.load(path)
+        packed = atlas_index["groups"].get("portraits", {}).get("sprites", {}).values()
+        index.cells &= {(sprite["source_id"], sprite["coords"]) for sprite in packed}
+        return index
+
+    @staticmethod
+    def _rect(source, x, y):
+        (w, h), (sx, sy), (mx, my) = source["region"], source["separation"], source["margins"]
+        return mx + x * (w + sx), my + y * (h + sy), w, h
+
+    @classmethod
+    def _fits(cls, source, x, y, size):
+        left, top, w, h = cls._rect(source, x, y)
+        return left + w <= size[0] and top + h <= size[1]
+
+    def region(self, source_id, coords):
+        """(image path, (x, y, w, h)) of a valid cell inside its atlas PNG."""
+        source = self.sources[source_id]
+        x, y = (int(v) for v in coords.split(","))
+        return _texture_file(source["texture"]), self._rect(source, x, y)
+
+    def is_valid(self, source_id, coords):
+        return (source_id, coords) in self.cells
+
+    def generic_pool(self):
+        """WorldGenerator's generic pool: every valid cell of GENERIC_SOURCES not reserved for a name or the player."""
+        reserved = set(FIXED_PORTRAITS.values()) | {PLAYER_PORTRAIT}
+        pool = []
+        for source_id in GENERIC_SOURCES:
+            for x, y in sorted(self.sources.get(source_id, {}).get("tiles", ()), key=lambda t: (t[1], t[0])):
+                cell = (source_id, f"{x},{y}")
+                if cell in self.cells and cell not in reserved:
+                    pool.append(cell)
+        return pool
+
+
+class PortraitAssigner:
+    """Assigns and validates portraits for every officer of a sqlite3 connection in one pass.
+
+    Players get PLAYER_PORTRAIT and named officers their FIXED_PORTRAITS cell.
+    Everyone else keeps a valid generic cell; officers with an invalid cell (or all
+    of them with reassign_all) draw from the shuffled generic pool, unused cells
+    first. Like GetPortraitFor, an exhausted pool falls back to PLAYER_PORTRAIT;
+    with reuse=True it starts over instead, which is what large generated worlds need.
+    """
+
+    def __init__(self, conn, index=None, rng_seed=None, reuse=False):
+        self.conn = conn
+        self.index = index or PortraitIndex.load()
+        self.rng = random.Random(rng_seed)
+        self.reuse = reuse
+
+    def invalid(self):
+        """[(officer_id, name, source_id, coords)] for officers whose portrait cell does not exist."""
+        return [row for row in self.conn.execute(
+            "SELECT officer_id, name, portrait_source_id, portrait_coords FROM officers ORDER BY officer_id")
+            if not self.index.is_valid(row[2], row[3])]
+
+    def plan(self, reassign_all=False):
+        """{officer_id: (source_id, coords)} for every officer whose portrait should change."""
+        rows = self.conn.execute(
+            "SELECT officer_id, name, is_player, portrait_source_id, portrait_coords FROM officers ORDER BY officer_id"
+        ).fetchall()
+        generic = self.index.generic_pool()
+        generic_set = set(generic)
+        keep = set()
+        if not reassign_all:
+            keep = {(src, coords) for _, name, is_player, src, coords in rows
+                    if not is_player and name not in FIXED_PORTRAITS and (src, coords) in generic_set}
+        pool = [cell for cell in generic if cell not in keep]
+        self.rng.shuffle(pool)
+        pool.reverse()              # pop() from the end hands out the shuffled order
+
+        changes = {}
+        for oid, name, is_player, src, coords in rows:
+            if is_player:
+                target = PLAYER_PORTRAIT
+            elif name in FIXED_PORTRAITS:
+                target = FIXED_PORTRAITS[name]
+            elif not reassign_all and (src, coords) in generic_set:
+                continue
+            else:
+                if not pool and self.reuse and generic:
+                    pool = generic[:]
+                    self.rng.shuffle(pool)
+                target = pool.pop() if pool else PLAYER_PORTRAIT
+            if target != (src, coords):
+                changes[oid] = target
+        return changes
+
+    def apply(self, changes):
+        """Writes `changes` with one UPDATE (no commit). Returns the number of officers updated."""
+        if not changes:
+            return 0
+        self.conn.execute("""CREATE TEMP TABLE IF NOT EXISTS portrait_assignments (
+            officer_id INTEGER PRIMARY KEY, source_id INTEGER, coords TEXT)""")
+        self.conn.execute("DELETE FROM temp.portrait_assignments")
+        self.conn.executemany("INSERT INTO temp.portrait_assignments VALUES (?, ?, ?)",
+                              [(oid, src, coords) for oid, (src, coords) in changes.items()])
+        cursor = self.conn.execute("""
+            UPDATE officers SET (portrait_source_id, portrait_coords) = (
+                SELECT source_id, coords FROM temp.portrait_assignments a WHERE a.officer_id = officers.officer_id)
+            WHERE officer_id IN (SELECT officer_id FROM temp.portrait_assignments)""")
+        self.conn.execute("DELETE FROM temp.portrait_assignments")
+        return cursor.rowcount
+
+    def run(self, reassign_all=False):
+        return self.apply(self.plan(reassign_all))
@@ -0,0 +1,238 @@
+import json
+
+import numpy as np
+
+# Officer-to-officer relations (RelationshipManager / BattleManager.CalculateAvgRelation).
+# The game reads and writes officer_relations one pair at a time, and
+# CalculateAvgRelation issues one GetRelation query per group member for every
+# candidate. RelationStore loads every relation touching a set of officers with one
+# query into a symmetric CSR layout (row offsets + sorted neighbour indices +
+# values, plain NumPy), answers pair lookups and group averages from memory, and
+# writes changes back as one UPSERT batch. Single-pair get() calls go through a
+# {pair: value} dict built from the arrays on first use, since a NumPy binary
+# search per call costs more than the SQL lookup it replaces.
+#
+# A store loaded for some officers only knows the pairs that touch one of them;
+# get() and modify() on any other pair raise instead of treating it as 0, which
+# save() would then write over the stored value.
+
+RELATION_MIN, RELATION_MAX = -100, 100
+SELF_RELATION = 100          # GetRelation(a, a)
+
+
+def pair_key(a, b):
+    """Canonical officer_relations key: smaller id first."""
+    return (a, b) if a < b else (b, a)
+
+
+class RelationStore:
+    """Symmetric CSR over officer_relations rows.
+
+    `ids` is the sorted array of officers with at least one loaded relation; row i
+    covers neighbours `indices[indptr[i]:indptr[i + 1]]` (positions in `ids`,
+    sorted) with the matching `values`. Pairs without a row are 0. `officers` is
+    the set the store was loaded for (None: every officer).
+    """
+
+    def __init__(self, ids, indptr, indices, values, officers=None):
+        self.ids = ids
+        self.indptr = indptr
+        self.indices = indices
+        self.values = values
+        self.officers = officers
+        self.changes = {}        # pair_key -> value still to be written
+        self._new_pairs = {}     # changed pairs that are not in the CSR arrays yet
+        self._pairs = None       # pair_key -> value, built by _pair_values()
+
+    @classmethod
+    def from_pairs(cls, a, b, v):
+        a, b, v = (np.asarray(x, dtype=np.int64) for x in (a, b, v))
+        ids = np.unique(np.concatenate([a, b]))
+        rows = np.searchsorted(ids, np.concatenate([a, b]))
+        cols = np.searchsorted(ids, np.concatenate([b, a]))
+        order = np.lexsort((cols, rows))
+        rows, cols = rows[order], cols[order]
+        indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(ids)), out=indptr[1:])
+        return cls(ids, indptr, cols.astype(np.int64), np.concatenate([v, v])[order].astype(np.int32))
+
+    @classmethod
+    def load(cls, conn, officer_ids=None):
+        """Every relation touching `officer_ids` (all of them when None), in one query.
+
+        The two IN lists are served by the primary key and by
+        ix_officer_relations_officer_2 respectively.
+        """
+        columns = "SELECT officer_1_id, officer_2_id, COALESCE(value, 0) FROM officer_relations"
+        if officer_ids is None:
+            officers = None
+            cursor = conn.execute(f"{columns} WHERE officer_1_id != officer_2_id")
+        else:
+            officers = frozenset(int(i) for i in officer_ids)
+            ids = json.dumps(sorted(officers))
+            cursor = conn.execute(f"""
+                {columns} WHERE officer_1_id != officer_2_id
+                AND (officer_1_id IN (SELECT value FROM json_each(?)) OR officer_2_id IN (SELECT value FROM json_each(?)))""",
+                (ids, ids))
+        # Straight from the cursor into one structured array, without a list of tuples in between
+        rows = np.fromiter(cursor, dtype=[("a", np.int64), ("b", np.int64), ("v", np.int64)])
+        store = cls.from_pairs(rows["a"], rows["b"], rows["v"])
+        store.officers = officers
+        return store
+
+    def __len__(self):
+        return len(self.indices) // 2 + len(self._new_pairs)
+
+    # --- Lookups ---
+
+    def _positions(self, officer_ids):
+        """Row of each id in `ids` and whether it is loaded at all."""
+        if len(self.ids) == 0:
+            return np.zeros(len(officer_ids), dtype=np.int64), np.zeros(len(officer_ids), dtype=bool)
+        pos = np.minimum(np.searchsorted(self.ids, officer_ids), len(self.ids) - 1)
+        return pos, self.ids[pos] == officer_ids
+
+    def _slot(self, a, b):
+        """Index into indices/values for the a->b entry, or None."""
+        i = np.searchsorted(self.ids, a)
+        j = np.searchsorted(self.ids, b)
+        if i >= len(self.ids) or j >= len(self.ids) or self.ids[i] != a or self.ids[j] != b:
+            return None
+        start, end = self.indptr[i], self.indptr[i + 1]
+        k = start + np.searchsorted(self.indices[start:end], j)
+        return k if k < end and self.indices[k] == j else None
+
+    def _check_loaded(self, a, b):
+        if self.officers is not None and a not in self.officers and b not in self.officers:
+            raise ValueError(f"Relation {a}-{b} was not loaded (neither officer is in this store)")
+
+    def _pair_values(self):
+        """{pair_key: value} of every stored pair (built once, kept in step by _set())."""
+        if self._pairs is None:
+            rows = np.repeat(self.ids, np.diff(self.indptr))
+            cols = self.ids[self.indices]
+            keep = rows < cols
+            self._pairs = dict(zip(zip(rows[keep].tolist(), cols[keep].tolist()), self.values[keep].tolist()))
+            self._pairs.update(self._new_pairs)
+        return self._pairs
+
+    def get(self, a, b):
+        """RelationshipManager.GetRelation."""
+        if a == b:
+            return SELF_RELATION
+        self._check_loaded(a, b)
+        return self._pair_values().get(pair_key(a, b), 0)
+
+    def neighbours(self, a):
+        """{other_id: value} for every stored relation of `a`."""
+        if self.officers is not None and a not in self.officers:
+            raise ValueError(f"Relations of officer {a} were not loaded")
+        result = {}
+        i = np.searchsorted(self.ids, a)
+        if i < len(self.ids) and self.ids[i] == a:
+            start, end = self.indptr[i], self.indptr[i + 1]
+            result = dict(zip(self.ids[self.indices[start:end]].tolist(), self.values[start:end].tolist()))
+        for (x, y), value in self._new_pairs.items():
+            if a in (x, y):
+                result[y if x == a else x] = value
+        return result
+
+    def group_affinity(self, officer_ids, group):
+        """BattleManager.CalculateAvgRelation for every officer against one group.
+
+        Sum of relations to each member (100 for the officer itself) divided by the
+        group size with C# integer division. Returns an int64 array; 0 for an empty group.
+        """
+        officer_ids = np.asarray(officer_ids, dtype=np.int64)
+        group = np.asarray(group, dtype=np.int64)
+        if len(group) == 0:
+            return np.zeros(len(officer_ids), dtype=np.int64)
+        self._merge_new_pairs()
+
+        # Group membership as a weight per loaded officer (members can repeat in a list)
+        pos, known = self._positions(group)
+        weight = np.bincount(pos[known], minlength=len(self.ids))
+
+        # Sparse row . weight, over the requested rows' slices only
+        row, found = self._positions(officer_ids)
+        starts, ends = self.indptr[row[found]], self.indptr[row[found] + 1]
+        lengths = ends - starts
+        owner = np.repeat(np.arange(len(starts)), lengths)
+        slots = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths) + np.repeat(starts, lengths)
+        total = np.zeros(len(officer_ids), dtype=np.int64)
+        total[found] = np.bincount(owner, weights=self.values[slots] * weight[self.indices[slots]],
+                                   minlength=len(starts)).astype(np.int64)
+
+        # Self pairs count as 100 for every time the officer appears in the group
+        members, counts = np.unique(group, return_counts=True)
+        at = np.minimum(np.searchsorted(members, officer_ids), len(members) - 1)
+        total += np.where(members[at] == officer_ids, counts[at] * SELF_RELATION, 0)
+
+        n = len(group)
+        return np.sign(total) * (np.abs(total) // n)
+
+    def group_affinities(self, officer_ids, groups):
+        """group_affinity for several groups: an (officers x groups) array."""
+        return np.stack([self.group_affinity(officer_ids, g) for g in groups], axis=1) if groups else \
+            np.zeros((len(officer_ids), 0), dtype=np.int64)
+
+    # --- Changes ---
+
+    def _set(self, a, b, value):
+        key = pair_key(a, b)
+        k = self._slot(a, b)
+        if k is None:
+            self._new_pairs[key] = value
+        else:
+            self.values[k] = value
+            self.values[self._slot(b, a)] = value
+        if self._pairs is not None:
+            self._pairs[key] = value
+        self.changes[key] = value
+
+    def modify(self, a, b, delta):
+        """RelationshipManager.ModifyRelation: clamp(current + delta) to [-100, 100]."""
+        if a == b:
+            return None
+        self._check_loaded(a, b)
+        value = max(RELATION_MIN, min(RELATION_MAX, self.get(a, b) + delta))
+        self._set(a, b, value)
+        return value
+
+    def decay(self, step):
+        """Moves every stored relation `step` points toward 0. Returns the pairs changed."""
+        self._merge_new_pairs()
+        decayed = (np.sign(self.values) * np.maximum(np.abs(self.values) - step, 0)).astype(self.values.dtype)
+        rows = np.repeat(self.ids, np.diff(self.indptr))
+        cols = self.ids[self.indices]
+        moved = (decayed != self.values) & (rows < cols)  # One entry per pair
+        self.values = decayed
+        self._pairs = None
+        for a, b, v in zip(rows[moved].tolist(), cols[moved].tolist(), decayed[moved].tolist()):
+            self.changes[(a, b)] = v
+        return int(moved.sum())
+
+    def _merge_new_pairs(self):
+        """Folds pairs created by modify() into the CSR arrays."""
+        if not self._new_pairs:
+            return
+        rows = np.repeat(self.ids, np.diff(self.indptr))
+        cols = self.ids[self.indices]
+        keep = rows < cols
+        a = np.concatenate([rows[keep], [k[0] for k in self._new_pairs]])
+        b = np.concatenate([cols[keep], [k[1] for k in self._new_pairs]])
+        v = np.concatenate([self.values[keep], list(self._new_pairs.values())])
+        merged = RelationStore.from_pairs(a, b, v)
+        self.ids, self.indptr, self.indices, self.values = merged.ids, merged.indptr, merged.indices, merged.values
+        self._new_pairs = {}
+
+    def save(self, conn):
+        """Writes pending changes as one UPSERT batch. Nothing is committed: the caller owns
+        the transaction. Returns the row count."""
+        rows = [(a, b, v) for (a, b), v in self.changes.items()]
+        if rows:
+            conn.executemany("""
+                INSERT INTO officer_relations (officer_1_id, officer_2_id, value) VALUES (?, ?, ?)
+                ON CONFLICT(officer_1_id, officer_2_id) DO UPDATE SET value = excluded.value""", rows)
+        self.changes = {}
+        return len(rows)
@@ -0,0 +1,333 @@
+import hashlib
+import heapq
+from collections import OrderedDict
+
+import numpy as np
+
+# Weighted all-pairs shortest paths over the city graph.
+# FactionAI.FindNextHopToward, WorldGraph.IsConnectedToHQ and
+# WorldGenerator.GetShortestPath rebuild an adjacency list and BFS on every call,
+# counting hops and ignoring Route.distance. Routes never change during play, so
+# the distance and next-hop matrices are computed once, stored in a `route_cache`
+# table keyed by a hash of the routes, and every pathing query is an array lookup.
+# Build from the command line with tools/build_route_cache.py.
+#
+# The dense tables grow with cities squared (5000 cities: 200 MB, and close to a
+# minute to build without SciPy), so load_routes() only builds them up to
+# ALL_PAIRS_MAX_CITIES. Bigger maps get TargetRoutes, which runs one Dijkstra per
+# target city when it is first asked for and keeps the most recent targets' trees.
+
+ROUTE_CACHE_TABLE = """
+    CREATE TABLE IF NOT EXISTS route_cache (
+        routes_hash TEXT PRIMARY KEY,
+        city_ids BLOB NOT NULL,
+        distances BLOB NOT NULL,
+        next_hops BLOB NOT NULL,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )"""
+
+NO_ROUTE = -1               # next_hops entry when the target is unreachable
+DEFAULT_DISTANCE = 1.0      # Route.distance default, used for NULL distances
+FLOYD_WARSHALL_MAX = 400    # Above this many cities (sparse roads), Dijkstra per source is faster
+ALL_PAIRS_MAX_CITIES = 1000 # Above this many cities, load_routes() computes paths per target instead
+TARGET_TREES_KEPT = 256     # Shortest-path trees TargetRoutes keeps (one int32 + one float per city each)
+
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import dijkstra as _scipy_dijkstra
+except ImportError:  # SciPy is optional; the NumPy/heapq paths below cover it
+    _scipy_dijkstra = None
+
+
+def load_graph(conn):
+    """Reads cities and routes. Returns (city_ids, [(start, end, distance)]) sorted for hashing."""
+    city_ids = {r[0] for r in conn.execute("SELECT city_id FROM cities")}
+    edges = conn.execute(
+        "SELECT start_city_id, end_city_id, distance FROM routes ORDER BY start_city_id, end_city_id, route_id"
+    ).fetchall()
+    for start, end, _ in edges:
+        city_ids.update((start, end))
+    edges = [(s, e, DEFAULT_DISTANCE if d is None else float(d)) for s, e, d in edges]
+    return sorted(city_ids), edges
+
+
+def routes_hash(city_ids, edges):
+    """Stable SHA-256 of the graph; any route or city change gives a new key."""
+    digest = hashlib.sha256()
+    digest.update(np.asarray(city_ids, dtype=np.int64).tobytes())
+    for start, end, distance in edges:
+        digest.update(f"{start},{end},{distance!r};".encode())
+    return digest.hexdigest()
+
+
+def _weight_matrix(n, index, edges):
+    """Dense n x n weights; routes are travelled both ways, like the game's BFS."""
+    weights = np.full((n, n), np.inf)
+    for start, end, distance in edges:
+        a, b = index[start], index[end]
+        if a != b and distance < weights[a, b]:
+            weights[a, b] = weights[b, a] = distance
+    return weights
+
+
+def floyd_warshall(weights):
+    """Vectorised Floyd-Warshall. Returns (dist, next_hop) with next_hop as node indices."""
+    n = len(weights)
+    dist = weights.copy()
+    np.fill_diagonal(dist, 0.0)
+    next_hop = np.where(np.isfinite(dist), np.arange(n)[None, :], NO_ROUTE).astype(np.int32)
+    for k in range(n):
+        through_k = dist[:, k, None] + dist[None, k, :]
+        better = through_k < dist
+        if better.any():
+            dist = np.where(better, through_k, dist)
+            next_hop = np.where(better, next_hop[:, k, None], next_hop)
+    return dist, next_hop
+
+
+def _first_hops(source, predecessors):
+    """Turns one Dijkstra predecessor row into first hops from source."""
+    n = len(predecessors)
+    hops = np.full(n, NO_ROUTE, dtype=np.int32)
+    hops[source] = source
+    reached = predecessors >= 0
+    direct = reached & (predecessors == source)
+    hops[direct] = np.flatnonzero(direct)
+    # Walk the unresolved nodes up the tree together until each meets a resolved ancestor
+    pending = np.flatnonzero(reached & ~direct)
+    up = predecessors[pending].copy()
+    while len(pending):
+        resolved = hops[up] != NO_ROUTE
+        hops[pending[resolved]] = hops[up[resolved]]
+        pending, up = pending[~resolved], up[~resolved]
+        up = predecessors[up]
+    return hops
+
+
+def dijkstra_all(weights):
+    """Dijkstra from every source (SciPy when installed, heapq otherwise)."""
+    n = len(weights)
+    if _scipy_dijkstra is not None:
+        graph = csr_matrix(np.where(np.isfinite(weights), weights, 0.0))
+        dist, predecessors = _scipy_dijkstra(graph, directed=False, return_predecessors=True)
+        predecessors = predecessors.astype(np.int64)
+        predecessors[predecessors < 0] = NO_ROUTE
+    else:
+        neighbours = [[(int(j), float(weights[i, j])) for j in np.flatnonzero(np.isfinite(weights[i]))] for i in range(n)]
+        dist = np.full((n, n), np.inf)
+        predecessors = np.full((n, n), NO_ROUTE, dtype=np.int64)
+        for source in range(n):
+            row, pred = dist[source], predecessors[source]
+            row[source] = 0.0
+            heap = [(0.0, source)]
+            while heap:
+                d, node = heapq.heappop(heap)
+                if d > row[node]:
+                    continue
+                for other, w in neighbours[node]:
+                    nd = d + w
+                    if nd < row[other]:
+                        row[other] = nd
+                        pred[other] = node
+                        heapq.heappush(heap, (nd, other))
+    next_hop = np.vstack([_first_hops(s, predecessors[s]) for s in range(n)]) if n else np.empty((0, 0), np.int32)
+    return dist, next_hop
+
+
+class RouteTable:
+    """All-pairs route distances and first hops between cities.
+
+    Lookups take city ids and cost two dict hits plus an array index. Distances are
+    in Route.distance units (days); unreachable pairs are inf / 0 like the game's
+    "no hop" return value.
+    """
+
+    def __init__(self, city_ids, distances, next_hops, routes_hash=None):
+        self.city_ids = np.asarray(city_ids, dtype=np.int64)
+        self.index = {cid: i for i, cid in enumerate(self.city_ids.tolist())}
+        self.distances = distances   # float32 (n, n)
+        self.next_hops = next_hops   # int32 (n, n) of node indices, NO_ROUTE if unreachable
+        self.routes_hash = routes_hash
+
+    @classmethod
+    def compute(cls, conn):
+        city_ids, edges = load_graph(conn)
+        n = len(city_ids)
+        index = {cid: i for i, cid in enumerate(city_ids)}
+        weights = _weight_matrix(n, index, edges)
+        if n <= FLOYD_WARSHALL_MAX and _scipy_dijkstra is None:
+            dist, next_hop = floyd_warshall(weights)
+        else:
+            dist, next_hop = dijkstra_all(weights)
+        return cls(city_ids, dist.astype(np.float32), next_hop.astype(np.int32), routes_hash(city_ids, edges))
+
+    @classmethod
+    def load(cls, conn, key=None):
+        """Reads the cached tables for `key` (default: the current routes); None on a miss."""
+        if key is None:
+            key = routes_hash(*load_graph(conn))
+        conn.execute(ROUTE_CACHE_TABLE)
+        row = conn.execute("SELECT city_ids, distances, next_hops FROM route_cache WHERE routes_hash = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        city_ids = np.frombuffer(row[0], dtype=np.int64)
+        n = len(city_ids)
+        distances = np.frombuffer(row[1], dtype=np.float32).reshape(n, n)
+        next_hops = np.frombuffer(row[2], dtype=np.int32).reshape(n, n)
+        return cls(city_ids, distances, next_hops, key)
+
+    def save(self, conn):
+        """Stores this table under its hash and drops entries for older route sets.
+        Nothing is committed: the caller owns the transaction."""
+        conn.execute(ROUTE_CACHE_TABLE)
+        conn.execute("DELETE FROM route_cache WHERE routes_hash != ?", (self.routes_hash,))
+        conn.execute("INSERT OR REPLACE INTO route_cache (routes_hash, city_ids, distances, next_hops) VALUES (?, ?, ?, ?)",
+                     (self.routes_hash, self.city_ids.tobytes(),
+                      np.ascontiguousarray(self.distances, dtype=np.float32).tobytes(),
+                      np.ascontiguousarray(self.next_hops, dtype=np.int32).tobytes()))
+
+    @classmethod
+    def load_or_build(cls, conn, persist=True):
+        """Cached table if the routes are unchanged, otherwise recompute (and store and
+        commit if persist)."""
+        key = routes_hash(*load_graph(conn))
+        table = cls.load(conn, key)
+        if table is None:
+            table = cls.compute(conn)
+            if persist:
+                table.save(conn)
+                conn.commit()
+        return table
+
+    def distance(self, start, target):
+        a, b = self.index.get(start), self.index.get(target)
+        if a is None or b is None:
+            return float("inf")
+        return float(self.distances[a, b])
+
+    def next_hop(self, start, target):
+        """First city on the shortest route from start to target; 0 if none (FindNextHopToward)."""
+        a, b = self.index.get(start), self.index.get(target)
+        if a is None or b is None or a == b:
+            return 0
+        hop = self.next_hops[a, b]
+        return 0 if hop == NO_ROUTE else int(self.city_ids[hop])
+
+    def path(self, start, target):
+        """City ids from start to target inclusive; [] if unreachable (GetShortestPath)."""
+        a, b = self.index.get(start), self.index.get(target)
+        if a is None or b is None or self.next_hops[a, b] == NO_ROUTE:
+            return []
+        nodes = [a]
+        while a != b:
+            a = int(self.next_hops[a, b])
+            nodes.append(a)
+        return [int(self.city_ids[i]) for i in nodes]
+
+    def reachable(self, start, target):
+        return np.isfinite(self.distance(start, target))
+
+
+class TargetRoutes:
+    """RouteTable's lookups for maps too big for the all-pairs table.
+
+    Routes run both ways, so one Dijkstra from the target gives every city's distance
+    to it and its first hop toward it (its parent in the target's shortest-path tree).
+    Trees are computed on first use and the `cache_size` most recently used are kept.
+    """
+
+    def __init__(self, city_ids, edges, cache_size=TARGET_TREES_KEPT, routes_hash=None):
+        self.city_ids = np.asarray(city_ids, dtype=np.int64)
+        self.index = {cid: i for i, cid in enumerate(self.city_ids.tolist())}
+        self.cache_size = cache_size
+        self.routes_hash = routes_hash
+        shortest = {}
+        for start, end, distance in edges:
+            a, b = self.index[start], self.index[end]
+            if a != b:
+                pair = (min(a, b), max(a, b))
+                shortest[pair] = min(distance, shortest.get(pair, np.inf))
+        self.neighbours = [[] for _ in range(len(self.city_ids))]
+        for (a, b), distance in shortest.items():
+            self.neighbours[a].append((b, distance))
+            self.neighbours[b].append((a, distance))
+        self._trees = OrderedDict()
+
+    @classmethod
+    def compute(cls, conn, cache_size=TARGET_TREES_KEPT):
+        city_ids, edges = load_graph(conn)
+        return cls(city_ids, edges, cache_size, routes_hash(city_ids, edges))
+
+    def _tree(self, target):
+        """(distances to target, parent toward target) as node-index arrays."""
+        tree = self._trees.get(target)
+        if tree is not None:
+            self._trees.move_to_end(target)
+            return tree
+        n = len(self.city_ids)
+        dist = np.full(n, np.inf)
+        parent = np.full(n, NO_ROUTE, dtype=np.int32)
+        dist[target] = 0.0
+        parent[target] = target
+        heap = [(0.0, target)]
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d > dist[node]:
+                continue
+            for other, w in self.neighbours[node]:
+                nd = d + w
+                if nd < dist[other]:
+                    dist[other] = nd
+                    parent[other] = node
+                    heapq.heappush(heap, (nd, other))
+        tree = self._trees[target] = (dist.astype(np.float32), parent)
+        if len(self._trees) > self.cache_size:
+            self._trees.popitem(last=False)
+        return tree
+
+    def distance(self, start, target):
+        a, b = self.index.get(start), self.index.get(target)
+        if a is None or b is None:
+            return float("inf")
+        return float(self._tree(b)[0][a])
+
+    def next_hop(self, start, target):
+        """First city on the shortest route from start to target; 0 if none (FindNextHopToward)."""
+        a, b = self.index.get(start), self.index.get(target)
+        if a is None or b is None or a == b:
+            return 0
+        hop = self._tree(b)[1][a]
+        return 0 if hop == NO_ROUTE else int(self.city_ids[hop])
+
+    def path(self, start, target):
+        """City ids from start to target inclusive; [] if unreachable (GetShortestPath)."""
+        a, b = self.index.get(start), self.index.get(target)
+        if a is None or b is None:
+            return []
+        parent = self._tree(b)[1]
+        if parent[a] == NO_ROUTE:
+            return []
+        nodes = [a]
+        while a != b:
+            a = int(parent[a])
+            nodes.append(a)
+        return [int(self.city_ids[i]) for i in nodes]
+
+    def reachable(self, start, target):
+        return np.isfinite(self.distance(start, target))
+
+
+def load_routes(conn, persist=True, max_cities=ALL_PAIRS_MAX_CITIES):
+    """Route lookups for the world in `conn`: the cached or freshly built RouteTable
+    up to `max_cities` cities (see RouteTable.load_or_build), TargetRoutes above."""
+    city_ids, edges = load_graph(conn)
+    key = routes_hash(city_ids, edges)
+    if len(city_ids) > max_cities:
+        return TargetRoutes(city_ids, edges, routes_hash=key)
+    table = RouteTable.load(conn, key)
+    if table is None:
+        table = RouteTable.compute(conn)
+        if persist:
+            table.save(conn)
+            conn.commit()
+    return table
@@ -0,0 +1,194 @@
+import numpy as np
+
+# Whole-map strategic view for FactionAI (FindExpansionTarget, GetCityDefenseStrength,
+# GetOfficerStrength and the CaptureCity force checks in AssignOfficerTasks).
+# Every turn the game re-reads each faction's cities and border routes, then orders
+# the neighbours with a correlated COUNT(*) of officers per city. Garrisons, assigned
+# attack forces and officer strengths are further one-row queries per city or officer.
+#
+# StrategicMap reads cities, officers and routes once into arrays indexed by city
+# position (cities sorted by city_id). Garrison totals are np.bincount group sums,
+# and border status comes from masking the route endpoint arrays by owner. Every
+# faction's expansion candidates go into one (factions x cities) score matrix, so a
+# single argsort ranks the targets of all factions at once. The *_sql functions are
+# the game's queries, kept as the reference for tools/bench_strategic_map.py.
+
+NEUTRAL_MILITIA = 1500          # GetCityDefenseStrength: an empty neutral town
+GARRISON_BONUS = 500            # ...otherwise officer troops + walls/garrison
+ATTACK_SUPERIORITY = 1.3        # AssignOfficerTasks aims for 30% more troops than the defence
+ATTACK_ASSIGNMENTS = ("CaptureCity", "SupportAttack")
+
+
+def find_expansion_target_sql(conn, faction_id):
+    """Reference: FactionAI.FindExpansionTarget (0 when there is no target)."""
+    mine = [r[0] for r in conn.execute("SELECT city_id FROM cities WHERE faction_id = ?", (faction_id,))]
+    if not mine:
+        return 0
+    owned = set(mine)
+    city_list = ",".join(map(str, mine))
+    neighbours = set()
+    for s, e in conn.execute(f"SELECT start_city_id, end_city_id FROM routes "
+                             f"WHERE start_city_id IN ({city_list}) OR end_city_id IN ({city_list})"):
+        if s in owned and e not in owned:
+            neighbours.add(e)
+        elif e in owned and s not in owned:
+            neighbours.add(s)
+    if not neighbours:
+        return 0
+    row = conn.execute(f"""
+        SELECT city_id FROM cities
+        WHERE city_id IN ({",".join(map(str, neighbours))})
+        AND (faction_id != ? OR faction_id IS NULL)
+        ORDER BY (faction_id IS NULL) DESC,
+                 (SELECT COUNT(*) FROM officers WHERE location_id = cities.city_id) ASC
+        LIMIT 1""", (faction_id,)).fetchone()
+    return row[0] if row else 0
+
+
+def city_defense_strength_sql(conn, city_id):
+    """Reference: FactionAI.GetCityDefenseStrength."""
+    total = conn.execute("SELECT SUM(troops) FROM officers WHERE location_id = ?", (city_id,)).fetchone()[0] or 0
+    if total == 0:
+        owner = conn.execute("SELECT faction_id FROM cities WHERE city_id = ?", (city_id,)).fetchone()
+        if owner is None or owner[0] is None:
+            return NEUTRAL_MILITIA
+    return total + GARRISON_BONUS
+
+
+class StrategicMap:
+    """Per-city strategic arrays for every faction, built in one pass.
+
+    Arrays are indexed by city position (city_ids is sorted); owner holds a faction
+    position into faction_ids or -1 for neutral cities. Like the other array caches
+    this is a snapshot: call load() again after cities or officers change.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.city_ids = None
+        self.faction_ids = None
+        self.owner = None               # faction position per city, -1 = neutral
+        self.officer_count = None       # officers stationed in the city (any faction)
+        self.troops = None              # their summed troops
+        self.garrison = None            # GetCityDefenseStrength
+        self.assigned = None            # troops assigned to CaptureCity/SupportAttack on the city
+        self.border = None              # owned city with a neighbour owned by someone else
+        self.frontier = None            # (factions x cities): not owned by the faction, next to one it owns
+        self.pressure = None            # troops in adjacent cities held by other factions
+        self.officer_ids = None
+        self.officer_strength = None
+
+    def _positions(self, keys, values):
+        """Positions of `values` in the sorted `keys`; -1 where missing or NULL."""
+        values = np.asarray(values, dtype=np.float64)
+        out = np.full(len(values), -1, dtype=np.int64)
+        valid = ~np.isnan(values)
+        if len(keys) and valid.any():
+            v = values[valid].astype(np.int64)
+            pos = np.clip(np.searchsorted(keys, v), 0, len(keys) - 1)
+            out[np.flatnonzero(valid)] = np.where(keys[pos] == v, pos, -1)
+        return out
+
+    def load(self):
+        conn = self.conn
+        self.faction_ids = np.array([r[0] for r in conn.execute("SELECT faction_id FROM factions ORDER BY faction_id")],
+                                    dtype=np.int64)
+        rows = conn.execute("SELECT city_id, faction_id FROM cities ORDER BY city_id").fetchall()
+        cols = np.array(rows, dtype=np.float64).reshape(-1, 2)      # NULL -> nan
+        self.city_ids = cols[:, 0].astype(np.int64)
+        self.owner = self._positions(self.faction_ids, cols[:, 1])
+        n = len(self.city_ids)
+
+        # Officers only matter through their city: read (location, troops) and group-sum them
+        rows = conn.execute("SELECT location_id, troops FROM officers WHERE location_id IS NOT NULL").fetchall()
+        cols = np.array(rows, dtype=np.float64).reshape(-1, 2)
+        location, troops = self._positions(self.city_ids, cols[:, 0]), np.nan_to_num(cols[:, 1])
+        at_city = location >= 0
+        self.officer_count = np.bincount(location[at_city], minlength=n)
+        self.troops = np.bincount(location[at_city], weights=troops[at_city], minlength=n).astype(np.int64)
+        self.garrison = np.where((self.troops == 0) & (self.owner < 0), NEUTRAL_MILITIA, self.troops + GARRISON_BONUS)
+        placeholders = ", ".join("?" * len(ATTACK_ASSIGNMENTS))
+        rows = conn.execute(f"SELECT assignment_target_id, TOTAL(troops) FROM officers "
+                            f"WHERE current_assignment IN ({placeholders}) GROUP BY assignment_target_id",
+                            ATTACK_ASSIGNMENTS).fetchall()
+        cols = np.array(rows, dtype=np.float64).reshape(-1, 2)
+        target = self._positions(self.city_ids, cols[:, 0])
+        self.assigned = np.zeros(n, dtype=np.int64)
+        self.assigned[target[target >= 0]] = cols[target >= 0, 1].astype(np.int64)
+        self.officer_ids = self.officer_strength = None      # read on the first officer_strength_of()
+
+        # Both directions of every route; routes to unknown cities are ignored
+        pairs = np.array(conn.execute("SELECT start_city_id, end_city_id FROM routes").fetchall(),
+                         dtype=np.float64).reshape(-1, 2)
+        a = self._positions(self.city_ids, pairs[:, 0])
+        b = self._positions(self.city_ids, pairs[:, 1])
+        known = (a >= 0) & (b >= 0)
+        src = np.concatenate([a[known], b[known]])
+        dst = np.concatenate([b[known], a[known]])
+        src_owner, dst_owner = self.owner[src], self.owner[dst]
+        reach = (src_owner >= 0) & (src_owner != dst_owner)     # an owned city next to someone else's
+
+        self.border = np.zeros(n, dtype=bool)
+        self.border[src[reach]] = True
+        self.frontier = np.zeros((len(self.faction_ids), n), dtype=bool)
+        self.frontier[src_owner[reach], dst[reach]] = True
+        self.pressure = np.bincount(dst[reach], weights=self.troops[src[reach]], minlength=n).astype(np.int64)
+        return self
+
+    # --- Planning ---
+
+    def expansion_scores(self):
+        """(factions x cities) int64 keys, lower is better; -1 where the city is not a candidate.
+
+        FindExpansionTarget's order: neutral cities first, then the fewest stationed
+        officers, then (where the game leaves it to SQLite) the lowest city_id.
+        """
+        n = len(self.city_ids)
+        occupied = (self.owner >= 0).astype(np.int64)
+        key = (occupied * (self.officer_count.max(initial=0) + 1) + self.officer_count) * n + np.arange(n)
+        return np.where(self.frontier, key[None, :], -1)
+
+    def ranked_targets(self):
+        """(factions x cities) city positions, each faction's candidates best first, then -1 padding."""
+        scores = self.expansion_scores()
+        order = np.argsort(np.where(scores < 0, np.iinfo(np.int64).max, scores), axis=1, kind="stable")
+        return np.where(np.take_along_axis(scores, order, axis=1) >= 0, order, -1)
+
+    def expansion_targets(self):
+        """{faction_id: city_id} of every faction's FindExpansionTarget pick (0 when it has none)."""
+        best = self.ranked_targets()[:, 0] if len(self.city_ids) else np.full(len(self.faction_ids), -1)
+        return {int(fid): int(self.city_ids[pos]) if pos >= 0 else 0 for fid, pos in zip(self.faction_ids, best)}
+
+    def needed_troops(self):
+        """Troops AssignOfficerTasks wants on each city before it stops sending attackers."""
+        return (self.garrison * ATTACK_SUPERIORITY).astype(np.int64)
+
+    # --- Lookups ---
+
+    def city_position(self, city_id):
+        pos = int(np.searchsorted(self.city_ids, city_id))
+        if pos >= len(self.city_ids) or self.city_ids[pos] != city_id:
+            raise KeyError(city_id)
+        return pos
+
+    def defense_strength(self, city_id):
+        return int(self.garrison[self.city_position(city_id)])
+
+    def officer_strength_of(self, officer_id):
+        """GetOfficerStrength (0 for an unknown officer)."""
+        if self.officer_ids is None:
+            cols = np.array(self.conn.execute("SELECT officer_id, strength FROM officers ORDER BY officer_id").fetchall(),
+                            dtype=np.float64).reshape(-1, 2)
+            self.officer_ids = cols[:, 0].astype(np.int64)
+            self.officer_strength = np.nan_to_num(cols[:, 1]).astype(np.int64)
+        pos = int(np.searchsorted(self.officer_ids, officer_id))
+        if pos < len(self.officer_ids) and self.officer_ids[pos] == officer_id:
+            return int(self.officer_strength[pos])
+        return 0
+
+    def border_cities(self, faction_id):
+        """city_ids the faction owns that touch another faction's or a neutral city."""
+        pos = int(np.searchsorted(self.faction_ids, faction_id))
+        if pos >= len(self.faction_ids) or self.faction_ids[pos] != faction_id:
+            return []
+        return self.city_ids[(self.owner == pos) & self.border].tolist()
@@ -0,0 +1,698 @@
+import math
+import random
+import time
+from bisect import insort
+from collections import defaultdict
+
+import numpy as np
+
+from src.simulation.battle_grid import TILE_SIZE, GATE, HQ, SUPPLY_DEPOT, OUTPOST, BattleGrid
+from src.simulation.battle_paths import NO_STEP, FlowFieldCache
+
+# Headless port of the real-time battle (BattleController + UnitController).
+# Every frame the game ticks each unit against the whole unit list: cavalry charges,
+# ranged targets, the blocker on the next tile and CP control are all linear scans
+# over allUnits, and every retarget (once a second for every AI unit) runs a fresh
+# A*. Here units step on a fixed timestep; neighbour queries go through a
+# uniform-grid spatial hash keyed on pixel position, tile blockers and CP control
+# read a per-tile occupancy list, and movement follows the next-step table of a
+# distance field cached per target cell (battle_paths.FlowFieldCache) instead of a
+# per-unit A* path.
+#
+# Deliberate differences from the game, all so battles can run without a scene:
+#  - Hostility is by side (attacker / defender). The game compares IsAlly for
+#    charges and ranged fire, which only differs when the player is in the battle.
+#  - The player's units follow the same AI orders as everyone else.
+#  - A unit's next step comes from the distance field, so when several shortest
+#    paths exist it may take a different one than the game's A*.
+#  - Supply consumption, the gauge and the capture dialog (the AI's random pick of
+#    SupplyDepot/Outpost is kept) are left out.
+
+# BattleOfficer.TroopType (officers.main_troop_type / officer_type store these + 1)
+INFANTRY, ARCHER, CAVALRY, SIEGE, ELITE = range(5)
+TROOP_TYPES = ("Infantry", "Archer", "Cavalry", "Siege", "Elite")
+
+# UnitController.UnitState
+IDLE, MOVING, ATTACKING, COOLDOWN, SIEGING, CHARGING, LOOPING, RETREAT = (
+    "Idle", "Moving", "Attacking", "Cooldown", "Siege", "Charging", "Looping", "Retreat")
+MOVEMENT_STATES = frozenset((IDLE, MOVING, RETREAT, CHARGING, LOOPING))
+
+
+def _f32(value):
+    """The float32 constant the game multiplies by."""
+    return float(np.float32(value))
+
+
+DT = 0.05                            # Fixed timestep (seconds)
+MAX_SECONDS = 600.0                  # Battles still running after this are a defender hold
+PASSAGE_TICK_RATE = 3.0
+AI_RETARGET_INTERVAL = 1.0
+START_MORALE = 80
+HASH_CELL = 2 * TILE_SIZE            # Spatial hash bucket size in pixels
+
+MELEE_RANGE = 40.0
+SPEEDS = {CAVALRY: 150.0, ARCHER: 80.0, SIEGE: 60.0}          # Default 100
+RANGES = {ARCHER: (180.0, 60.0), SIEGE: (240.0, 80.0)}        # (range, min range)
+ARCHER_OFFICER_RANGE = 120.0
+STRUCTURE_BUFFER = 20.0
+CHARGE_MIN, CHARGE_MAX, CHARGE_OVERSHOOT, LOOP_DISTANCE = 40.0, 120.0, 80.0, 150.0
+CHARGE_MIN_SQ, CHARGE_MAX_SQ = CHARGE_MIN ** 2, CHARGE_MAX ** 2
+CHARGE_SPEED, LOOP_SPEED = _f32(2.5), _f32(1.5)
+HIGH_MORALE_MULT, LOW_MORALE_MULT = _f32(1.2), _f32(0.5)
+RPS_BONUS, SIEGE_VS_UNITS, MIN_RANGE_PENALTY = _f32(1.3), _f32(0.5), _f32(0.4)
+TROOP_SHARE, SIEGE_WEAKNESS = _f32(0.9), _f32(1.5)
+RPS_ADVANTAGE = {(CAVALRY, INFANTRY), (INFANTRY, ARCHER), (ARCHER, CAVALRY)}
+TROOPS_PER_SQUAD, MAX_SQUADS = 150, 6
+KILL_GOLD, MINION_KILL_GOLD = 200, 25
+
+OFFICER_COLUMNS = ("officer_id, name, faction_id, leadership, intelligence, strength, politics, "
+                   "is_player, rank, troops, main_troop_type, officer_type")
+
+
+def assign_troop_type(officer, rng):
+    """BattleManager.AssignIntelligentTroopType: weighted pick of the troop type, then the officer's own."""
+    weights = [40, 25, 25, 5, 5]     # Infantry, Archer, Cavalry, Siege, Elite
+    if officer["intelligence"] > 70:
+        weights[ARCHER] += 50
+    if officer["strength"] > 70:
+        weights[CAVALRY] += 50
+    if officer["leadership"] > 80:
+        weights[ELITE] += 30
+    if officer["intelligence"] > 50 and officer["politics"] > 50:
+        weights[SIEGE] += 20
+    roll = rng.randrange(sum(weights))
+    for troop_type, weight in enumerate(weights):
+        if roll < weight:
+            officer["main_troop_type"] = troop_type
+            break
+        roll -= weight
+    if officer["intelligence"] > officer["strength"] + 20:
+        officer["officer_type"] = ARCHER
+    elif officer["strength"] > officer["intelligence"] + 20:
+        officer["officer_type"] = CAVALRY
+    else:
+        officer["officer_type"] = INFANTRY
+
+
+def load_battle_officers(conn, officer_ids, rng):
+    """BattleManager's BattleOfficer rows for `officer_ids` (in that order), with one query.
+
+    Officers without a stored troop or officer type get one from
+    assign_troop_type, drawn from `rng` (a random.Random).
+    """
+    officer_ids = list(dict.fromkeys(officer_ids))
+    if not officer_ids:
+        return []
+    marks = ", ".join("?" * len(officer_ids))
+    rows = {row[0]: row for row in conn.execute(
+        f"SELECT {OFFICER_COLUMNS} FROM officers WHERE officer_id IN ({marks})", officer_ids)}
+    officers = []
+    for oid in officer_ids:
+        row = rows.get(oid)
+        if row is None:
+            continue
+        _, name, fid, lea, intel, strength, pol, is_player, rank, troops, mtt, oct_ = row
+        o = {
+            "officer_id": oid, "name": name, "faction_id": fid if fid is not None else -1,
+            "leadership": lea or 0, "intelligence": intel or 0, "strength": strength or 0,
+            "politics": pol if pol is not None else 50, "is_player": bool(is_player), "rank": rank,
+            "troops": troops or 0, "main_troop_type": INFANTRY, "officer_type": INFANTRY,
+        }
+        mtt, oct_ = mtt or 0, oct_ or 0
+        if mtt > 0:
+            o["main_troop_type"] = mtt - 1
+        if oct_ > 0:
+            o["officer_type"] = oct_ - 1
+        if mtt == 0 or oct_ == 0:
+            assign_troop_type(o, rng)
+        o["max_officer_hp"] = o["strength"] + o["leadership"]
+        if oid == 1:
+            o["max_officer_hp"] *= 2
+        o["officer_armor"] = o["intelligence"] // 2
+        o["troop_armor"] = o["leadership"] // 5
+        officers.append(o)
+    return officers
+
+
+class Unit:
+    """One UnitController: an officer's hero unit or one of their squads."""
+
+    __slots__ = ("index", "officer", "officer_id", "faction_id", "defender", "is_hero", "leadership",
+                 "strength", "intelligence", "troop_type", "officer_type", "ranged", "minion",
+                 "hp", "officer_hp", "troop_armor", "officer_armor", "morale",
+                 "speed", "attack_range", "min_range", "attack_speed", "cooldown", "passage",
+                 "state", "gx", "gy", "tx", "ty", "x", "y", "vx", "vy")
+
+    def __init__(self, index, officer, defender, is_hero, troops, gx, gy):
+        self.index = index
+        self.officer = officer
+        self.officer_id = officer["officer_id"]
+        self.faction_id = officer["faction_id"]
+        self.defender = defender
+        self.is_hero = is_hero
+        self.leadership = officer["leadership"]
+        self.strength = officer["strength"]
+        self.intelligence = officer["intelligence"]
+        self.troop_type = officer["main_troop_type"]
+        self.officer_type = officer["officer_type"]
+        self.ranged = self.troop_type in (ARCHER, SIEGE) or self.officer_type == ARCHER
+        self.minion = officer["rank"] == "Minion"
+        self.hp = troops
+        self.officer_hp = officer["max_officer_hp"]
+        self.troop_armor = officer["troop_armor"]
+        self.officer_armor = officer["officer_armor"]
+        self.morale = START_MORALE
+        self.attack_speed = 1.0 + self.strength / _f32(200.0)
+        self.speed = SPEEDS.get(self.troop_type, 100.0)
+        self.attack_range, self.min_range = RANGES.get(self.troop_type, (MELEE_RANGE, 0.0))
+        if self.officer_type == ARCHER and self.attack_range < ARCHER_OFFICER_RANGE:
+            self.attack_range = ARCHER_OFFICER_RANGE
+        self.cooldown = 0.0
+        self.passage = 0.0
+        self.state = IDLE
+        self.gx, self.gy = gx, gy
+        self.tx, self.ty = gx, gy
+        self.x, self.y = BattleGrid.grid_to_world(gx, gy)
+        self.vx, self.vy = self.x, self.y
+
+
+class SpatialHash:
+    """Uniform-grid buckets over live unit pixel positions, one set per side, plus per-tile occupancy.
+
+    Units leave the index when they die (they never come back). Callers pick among
+    the candidates with (distance, unit index), so every query returns the unit the
+    game's list scan would: ties go to the earlier unit in allUnits.
+    """
+
+    def __init__(self, units, width):
+        self.units = units
+        self.width = width
+        self.buckets = (defaultdict(set), defaultdict(set))     # [defender] -> bucket key -> indices
+        self.keys = {}
+        self.tiles = defaultdict(list)   # cell -> unit indices, sorted
+        for u in units:
+            self.add(u)
+
+    @staticmethod
+    def _key(x, y):
+        return int(x // HASH_CELL), int(y // HASH_CELL)
+
+    def add(self, u):
+        key = self._key(u.x, u.y)
+        self.keys[u.index] = key
+        self.buckets[u.defender][key].add(u.index)
+        insort(self.tiles[u.gy * self.width + u.gx], u.index)
+
+    def moved(self, u):
+        key = self._key(u.x, u.y)
+        old = self.keys.get(u.index)
+        if old is not None and key != old:
+            self._discard(u, old)
+            self.buckets[u.defender][key].add(u.index)
+            self.keys[u.index] = key
+
+    def _discard(self, u, key):
+        bucket = self.buckets[u.defender][key]
+        bucket.discard(u.index)
+        if not bucket:
+            del self.buckets[u.defender][key]
+
+    def stepped(self, u, old_cell):
+        if u.index in self.keys:
+            self.tiles[old_cell].remove(u.index)
+            insort(self.tiles[u.gy * self.width + u.gx], u.index)
+
+    def died(self, u):
+        key = self.keys.pop(u.index, None)
+        if key is not None:
+            self._discard(u, key)
+            self.tiles[u.gy * self.width + u.gx].remove(u.index)
+
+    def near(self, x, y, radius, defender):
+        """Buckets of side `defender` overlapping the square of `radius` around (x, y)."""
+        kx0, ky0 = self._key(x - radius, y - radius)
+        kx1, ky1 = self._key(x + radius, y + radius)
+        buckets = self.buckets[defender]
+        found = []
+        for kx in range(kx0, kx1 + 1):
+            for ky in range(ky0, ky1 + 1):
+                bucket = buckets.get((kx, ky))
+                if bucket:
+                    found.append(bucket)
+        return found
+
+    def on_tile(self, cell):
+        return self.tiles.get(cell, ())
+
+    def nearest(self, x, y, defender):
+        """Nearest live unit of side `defender` by squared distance.
+
+        Occupied buckets are visited closest first, stopping once a bucket's nearest
+        edge is farther than the best unit found.
+        """
+        bounds = []
+        for (kx, ky), bucket in self.buckets[defender].items():
+            dx = max(kx * HASH_CELL - x, 0.0, x - (kx + 1) * HASH_CELL)
+            dy = max(ky * HASH_CELL - y, 0.0, y - (ky + 1) * HASH_CELL)
+            bounds.append((dx * dx + dy * dy, bucket))
+        bounds.sort(key=lambda b: b[0])
+        units = self.units
+        best = None
+        for bound, bucket in bounds:
+            if best is not None and bound > best[0]:
+                break
+            for i in bucket:
+                u = units[i]
+                candidate = ((u.x - x) ** 2 + (u.y - y) ** 2, i)
+                if best is None or candidate < best:
+                    best = candidate
+        return None if best is None else units[best[1]]
+
+
+class UnitScan:
+    """Same queries as SpatialHash, answered by scanning every unit like the game does."""
+
+    def __init__(self, units, width):
+        self.units = units
+        self.width = width
+
+    def add(self, u):
+        pass
+
+    def moved(self, u):
+        pass
+
+    def stepped(self, u, old_cell):
+        pass
+
+    def died(self, u):
+        pass
+
+    def near(self, x, y, radius, defender):
+        return (range(len(self.units)),)
+
+    def on_tile(self, cell):
+        w = self.width
+        return [u.index for u in self.units if u.gy * w + u.gx == cell]
+
+    def nearest(self, x, y, defender):
+        best = None
+        for u in self.units:
+            if u.defender != defender or u.hp <= 0:
+                continue
+            candidate = ((u.x - x) ** 2 + (u.y - y) ** 2, u.index)
+            if best is None or candidate < best:
+                best = candidate
+        return None if best is None else self.units[best[1]]
+
+
+class TacticalBattle:
+    """One real-time battle between two lists of BattleOfficer dicts on a generated map.
+
+    `grid` and `cps` come from BattleGrid.siege_map or BattleGrid.from_template.
+    `spatial_hash=False` answers every neighbour query with a full scan instead;
+    given the same seed both modes produce the same battle. `paths` is a
+    FlowFieldCache for `grid` (for instance one loaded from disk); a fresh one
+    is made when omitted. run() returns a result
+    dict; the battle state stays on the instance for inspection.
+    """
+
+    def __init__(self, grid, cps, attackers, defenders, attacker_fid, defender_fid,
+                 rng_seed=None, dt=DT, spatial_hash=True, paths=None):
+        self.grid = grid
+        self.cps = cps
+        self.attacker_fid, self.defender_fid = attacker_fid, defender_fid
+        self.rng = random.Random(rng_seed)
+        self.dt = dt
+        self.time = 0.0
+        self.ticks = 0
+        self.ai_timer = 0.0
+        self.paths = paths if paths is not None else FlowFieldCache(grid, cps)
+        self.gold = defaultdict(int)     # officer_id -> BattleManager.AwardGold total
+        self.units = []
+        self.alive = [0, 0]              # [defender] -> units with troops left
+        self.winner = None
+        self.timings = defaultdict(float)
+        self.gate = next((cp for cp in cps if cp.type == GATE), None)
+        self.index = UnitScan(self.units, grid.width)
+        self._spawn(attackers, defenders)
+        self.index = (SpatialHash if spatial_hash else UnitScan)(self.units, grid.width)
+        self._initial_orders()
+
+    # --- Setup (BattleController.SpawnUnits / StartBattle) ---
+
+    def _hq(self, faction_id):
+        return next((cp for cp in self.cps if cp.type == HQ and cp.owner == faction_id), None)
+
+    def _spawn(self, attackers, defenders):
+        spawned = set()
+        for officers, defender, fid, fallback in ((defenders, True, self.defender_fid, (2, 5)),
+                                                   (attackers, False, self.attacker_fid, (17, 5))):
+            hq = self._hq(fid)
+            for o in officers:
+                if o["officer_id"] in spawned:
+                    continue
+                spawned.add(o["officer_id"])
+                pos = self._spawn_pos(hq.x, hq.y) if hq else fallback
+                self._spawn_officer(o, pos, defender)
+
+    def _spawn_pos(self, cx, cy):
+        """GetRandomSpawnPos: up to 10 tries within 2 tiles, else the centre."""
+        for _ in range(10):
+            x, y = cx + self.rng.randint(-2, 2), cy + self.rng.randint(-2, 2)
+            if self.grid.is_walkable(x, y) and not self.index.on_tile(y * self.grid.width + x):
+                return x, y
+        return cx, cy
+
+    def _spawn_officer(self, officer, pos, defender):
+        """SpawnUnit: one hero unit, then clamp(troops / 150, 1, 6) squads sharing the troops."""
+        self._add_unit(officer, defender, True, 1, pos)
+        troops = officer["troops"]
+        if troops <= 0:
+            return
+        squads = min(MAX_SQUADS, max(1, troops // TROOPS_PER_SQUAD))
+        for _ in range(squads):
+            self._add_unit(officer, defender, False, troops // squads, self._spawn_pos(*pos))
+
+    def _add_unit(self, officer, defender, is_hero, troops, pos):
+        unit = Unit(len(self.units), officer, defender, is_hero, troops, *pos)
+        self.units.append(unit)
+        self.alive[defender] += 1
+        self.index.add(unit)
+
+    def _died(self, u):
+        self.alive[u.defender] -= 1
+        self.index.died(u)
+
+    def _initial_orders(self):
+        gate = self.gate
+        att_hq, def_hq = self._hq(self.attacker_fid), self._hq(self.defender_fid)
+        for u in self.units:
+            if gate is not None and not gate.is_destroyed:
+                self._set_focus(u, gate.x, gate.y)
+            else:
+                hq = att_hq if u.defender else def_hq
+                if hq is not None:
+                    self._set_focus(u, hq.x, hq.y)
+
+    # --- Loop (BattleController._Process) ---
+
+    def run(self, max_seconds=MAX_SECONDS):
+        start = time.perf_counter()
+        while self.winner is None and self.time < max_seconds:
+            self.step()
+        self.timings["run"] += time.perf_counter() - start
+        return self.result()
+
+    def step(self):
+        dt = self.dt
+        for u in self.units:
+            self._tick(u, dt)
+        self._update_cp_control()
+        self.ai_timer += dt
+        if self.ai_timer >= AI_RETARGET_INTERVAL:
+            self._update_ai_targets()
+            self.ai_timer = 0.0
+        self.time += dt
+        self.ticks += 1
+        if not self.alive[False]:
+            self.winner = "defender"
+        elif not self.alive[True]:
+            self.winner = "attacker"
+
+    def _update_ai_targets(self):
+        for u in self.units:
+            if u.hp <= 0:
+                continue
+            enemy = self.index.nearest(u.x, u.y, not u.defender)
+            if enemy is not None:
+                self._set_focus(u, enemy.gx, enemy.gy)
+
+    def _update_cp_control(self):
+        """King of the hill: the faction with the most live units within Manhattan 1 takes the point."""
+        w = self.grid.width
+        for cp in self.cps:
+            if cp.is_destroyed:
+                continue
+            counts = {}
+            for dx, dy in ((0, 0), (0, -1), (0, 1), (-1, 0), (1, 0)):
+                x, y = cp.x + dx, cp.y + dy
+                if not self.grid.in_bounds(x, y):
+                    continue
+                for i in self.index.on_tile(y * w + x):
+                    u = self.units[i]
+                    if u.hp > 0:
+                        counts[u.faction_id] = counts.get(u.faction_id, 0) + 1
+            if not counts:
+                continue
+            ranked = sorted(counts.values(), reverse=True)
+            if len(ranked) > 1 and ranked[0] == ranked[1]:
+                continue
+            winner = max(counts, key=counts.get)
+            if cp.owner != winner:
+                cp.owner = winner
+                cp.type = self.rng.choice((SUPPLY_DEPOT, OUTPOST))   # HandleCPCapture, AI choice
+                self.paths.cps_changed()
+
+    # --- Unit (UnitController) ---
+
+    def _set_focus(self, u, tx, ty):
+        u.tx, u.ty = tx, ty
+        u.state = MOVING
+
+    def _tick(self, u, dt):
+        if u.hp <= 0:
+            return
+        if u.troop_type == CAVALRY and u.state == MOVING:
+            self._cavalry_charge(u)
+        if u.cooldown > 0:
+            u.cooldown -= dt
+            if u.state == COOLDOWN and u.cooldown <= 0:
+                u.state = IDLE
+        u.passage += dt
+        if u.passage >= PASSAGE_TICK_RATE:
+            u.passage = 0.0
+            self._passage(u)
+        if u.cooldown <= 0 and (u.state == IDLE or u.state == MOVING):
+            self._ranged_fire(u)
+        if u.state in MOVEMENT_STATES:
+            self._movement(u)
+
+        # Visual smoothing: the pixel position trails the grid position
+        dx, dy = u.vx - u.x, u.vy - u.y
+        dist = math.hypot(dx, dy)
+        if dist > 1.0:
+            speed = u.speed * (CHARGE_SPEED if u.state == CHARGING else LOOP_SPEED if u.state == LOOPING else 1.0)
+            reach = speed * dt
+            if dist <= reach:
+                u.x, u.y = u.vx, u.vy
+            else:
+                u.x += dx / dist * reach
+                u.y += dy / dist * reach
+            self.index.moved(u)
+
+        if u.morale <= 0 or u.officer_hp <= 0:
+            u.state = RETREAT
+            u.tx, u.ty = (0 if u.defender else self.grid.width, 0)
+
+    def _passage(self, u):
+        """ProcessPassageEffects: +1 morale, and desertion below 30."""
+        if u.hp <= 0 or u.officer_hp <= 0:
+            return
+        if 0 < u.morale < 100:
+            u.morale += 1
+        if u.morale < 30:
+            u.hp = max(0, u.hp - (30 - u.morale) * 2)
+            if u.hp == 0:
+                self._died(u)
+
+    def _cavalry_charge(self, u):
+        best = None
+        units = self.units
+        for bucket in self.index.near(u.x, u.y, CHARGE_MAX, not u.defender):
+            for i in bucket:
+                t = units[i]
+                if t.defender == u.defender or t.hp <= 0 or (best is not None and i > best):
+                    continue
+                d2 = (t.x - u.x) ** 2 + (t.y - u.y) ** 2
+                if CHARGE_MIN_SQ < d2 < CHARGE_MAX_SQ:
+                    best = i
+        if best is None:
+            return
+        t = self.units[best]
+        u.state = CHARGING
+        dx, dy = t.x - u.x, t.y - u.y
+        dist = math.hypot(dx, dy)
+        u.vx, u.vy = t.x + dx / dist * CHARGE_OVERSHOOT, t.y + dy / dist * CHARGE_OVERSHOOT
+        self._take_damage(t, u.leadership // 3)
+
+    def _ranged_fire(self, u):
+        if not u.ranged:
+            return
+        best = None
+        units = self.units
+        reach = u.attack_range * u.attack_range
+        for bucket in self.index.near(u.x, u.y, u.attack_range, not u.defender):
+            for i in bucket:
+                t = units[i]
+                if t.defender == u.defender or t.hp <= 0:
+                    continue
+                d2 = (t.x - u.x) ** 2 + (t.y - u.y) ** 2
+                if d2 < reach and (best is None or (d2, i) < best):
+                    best = (d2, i)
+        if best is not None:
+            self._attack(u, self.units[best[1]])
+            return
+
+        best_cp, best_dist = None, u.attack_range + STRUCTURE_BUFFER
+        for cp in self.cps:
+            if cp.is_destroyed or cp.type != GATE:
+                continue
+            enemy = cp.owner != u.faction_id if u.defender else cp.owner != 0
+            if not enemy:
+                continue
+            d = math.hypot(cp.x * TILE_SIZE + TILE_SIZE / 2 - u.x, cp.y * TILE_SIZE + TILE_SIZE / 2 - u.y)
+            if d < best_dist:
+                best_cp, best_dist = cp, d
+        if best_cp is not None:
+            self._attack_gate(u, best_cp)
+
+    def _next_step(self, u):
+        """Next tile on the target's distance field, else the simple-direction fallback."""
+        w = self.grid.width
+        n = self.paths.next_steps(u.tx, u.ty)[u.gy * w + u.gx]
+        if n != NO_STEP:
+            return n % w, n // w
+        dx = 1 if u.tx > u.gx else -1 if u.tx < u.gx else 0
+        dy = 0 if dx else 1 if u.ty > u.gy else -1 if u.ty < u.gy else 0
+        return u.gx + dx, u.gy + dy
+
+    def _movement(self, u):
+        """HandleMovement: once at the current tile, step towards the target, attack or wait."""
+        if (u.x - u.vx) ** 2 + (u.y - u.vy) ** 2 > 25.0:
+            return
+        if u.state == CHARGING:
+            u.state = LOOPING
+            dx, dy = u.x - u.vx, u.y - u.vy
+            dist = math.hypot(dx, dy)
+            if dist > 0:
+                u.vx, u.vy = u.x + dx / dist * LOOP_DISTANCE, u.y + dy / dist * LOOP_DISTANCE
+            return
+        if u.state == LOOPING:
+            u.state = IDLE
+            return
+        if u.gx == u.tx and u.gy == u.ty:
+            u.state = IDLE
+            return
+
+        nx, ny = self._next_step(u)
+        wall = next((cp for cp in self.cps if cp.x == nx and cp.y == ny and cp.type == GATE
+                     and not cp.is_destroyed), None)
+        if wall is not None:
+            if wall.owner != u.faction_id:
+                self._attack_gate(u, wall)
+            else:
+                u.state = IDLE
+            return
+
+        blocker = None
+        if self.grid.in_bounds(nx, ny):
+            for i in self.index.on_tile(ny * self.grid.width + nx):
+                t = self.units[i]
+                if t.hp > 0 and t is not u:
+                    blocker = t
+                    break
+        if blocker is not None:
+            if blocker.defender != u.defender:
+                self._attack(u, blocker)
+            else:
+                u.state = IDLE
+        elif self.grid.is_walkable(nx, ny):
+            old_cell = u.gy * self.grid.width + u.gx
+            u.gx, u.gy = nx, ny
+            u.vx, u.vy = BattleGrid.grid_to_world(nx, ny)
+            u.state = MOVING
+            self.index.stepped(u, old_cell)
+
+    def _efficiency(self, u):
+        """GetEfficiencyMultiplier: officer-troop synergy."""
+        efficiency = 1.0
+        if u.troop_type == CAVALRY and u.strength < 60:
+            efficiency = _f32(0.6) + u.strength / _f32(150.0)
+        elif u.troop_type == ARCHER and u.intelligence < 60:
+            efficiency = _f32(0.6) + u.intelligence / _f32(150.0)
+        elif u.troop_type == ELITE and u.leadership < 80:
+            efficiency = _f32(0.5) + u.leadership / _f32(160.0)
+        return min(1.0, efficiency)
+
+    def _attack(self, u, t):
+        """TryAttack(UnitController)."""
+        dist = math.hypot(t.x - u.x, t.y - u.y)
+        if dist > u.attack_range or u.cooldown > 0:
+            return
+        morale = HIGH_MORALE_MULT if u.morale > 70 else LOW_MORALE_MULT if u.morale < 30 else 1.0
+        base = int((u.leadership + u.hp // 200) * morale * self._efficiency(u))
+        if u.troop_type == SIEGE:
+            rps = SIEGE_VS_UNITS
+        else:
+            rps = RPS_BONUS if (u.troop_type, t.troop_type) in RPS_ADVANTAGE else 1.0
+        final = int(base * rps * (MIN_RANGE_PENALTY if dist < u.min_range else 1.0))
+        damage = max(1, final - (t.leadership + t.hp // 400) // 2)
+        was_alive = t.officer_hp > 0
+        self._take_damage(t, damage)
+        if was_alive and t.officer_hp <= 0:
+            self.gold[u.officer_id] += MINION_KILL_GOLD if t.minion else KILL_GOLD
+        u.cooldown = 1.0 / u.attack_speed
+        u.state = COOLDOWN
+
+    def _attack_gate(self, u, cp):
+        """TryAttack(ControlPoint): Leadership / 5 per hit, four times that for siege troops."""
+        dist = math.hypot(cp.x * TILE_SIZE + TILE_SIZE / 2 - u.x, cp.y * TILE_SIZE + TILE_SIZE / 2 - u.y)
+        if dist > u.attack_range + STRUCTURE_BUFFER or u.cooldown > 0:
+            return
+        damage = max(1, u.leadership // 5)
+        if u.troop_type == SIEGE:
+            damage *= 4
+        cp.take_damage(damage)
+        if cp.is_destroyed:
+            self.paths.cps_changed()
+        u.cooldown = 1.0 / u.attack_speed
+        u.state = COOLDOWN
+
+    def _take_damage(self, t, amount):
+        reduction = 1.0 + (t.troop_armor if t.hp > 0 else t.officer_armor) / _f32(50.0)
+        real = int(max(1, amount / reduction))
+        if t.troop_type == SIEGE:
+            real = int(real * SIEGE_WEAKNESS)
+        if t.hp > 0:
+            troop_damage = int(real * TROOP_SHARE)
+            t.hp = max(0, t.hp - troop_damage)
+            if t.hp == 0:
+                self._died(t)
+            t.officer_hp = max(0, t.officer_hp - max(1, real - troop_damage))
+        else:
+            t.officer_hp = max(0, t.officer_hp - real)
+        t.morale = max(0, t.morale - real // 5)
+
+    # --- Result ---
+
+    def result(self):
+        """Outcome plus troops left per officer (summed over their squads; the hero's 1 is not a troop)."""
+        troops = defaultdict(int)
+        for u in self.units:
+            troops[u.officer_id] += 0 if u.is_hero else u.hp
+        return {
+            "attackers_won": self.winner == "attacker",
+            "timed_out": self.winner is None,
+            "seconds": round(self.time, 6),
+            "ticks": self.ticks,
+            "units": len(self.units),
+            "squads": sum(not u.is_hero for u in self.units),
+            "attacker_troops": sum(u.hp for u in self.units if not u.defender and not u.is_hero),
+            "defender_troops": sum(u.hp for u in self.units if u.defender and not u.is_hero),
+            "troops": dict(troops),
+            "gold": dict(self.gold),
+            "gate_health": self.gate.health if self.gate is not None else None,
+            "cp_owners": [cp.owner for cp in self.cps],
+            "field_builds": self.paths.builds,
+        }
@@ -0,0 +1,143 @@
+import os
+import io
+import random
+import sqlite3
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.database.db_manager import DatabaseManager
+from src.simulation.turn_simulator import TurnSimulator
+
+# Parallel self-play: the same starting world simulated for N days under many RNG
+# seeds. A Godot session plays one campaign at a time; balance questions need
+# hundreds. The world is built or read once in the parent and handed to every
+# worker as serialized SQLite bytes. Each campaign deserializes them into its own
+# in-memory database, so workers share nothing and never touch the save. Campaigns
+# are independent, so throughput scales with the number of worker processes.
+# Outcomes come back as plain tuples and are merged into one results database.
+
+RESULT_TABLES = {
+    "campaigns": """CREATE TABLE campaigns (
+        seed INTEGER PRIMARY KEY, days INTEGER, final_day INTEGER, seconds REAL,
+        winner_id INTEGER, winner_cities INTEGER, conquest_day INTEGER, captures INTEGER)""",
+    "captures": """CREATE TABLE captures (
+        seed INTEGER, day INTEGER, city_id INTEGER, old_faction_id INTEGER, new_faction_id INTEGER)""",
+    "treasury": """CREATE TABLE treasury (
+        seed INTEGER, day INTEGER, faction_id INTEGER, gold INTEGER, supplies INTEGER, cities INTEGER,
+        PRIMARY KEY (seed, day, faction_id))""",
+    "factions": "CREATE TABLE factions (faction_id INTEGER PRIMARY KEY, name TEXT)",
+    "cities": "CREATE TABLE cities (city_id INTEGER PRIMARY KEY, name TEXT)",
+}
+
+_world = None       # serialized world of this worker process (set by _init_worker)
+
+
+def serialize_file(db_path):
+    """Serialized bytes of a database file, read through the backup API."""
+    source, copy = sqlite3.connect(db_path), sqlite3.connect(":memory:")
+    try:
+        source.backup(copy)
+        return copy.serialize()
+    finally:
+        source.close()
+        copy.close()
+
+
+def serialize_seeded(builder, **kwargs):
+    """Serialized bytes of a world built in memory by a tools/seed_db.py function."""
+    manager = DatabaseManager("sqlite://")
+    with contextlib.redirect_stdout(io.StringIO()):
+        builder(manager=manager, **kwargs)
+    return manager.engine.raw_connection().driver_connection.serialize()
+
+
+def _init_worker(world):
+    global _world
+    _world = world
+
+
+def _standings(conn):
+    """{faction_id: (gold, supplies, cities)} for every faction."""
+    cities = dict(conn.execute("SELECT faction_id, COUNT(*) FROM cities WHERE faction_id IS NOT NULL GROUP BY faction_id"))
+    return {fid: (gold, supplies, cities.get(fid, 0))
+            for fid, gold, supplies in conn.execute("SELECT faction_id, gold_treasury, supplies FROM factions")}
+
+
+def play(seed, days, curve_every=1, options=None, world=None):
+    """Simulates one campaign. Returns (campaign row, capture rows, treasury rows)."""
+    sim = TurnSimulator.from_bytes(world if world is not None else _world, rng_seed=seed, **(options or {}))
+    treasury = []
+    conquest = [None]
+
+    def after_day(s):
+        standings = _standings(s.conn)
+        day = s.current_day() - 1          # the day that was just played
+        if conquest[0] is None and sum(1 for _, _, cities in standings.values() if cities) == 1:
+            conquest[0] = day
+        if s.days_simulated % curve_every == 0 or s.days_simulated == days:
+            treasury.extend((seed, day, fid, gold, supplies, cities)
+                            for fid, (gold, supplies, cities) in sorted(standings.items()))
+
+    result = sim.run(days, after_day=after_day)
+    standings = _standings(sim.conn)
+    troops = dict(sim.conn.execute("SELECT faction_id, SUM(troops) FROM officers WHERE faction_id IS NOT NULL "
+                                   "GROUP BY faction_id"))
+    # Most cities wins; troops, then the lower faction_id, break ties
+    winner = min(standings, key=lambda fid: (-standings[fid][2], -(troops.get(fid) or 0), fid)) if standings else None
+    campaign = (seed, days, sim.current_day() - 1, result["seconds"], winner,
+                standings[winner][2] if winner is not None else 0, conquest[0], len(sim.captures))
+    captures = [(seed, day, cid, old, new) for day, cid, old, new in sim.captures]
+    sim.conn.close()
+    return campaign, captures, treasury
+
+
+class Tournament:
+    """Plays `seeds` campaigns of `days` days from one world across a process pool."""
+
+    def __init__(self, world, days, workers=None, curve_every=1, options=None):
+        self.world = world
+        self.days = days
+        self.workers = workers or os.cpu_count() or 1
+        self.curve_every = curve_every
+        self.options = options or {}
+
+    def run(self, seeds, progress=None):
+        """[(campaign, captures, treasury)] ordered by seed; `progress(done, total)` after each campaign."""
+        seeds = list(seeds)
+        outcomes = []
+        if self.workers == 1:
+            for seed in seeds:
+                outcomes.append(play(seed, self.days, self.curve_every, self.options, world=self.world))
+                if progress:
+                    progress(len(outcomes), len(seeds))
+        else:
+            with ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.world,)) as pool:
+                futures = [pool.submit(play, seed, self.days, self.curve_every, self.options) for seed in seeds]
+                for future in as_completed(futures):
+                    outcomes.append(future.result())
+                    if progress:
+                        progress(len(outcomes), len(seeds))
+        return sorted(outcomes, key=lambda outcome: outcome[0][0])
+
+    def write(self, path, outcomes):
+        """Writes (replacing) the merged results database; returns its sqlite3 connection."""
+        if os.path.exists(path):
+            os.remove(path)
+        conn = sqlite3.connect(path)
+        for ddl in RESULT_TABLES.values():
+            conn.execute(ddl)
+        world = sqlite3.connect(":memory:")
+        world.deserialize(self.world)
+        conn.executemany("INSERT INTO factions VALUES (?, ?)", world.execute("SELECT faction_id, name FROM factions"))
+        conn.executemany("INSERT INTO cities VALUES (?, ?)", world.execute("SELECT city_id, name FROM cities"))
+        world.close()
+        conn.executemany("INSERT INTO campaigns VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [o[0] for o in outcomes])
+        conn.executemany("INSERT INTO captures VALUES (?, ?, ?, ?, ?)", [row for o in outcomes for row in o[1]])
+        conn.executemany("INSERT INTO treasury VALUES (?, ?, ?, ?, ?, ?)", [row for o in outcomes for row in o[2]])
+        conn.commit()
+        return conn
+
+
+def seed_list(count, base=0):
+    """`count` distinct campaign seeds derived from `base`."""
+    return random.Random(base).sample(range(1 << 30), count)
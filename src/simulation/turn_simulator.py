@@ -0,0 +1,949 @@
+import time
+import random
+import sqlite3
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+from sqlalchemy import select
+
+from src.database.db_manager import DatabaseManager, DB_PATH
+from src.database.migrations import migrate
+from src.database.models import Route
+from src.simulation import game_constants as gc
+from src.simulation.battle_resolver import BattleResolver
+from src.simulation.connectivity import ConnectivityIndex
+from src.simulation.economy import apply_monthly_sql, apply_harvest_sql
+from src.simulation.officer_phase import OfficerPhase, DOMESTIC_TYPES, WORK_MISSIONS, TRAINABLE_STATS
+from src.simulation.route_cache import load_routes
+
+# Headless mirror of the Godot day loop (TurnManager.StartNewDay -> EndDayCycle).
+# Every rule below follows the C# source in romance-of-tree-kingdoms/scripts/logic;
+# the method names point at the C# method they reproduce. The simulator only ever
+# touches an in-memory copy of the database, so soak runs never modify a save.
+
+PHASES = ["faction_ai", "officer_phase", "conflicts", "city_decay", "logistics", "ronin", "end_day"]
+
+
+class TurnSimulator:
+    """Advances the world one day at a time without Godot.
+
+    Player-only paths (council, battle UI, dialogs) are skipped: the player's officer
+    is treated like any other AI officer and every battle is auto-resolved.
+    """
+
+    def __init__(self, manager, rng_seed=None, batch_battles=False, batch_officers=True):
+        self.manager = manager
+        self.rng = random.Random(rng_seed)
+        self.batch_battles = batch_battles  # Resolve all pending battles at once with BattleResolver
+        self.batch_officers = batch_officers  # Officer phase in memory (same rolls, same result) via OfficerPhase
+        self.phase_times = defaultdict(float)
+        self.days_simulated = 0
+        self.captures = []  # (day, city_id, old_faction, new_faction)
+        self.battles = []   # (day, city_id, defender_faction, attacker_faction, attacker_won)
+
+        # One connection for the whole run; a day is one transaction
+        self._raw = manager.engine.raw_connection()
+        self.conn = self._raw.driver_connection
+        # Worlds created from models.py or saved by an older build get the columns and
+        # tables DatabaseMigration.cs adds at game start; current saves cost one SELECT
+        migrate(self.conn)
+        self.officer_phase = OfficerPhase(self.conn, self.rng)
+
+        # Routes never change during play, so adjacency and shortest paths are loaded once
+        self.adjacency = self._load_adjacency()
+        self.routes = load_routes(self.conn, persist=False)  # All-pairs table, or per target on big maps
+        self.connectivity = ConnectivityIndex.load(self.conn)  # Kept in step with every ownership change
+        self._turn_queue = []
+
+    @classmethod
+    def from_file(cls, db_path=DB_PATH, rng_seed=None, profiler=None, **options):
+        """Copies a database file into a private in-memory DB and wraps it.
+        A QueryProfiler records every statement, labelled with the day phase."""
+        manager = DatabaseManager("sqlite://", profiler=profiler)
+        raw = manager.engine.raw_connection()
+        source = sqlite3.connect(db_path)
+        try:
+            source.backup(raw.driver_connection)
+        finally:
+            source.close()
+            raw.close()
+        return cls(manager, rng_seed, **options)
+
+    @classmethod
+    def from_bytes(cls, data, rng_seed=None, profiler=None, **options):
+        """Wraps a private in-memory DB loaded from sqlite3 Connection.serialize() bytes."""
+        manager = DatabaseManager("sqlite://", profiler=profiler)
+        raw = manager.engine.raw_connection()
+        try:
+            raw.driver_connection.deserialize(data)
+        finally:
+            raw.close()
+        return cls(manager, rng_seed, **options)
+
+    # --- Setup ---
+
+    def _load_adjacency(self):
+        adjacency = defaultdict(set)
+        with self.manager.get_session() as session:
+            for start, end in session.execute(select(Route.start_city_id, Route.end_city_id)):
+                adjacency[start].add(end)
+                adjacency[end].add(start)
+        return adjacency
+
+    # --- Helpers ---
+
+    @contextmanager
+    def _phase(self, name):
+        start = time.perf_counter()
+        try:
+            with self.manager.profiler.phase(name) if self.manager.profiler else nullcontext():
+                yield
+        finally:
+            self.phase_times[name] += time.perf_counter() - start
+
+    def _scalar(self, sql, params=()):
+        row = self.conn.execute(sql, params).fetchone()
+        return row[0] if row else None
+
+    def _exec(self, sql, params=()):
+        return self.conn.execute(sql, params)
+
+    def _has_ap(self, officer_id):
+        ap = self._scalar("SELECT current_action_points FROM officers WHERE officer_id = ?", (officer_id,))
+        return ap is not None and ap > 0
+
+    def current_day(self):
+        day = self._scalar("SELECT current_day FROM game_state LIMIT 1")
+        return day if day is not None else 1
+
+    def loop_state(self):
+        """(RNG state, initiative order): everything besides the database the next day depends on."""
+        return self.rng.getstate(), list(self._turn_queue)
+
+    def restore_loop_state(self, rng_state, turn_queue):
+        self.rng.setstate(rng_state)
+        self._turn_queue = list(turn_queue)
+
+    # --- Day Loop ---
+
+    def step_day(self):
+        day = self.current_day()
+
+        with self._phase("faction_ai"):
+            self._start_new_day(day)
+        with self._phase("officer_phase"):
+            if self.batch_officers:
+                self.officer_phase.run()
+            else:
+                self._process_all_officer_turns()
+        with self._phase("conflicts"):
+            self._resolve_conflicts(day)
+
+        # EndDayCycle
+        with self._phase("city_decay"):
+            self._process_city_decay()
+        with self._phase("logistics"):
+            self._process_daily_logistics(day)
+        with self._phase("ronin"):
+            self._process_ronin_turns()
+        with self._phase("end_day"):
+            self._end_day()
+
+        self.conn.commit()
+        self.days_simulated += 1
+
+    def run(self, days, report_every=0, after_day=None):
+        """Simulates `days` days and returns a timing summary.
+
+        `after_day(sim)`, when given, runs after each committed day (e.g. a snapshot).
+        """
+        start = time.perf_counter()
+        for i in range(days):
+            self.step_day()
+            if after_day is not None:
+                after_day(self)
+            if report_every and (i + 1) % report_every == 0:
+                print(f"  Day {self.current_day()}: {i + 1}/{days} simulated")
+        elapsed = time.perf_counter() - start
+        return {
+            "days": days,
+            "seconds": elapsed,
+            "days_per_second": days / elapsed if elapsed > 0 else float("inf"),
+            "phase_seconds": {name: self.phase_times[name] for name in PHASES},
+            "captures": len(self.captures),
+        }
+
+    # --- TurnManager.ContinueStartNewDay ---
+
+    def _start_new_day(self, day):
+        is_new_week = day == 1 or (day - 1) % 7 == 0
+        if is_new_week or not self._turn_queue:
+            self._roll_initiative()
+
+            if is_new_week:
+                fids = [r[0] for r in self._exec("SELECT faction_id FROM factions").fetchall()]
+                if day == 1 or (day - 1) % 28 == 0:
+                    for fid in fids:
+                        self._process_monthly_finances(fid)
+
+                # Stage 1: Preparation (Stage 2 is a stub in FactionAI)
+                for fid in fids:
+                    for (cid,) in self._exec("SELECT city_id FROM cities WHERE faction_id = ?", (fid,)).fetchall():
+                        self._perform_prefect_evaluation(cid)
+                    self._ensure_goals_exist(fid)
+                    self._reposition_officers(fid)
+                    self._perform_stage1_prep(fid)
+
+        for fid in self._turn_queue:
+            self._process_faction_turn(fid)
+
+    def _roll_initiative(self):
+        rows = self._exec("""
+            SELECT f.faction_id, MAX(o.intelligence) as strat, MAX(o.leadership) as lead
+            FROM factions f
+            JOIN officers o ON f.faction_id = o.faction_id
+            GROUP BY f.faction_id""").fetchall()
+        scores = {fid: (strat or 0) + (lead or 0) * 0.5 + self.rng.randint(-10, 9) for fid, strat, lead in rows}
+        self._turn_queue = sorted(scores, key=scores.get, reverse=True)
+
+    # --- FactionAI: weekly preparation ---
+
+    def _process_monthly_finances(self, fid):
+        self._exec("""
+            UPDATE factions
+            SET gold_treasury = gold_treasury + (SELECT SUM(commerce * tax_rate) FROM cities WHERE faction_id = factions.faction_id)
+            WHERE faction_id = ?""", (fid,))
+        self._exec("""
+            UPDATE factions
+            SET gold_treasury = gold_treasury - (SELECT COUNT(*) * 10 FROM officers WHERE faction_id = factions.faction_id)
+            WHERE faction_id = ?""", (fid,))
+
+    def _perform_prefect_evaluation(self, cid):
+        row = self._exec("""
+            SELECT governor_id, commerce, agriculture, technology, security, stability
+            FROM cities WHERE city_id = ? AND governor_id > 0""", (cid,)).fetchone()
+        if row:
+            merit = sum(v or 0 for v in row[1:]) // 100
+            if merit > 0:
+                self._exec("UPDATE officers SET merit_score = merit_score + ? WHERE officer_id = ?", (merit, row[0]))
+
+    def _faction_cities(self, fid):
+        return self._exec("""
+            SELECT city_id, is_hq, governor_id, technology, commerce, agriculture, public_order, max_stats
+            FROM cities WHERE faction_id = ?""", (fid,)).fetchall()
+
+    def _reposition_officers(self, fid):
+        cities = self._faction_cities(fid)
+        if not cities:
+            return
+        owner = dict(self._exec("SELECT city_id, faction_id FROM cities").fetchall())
+        frontline = [c for c in cities if any(owner.get(n) != fid for n in self.adjacency[c[0]])]
+        safe = [c for c in cities if c not in frontline]
+
+        officers = self._exec("""
+            SELECT officer_id, strength, politics, intelligence, leadership, is_commander
+            FROM officers WHERE faction_id = ? AND is_player = 0 ORDER BY officer_id""", (fid,)).fetchall()
+
+        assignments = {}
+        remaining = list(officers)
+        # Step A: Governors stay at their post
+        for city in cities:
+            gov_id = city[2] or 0
+            if gov_id > 0:
+                gov = next((o for o in remaining if o[0] == gov_id), None)
+                if gov:
+                    assignments[gov[0]] = city[0]
+                    remaining.remove(gov)
+        # Step A2: Faction leader stays at HQ
+        leader = next((o for o in remaining if o[5]), None)
+        if leader:
+            hq = next((c for c in cities if c[1]), cities[0])
+            assignments[leader[0]] = hq[0]
+            remaining.remove(leader)
+
+        if not frontline:
+            frontline = cities
+        # Step B: Warriors (str + lead >= pol + int) to the frontline, strongest first
+        warriors = sorted((o for o in remaining if (o[1] or 0) + (o[4] or 0) >= (o[2] or 0) + (o[3] or 0)),
+                          key=lambda o: o[1], reverse=True)
+        for i, w in enumerate(warriors):
+            assignments[w[0]] = frontline[i % len(frontline)][0]
+            remaining.remove(w)
+        # Step C: Everyone else to safe cities
+        targets = safe or cities
+        for i, o in enumerate(remaining):
+            assignments[o[0]] = targets[i % len(targets)][0]
+
+        self.conn.executemany("UPDATE officers SET location_id = ? WHERE officer_id = ?",
+                              [(loc, oid) for oid, loc in assignments.items()])
+
+    def _perform_stage1_prep(self, fid):
+        for city in self._faction_cities(fid):
+            officers = self._exec("""
+                SELECT officer_id, strength, leadership, politics, intelligence
+                FROM officers WHERE location_id = ? AND faction_id = ? ORDER BY officer_id""", (city[0], fid)).fetchall()
+            for oid, strength, leadership, politics, intelligence in officers:
+                if strength + leadership >= politics + intelligence:
+                    mission = "Conscription" if self.rng.random() > 0.5 else "Training"
+                else:
+                    mission = self._best_domestic_mission(city)
+                self._exec("UPDATE officers SET current_mission = ?, current_assignment = ? WHERE officer_id = ?",
+                           (mission, mission, oid))
+        # OutfitOfficersIfPossible is not simulated (troop tiers are cosmetic for auto-resolve)
+
+    @staticmethod
+    def _best_domestic_mission(city):
+        _, _, _, tech, commerce, agriculture, order, max_stats = city
+        if order < int((max_stats or 1000) * 0.7):
+            return "Order"
+        if agriculture < commerce and agriculture < tech:
+            return "Farming"
+        if commerce < tech:
+            return "Commerce"
+        return "Science"
+
+    # --- FactionAI: goals ---
+
+    def _get_faction_leader(self, fid):
+        return self._exec("""
+            SELECT officer_id, intelligence, strength, politics, leadership, current_action_points
+            FROM officers WHERE faction_id = ? AND is_commander = 1 LIMIT 1""", (fid,)).fetchone()
+
+    def _ensure_goals_exist(self, fid):
+        row = self._exec("SELECT monthly_goal, weekly_task FROM factions WHERE faction_id = ?", (fid,)).fetchone()
+        if row:
+            if row[0] is None:
+                self._update_monthly_goal(fid)
+            if row[1] is None:
+                self._update_weekly_task(fid)
+
+    def _update_monthly_goal(self, fid):
+        leader = self._get_faction_leader(fid)
+        if leader is None:
+            return
+        _, intelligence, strength, politics, leadership, _ = (v if v is not None else 50 for v in leader)
+        if strength > 65 or leadership > 65:
+            goal = "Conquest"
+        elif politics > 70 or intelligence > 70:
+            goal = "Prosper"
+        else:
+            goal = "Stability"
+        self._exec("UPDATE factions SET monthly_goal = ? WHERE faction_id = ?", (goal, fid))
+
+    def _update_weekly_task(self, fid):
+        goal = self._scalar("SELECT monthly_goal FROM factions WHERE faction_id = ?", (fid,)) or "Prosper"
+        target_id = 0
+        if goal == "Conquest":
+            target_id = self._find_expansion_target(fid)
+            task = "CaptureCity" if target_id > 0 else "Recruit"
+        elif goal == "Prosper":
+            task = "RecruitOfficer" if len(self._get_idle_officers(fid)) < 5 else self._next_domestic_task(fid)
+        else:
+            task = "RecruitOfficer" if self.rng.random() > 0.6 else "Fortify"
+        self._exec("UPDATE factions SET weekly_task = ?, goal_target_id = ? WHERE faction_id = ?", (task, target_id, fid))
+
+    def _find_expansion_target(self, fid):
+        owner = dict(self._exec("SELECT city_id, faction_id FROM cities").fetchall())
+        mine = {cid for cid, f in owner.items() if f == fid}
+        neighbours = {n for cid in mine for n in self.adjacency[cid] if n not in mine}
+        if not neighbours:
+            return 0
+        counts = dict(self._exec("SELECT location_id, COUNT(*) FROM officers GROUP BY location_id").fetchall())
+        # Neutral first, then the weakest garrison (ties keep SQLite's city_id order)
+        return min(sorted(neighbours), key=lambda cid: (owner.get(cid) is not None, counts.get(cid, 0)))
+
+    def _get_idle_officers(self, fid):
+        # Governors (except leaders) are never idle
+        return self._exec("""
+            SELECT o.officer_id, o.location_id, o.current_action_points, o.strength, o.is_commander
+            FROM officers o
+            LEFT JOIN cities c ON o.officer_id = c.governor_id
+            WHERE o.faction_id = ?
+            AND o.current_action_points > 0
+            AND (c.governor_id IS NULL OR o.is_commander = 1)
+            ORDER BY o.officer_id""", (fid,)).fetchall()
+
+    def _next_domestic_task(self, fid):
+        cid = self._scalar("SELECT city_id FROM cities WHERE faction_id = ? AND is_hq = 1 LIMIT 1", (fid,))
+        if cid is None:
+            cid = self._scalar("SELECT city_id FROM cities WHERE faction_id = ? LIMIT 1", (fid,))
+        if cid is None:
+            return "DevelopEconomy"
+        commerce, agriculture, technology, security, stability, order, max_stats = self._exec("""
+            SELECT commerce, agriculture, technology, security, stability, public_order, max_stats
+            FROM cities WHERE city_id = ?""", (cid,)).fetchone()
+        if order < 60:
+            return "Fortify"
+        if security < 50:
+            return "Secure"
+        if stability < 50:
+            return "Stabilize"
+        for tier in (250, 500, 750, max_stats or 1000):
+            if commerce < tier:
+                return "DevelopEconomy"
+            if agriculture < tier:
+                return "Cultivate"
+            if technology < tier:
+                return "Research"
+        return "Recruit"
+
+    def _city_defense_strength(self, cid):
+        troops = self._scalar("SELECT SUM(troops) FROM officers WHERE location_id = ?", (cid,)) or 0
+        if troops == 0 and self._scalar("SELECT faction_id FROM cities WHERE city_id = ?", (cid,)) is None:
+            return 1500  # Default militia for neutral towns
+        return troops + 500
+
+    # --- FactionAI.ProcessTurn ---
+
+    def _process_faction_turn(self, fid):
+        self._ensure_goals_exist(fid)
+        self._assign_officer_tasks(fid)
+
+        officers = self._exec("""
+            SELECT officer_id, location_id, current_action_points, current_assignment, assignment_target_id
+            FROM officers WHERE faction_id = ? AND current_assignment IS NOT NULL AND current_action_points > 0
+            ORDER BY officer_id""",
+            (fid,)).fetchall()
+        leader = self._get_faction_leader(fid)
+        if leader:
+            officers.sort(key=lambda o: o[0] != leader[0])  # Leader acts first
+        for officer in officers:
+            self._execute_assignment(*officer)
+
+    def _assign_officer_tasks(self, fid):
+        leader = self._get_faction_leader(fid)
+        if leader is None or (leader[5] or 0) <= 0:
+            return
+        leader_id, leader_ap = leader[0], leader[5]
+
+        weekly_task, target_id = self._exec(
+            "SELECT weekly_task, goal_target_id FROM factions WHERE faction_id = ?", (fid,)).fetchone()
+        weekly_task = weekly_task or "DevelopEconomy"
+        target_id = target_id or 0
+
+        candidates = sorted(self._get_idle_officers(fid), key=lambda o: (bool(o[4]), -(o[3] or 0)))
+        leader_is_candidate = any(o[0] == leader_id for o in candidates)
+        for off in candidates:
+            if leader_ap <= 0:
+                break
+            task = weekly_task
+            if weekly_task == "CaptureCity":
+                needed = int(self._city_defense_strength(target_id) * 1.3)  # Aim for 30% superiority
+                assigned = self._scalar("""
+                    SELECT SUM(troops) FROM officers
+                    WHERE (current_assignment = 'CaptureCity' OR current_assignment = 'SupportAttack')
+                    AND assignment_target_id = ?""", (target_id,)) or 0
+                if assigned >= needed and assigned > 0:
+                    task = "DevelopEconomy"
+                elif self._scalar("SELECT COUNT(*) FROM officers WHERE current_assignment = 'CaptureCity' AND assignment_target_id = ?",
+                                  (target_id,)) == 0:
+                    task = "CaptureCity"
+                else:
+                    task = "SupportAttack"
+
+            self._exec("UPDATE officers SET current_assignment = ?, assignment_target_id = ? WHERE officer_id = ?",
+                       (task, target_id, off[0]))
+            # Leader pays 1 AP per order issued to others
+            if off[0] != leader_id:
+                self._exec("UPDATE officers SET current_action_points = current_action_points - 1 WHERE officer_id = ?", (leader_id,))
+                leader_ap -= 1
+            if leader_is_candidate and leader_ap <= 1:
+                break
+
+    def _execute_assignment(self, oid, location_id, ap, assignment, target_id):
+        if ap <= 0:
+            return
+        if assignment in ("CaptureCity", "SupportAttack"):
+            if target_id in self.adjacency[location_id]:
+                if assignment == "CaptureCity":
+                    self._declare_attack(oid, target_id)
+                else:
+                    self._perform_rest(oid)  # Wait for the leader to declare
+            else:
+                next_hop = self._find_next_hop(location_id, target_id)
+                if next_hop > 0:
+                    self._perform_move(oid, next_hop)
+                else:
+                    self._perform_rest(oid)
+        elif assignment in ("Fortify", "Cultivate", "Secure", "Stabilize", "Order", "Farming", "Commerce", "Science"):
+            pass  # Domestic work is done in the officer phase
+        elif assignment == "RecruitOfficer":
+            ronin_id = self._scalar("SELECT officer_id FROM officers WHERE location_id = ? AND faction_id IS NULL LIMIT 1", (location_id,))
+            if ronin_id:
+                if self._faction_gold_of(oid) < 100:
+                    self._perform_social_talk(oid, ronin_id)
+                else:
+                    self._perform_recruit(oid, ronin_id)
+            else:
+                self._perform_rest(oid)
+        elif assignment == "Recruit":
+            if self._faction_gold_of(oid) < 200:
+                self._perform_domestic_action(oid, location_id, "Commerce")
+            else:
+                self._perform_recruit_troops(oid)
+        else:
+            if self.rng.random() > 0.7:
+                options = [r[0] for r in self._exec(
+                    "SELECT officer_id FROM officers WHERE location_id = ? AND officer_id != ? ORDER BY officer_id LIMIT 5", (location_id, oid))]
+                if options:
+                    self._perform_social_talk(oid, self.rng.choice(options))
+                else:
+                    self._perform_domestic_action(oid, location_id, "PublicOrder")
+            else:
+                self._perform_domestic_action(oid, location_id, "PublicOrder")
+
+    def _faction_gold_of(self, oid):
+        gold = self._scalar("""
+            SELECT f.gold_treasury FROM factions f JOIN officers o ON f.faction_id = o.faction_id
+            WHERE o.officer_id = ?""", (oid,))
+        return gold or 0
+
+    def _find_next_hop(self, start, target):
+        """First hop toward target (FactionAI.FindNextHopToward), weighted by route distance."""
+        return self.routes.next_hop(start, target)
+
+    # --- ActionManager actions ---
+
+    def _declare_attack(self, oid, city_id):
+        if not self._has_ap(oid):
+            return False
+        fid, troops, max_troops, location_id = self._exec(
+            "SELECT faction_id, troops, max_troops, location_id FROM officers WHERE officer_id = ?", (oid,)).fetchone()
+        fid, troops, max_troops = fid or 0, troops or 0, max_troops or 0
+        if fid <= 0:
+            return False
+        if troops < min(150, int(max_troops * 0.15)):
+            return False
+        if self._scalar("SELECT COUNT(*) FROM pending_battles WHERE attacker_faction_id = ?", (fid,)) > 0:
+            return False
+        if city_id not in self.adjacency[location_id]:
+            return False
+        if self._scalar("SELECT COUNT(*) FROM pending_battles WHERE location_id = ? AND source_location_id = ?",
+                        (location_id, city_id)) > 0:
+            return False  # Target is already marching on us; we must defend
+        if (self._scalar("SELECT faction_id FROM cities WHERE city_id = ?", (city_id,)) or 0) == fid:
+            return False
+        if self._scalar("SELECT COUNT(*) FROM pending_battles WHERE location_id = ?", (city_id,)) > 0:
+            return False  # The game's INSERT fails on the location_id PK here
+
+        self._exec("UPDATE officers SET current_action_points = current_action_points - 1, reputation = reputation + 15 WHERE officer_id = ?", (oid,))
+        self._exec("INSERT INTO pending_battles (location_id, attacker_faction_id, source_location_id, leader_id) VALUES (?, ?, ?, ?)",
+                   (city_id, fid, location_id, oid))
+        self._update_city_faction_opinion(city_id, fid, -5)
+        return True
+
+    def _perform_move(self, oid, target_city_id):
+        if not self._has_ap(oid):
+            return
+        troops, tier, fid, gold, location_id = self._exec(
+            "SELECT troops, troop_tier, faction_id, gold, location_id FROM officers WHERE officer_id = ?", (oid,)).fetchone()
+        if location_id == target_city_id or target_city_id not in self.adjacency[location_id]:
+            return
+        fee = int(((troops or 0) / 10) * (tier or 1))
+        if fid:
+            self._exec("UPDATE factions SET gold_treasury = gold_treasury - ? WHERE faction_id = ?", (fee, fid))
+        elif (gold or 0) < fee:
+            return
+        else:
+            self._exec("UPDATE officers SET gold = gold - ? WHERE officer_id = ?", (fee, oid))
+        self._exec("UPDATE officers SET location_id = ?, current_action_points = current_action_points - 1 WHERE officer_id = ?",
+                   (target_city_id, oid))
+
+    def _perform_rest(self, oid):
+        if not self._has_ap(oid):
+            return
+        current, max_troops = self._exec("SELECT troops, max_troops FROM officers WHERE officer_id = ?", (oid,)).fetchone()
+        current, max_troops = current or 0, max_troops or 0
+        if current >= max_troops:
+            return
+        heal = int(max_troops * 0.3) + self.rng.randint(10, 49)
+        self._exec("UPDATE officers SET troops = ?, current_action_points = current_action_points - 1 WHERE officer_id = ?",
+                   (min(max_troops, current + heal), oid))
+
+    def _perform_social_talk(self, oid, target_id):
+        if oid == target_id or not self._has_ap(oid):
+            return
+        charisma = self._scalar("SELECT charisma FROM officers WHERE officer_id = ?", (oid,))
+        self._modify_relation(oid, target_id, 5 + (charisma if charisma is not None else 50) // 20)
+        self._exec("UPDATE officers SET current_action_points = current_action_points - 1, reputation = reputation + 2 WHERE officer_id = ?", (oid,))
+
+    def _perform_recruit(self, oid, target_id):
+        if not self._has_ap(oid):
+            return
+        fid, rep = self._exec("SELECT faction_id, reputation FROM officers WHERE officer_id = ?", (oid,)).fetchone()
+        score = self._get_relation(oid, target_id) + self._get_faction_relation(target_id, fid or 0) + (rep or 0)
+        self._exec("UPDATE officers SET current_action_points = current_action_points - 1 WHERE officer_id = ?", (oid,))
+        if score + self.rng.randint(0, 39) >= 80:
+            self._exec("UPDATE officers SET faction_id = ?, rank = ?, max_troops = ?, troops = troops + ? WHERE officer_id = ?",
+                       (fid, gc.RANK_REGULAR, gc.TROOPS_REGULAR, gc.TROOPS_REGULAR - gc.TROOPS_VOLUNTEER, target_id))
+            self._exec("UPDATE officers SET reputation = reputation + 10 WHERE officer_id = ?", (oid,))
+
+    def _perform_recruit_troops(self, oid):
+        if not self._has_ap(oid):
+            return
+        location_id, fid = self._exec("SELECT location_id, faction_id FROM officers WHERE officer_id = ?", (oid,)).fetchone()
+        # Conscription: fill to max troops for 500 gold and -15 public order (unit tier choice is not simulated)
+        self._exec("UPDATE officers SET troops = max_troops, current_action_points = current_action_points - 1, reputation = reputation + 5 WHERE officer_id = ?", (oid,))
+        if fid:
+            self._exec("UPDATE factions SET gold_treasury = gold_treasury - 500 WHERE faction_id = ?", (fid,))
+        self._exec("UPDATE cities SET public_order = MAX(0, public_order - 15) WHERE city_id = ?", (location_id,))
+
+    def _perform_domestic_action(self, oid, city_id, kind):
+        if not self._has_ap(oid):
+            return
+        stat_col, target_col, skill_col = DOMESTIC_TYPES[kind]
+        stat, skill, attitude, fid, gold = self._exec(
+            f"SELECT {stat_col}, {skill_col}, public_attitude, faction_id, gold FROM officers WHERE officer_id = ?", (oid,)).fetchone()
+        fid = fid or 0
+
+        row = self._exec("""
+            SELECT c.governor_id, c.faction_id, f.leader_id, f.gold_treasury
+            FROM cities c LEFT JOIN factions f ON c.faction_id = f.faction_id
+            WHERE c.city_id = ?""", (city_id,)).fetchone()
+        gov_id, city_fid, leader_id, treasury = (v or 0 for v in row) if row else (0, 0, 0, 0)
+
+        # Governors and the ruler spend treasury gold; everyone else pays personally
+        is_assigned = oid in (gov_id, leader_id) and fid == city_fid
+        cost = 100
+        if (treasury if is_assigned else (gold or 0)) < cost:
+            return
+
+        current, max_stats = self._exec(f"SELECT {target_col}, max_stats FROM cities WHERE city_id = ?", (city_id,)).fetchone()
+        cap = 100 if kind == "PublicOrder" else (max_stats or 1000)
+        if current >= cap:
+            return
+
+        # Linking bonus compares current_mission with the DomesticType name, like the game
+        linking = self._scalar("SELECT COUNT(*) FROM officers WHERE location_id = ? AND current_mission = ? AND officer_id != ?",
+                               (city_id, kind, oid))
+        gain = int(stat * 0.5) + int((skill or 0) * 0.2) + int((attitude or 0) * 0.1) + linking * 5 + self.rng.randint(5, 15)
+        merit = 20 if gain > int(stat * 0.6) else 10
+        rep = 10 + gain // 10
+        stat_update = f", {stat_col} = {stat_col} + 1" if self.rng.randint(1, 10) == 1 else ""
+        pay = "" if is_assigned else f", gold = gold - {cost}"
+
+        self._exec(f"UPDATE cities SET {target_col} = MIN(?, {target_col} + ?) WHERE city_id = ?", (cap, gain, city_id))
+        self._exec(f"""
+            UPDATE officers
+            SET current_action_points = current_action_points - 1,
+                reputation = reputation + ?,
+                merit_score = merit_score + ?,
+                days_service = days_service + 1
+                {pay}{stat_update},
+                {skill_col} = {skill_col} + 1
+            WHERE officer_id = ?""", (rep, merit, oid))
+        if is_assigned:
+            self._exec("UPDATE factions SET gold_treasury = gold_treasury - ? WHERE faction_id = ?", (cost, city_fid))
+        if fid > 0:
+            self._update_city_faction_opinion(city_id, fid, 1)
+        self._check_promotions(oid)
+
+    def _check_promotions(self, oid):
+        row = self._exec("SELECT rank, reputation, max_troops FROM officers WHERE officer_id = ?", (oid,)).fetchone()
+        if row is None:
+            return
+        rank, rep, max_troops = row
+        rep, max_troops = rep or 0, max_troops or 0
+        level = gc.get_level_by_rank_name(rank)
+        target = gc.get_promotion_level(level, rep)
+        if target > level:
+            new_max = gc.get_max_troops_by_level(target)
+            self._exec("""
+                UPDATE officers SET rank = ?, max_troops = ?, troops = MIN(?, troops + ?),
+                    last_promotion_day = (SELECT current_day FROM game_state)
+                WHERE officer_id = ?""", (gc.get_rank_title(target), new_max, new_max, new_max - max_troops, oid))
+
+    # --- RelationshipManager ---
+
+    def _get_relation(self, a, b):
+        value = self._scalar("SELECT value FROM officer_relations WHERE officer_1_id = ? AND officer_2_id = ?", (min(a, b), max(a, b)))
+        return value or 0
+
+    def _get_faction_relation(self, oid, fid):
+        value = self._scalar("SELECT value FROM officer_faction_relations WHERE officer_id = ? AND faction_id = ?", (oid, fid))
+        return value or 0
+
+    def _modify_relation(self, a, b, delta):
+        if a == b:
+            return
+        self._exec("""
+            INSERT INTO officer_relations (officer_1_id, officer_2_id, value) VALUES (?, ?, MAX(-100, MIN(100, ?)))
+            ON CONFLICT(officer_1_id, officer_2_id) DO UPDATE SET value = MAX(-100, MIN(100, value + ?))""",
+            (min(a, b), max(a, b), delta, delta))
+
+    def _update_city_faction_opinion(self, city_id, fid, delta):
+        self._exec("""
+            INSERT INTO officer_faction_relations (officer_id, faction_id, value)
+            SELECT officer_id, ?, MAX(-100, MIN(100, ?)) FROM officers WHERE location_id = ?
+            ON CONFLICT(officer_id, faction_id) DO UPDATE SET value = MAX(-100, MIN(100, value + ?))""",
+            (fid, delta, city_id, delta))
+
+    # --- ActionManager.ProcessAllOfficerTurns ---
+
+    def _process_all_officer_turns(self):
+        """Per-officer reference path (batch_officers=False); OfficerPhase does the same in one flush."""
+        officers = self._exec("""
+            SELECT officer_id, location_id, current_mission, current_action_points, satisfaction
+            FROM officers WHERE is_player = 0 ORDER BY officer_id""").fetchall()
+        by_city = defaultdict(list)
+        for oid, loc, *_ in self._exec("SELECT officer_id, location_id FROM officers ORDER BY officer_id"):
+            by_city[loc].append(oid)
+
+        for oid, loc, mission, ap, satisfaction in officers:
+            ap = ap or 0
+            # 1. Work duty (if assigned and satisfied)
+            if mission and (satisfaction if satisfaction is not None else 100) > 30 and ap > 0:
+                kind = WORK_MISSIONS.get(mission)
+                if kind:
+                    self._perform_domestic_action(oid, loc, kind)
+                ap -= 1
+            # 2. Remaining AP on personal actions
+            while ap > 0:
+                roll = self.rng.random()
+                if roll < 0.5:
+                    others = by_city[loc]
+                    if len(others) > 1:
+                        target = oid
+                        while target == oid:
+                            target = self.rng.choice(others)
+                        self._modify_relation(oid, target, 10)
+                elif roll < 0.8:
+                    stat = self.rng.choice(TRAINABLE_STATS)
+                    self._exec(f"UPDATE officers SET {stat} = {stat} + 1 WHERE officer_id = ?", (oid,))
+                ap -= 1
+                self._exec("UPDATE officers SET current_action_points = ? WHERE officer_id = ?", (ap, oid))
+
+    # --- TurnManager.ResolveNextConflict / BattleManager.SimulateBattle ---
+
+    def _resolve_conflicts(self, day):
+        if self.batch_battles:
+            self._resolve_conflicts_batch(day)
+            return
+        for city_id, attacker_fid, source_id in self._exec(
+                "SELECT location_id, attacker_faction_id, source_location_id FROM pending_battles").fetchall():
+            self._simulate_battle(day, city_id, attacker_fid or 0, source_id or 0)
+            self._exec("DELETE FROM pending_battles WHERE location_id = ?", (city_id,))
+
+    def _resolve_conflicts_batch(self, day):
+        """All pending battles in one BattleResolver pass, then the per-capture follow-ups."""
+        resolver = BattleResolver(self.conn, self.adjacency, rng_seed=self.rng.getrandbits(32)).load()
+        if not resolver.battles:
+            return
+        results = resolver.apply(day=day)
+        for i, (city_id, defender_fid, attacker_fid, won) in enumerate(results):
+            self.battles.append((day, city_id, defender_fid, attacker_fid, bool(won)))
+            if not won:
+                continue
+            self.connectivity.set_owner(city_id, attacker_fid if attacker_fid > 0 else None)
+            if defender_fid > 0:
+                self._update_city_faction_opinion(city_id, defender_fid, -15)
+            # Same row layout _apply_post_battle_movement expects from _battle_sides
+            winners = [(o[0], o[1], o[3], o[4], o[5], o[8]) for o in resolver.attackers[i]]
+            self._apply_post_battle_movement(attacker_fid, resolver.battles[i][2], city_id, winners)
+            self._handle_post_battle_consequences(defender_fid, city_id)
+            self.captures.append((day, city_id, defender_fid, attacker_fid))
+
+    def _battle_sides(self, city_id, attacker_fid, source_id):
+        defender_fid = self._scalar("SELECT faction_id FROM cities WHERE city_id = ?", (city_id,)) or 0
+        cols = "officer_id, faction_id, strength, troops, rank, politics"
+        present = self._exec(f"SELECT {cols} FROM officers WHERE location_id = ?", (city_id,)).fetchall()
+        if source_id > 0:
+            present += self._exec(f"SELECT {cols} FROM officers WHERE location_id = ?", (source_id,)).fetchall()
+        seen = {o[0] for o in present}
+        if attacker_fid > 0:
+            neighbours = list(self.adjacency[city_id] - {city_id})
+            if neighbours:
+                marks = ",".join("?" * len(neighbours))
+                for o in self._exec(f"SELECT {cols} FROM officers WHERE faction_id = ? AND location_id IN ({marks})",
+                                    (attacker_fid, *neighbours)).fetchall():
+                    if o[0] not in seen:
+                        seen.add(o[0])
+                        present.append(o)
+
+        # Ronin/third-party joins (5% roll + relation > 70) and neutral militia never
+        # reach either side in DetermineSides for AI battles, so they are left out.
+        attackers = [o for o in present if attacker_fid > 0 and o[1] == attacker_fid and (o[3] or 0) > 0]
+        defenders = [o for o in present if defender_fid > 0 and o[1] == defender_fid and (o[3] or 0) > 0]
+        return defender_fid, attackers, defenders
+
+    def _simulate_battle(self, day, city_id, attacker_fid, source_id):
+        defender_fid, attackers, defenders = self._battle_sides(city_id, attacker_fid, source_id)
+        if attacker_fid == defender_fid and attacker_fid > 0:
+            return
+
+        att_str = sum(o[2] + (o[3] or 0) // 100 for o in attackers)
+        def_str = sum(o[2] + (o[3] or 0) // 100 for o in defenders) + 20
+        if not defenders and defender_fid == 0:
+            def_str = 40  # Neutral town militia
+
+        attacker_wins = att_str + self.rng.randint(-20, 19) > def_str
+        self.battles.append((day, city_id, defender_fid, attacker_fid, attacker_wins))
+        winner_loss = 0.1 + self.rng.random() * 0.2
+        loser_loss = 0.7 + self.rng.random() * 0.2
+
+        for side, won in ((attackers, attacker_wins), (defenders, not attacker_wins)):
+            keep = 1.0 - (winner_loss if won else loser_loss)
+            for o in side:
+                self._exec("UPDATE officers SET troops = ?, reputation = reputation + ? WHERE officer_id = ?",
+                           (int((o[3] or 0) * keep), 50 if won else 5, o[0]))
+                self._check_promotions(o[0])
+
+        if attacker_wins:
+            self._exec("UPDATE cities SET faction_id = ?, is_hq = 0 WHERE city_id = ?",
+                       (attacker_fid if attacker_fid > 0 else None, city_id))
+            self.connectivity.set_owner(city_id, attacker_fid if attacker_fid > 0 else None)
+            if defender_fid > 0:
+                self._update_city_faction_opinion(city_id, defender_fid, -15)
+            self._apply_post_battle_movement(attacker_fid, source_id, city_id, attackers)
+            self._handle_post_battle_consequences(defender_fid, city_id)
+            self.captures.append((day, city_id, defender_fid, attacker_fid))
+
+    def _apply_post_battle_movement(self, winner_fid, source_id, target_id, winners):
+        if winner_fid <= 0:
+            return
+        source_gov = self._scalar("SELECT governor_id FROM cities WHERE city_id = ?", (source_id,))
+        source_gov = source_gov if source_gov is not None else -1
+        leader_id = self._scalar("SELECT leader_id FROM factions WHERE faction_id = ?", (winner_fid,))
+        leader_id = leader_id if leader_id is not None else -1
+        hq_id = self._scalar("SELECT city_id FROM cities WHERE faction_id = ? AND is_hq = 1 LIMIT 1", (winner_fid,))
+        if hq_id is None:
+            hq_id = source_id
+
+        # New governor: highest rank, then politics, avoiding the faction leader
+        ranked = sorted(winners, key=lambda o: (gc.get_level_by_rank_name(o[4]), o[5] or 0), reverse=True)
+        new_gov = next((o[0] for o in ranked if o[0] != leader_id), leader_id if ranked else -1)
+        if new_gov != -1:
+            self._exec("UPDATE cities SET governor_id = ? WHERE city_id = ?", (new_gov, target_id))
+
+        for o in winners:
+            oid = o[0]
+            if oid == new_gov:
+                self._exec("UPDATE officers SET location_id = ?, current_assignment = NULL, assignment_target_id = 0 WHERE officer_id = ?", (target_id, oid))
+            elif oid == source_gov:
+                self._exec("UPDATE officers SET location_id = ?, current_assignment = NULL, assignment_target_id = 0 WHERE officer_id = ?", (source_id, oid))
+            elif oid == leader_id:
+                self._exec("UPDATE officers SET location_id = ? WHERE officer_id = ?", (hq_id, oid))
+            else:
+                self._exec("UPDATE officers SET location_id = ? WHERE officer_id = ?", (target_id, oid))
+
+    def _handle_post_battle_consequences(self, defeated_fid, lost_city_id):
+        if defeated_fid <= 0:
+            return
+        retreat_id = self._scalar("SELECT city_id FROM cities WHERE faction_id = ? LIMIT 1", (defeated_fid,))
+        if retreat_id is not None:
+            self._exec("UPDATE officers SET location_id = ? WHERE location_id = ? AND faction_id = ?",
+                       (retreat_id, lost_city_id, defeated_fid))
+        else:
+            # Faction eliminated: officers become ronin
+            self._exec("UPDATE officers SET faction_id = NULL, rank = 'Free' WHERE faction_id = ?", (defeated_fid,))
+            self._exec("DELETE FROM faction_relations WHERE source_faction_id = ? OR target_faction_id = ?", (defeated_fid, defeated_fid))
+            self._exec("DELETE FROM officer_faction_relations WHERE faction_id = ?", (defeated_fid,))
+            self._exec("DELETE FROM pending_battles WHERE attacker_faction_id = ?", (defeated_fid,))
+            self._exec("DELETE FROM factions WHERE faction_id = ?", (defeated_fid,))
+            self._turn_queue = [fid for fid in self._turn_queue if fid != defeated_fid]
+
+    # --- TurnManager.ProcessCityDecay ---
+
+    def _process_city_decay(self):
+        cities = self._exec("SELECT city_id, faction_id, decay_turns FROM cities WHERE faction_id > 0").fetchall()
+        occupied = set(self._exec("SELECT DISTINCT location_id, faction_id FROM officers WHERE faction_id > 0").fetchall())
+        for cid, fid, turns in cities:
+            turns = turns or 0
+            if (cid, fid) in occupied:
+                if turns > 0:
+                    self._exec("UPDATE cities SET decay_turns = 0 WHERE city_id = ?", (cid,))
+            elif turns + 1 >= 3:
+                self._exec("UPDATE cities SET faction_id = NULL, decay_turns = 0 WHERE city_id = ?", (cid,))
+                self.connectivity.set_owner(cid, None, is_hq=cid in self.connectivity.hq_flags)  # is_hq is left as is
+            else:
+                self._exec("UPDATE cities SET decay_turns = ? WHERE city_id = ?", (turns + 1, cid))
+
+    # --- TurnManager.ProcessDailyLogistics ---
+
+    def _process_daily_logistics(self, day):
+        if day % 7 == 0:
+            self._process_weekly_merit_review()
+        if day % 30 == 0:
+            self._process_monthly_economics()
+        if day % 90 == 0:
+            self._process_quarterly_harvest()
+
+    def _process_weekly_merit_review(self):
+        rows = self._exec("SELECT officer_id FROM officers WHERE merit_score > 0 ORDER BY merit_score DESC").fetchall()
+        for i, (oid,) in enumerate(rows):
+            gold, rep = (500, 50) if i == 0 else (100, 20)  # Only the world's top contributor gets the big prize
+            self._exec("UPDATE officers SET gold = gold + ?, reputation = reputation + ? WHERE officer_id = ?", (gold, rep, oid))
+        self._exec("UPDATE officers SET merit_score = 0")
+
+    def _process_monthly_economics(self):
+        # 1 + 2. Taxes (commerce * public_order / 100, nothing below PO 20) minus rank salaries.
+        # The game's statements: EconomyEngine is slower end to end (tools/bench_economy.py)
+        apply_monthly_sql(self.conn)
+        # 3. Bankruptcy hurts satisfaction
+        self._exec("""
+            UPDATE officers
+            SET satisfaction = satisfaction - 20
+            WHERE faction_id IN (SELECT faction_id FROM factions WHERE gold_treasury < 0)""")
+        # 4. Auto-draft: (draft_population / 50) * (public_order / 100)
+        # COALESCE keeps troops at their old value where the game's subquery yields NULL (PO < 20)
+        self._exec("""
+            UPDATE officers SET troops = COALESCE(MIN(max_troops, troops + (
+                SELECT (c.draft_population / 50) * (c.public_order / 100.0)
+                FROM cities c
+                WHERE c.city_id = officers.location_id
+                AND c.public_order >= 20
+            )), troops)
+            WHERE faction_id > 0 AND troops < max_troops""")
+
+    def _process_quarterly_harvest(self):
+        apply_harvest_sql(self.conn)
+
+    # --- FactionAI.ProcessRoninTurns ---
+
+    def _process_ronin_turns(self):
+        candidates = self._exec("""
+            SELECT o.officer_id, c.faction_id
+            FROM officers o
+            JOIN cities c ON o.location_id = c.city_id
+            JOIN factions f ON c.faction_id = f.faction_id
+            WHERE o.faction_id IS NULL AND c.faction_id IS NOT NULL""").fetchall()
+        for oid, fid in candidates:
+            if self._get_faction_relation(oid, fid) >= 50 and self.rng.random() > 0.90:
+                self._exec("UPDATE officers SET faction_id = ?, rank = ?, max_troops = ?, troops = troops + ? WHERE officer_id = ?",
+                           (fid, gc.RANK_REGULAR, gc.TROOPS_REGULAR, gc.TROOPS_REGULAR - gc.TROOPS_VOLUNTEER, oid))
+
+    # --- ActionManager.EndDay ---
+
+    def _end_day(self):
+        self._exec("UPDATE officers SET current_action_points = max_action_points")
+        if self._scalar("SELECT current_day FROM game_state LIMIT 1") is None:
+            self._exec("INSERT INTO game_state (current_day, player_id) VALUES (1, 1)")
+            day = 1
+        else:
+            self._exec("UPDATE game_state SET current_day = current_day + 1")
+            day = self.current_day()
+        self._exec("UPDATE officers SET days_service = days_service + 1 WHERE faction_id IS NOT NULL AND faction_id > 0")
+        player_id = self._scalar("SELECT officer_id FROM officers WHERE is_player = 1")
+        if player_id is not None:
+            self._check_promotions(player_id)
+        # Passive troop regeneration for officers in peaceful cities
+        self._exec("""
+            UPDATE officers
+            SET troops = MIN(max_troops, troops + MAX(200, max_troops / 10))
+            WHERE location_id IN (SELECT city_id FROM cities)
+            AND location_id NOT IN (SELECT location_id FROM pending_battles)""")
+        if day % 7 == 0:
+            self._exec("DELETE FROM wine_dine_history")
+
+    # --- Reporting ---
+
+    def summary(self):
+        """Per-faction snapshot of the simulated world."""
+        rows = self._exec("""
+            SELECT f.faction_id, f.name, f.gold_treasury, f.supplies,
+                   (SELECT COUNT(*) FROM cities c WHERE c.faction_id = f.faction_id),
+                   (SELECT COUNT(*) FROM officers o WHERE o.faction_id = f.faction_id),
+                   (SELECT SUM(troops) FROM officers o WHERE o.faction_id = f.faction_id)
+            FROM factions f ORDER BY f.faction_id""").fetchall()
+        # Cities with a friendly path back to the HQ (WorldGraph.IsConnectedToHQ)
+        return [row + (len(self.connectivity.connected_cities(row[0])),) for row in rows]
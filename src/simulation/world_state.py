@@ -0,0 +1,201 @@
+import sys
+
+import numpy as np
+
+# Array-backed world tables.
+# Python consumers that go through the ORM build one Officer / City object per row,
+# each carrying SQLAlchemy instrumentation for ~50 columns, which is far more memory
+# and load time than the numbers themselves. WorldState reads officers, cities,
+# factions and routes with one SELECT each into NumPy structured arrays: INTEGER
+# columns as int64, REAL as float64, text interned to int32 codes in one string
+# pool shared by every table. Each table keeps its primary keys sorted for
+# vectorised id -> row lookup, plus a dirty-row bitmap and the set of columns
+# written through set(). flush() sends only those rows and columns back, one
+# executemany per table.
+#
+# NULL is NULL_INT in integer columns, NaN in REAL columns and NULL_CODE in text
+# columns. Rows inserted or deleted in SQL after load() need a new load().
+
+WORLD_TABLES = {"officers": "officer_id", "cities": "city_id", "factions": "faction_id", "routes": "route_id"}
+NULL_INT = np.iinfo(np.int64).min
+NULL_CODE = -1
+INT, FLOAT, TEXT = "int", "float", "text"
+_DTYPES = {INT: np.int64, FLOAT: np.float64, TEXT: np.int32}
+
+
+def _declared_kind(declared):
+    declared = (declared or "").upper()
+    if "INT" in declared or "BOOL" in declared:
+        return INT
+    if "REAL" in declared or "FLOA" in declared or "DOUB" in declared or "NUM" in declared:
+        return FLOAT
+    return TEXT
+
+
+def _kind(values, declared):
+    """Storage kind of one column: from its values, or its declared type when they are all NULL."""
+    kinds = {type(v) for v in values if v is not None}
+    if not kinds:
+        return _declared_kind(declared)
+    if kinds <= {int, bool}:
+        return INT
+    if kinds <= {int, bool, float}:
+        return FLOAT
+    return TEXT
+
+
+class StringPool:
+    """Interns strings to dense int32 codes (NULL_CODE for NULL)."""
+
+    def __init__(self):
+        self.codes = {}
+        self.strings = []
+
+    def intern(self, value):
+        if value is None:
+            return NULL_CODE
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+    def lookup(self, code):
+        return None if code == NULL_CODE else self.strings[code]
+
+    def nbytes(self):
+        return sys.getsizeof(self.codes) + sys.getsizeof(self.strings) + sum(sys.getsizeof(s) for s in self.strings)
+
+
+class TableArrays:
+    """One table as a structured array with a sorted-key index and dirty tracking."""
+
+    def __init__(self, name, key, columns, kinds, rows, pool):
+        self.name = name
+        self.key = key
+        self.columns = columns
+        self.kinds = kinds           # {column: INT | FLOAT | TEXT}
+        self.rows = rows             # structured array, one record per row in primary key order
+        self.pool = pool
+        self.dirty = np.zeros(len(rows), dtype=bool)
+        self.dirty_columns = set()
+        self._ids = rows[key].copy()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, column):
+        """Column view (no copy); in-place writes must be followed by mark_dirty()."""
+        return self.rows[column]
+
+    def row(self, id_):
+        """Row index of primary key `id_`, or -1."""
+        pos = int(np.searchsorted(self._ids, id_))
+        return pos if pos < len(self._ids) and self._ids[pos] == id_ else -1
+
+    def row_indexes(self, ids):
+        """Row index of every id in `ids` (-1 where missing)."""
+        ids = np.asarray(ids, dtype=np.int64)
+        pos = np.clip(np.searchsorted(self._ids, ids), 0, max(len(self._ids) - 1, 0))
+        return np.where(self._ids[pos] == ids, pos, -1) if len(self._ids) else np.full(len(ids), -1)
+
+    def set(self, rows, column, values):
+        """Writes `values` into `column` at row indexes `rows` and marks them dirty.
+        Text columns take strings (None for NULL) and intern them."""
+        if column == self.key:
+            raise ValueError(f"{self.name}.{self.key} is the primary key and cannot be changed in place")
+        if self.kinds[column] == TEXT:
+            values = [self.pool.intern(v) for v in np.atleast_1d(np.asarray(values, dtype=object))]
+            values = values if np.ndim(rows) else values[0]
+        self.rows[column][rows] = values
+        self.mark_dirty(rows, column)
+
+    def mark_dirty(self, rows, *columns):
+        self.dirty[rows] = True
+        self.dirty_columns.update(columns or [c for c in self.columns if c != self.key])
+
+    def value(self, row, column):
+        """One cell as the Python value SQLite holds (None for NULL, str for text)."""
+        return self._decode(column, self.rows[column][row].item())
+
+    def _decode(self, column, value):
+        kind = self.kinds[column]
+        if kind == TEXT:
+            return self.pool.lookup(value)
+        if kind == INT:
+            return None if value == NULL_INT else value
+        return None if value != value else value      # NaN -> NULL
+
+    def flush(self, conn):
+        """UPDATEs the dirty rows' written columns with one executemany. Returns the row count."""
+        rows = np.flatnonzero(self.dirty)
+        columns = [c for c in self.columns if c in self.dirty_columns]
+        if len(rows) and columns:
+            values = [[self._decode(c, v) for v in self.rows[c][rows].tolist()] for c in columns]
+            params = list(zip(*values, self.rows[self.key][rows].tolist()))
+            assignments = ", ".join(f'"{c}" = ?' for c in columns)
+            conn.executemany(f'UPDATE {self.name} SET {assignments} WHERE "{self.key}" = ?', params)
+        self.dirty[:] = False
+        self.dirty_columns.clear()
+        return len(rows) if columns else 0
+
+    def nbytes(self):
+        return self.rows.nbytes + self._ids.nbytes + self.dirty.nbytes
+
+
+class WorldState:
+    """officers / cities / factions / routes as TableArrays over one sqlite3 connection.
+
+    Nothing is committed here: flush() issues the UPDATEs and the caller owns the
+    transaction, as with EconomyEngine.
+    """
+
+    def __init__(self, conn, tables=WORLD_TABLES):
+        self.conn = conn
+        self.table_keys = dict(tables)
+        self.pool = StringPool()
+        self.tables = {}
+
+    def __getitem__(self, name):
+        return self.tables[name]
+
+    def load(self):
+        existing = {r[0] for r in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.pool = StringPool()
+        self.tables = {}
+        for name, key in self.table_keys.items():
+            if name in existing:
+                self.tables[name] = self._load_table(name, key)
+        return self
+
+    def _load_table(self, name, key):
+        declared = {r[1]: r[2] for r in self.conn.execute(f"PRAGMA table_info({name})")}
+        cursor = self.conn.execute(f'SELECT * FROM {name} ORDER BY "{key}"')
+        columns = [d[0] for d in cursor.description]
+        data = cursor.fetchall()
+        values = list(zip(*data)) if data else [()] * len(columns)
+        kinds = {c: _kind(v, declared.get(c)) for c, v in zip(columns, values)}
+        rows = np.zeros(len(data), dtype=[(c, _DTYPES[kinds[c]]) for c in columns])
+        for column, column_values in zip(columns, values):
+            kind = kinds[column]
+            if kind == TEXT:
+                intern = self.pool.intern
+                rows[column] = np.fromiter((intern(v if v is None or isinstance(v, str) else str(v))
+                                            for v in column_values), dtype=np.int32, count=len(data))
+            elif None not in column_values:
+                rows[column] = column_values
+            elif kind == INT:
+                rows[column] = [NULL_INT if v is None else v for v in column_values]
+            else:
+                rows[column] = [np.nan if v is None else v for v in column_values]
+        return TableArrays(name, key, columns, kinds, rows, self.pool)
+
+    def flush(self):
+        """Writes every table's dirty rows. Returns {table: rows written}."""
+        return {name: table.flush(self.conn) for name, table in self.tables.items()}
+
+    def memory(self):
+        """{table: bytes} of the arrays, plus "strings" for the shared pool."""
+        usage = {name: table.nbytes() for name, table in self.tables.items()}
+        usage["strings"] = self.pool.nbytes()
+        return usage
@@ -0,0 +1,117 @@
+import sys
+import os
+import time
+import random
+import sqlite3
+import argparse
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.database.db_manager import DB_PATH
+from src.database.migrations import migrate
+from src.assets.atlas import OUTPUT_DIR, load_index
+from src.simulation.portraits import PortraitIndex, PortraitAssigner
+from tools.battle_odds import load_copy
+
+# Validates and repairs officer portraits against the portrait tileset
+# (src/simulation/portraits.py); replaces fix_portraits.py, update_officer_portraits.py,
+# check_zhou.py and sanity_check.py. --bench N times a full reassignment on an
+# in-memory copy grown to N officers. Run from the project root:
+#   python tools/assign_portraits.py --db tree_kingdoms.db --check
+#   python tools/assign_portraits.py --db tree_kingdoms.db --dry-run
+#   python tools/assign_portraits.py --db tree_kingdoms.db --bench 100000
+#   python tools/assign_portraits.py --db tree_kingdoms.db --atlas build/atlases
+
+
+def grow(conn, count, rng):
+    """Adds generic officers (random, often invalid portraits) until there are `count`."""
+    have = conn.execute("SELECT COUNT(*), MAX(officer_id) FROM officers").fetchone()
+    start = (have[1] or 0) + 1
+    rows = [(start + i, f"Generic Officer {start + i}", 0, rng.randint(0, 9), f"{rng.randint(0, 4)},{rng.randint(0, 3)}")
+            for i in range(max(0, count - have[0]))]
+    conn.executemany("INSERT INTO officers (officer_id, name, is_player, portrait_source_id, portrait_coords) "
+                     "VALUES (?, ?, ?, ?, ?)", rows)
+    conn.commit()
+
+
+def bench(args, index):
+    conn = load_copy(args.db)
+    migrate(conn)
+    grow(conn, args.bench, random.Random(args.seed))
+    assigner = PortraitAssigner(conn, index, rng_seed=args.seed, reuse=True)
+    invalid = len(assigner.invalid())
+    start = time.perf_counter()
+    changes = assigner.plan(reassign_all=args.reassign_all)
+    planned = time.perf_counter()
+    updated = assigner.apply(changes)
+    conn.commit()
+    done = time.perf_counter()
+    remaining = len(assigner.invalid())
+    print(f"{args.bench:,} officers, {invalid:,} invalid portraits: planned {len(changes):,} changes in "
+          f"{(planned - start) * 1000:.1f}ms, one UPDATE of {updated:,} rows in {(done - planned) * 1000:.1f}ms "
+          f"({(done - start) * 1000:.1f}ms total); {remaining} invalid afterwards")
+    if remaining:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate and assign officer portraits from the portrait tileset.")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite file to check or update")
+    parser.add_argument("--check", action="store_true", help="Only list invalid portraits (exit 1 if any)")
+    parser.add_argument("--dry-run", action="store_true", help="Show the changes without writing them")
+    parser.add_argument("--reassign-all", action="store_true", help="Redraw every generic portrait, not just invalid ones")
+    parser.add_argument("--reuse", action="store_true", help="Reuse generic cells when the pool runs out")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--bench", type=int, default=0, help="Time a run on an in-memory copy with N officers")
+    parser.add_argument("--atlas", nargs="?", const=OUTPUT_DIR, default=None,
+                        help="Only use cells packed in this atlas build (tools/build_atlases.py)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"ERROR: Database not found at {args.db}")
+        sys.exit(1)
+    if args.atlas:
+        atlas = load_index(args.atlas)
+        if "portraits" not in atlas["groups"]:
+            print(f"ERROR: No portrait atlas in {args.atlas} (run tools/build_atlases.py)")
+            sys.exit(1)
+        index = PortraitIndex.from_atlas(atlas)
+    else:
+        index = PortraitIndex.load()
+    print(f"Portrait index: {len(index.cells)} cells in {len(index.sources)} atlas sources"
+          f"{f', {len(index.clipped)} declared cells outside their image' if index.clipped else ''}")
+    if args.bench:
+        bench(args, index)
+        return
+
+    # Checks and dry runs work on a copy, so a save the game has not migrated yet is left untouched
+    conn = load_copy(args.db) if args.check or args.dry_run else sqlite3.connect(args.db)
+    migrate(conn)
+    try:
+        assigner = PortraitAssigner(conn, index, rng_seed=args.seed, reuse=args.reuse)
+        invalid = assigner.invalid()
+        print(f"{len(invalid)} officers with an invalid portrait")
+        for oid, name, src, coords in invalid[:20]:
+            print(f"  {oid:>6} {name:<24} source {src} coords {coords}")
+        if args.check:
+            if invalid:
+                sys.exit(1)
+            return
+
+        changes = assigner.plan(reassign_all=args.reassign_all)
+        names = dict(conn.execute("SELECT officer_id, name FROM officers"))
+        for oid, (src, coords) in list(changes.items())[:20]:
+            print(f"  {oid:>6} {names[oid]:<24} -> source {src} coords {coords}")
+        if args.dry_run:
+            print(f"{len(changes)} changes (dry run, nothing written).")
+            return
+        updated = assigner.apply(changes)
+        conn.commit()
+        print(f"Updated {updated} officers.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import sys
+import os
+import time
+import random
+import sqlite3
+import argparse
+
+import numpy as np
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.database.db_manager import DB_PATH
+from src.simulation.battle_resolver import BattleResolver, ROLL_LOW, ROLL_HIGH
+
+# What-if odds for every pending battle, from Monte Carlo trials, checked against the
+# exact win probability of the uniform roll. Works on an in-memory copy, so the
+# source DB is never touched. Run from the project root:
+#   python tools/battle_odds.py --db tree_kingdoms.db --generate 200 --trials 5000 --apply
+
+
+def load_copy(db_path):
+    conn = sqlite3.connect(":memory:")
+    source = sqlite3.connect(db_path)
+    try:
+        source.backup(conn)
+    finally:
+        source.close()
+    return conn
+
+
+def generate_battles(conn, count, rng_seed):
+    """Queues up to `count` attacks from owned cities into adjacent cities held by someone else."""
+    rng = random.Random(rng_seed)
+    owners = dict(conn.execute("SELECT city_id, faction_id FROM cities").fetchall())
+    pending = {r[0] for r in conn.execute("SELECT location_id FROM pending_battles")}
+    edges = [(s, e) for s, e in conn.execute("SELECT start_city_id, end_city_id FROM routes")
+             if owners.get(s) and owners.get(e) != owners.get(s)]
+    rng.shuffle(edges)
+    rows = []
+    for source, target in edges:
+        if len(rows) >= count:
+            break
+        if target not in pending:
+            pending.add(target)
+            rows.append((target, owners[source], source))
+    conn.executemany("INSERT INTO pending_battles (location_id, attacker_faction_id, source_location_id) VALUES (?, ?, ?)", rows)
+    conn.commit()
+    return len(rows)
+
+
+def exact_win_prob(attack, defence):
+    rolls = np.arange(ROLL_LOW, ROLL_HIGH)
+    return (attack[:, None] + rolls[None, :] > defence[:, None]).mean(axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo odds for pending battles, optionally resolved in one batch.")
+    parser.add_argument("--db", default=DB_PATH, help="Source SQLite file (copied, never modified)")
+    parser.add_argument("--trials", type=int, default=2000)
+    parser.add_argument("--generate", type=int, default=0, help="Queue N extra attacks along hostile borders first")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--apply", action="store_true", help="Resolve every battle and write the outcomes")
+    parser.add_argument("--show", type=int, default=20, help="Rows of the odds table to print")
+    args = parser.parse_args()
+
+    conn = load_copy(args.db)
+    if args.generate:
+        print(f"Queued {generate_battles(conn, args.generate, args.seed)} extra battles.")
+
+    resolver = BattleResolver(conn, rng_seed=args.seed)
+    start = time.perf_counter()
+    resolver.load()
+    loaded = time.perf_counter()
+    odds = resolver.odds(args.trials)
+    done = time.perf_counter()
+    print(f"{len(odds)} pending battles: load {(loaded - start) * 1000:.1f}ms, "
+          f"{args.trials} trials each in {(done - loaded) * 1000:.1f}ms")
+    if not odds:
+        return
+
+    print(f"{'city':>6} {'att':>4} {'def':>4} {'att str':>8} {'def str':>8} {'P(win)':>7} {'exp att loss':>13} {'exp def loss':>13}")
+    for o in odds[:args.show]:
+        print(f"{o['city_id']:>6} {o['attacker_faction_id']:>4} {o['defender_faction_id']:>4} "
+              f"{o['attack_strength']:>8.0f} {o['defence_strength']:>8.0f} {o['attacker_win_prob']:>7.1%} "
+              f"{o['expected_attacker_losses']:>13,.0f} {o['expected_defender_losses']:>13,.0f}")
+
+    exact = exact_win_prob(resolver.attack_strength, resolver.defence_strength) * resolver._contested()
+    worst = float(np.max(np.abs(exact - [o["attacker_win_prob"] for o in odds])))
+    print(f"Largest gap between Monte Carlo and exact win probability: {worst:.3f} "
+          f"(~{3 / np.sqrt(args.trials):.3f} expected at 3 sigma)")
+
+    if args.apply:
+        start = time.perf_counter()
+        results = resolver.apply()
+        conn.commit()
+        elapsed = time.perf_counter() - start
+        print(f"Resolved {len(results)} battles in one transaction in {elapsed * 1000:.1f}ms; "
+              f"{sum(r[3] for r in results)} cities changed hands.")
+
+
+if __name__ == "__main__":
+    main()
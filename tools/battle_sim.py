@@ -0,0 +1,164 @@
+import sys
+import os
+import time
+import random
+import argparse
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.database.db_manager import DB_PATH
+from src.database.migrations import migrate
+from src.simulation.battle_grid import MAP_WIDTH, MAP_HEIGHT, BattleGrid
+from src.simulation.battle_paths import FlowFieldCache
+from src.simulation.battle_resolver import BattleResolver
+from src.simulation.tactical import TacticalBattle, load_battle_officers
+from tools.battle_odds import load_copy, generate_battles
+
+# Runs pending battles through the headless real-time battle engine
+# (src/simulation/tactical.py) on an in-memory copy of the DB, and benchmarks large
+# engagements. --check replays every battle with full unit scans and compares the
+# outcome, and compares distance-field steps with A* path lengths. Run from the
+# project root:
+#   python tools/battle_sim.py --db tree_kingdoms.db --generate 50 --check
+#   python tools/battle_sim.py --db tree_kingdoms.db --squads 240 --width 60 --height 40 --check
+#   python tools/battle_sim.py --db tree_kingdoms.db --generate 50 --map template --field-cache
+
+
+def build_map(conn, args, defender_fid, attacker_fid, defense_level):
+    if args.map == "siege":
+        return BattleGrid.siege_map(defender_fid, attacker_fid, defense_level, args.width, args.height)
+    return BattleGrid.from_template(conn, args.template_id, defender_fid, attacker_fid, args.width, args.height)
+
+
+def pending_battles(conn, rng):
+    """(attacker_fid, defender_fid, defense_level, attackers, defenders) for every contested pending battle."""
+    resolver = BattleResolver(conn).load()
+    defense = dict(conn.execute("SELECT city_id, defense_level FROM cities").fetchall())
+    battles = []
+    for (city_id, attacker_fid, _, defender_fid), attackers, defenders in zip(
+            resolver.battles, resolver.attackers, resolver.defenders):
+        if not attackers:
+            continue
+        battles.append((attacker_fid, defender_fid, defense.get(city_id) or 0,
+                        load_battle_officers(conn, [o[0] for o in attackers], rng),
+                        load_battle_officers(conn, [o[0] for o in defenders], rng)))
+    return battles
+
+
+def large_battle(conn, squads, rng):
+    """Two armies of full (6-squad) officers from the two largest factions, `squads` squads in total."""
+    per_side = -(-squads // 12)
+    factions = [fid for fid, _ in conn.execute("""
+        SELECT faction_id, COUNT(*) FROM officers WHERE faction_id > 0
+        GROUP BY faction_id ORDER BY COUNT(*) DESC LIMIT 2""")]
+    if len(factions) < 2:
+        raise SystemExit("Need two factions with officers for --squads")
+    sides = []
+    for fid in factions:
+        ids = [r[0] for r in conn.execute(
+            "SELECT officer_id FROM officers WHERE faction_id = ? ORDER BY officer_id LIMIT ?", (fid, per_side))]
+        officers = load_battle_officers(conn, ids, rng)
+        for o in officers:
+            o["troops"] = 900
+        sides.append(officers)
+    return factions[0], factions[1], 0, sides[0], sides[1]
+
+
+def run_battle(conn, args, battle, seed, spatial_hash=True):
+    attacker_fid, defender_fid, defense_level, attackers, defenders = battle
+    grid, cps = build_map(conn, args, defender_fid, attacker_fid, defense_level)
+    paths = FlowFieldCache(grid, cps)
+    if args.field_cache:
+        name = "siege" if args.map == "siege" else f"template_{args.template_id}"
+        if not paths.load(args.field_cache, name):
+            paths.save(args.field_cache, name)
+    sim = TacticalBattle(grid, cps, attackers, defenders, attacker_fid, defender_fid,
+                         rng_seed=seed, dt=args.dt, spatial_hash=spatial_hash, paths=paths)
+    return sim, sim.run(args.max_seconds)
+
+
+def check_fields(grid, rng, samples=200):
+    """Distance-field steps against A* path lengths for random walkable pairs. Returns mismatches."""
+    walkable = [(x, y) for y in range(grid.height) for x in range(grid.width) if grid.is_walkable(x, y)]
+    mismatches = 0
+    for _ in range(samples):
+        start, end = rng.choice(walkable), rng.choice(walkable)
+        path = grid.get_path(start, end)
+        steps = int(grid.distance_field(*end)[start[1] * grid.width + start[0]])
+        if (path is None and steps != -1) or (path is not None and len(path) != steps):
+            mismatches += 1
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless real-time battles: balance runs and large benchmarks.")
+    parser.add_argument("--db", default=DB_PATH, help="Source SQLite file (copied, never modified)")
+    parser.add_argument("--generate", type=int, default=0, help="Queue N extra attacks along hostile borders first")
+    parser.add_argument("--squads", type=int, default=0, help="Benchmark one battle with about N squads instead")
+    parser.add_argument("--map", choices=["siege", "template"], default="siege")
+    parser.add_argument("--template-id", type=int, default=1)
+    parser.add_argument("--width", type=int, default=MAP_WIDTH)
+    parser.add_argument("--height", type=int, default=MAP_HEIGHT)
+    parser.add_argument("--dt", type=float, default=0.05)
+    parser.add_argument("--max-seconds", type=float, default=600.0)
+    parser.add_argument("--field-cache", nargs="?", const=os.path.join(os.path.dirname(DB_PATH), "battle_fields"),
+                        help="Load/save control-point distance fields as .npy in this directory")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", action="store_true", help="Replay with full unit scans and compare")
+    args = parser.parse_args()
+
+    conn = load_copy(args.db)
+    migrate(conn)
+    rng = random.Random(args.seed)
+    if args.squads:
+        battles = [large_battle(conn, args.squads, rng)]
+    else:
+        if args.generate:
+            print(f"Queued {generate_battles(conn, args.generate, args.seed)} extra battles.")
+        battles = pending_battles(conn, rng)
+    print(f"{len(battles)} battles on a {args.width}x{args.height} {args.map} map, dt {args.dt}s")
+    if not battles:
+        return
+
+    start = time.perf_counter()
+    results, unit_ticks = [], 0
+    for i, battle in enumerate(battles):
+        sim, result = run_battle(conn, args, battle, args.seed + i)
+        results.append(result)
+        unit_ticks += result["units"] * result["ticks"]
+    elapsed = time.perf_counter() - start
+
+    wins = sum(r["attackers_won"] for r in results)
+    timeouts = sum(r["timed_out"] for r in results)
+    battle_seconds = sum(r["seconds"] for r in results)
+    print(f"Ran {len(results)} battles ({sum(r['squads'] for r in results)} squads, "
+          f"{battle_seconds:,.0f} battle seconds) in {elapsed:.2f}s: "
+          f"{elapsed / len(results) * 1000:.1f}ms per battle, {unit_ticks / elapsed:,.0f} unit ticks/s")
+    print(f"Attackers won {wins}, defenders held {len(results) - wins - timeouts}, timed out {timeouts}; "
+          f"distance fields built: {sum(r['field_builds'] for r in results)}"
+          f"{', loaded from ' + args.field_cache if args.field_cache else ''}")
+    for r in results[:10]:
+        print(f"  {'attacker' if r['attackers_won'] else 'timeout ' if r['timed_out'] else 'defender'} "
+              f"{r['seconds']:>7.1f}s  squads {r['squads']:>4}  troops left {r['attacker_troops']:>6} "
+              f"vs {r['defender_troops']:>6}  gate {r['gate_health']}")
+
+    if args.check:
+        start = time.perf_counter()
+        differing = 0
+        for i, battle in enumerate(battles):
+            _, scanned = run_battle(conn, args, battle, args.seed + i, spatial_hash=False)
+            differing += scanned != results[i]
+        scan_elapsed = time.perf_counter() - start
+        print(f"Full-scan replay: {scan_elapsed:.2f}s ({scan_elapsed / elapsed:.1f}x the spatial hash); "
+              f"{differing} of {len(battles)} battles differ")
+
+        grid, _ = build_map(conn, args, battles[0][1], battles[0][0], battles[0][2])
+        mismatches = check_fields(grid, rng)
+        print(f"Distance fields vs A*: {mismatches} of 200 path lengths differ")
+        if differing or mismatches:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
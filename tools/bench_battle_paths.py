@@ -0,0 +1,126 @@
+import sys
+import os
+import time
+import random
+import tempfile
+import argparse
+
+import numpy as np
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.database.db_manager import DB_PATH
+from src.simulation.battle_grid import MAP_WIDTH, MAP_HEIGHT, BattleGrid
+from src.simulation.battle_paths import FlowFieldCache, distance_fields
+from tools.battle_odds import load_copy
+
+# Repeated per-unit A* (BattleGrid.GetPath) against cached distance fields
+# (src/simulation/battle_paths.py) for units heading to a map's control points.
+# Checks that every field path is as long as the A* path, that the vectorised BFS
+# matches the plain one, that saved fields load back unchanged, and that fields are
+# rebuilt after a terrain change. Run from the project root:
+#   python tools/bench_battle_paths.py --db tree_kingdoms.db --map template --width 60 --height 40
+
+
+def walk(cache, start, target, limit):
+    """Steps taken following the next-step table from start, or None if it never arrives."""
+    x, y = start
+    goals = {target}
+    if not cache.grid.is_walkable(*target):
+        goals = {(target[0] + dx, target[1] + dy) for dx, dy in ((0, -1), (0, 1), (-1, 0), (1, 0))}
+    steps = 0
+    while (x, y) not in goals:
+        step = cache.step(x, y, *target)
+        if step is None or steps > limit:
+            return None
+        x, y = step
+        steps += 1
+    return steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-unit A* against cached battle distance fields.")
+    parser.add_argument("--db", default=DB_PATH, help="Source SQLite file for --map template (copied, never modified)")
+    parser.add_argument("--map", choices=["siege", "template"], default="siege")
+    parser.add_argument("--template-id", type=int, default=1)
+    parser.add_argument("--width", type=int, default=MAP_WIDTH)
+    parser.add_argument("--height", type=int, default=MAP_HEIGHT)
+    parser.add_argument("--units", type=int, default=400)
+    parser.add_argument("--rounds", type=int, default=5, help="Retargets per unit (the AI retargets every second)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.map == "siege":
+        grid, cps = BattleGrid.siege_map(1, 2, 100, args.width, args.height)
+    else:
+        grid, cps = BattleGrid.from_template(load_copy(args.db), args.template_id, 1, 2, args.width, args.height)
+    rng = random.Random(args.seed)
+    walkable = [(x, y) for y in range(grid.height) for x in range(grid.width) if grid.is_walkable(x, y)]
+    targets = [(cp.x, cp.y) for cp in cps]
+    orders = [[(rng.choice(walkable), rng.choice(targets)) for _ in range(args.units)] for _ in range(args.rounds)]
+    print(f"{args.width}x{args.height} {args.map} map: {len(walkable)} walkable tiles, {len(cps)} control points; "
+          f"{args.units} units x {args.rounds} retargets")
+
+    # Field builds: one plain BFS per target against one vectorised pass for all of them
+    start = time.perf_counter()
+    plain = np.stack([grid.distance_field(*t) for t in targets])
+    plain_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    batch = distance_fields(grid.tiles == 0, targets)
+    batch_elapsed = time.perf_counter() - start
+    print(f"Fields for every CP: plain BFS {plain_elapsed * 1000:.1f}ms, vectorised {batch_elapsed * 1000:.1f}ms; "
+          f"identical: {np.array_equal(plain, batch)}")
+
+    # Repeated A*: what the game does on every SetFocus
+    start = time.perf_counter()
+    astar = [[grid.get_path(s, t) for s, t in round_] for round_ in orders]
+    astar_elapsed = time.perf_counter() - start
+
+    # Cached fields: build (or hit) once per target, then one lookup per unit
+    cache = FlowFieldCache(grid, cps)
+    start = time.perf_counter()
+    cache.warm()
+    first = [[cache.step(*s, *t) for s, t in round_] for round_ in orders]
+    field_elapsed = time.perf_counter() - start
+    requests = args.units * args.rounds
+    print(f"Repeated A*: {astar_elapsed * 1000:.1f}ms ({astar_elapsed / requests * 1e6:.1f}us per request); "
+          f"cached fields: {field_elapsed * 1000:.1f}ms ({field_elapsed / requests * 1e6:.2f}us per request, "
+          f"{cache.builds} fields built) -> {astar_elapsed / field_elapsed:.0f}x")
+
+    # Same path lengths, and the first step is always one tile closer
+    mismatches = 0
+    for round_, paths, steps in zip(orders, astar, first):
+        for (s, t), path, step in zip(round_, paths, steps):
+            length = walk(cache, s, t, len(walkable))
+            if (path is None) != (length is None) or (path is not None and len(path) != length):
+                mismatches += 1
+            elif path and step is None:
+                mismatches += 1
+    print(f"Path lengths vs A*: {mismatches} of {requests} differ")
+
+    # Persistence: save, memory-map back, compare
+    with tempfile.TemporaryDirectory() as directory:
+        path = cache.save(directory, f"{args.map}_{args.template_id}")
+        reloaded = FlowFieldCache(grid, cps)
+        start = time.perf_counter()
+        loaded = reloaded.load(directory, f"{args.map}_{args.template_id}")
+        load_elapsed = time.perf_counter() - start
+        same = loaded and all(np.array_equal(reloaded.fields[t], cache.fields[t]) for t in targets)
+        print(f"Saved {os.path.basename(path)} ({os.path.getsize(path):,} bytes); "
+              f"memory-mapped back in {load_elapsed * 1000:.2f}ms, identical: {same}")
+
+    # Invalidation: a terrain change drops the fields and the next query rebuilds
+    builds = cache.builds
+    x, y = walkable[0]
+    grid.carve_area(x, y, 1)
+    cache.step(x, y, *targets[0])
+    rebuilt = cache.builds > builds and len(cache.fields) == 1
+    print(f"After a terrain change: fields rebuilt on demand: {rebuilt}")
+
+    if not (np.array_equal(plain, batch) and same and rebuilt) or mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
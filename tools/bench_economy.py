@@ -0,0 +1,111 @@
+import sys
+import os
+import time
+import math
+import sqlite3
+import argparse
+import contextlib
+import io
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.database.db_manager import DatabaseManager
+from src.simulation.economy import EconomyEngine, apply_monthly_sql, apply_harvest_sql
+from tools.seed_db import seed_bulk
+
+# Checks the NumPy economy against the game's SQL on identical bulk worlds, then
+# times both at several officer counts. Run from the project root:
+#   python tools/bench_economy.py --officers 1000 10000 100000
+
+
+def build_world(num_officers, num_factions, rng_seed):
+    """Bulk world in memory (10 officers per city); returns its raw sqlite3 connection."""
+    manager = DatabaseManager("sqlite://")
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed_bulk(num_cities=max(num_factions, num_officers // 10), num_officers=num_officers,
+                  num_factions=num_factions, rng_seed=rng_seed, manager=manager)
+    conn = manager.engine.raw_connection().driver_connection
+    # Spread public order across the revolt threshold so the PO < 20 branch is exercised
+    conn.execute("UPDATE cities SET public_order = (city_id * 37) % 101")
+    conn.commit()
+    return conn
+
+
+def clone(conn):
+    copy = sqlite3.connect(":memory:")
+    conn.backup(copy)
+    return copy
+
+
+def faction_state(conn):
+    return conn.execute("SELECT faction_id, gold_treasury, supplies FROM factions ORDER BY faction_id").fetchall()
+
+
+def same_state(a, b):
+    for (fa, ga, sa), (fb, gb, sb) in zip(a, b):
+        for x, y in ((ga, gb), (sa, sb)):
+            if (x is None) != (y is None):
+                return False
+            if x is not None and not math.isclose(x, y, rel_tol=1e-9, abs_tol=1e-6):
+                return False
+        if fa != fb:
+            return False
+    return len(a) == len(b)
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(officer_counts, num_factions, repeat, rng_seed):
+    print(f"{'officers':>10} {'sql monthly':>12} {'np load':>9} {'np apply':>9} {'np total':>9} {'speedup':>8} "
+          f"{'sql harvest':>12} {'np harvest':>11} {'equal':>6}")
+    all_equal = True
+    for n in officer_counts:
+        base = build_world(n, num_factions, rng_seed)
+        # A faction with no cities/officers exercises the NULL semantics of the SQL
+        base.execute("INSERT INTO factions (faction_id, name, gold_treasury, supplies) VALUES (9999, 'Empty', 100, 100)")
+        base.commit()
+
+        sql_db, np_db = clone(base), clone(base)
+        engine = EconomyEngine(np_db)
+
+        # Equivalence: three months and a harvest on each copy
+        for _ in range(3):
+            apply_monthly_sql(sql_db)
+            engine.load().apply_monthly()
+        apply_harvest_sql(sql_db)
+        engine.load().apply_harvest()
+        equal = same_state(faction_state(sql_db), faction_state(np_db))
+        all_equal &= equal
+
+        sql_monthly = timed(lambda: apply_monthly_sql(sql_db), repeat)
+        np_load = timed(engine.load, repeat)
+        np_apply = timed(engine.apply_monthly, repeat)  # Arrays already loaded
+        sql_harvest = timed(lambda: apply_harvest_sql(sql_db), repeat)
+        np_harvest = timed(engine.apply_harvest, repeat)
+        np_total = np_load + np_apply
+        print(f"{n:>10,} {sql_monthly * 1000:>10.2f}ms {np_load * 1000:>7.2f}ms {np_apply * 1000:>7.2f}ms "
+              f"{np_total * 1000:>7.2f}ms {sql_monthly / np_total:>7.1f}x "
+              f"{sql_harvest * 1000:>10.2f}ms {np_harvest * 1000:>9.2f}ms {'yes' if equal else 'NO':>6}")
+    return all_equal
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Equivalence check and benchmark for the NumPy economy engine.")
+    parser.add_argument("--officers", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--factions", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if not run(args.officers, args.factions, args.repeat, args.seed):
+        print("MISMATCH: NumPy economy differs from the SQL reference")
+        sys.exit(1)
+    print("NumPy economy matches the SQL reference.")
@@ -0,0 +1,143 @@
+import sys
+import os
+import io
+import time
+import random
+import argparse
+import contextlib
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.database.db_manager import DatabaseManager
+from src.database.migrations import migrate
+from src.simulation.strategic_map import (ATTACK_ASSIGNMENTS, StrategicMap, city_defense_strength_sql,
+                                          find_expansion_target_sql)
+from tools.audit_queries import drop_indexes
+from tools.seed_db import seed_bulk
+
+# Checks the strategic map (src/simulation/strategic_map.py) against FactionAI's
+# queries on bulk worlds, then times a planning pass for every faction: the game's
+# FindExpansionTarget + GetCityDefenseStrength + assigned-force SUM per faction
+# against one StrategicMap load and a single ranking sort. --drop-indexes times a
+# save without the hot-lookup indexes of migration 14. Run from the project root:
+#   python tools/bench_strategic_map.py --cities 1000 5000 --factions 20 100
+
+
+def build_world(cities, factions, rng_seed, indexes=True):
+    manager = DatabaseManager("sqlite://")
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed_bulk(num_cities=cities, num_officers=cities * 10, num_factions=factions, rng_seed=rng_seed,
+                  manager=manager)
+    conn = manager.engine.raw_connection().driver_connection
+    migrate(conn)
+    # Some officers already marching on cities, so the assigned-force sums are exercised
+    rng = random.Random(rng_seed)
+    city_ids = [r[0] for r in conn.execute("SELECT city_id FROM cities")]
+    orders = [(rng.choice(ATTACK_ASSIGNMENTS), rng.choice(city_ids), oid)
+              for (oid,) in conn.execute("SELECT officer_id FROM officers WHERE faction_id IS NOT NULL")
+              if rng.random() < 0.05]
+    conn.executemany("UPDATE officers SET current_assignment = ?, assignment_target_id = ? WHERE officer_id = ?", orders)
+    conn.commit()
+    if not indexes:
+        drop_indexes(conn)
+    return conn
+
+
+def assigned_sql(conn, city_id):
+    """AssignOfficerTasks: troops already ordered against the target."""
+    return conn.execute("SELECT SUM(troops) FROM officers WHERE (current_assignment = 'CaptureCity' OR "
+                        "current_assignment = 'SupportAttack') AND assignment_target_id = ?",
+                        (city_id,)).fetchone()[0] or 0
+
+
+def plan_sql(conn, faction_ids):
+    plans = {}
+    for fid in faction_ids:
+        target = find_expansion_target_sql(conn, fid)
+        plans[fid] = (target, city_defense_strength_sql(conn, target), assigned_sql(conn, target)) if target else (0,)
+    return plans
+
+
+def plan_map(conn):
+    strategic = StrategicMap(conn).load()
+    plans = {}
+    for fid, target in strategic.expansion_targets().items():
+        if target:
+            pos = strategic.city_position(target)
+            plans[fid] = (target, int(strategic.garrison[pos]), int(strategic.assigned[pos]))
+        else:
+            plans[fid] = (0,)
+    return plans, strategic
+
+
+def check(conn, strategic, reference, mapped):
+    """Mismatch descriptions. SQLite leaves ties in FindExpansionTarget's ORDER BY unordered,
+    so a different target only counts when its (neutral, officer count) key differs."""
+    errors = []
+    for fid, ref in reference.items():
+        got = mapped[fid]
+        if ref[0] != got[0]:
+            if not ref[0] or not got[0]:
+                errors.append(f"faction {fid}: target {ref[0]} vs {got[0]}")
+                continue
+            keys = [(strategic.owner[p] >= 0, strategic.officer_count[p])
+                    for p in (strategic.city_position(ref[0]), strategic.city_position(got[0]))]
+            if keys[0] != keys[1]:
+                errors.append(f"faction {fid}: target {ref[0]} {keys[0]} vs {got[0]} {keys[1]}")
+            continue
+        if ref != got:
+            errors.append(f"faction {fid}: plan {ref} vs {got}")
+    sample = random.Random(0).sample(list(strategic.city_ids), min(500, len(strategic.city_ids)))
+    for cid in sample:
+        if city_defense_strength_sql(conn, int(cid)) != strategic.defense_strength(int(cid)):
+            errors.append(f"city {cid}: defence strength differs")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time whole-map FactionAI planning.")
+    parser.add_argument("--cities", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--factions", type=int, nargs="+", default=[20, 100])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--drop-indexes", action="store_true", help="Time a save that predates migration 14")
+    args = parser.parse_args()
+
+    failed = False
+    for cities, factions in ((c, f) for c in args.cities for f in args.factions):
+        conn = build_world(cities, factions, args.seed, indexes=not args.drop_indexes)
+        faction_ids = [r[0] for r in conn.execute("SELECT faction_id FROM factions ORDER BY faction_id")]
+
+        sql_best = map_best = rank_best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            reference = plan_sql(conn, faction_ids)
+            sql_time = time.perf_counter() - start
+            start = time.perf_counter()
+            mapped, strategic = plan_map(conn)
+            map_time = time.perf_counter() - start
+            start = time.perf_counter()
+            strategic.ranked_targets()
+            rank_time = time.perf_counter() - start
+            sql_best = sql_time if sql_best is None else min(sql_best, sql_time)
+            map_best = map_time if map_best is None else min(map_best, map_time)
+            rank_best = rank_time if rank_best is None else min(rank_best, rank_time)
+
+        errors = check(conn, strategic, reference, mapped)
+        targets = sum(1 for plan in mapped.values() if plan[0])
+        print(f"{cities:,} cities, {cities * 10:,} officers, {len(faction_ids)} factions ({targets} with a target, "
+              f"{int(strategic.border.sum())} border cities): FactionAI queries {sql_best * 1000:,.1f}ms, "
+              f"strategic map {map_best * 1000:,.1f}ms (ranking all factions {rank_best * 1000:.2f}ms), "
+              f"{sql_best / map_best:.1f}x, break-even at {map_best / (sql_best / len(faction_ids)):.0f} factions; "
+              f"{len(errors)} mismatches")
+        for error in errors[:10]:
+            print(f"  {error}")
+        failed |= bool(errors)
+        conn.close()
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
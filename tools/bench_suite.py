@@ -0,0 +1,269 @@
+import sys
+import os
+import io
+import json
+import time
+import random
+import sqlite3
+import platform
+import argparse
+import datetime
+import contextlib
+import subprocess
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.database.db_manager import DatabaseManager
+from src.database.migrations import migrate
+from src.simulation.battle_resolver import BattleResolver
+from src.simulation.connectivity import ConnectivityIndex, is_connected_bfs
+from src.simulation.economy import EconomyEngine, apply_monthly_sql
+from src.simulation.officer_phase import OfficerPhase
+from src.simulation.relations import RelationStore
+from src.simulation.route_cache import RouteTable
+from tools.battle_odds import generate_battles
+from tools.check_relations import generate_relations, get_relation_sql
+from tools.seed_db import seed, seed_bulk
+
+# Times the game's representative database workloads on bulk worlds at multiples of
+# the Hebei map (the world seed() builds) and appends the results to a JSON history,
+# one entry per run, so a regression in any module shows up as a diff and in the
+# comparison with the previous run. Every workload runs on a fresh in-memory copy
+# of its world; the best of --repeat runs is kept. Run from the project root:
+#   python tools/bench_suite.py --scales 1 10 100 1000
+#   python tools/bench_suite.py --scales 1 10 --workloads officer_phase battles --no-save
+
+DEFAULT_HISTORY = os.path.join("benchmarks", "history.json")
+LOOKUPS = 10000             # relation / connectivity queries per lookup workload
+ROUTE_TABLE_MAX = 2000      # all-pairs tables are n^2; larger worlds skip route_table
+REGRESSION = 0.25           # flag workloads more than 25% slower than the previous run...
+NOISE_FLOOR = 0.001         # ...when they take at least this many seconds
+
+
+def quiet(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def hebei_size(rng_seed):
+    """(cities, officers) in the world seed() builds (it rolls 1-3 officers per city, so seed the RNG)."""
+    random.seed(rng_seed)
+    manager = DatabaseManager("sqlite://")
+    quiet(seed, manager)
+    conn = manager.engine.raw_connection().driver_connection
+    return tuple(conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in ("cities", "officers"))
+
+
+def build_world(cities, officers, rng_seed):
+    """Migrated bulk world in memory with relations for every officer. Returns (conn, seed seconds)."""
+    manager = DatabaseManager("sqlite://")
+    start = time.perf_counter()
+    quiet(seed_bulk, num_cities=cities, num_officers=officers, rng_seed=rng_seed, manager=manager)
+    elapsed = time.perf_counter() - start
+    conn = manager.engine.raw_connection().driver_connection
+    migrate(conn)
+    generate_relations(conn, officers * 5, random.Random(rng_seed))
+    return conn, elapsed
+
+
+def clone(conn):
+    copy = sqlite3.connect(":memory:")
+    conn.backup(copy)
+    return copy
+
+
+# --- Workloads: each prepares a fresh copy and returns the callable to time ---
+
+def economy_sql(conn, rng):
+    return lambda: apply_monthly_sql(conn)
+
+
+def economy_numpy(conn, rng):
+    engine = EconomyEngine(conn)
+
+    def monthly():
+        engine.load()
+        engine.apply_monthly()
+    return monthly
+
+
+def officer_phase(conn, rng):
+    return OfficerPhase(conn, rng).run
+
+
+def battles(conn, rng):
+    cities = conn.execute("SELECT COUNT(*) FROM cities").fetchone()[0]
+    generate_battles(conn, max(1, cities // 10), rng.randrange(1 << 30))
+    return lambda: BattleResolver(conn, rng_seed=0).load().apply()
+
+
+def route_bfs(conn, rng):
+    """IsConnectedToHQ the way the game does it: a fresh BFS per query (LOOKUPS // 10 of them)."""
+    index = ConnectivityIndex.load(conn)
+    owned = [(fid, cid) for cid, fid in index.owner.items() if fid is not None]
+    queries = [rng.choice(owned) for _ in range(LOOKUPS // 10)]
+    return lambda: [is_connected_bfs(index.adjacency, index.owner, index.hq_flags, fid, cid) for fid, cid in queries]
+
+
+def connectivity(conn, rng):
+    index = ConnectivityIndex.load(conn)
+    owned = [(fid, cid) for cid, fid in index.owner.items() if fid is not None]
+    queries = [rng.choice(owned) for _ in range(LOOKUPS)]
+
+    def lookups():
+        loaded = ConnectivityIndex.load(conn)
+        return [loaded.is_connected(fid, cid) for fid, cid in queries]
+    return lookups
+
+
+def route_table(conn, rng):
+    if conn.execute("SELECT COUNT(*) FROM cities").fetchone()[0] > ROUTE_TABLE_MAX:
+        return None
+    return lambda: RouteTable.compute(conn)
+
+
+def _relation_pairs(conn, rng):
+    ids = [r[0] for r in conn.execute("SELECT officer_id FROM officers")]
+    return [(rng.choice(ids), rng.choice(ids)) for _ in range(LOOKUPS)]
+
+
+def relations_sql(conn, rng):
+    pairs = _relation_pairs(conn, rng)
+    return lambda: [get_relation_sql(conn, a, b) for a, b in pairs]
+
+
+def relations_store(conn, rng):
+    pairs = _relation_pairs(conn, rng)
+
+    def lookups():
+        store = RelationStore.load(conn)
+        return [store.get(a, b) for a, b in pairs]
+    return lookups
+
+
+WORKLOADS = {
+    "economy_sql": economy_sql,
+    "economy_numpy": economy_numpy,
+    "officer_phase": officer_phase,
+    "battles": battles,
+    "route_bfs": route_bfs,
+    "connectivity": connectivity,
+    "route_table": route_table,
+    "relations_sql": relations_sql,
+    "relations_store": relations_store,
+}
+
+
+def measure(world, workload, repeat, rng_seed):
+    """Best seconds over `repeat` fresh copies, or None when the workload skips this world."""
+    best = None
+    for _ in range(repeat):
+        conn = clone(world)
+        try:
+            fn = workload(conn, random.Random(rng_seed))
+            if fn is None:
+                return None
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+        finally:
+            conn.close()
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_history(path, history):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(history, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def regressions(previous, current):
+    """[(workload, scale, old, new)] for results slower than the previous run beyond REGRESSION."""
+    found = []
+    for name, by_scale in current["results"].items():
+        for scale, new in by_scale.items():
+            if previous.get("scales", {}).get(scale) != current["scales"][scale]:
+                continue  # Different world size (e.g. seed() changed): not comparable
+            old = previous.get("results", {}).get(name, {}).get(scale)
+            if old is None or new is None or old < NOISE_FLOOR:
+                continue
+            if new > old * (1 + REGRESSION):
+                found.append((name, scale, old, new))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game's database workloads at scaled world sizes.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100, 1000],
+                        help="World sizes as multiples of the Hebei map")
+    parser.add_argument("--workloads", nargs="+", choices=list(WORKLOADS), default=list(WORKLOADS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON file the results are appended to")
+    parser.add_argument("--no-save", action="store_true", help="Compare with the history but do not append")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    base_cities, base_officers = hebei_size(args.seed)
+    print(f"Hebei map: {base_cities} cities, {base_officers} officers; scales {args.scales}, best of {args.repeat}")
+    run = {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "scales": {},
+        "results": {name: {} for name in ["seed"] + args.workloads},
+    }
+
+    for scale in args.scales:
+        cities, officers = base_cities * scale, base_officers * scale
+        world, seed_seconds = build_world(cities, officers, args.seed)
+        key = f"{scale}x"
+        run["scales"][key] = {"cities": cities, "officers": officers}
+        run["results"]["seed"][key] = round(seed_seconds, 6)
+        line = [f"seed {seed_seconds * 1000:,.1f}"]
+        for name in args.workloads:
+            seconds = measure(world, WORKLOADS[name], args.repeat, args.seed)
+            run["results"][name][key] = None if seconds is None else round(seconds, 6)
+            line.append(f"{name} {'-' if seconds is None else f'{seconds * 1000:,.1f}'}")
+        world.close()
+        print(f"  {key:>6} ({cities:,} cities, {officers:,} officers) ms: " + ", ".join(line))
+
+    history = load_history(args.history)
+    if history:
+        previous = history[-1]
+        found = regressions(previous, run)
+        print(f"Against the previous run ({previous.get('date')}, {previous.get('commit')}): "
+              f"{len(found)} regressions over {REGRESSION:.0%}")
+        for name, scale, old, new in found:
+            print(f"  {name:<16} {scale:>6}: {old * 1000:,.1f}ms -> {new * 1000:,.1f}ms ({new / old:.2f}x)")
+    else:
+        found = []
+    if not args.no_save:
+        history.append(run)
+        save_history(args.history, history)
+        print(f"Appended to {args.history} ({len(history)} runs)")
+    if found and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import sys
+import os
+import gc
+import io
+import time
+import random
+import argparse
+import contextlib
+import tracemalloc
+
+import numpy as np
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.database.db_manager import DatabaseManager
+from src.database.models import City, Faction, Officer, Route
+from src.simulation.world_state import NULL_INT, WORLD_TABLES, WorldState
+from tools.seed_db import seed_bulk
+
+# WorldState (src/simulation/world_state.py) against the ORM on bulk worlds.
+# For each officer count: load time and memory held by the ORM objects
+# (officers, cities, factions, routes) vs the arrays. Checks that every array
+# cell decodes to the value in SQL. Then 1% of the officers are changed both ways
+# (troops and mission): the ORM with a session commit, WorldState with set() and
+# flush(). Both must leave the same rows. Run from the project root:
+#   python tools/bench_world_state.py --officers 10000 100000
+
+
+def build_world(num_officers, seed):
+    manager = DatabaseManager("sqlite://")
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed_bulk(num_cities=max(3, num_officers // 10), num_officers=num_officers, num_factions=8,
+                  rng_seed=seed, manager=manager)
+    return manager
+
+
+def measured(fn):
+    """(result, seconds, bytes still allocated by the result)."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, held
+
+
+def load_orm(manager):
+    session = manager.get_session()
+    objects = {model.__tablename__: session.query(model).all() for model in (Officer, City, Faction, Route)}
+    return session, objects
+
+
+def mismatches(conn, world):
+    """Cells where the arrays disagree with SQL."""
+    bad = 0
+    for name, key in WORLD_TABLES.items():
+        table = world[name]
+        for db_row in conn.execute(f"SELECT * FROM {name} ORDER BY {key}"):
+            row = table.row(db_row[0])
+            bad += sum(1 for column, value in zip(table.columns, db_row) if table.value(row, column) != value)
+    return bad
+
+
+def officer_rows(conn):
+    return conn.execute("SELECT * FROM officers ORDER BY officer_id").fetchall()
+
+
+def bench(num_officers, args):
+    orm_manager = build_world(num_officers, args.seed)
+    array_manager = build_world(num_officers, args.seed)
+    conn = array_manager.engine.raw_connection().driver_connection
+
+    (session, objects), orm_seconds, orm_bytes = measured(lambda: load_orm(orm_manager))
+    world, world_seconds, world_bytes = measured(lambda: WorldState(conn).load())
+    officers = world["officers"]
+    per_officer = officers.nbytes() / max(len(officers), 1)
+    print(f"{num_officers:,} officers, {len(world['cities']):,} cities, {len(world['routes']):,} routes:")
+    print(f"  ORM:        {orm_seconds * 1000:9.1f}ms, {orm_bytes / 1e6:8.2f}MB held "
+          f"({orm_bytes / num_officers:,.0f}B per officer incl. other tables)")
+    print(f"  WorldState: {world_seconds * 1000:9.1f}ms, {world_bytes / 1e6:8.2f}MB held "
+          f"({world_bytes / num_officers:,.0f}B per officer incl. other tables; officer record "
+          f"{officers.rows.dtype.itemsize}B, {per_officer:,.0f}B with index and bitmap) "
+          f"{orm_bytes / world_bytes:.1f}x less")
+
+    ok = True
+    if num_officers <= args.check_limit:
+        bad = mismatches(conn, world)
+        print(f"  Decoded arrays vs SQL: {'identical' if not bad else f'{bad} cells DIFFERENT'}")
+        ok = not bad
+
+    # Same analytics both ways: troops per faction
+    fids = officers["faction_id"]
+    has_faction = fids != NULL_INT
+    start = time.perf_counter()
+    totals = np.bincount(fids[has_faction], weights=officers["troops"][has_faction])
+    array_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    sql = dict(conn.execute("SELECT faction_id, SUM(troops) FROM officers WHERE faction_id IS NOT NULL GROUP BY faction_id"))
+    sql_seconds = time.perf_counter() - start
+    same = all(totals[fid] == troops for fid, troops in sql.items())
+    print(f"  Troops per faction: arrays {array_seconds * 1e6:,.0f}us, SQL {sql_seconds * 1e6:,.0f}us, "
+          f"{'same' if same else 'DIFFERENT'}")
+    ok &= same
+
+    # 1% of officers change troops and mission: ORM commit vs set() + flush()
+    rng = random.Random(args.seed)
+    changed = sorted(rng.sample([o.officer_id for o in objects["officers"]], max(1, num_officers // 100)))
+    missions = ["Commerce", "Farming", "Defense", None]
+    plan = [(oid, rng.randrange(1, 500), rng.choice(missions)) for oid in changed]
+    by_id = {o.officer_id: o for o in objects["officers"]}
+    start = time.perf_counter()
+    for oid, troops, mission in plan:
+        by_id[oid].troops = (by_id[oid].troops or 0) + troops
+        by_id[oid].current_mission = mission
+    session.commit()
+    orm_write = time.perf_counter() - start
+    session.close()
+
+    start = time.perf_counter()
+    rows = officers.row_indexes([oid for oid, _, _ in plan])
+    current = officers["troops"][rows]
+    officers.set(rows, "troops", np.where(current == NULL_INT, 0, current) + [t for _, t, _ in plan])
+    officers.set(rows, "current_mission", [m for _, _, m in plan])
+    written = world.flush()
+    conn.commit()
+    array_write = time.perf_counter() - start
+    orm_conn = orm_manager.engine.raw_connection().driver_connection
+    same = officer_rows(orm_conn) == officer_rows(conn)
+    print(f"  Update {len(plan):,} officers: ORM {orm_write * 1000:.1f}ms, WorldState {array_write * 1000:.1f}ms "
+          f"({written['officers']} rows flushed), tables {'identical' if same else 'DIFFERENT'}")
+    return ok and same
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare array-backed WorldState with ORM objects.")
+    parser.add_argument("--officers", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--check-limit", type=int, default=20000,
+                        help="Largest world whose every cell is compared with SQL")
+    args = parser.parse_args()
+    results = [bench(n, args) for n in args.officers]
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
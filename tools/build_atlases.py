@@ -0,0 +1,114 @@
+import sys
+import os
+import time
+import argparse
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.assets.atlas import GROUPS, INDEX_DB, INDEX_JSON, MAX_PAGE, OUTPUT_DIR, PADDING, AtlasBuilder
+from src.assets.png import read_png
+
+# Builds the portrait and town texture atlases plus thumbnails (src/assets/atlas.py)
+# into build/atlases, skipping groups whose inputs are unchanged. --verify decodes
+# every page and checks each sprite against its source pixels; --compare times
+# loading the loose PNGs a list view needs against the thumbnail pages.
+# Run from the project root:
+#   python tools/build_atlases.py
+#   python tools/build_atlases.py --force --verify --compare
+
+
+def size_of(directory, files):
+    return sum(os.path.getsize(os.path.join(directory, f)) for f in files)
+
+
+def verify(index, out_dir):
+    """[(group, name)] of sprites whose atlas pixels differ from the source."""
+    sources = {group: sprites for group, (lister, _) in GROUPS.items() for sprites in [lister()[0]]}
+    pages, images, bad = {}, {}, []
+    for group, data in index["groups"].items():
+        for name, path, rect, _ in sources.get(group, []):
+            entry = data["sprites"].get(name)
+            if entry is None:
+                bad.append((group, name))
+                continue
+            if path not in images:
+                images[path] = read_png(path)
+            expected = images[path]
+            if rect is not None:
+                x, y, w, h = rect
+                expected = expected[y:y + h, x:x + w]
+            thumb = entry["thumb_page"]
+            if thumb not in pages:
+                pages[thumb] = read_png(os.path.join(out_dir, thumb))
+            tx, ty, tw, th = entry["thumb_rect"]
+            if pages[thumb][ty:ty + th, tx:tx + tw].shape[:2] != (th, tw):
+                bad.append((group, name))
+                continue
+            if entry["page"] is None:
+                continue
+            if entry["page"] not in pages:
+                pages[entry["page"]] = read_png(os.path.join(out_dir, entry["page"]))
+            x, y, w, h = entry["rect"]
+            if not (pages[entry["page"]][y:y + h, x:x + w] == expected).all():
+                bad.append((group, name))
+    return bad
+
+
+def compare(index, out_dir):
+    """Decode time of every loose source PNG versus every thumbnail page."""
+    sources = sorted({path for lister, _ in GROUPS.values() for _, path, _, _ in lister()[0]})
+    start = time.perf_counter()
+    for path in sources:
+        read_png(path)
+    loose = time.perf_counter() - start
+    thumbs = [os.path.join(out_dir, f) for data in index["groups"].values() for f in data["thumb_pages"]]
+    start = time.perf_counter()
+    for path in thumbs:
+        read_png(path)
+    packed = time.perf_counter() - start
+    loose_bytes = sum(os.path.getsize(p) for p in sources)
+    thumb_bytes = sum(os.path.getsize(p) for p in thumbs)
+    print(f"List views: {len(sources)} loose PNGs ({loose_bytes / 1e6:.1f}MB) decode in {loose * 1000:,.0f}ms; "
+          f"{len(thumbs)} thumbnail pages ({thumb_bytes / 1e6:.2f}MB) in {packed * 1000:,.0f}ms "
+          f"({loose / max(packed, 1e-9):.0f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack portrait and town art into texture atlases with thumbnails.")
+    parser.add_argument("--out", default=OUTPUT_DIR, help="Output directory for pages and the index")
+    parser.add_argument("--groups", nargs="+", choices=list(GROUPS), default=list(GROUPS))
+    parser.add_argument("--max-size", type=int, default=MAX_PAGE, help="Largest page side (power of two)")
+    parser.add_argument("--padding", type=int, default=PADDING)
+    parser.add_argument("--portrait-thumb", type=int, default=None, help="Portrait thumbnail box side")
+    parser.add_argument("--town-thumb", type=int, default=None, help="Town thumbnail box side")
+    parser.add_argument("--force", action="store_true", help="Rebuild even when the inputs are unchanged")
+    parser.add_argument("--verify", action="store_true", help="Check every packed sprite against its source")
+    parser.add_argument("--compare", action="store_true", help="Time loose PNGs against the thumbnail pages")
+    args = parser.parse_args()
+
+    thumbs = {group: size for group, size in (("portraits", args.portrait_thumb), ("towns", args.town_thumb)) if size}
+    builder = AtlasBuilder(args.out, max_size=args.max_size, padding=args.padding, thumb_sizes=thumbs)
+    start = time.perf_counter()
+    status, index = builder.build(args.groups, force=args.force)
+    elapsed = time.perf_counter() - start
+    for group in args.groups:
+        data = index["groups"][group]
+        pages = ", ".join(f"{w}x{h}" for w, h in data["page_sizes"]) or "full size kept loose"
+        thumb_pages = ", ".join(f"{w}x{h}" for w, h in data["thumb_page_sizes"])
+        print(f"  {group:<10} {status[group]:<8} {len(data['sprites']):>3} sprites from {len(data['inputs'])} files; "
+              f"pages [{pages}] {size_of(args.out, data['pages']) / 1e6:.1f}MB, "
+              f"thumbnails [{thumb_pages}] {size_of(args.out, data['thumb_pages']) / 1e3:.0f}KB")
+    print(f"{elapsed:.2f}s; index in {os.path.join(args.out, INDEX_JSON)} and {INDEX_DB} (table atlas_sprites)")
+
+    if args.compare:
+        compare(index, args.out)
+    if args.verify:
+        bad = verify(index, args.out)
+        print(f"Verified against the sources: {len(bad)} mismatches {bad[:10] if bad else ''}")
+        if bad:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import sys
+import os
+import time
+import sqlite3
+import argparse
+from collections import defaultdict, deque
+
+import numpy as np
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.database.db_manager import DB_PATH
+from src.simulation import route_cache
+from src.simulation.route_cache import RouteTable, TargetRoutes
+
+# Builds the all-pairs route distance / next-hop cache for a world and stores it in
+# the database's route_cache table. Run from the project root:
+#   python tools/build_route_cache.py --db tree_kingdoms.db --verify
+
+
+def bfs_next_hop(adjacency, start, target):
+    """The game's unweighted FindNextHopToward, for comparing hop counts."""
+    parent = {start: None}
+    queue = deque([start])
+    while queue:
+        current = queue.popleft()
+        if current == target:
+            hops = 0
+            while parent[current] is not None:
+                current = parent[current]
+                hops += 1
+            return hops
+        for n in adjacency[current]:
+            if n not in parent:
+                parent[n] = current
+                queue.append(n)
+    return None
+
+
+def verify(conn, table):
+    """Checks the table against heapq Dijkstra and walks every path. TargetRoutes (the
+    per-target lookups big maps use) must give the same distances. Returns True if consistent."""
+    city_ids, edges = route_cache.load_graph(conn)
+    index = {cid: i for i, cid in enumerate(city_ids)}
+    weights = route_cache._weight_matrix(len(city_ids), index, edges)
+    reference, _ = route_cache.dijkstra_all(weights)
+    ok = np.allclose(table.distances, reference, rtol=1e-5, equal_nan=False)
+    per_target = TargetRoutes(city_ids, edges, cache_size=len(city_ids))
+
+    adjacency = defaultdict(set)
+    for start, end, _ in edges:
+        adjacency[start].add(end)
+        adjacency[end].add(start)
+
+    longer_hops = 0
+    for a in city_ids:
+        for b in city_ids:
+            path = table.path(a, b)
+            ok &= bool(np.isclose(per_target.distance(a, b), table.distance(a, b), rtol=1e-5))
+            if not path:
+                ok &= not np.isfinite(table.distance(a, b))
+                continue
+            length = sum(weights[index[x], index[y]] for x, y in zip(path, path[1:]))
+            ok &= bool(np.isclose(length, table.distance(a, b), rtol=1e-5))
+            bfs_hops = bfs_next_hop(adjacency, a, b)
+            if bfs_hops is not None and len(path) - 1 > bfs_hops:
+                longer_hops += 1
+    print(f"Verified {len(city_ids) ** 2:,} pairs against Dijkstra: {'ok' if ok else 'MISMATCH'} "
+          f"({longer_hops} pairs take more hops than BFS to save travel days)")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute weighted shortest paths between all cities.")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite file to read routes from and store the cache in")
+    parser.add_argument("--verify", action="store_true", help="Cross-check distances and paths (slow on big maps)")
+    parser.add_argument("--dry-run", action="store_true", help="Compute and report without writing the cache")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        key = route_cache.routes_hash(*route_cache.load_graph(conn))
+        cached = None if args.dry_run else RouteTable.load(conn, key)
+        if cached is not None:
+            print(f"Route cache is current ({key[:12]}, {len(cached.city_ids)} cities).")
+            table = cached
+        else:
+            start = time.perf_counter()
+            table = RouteTable.compute(conn)
+            elapsed = time.perf_counter() - start
+            n = len(table.city_ids)
+            size = table.distances.nbytes + table.next_hops.nbytes
+            print(f"Computed {n} cities ({n * n:,} pairs) in {elapsed:.3f}s, {size / 1024:,.1f} KiB")
+            if not args.dry_run:
+                table.save(conn)
+                conn.commit()
+                print(f"Stored in route_cache as {table.routes_hash[:12]}.")
+        if args.verify and not verify(conn, table):
+            sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import sys
+import os
+import time
+import random
+import sqlite3
+import argparse
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.database.db_manager import DB_PATH
+from src.simulation.connectivity import ConnectivityIndex, is_connected_bfs
+
+# Cross-checks the incremental HQ-connectivity index against the game's brute-force
+# BFS over random ownership changes, and times both. Run from the project root:
+#   python tools/check_connectivity.py --db tree_kingdoms.db --changes 5000
+
+
+def check(index, faction_ids):
+    """Compares every (faction, city) answer with a fresh BFS. Returns the mismatches."""
+    bad = []
+    for fid in faction_ids:
+        for cid in index.owner:
+            expected = is_connected_bfs(index.adjacency, index.owner, index.hq_flags, fid, cid)
+            if index.is_connected(fid, cid) != expected:
+                bad.append((fid, cid, expected))
+    return bad
+
+
+def run(conn, changes, rng_seed, hq_chance):
+    rng = random.Random(rng_seed)
+    index = ConnectivityIndex.load(conn)
+    cities = sorted(index.owner)
+    faction_ids = sorted({fid for fid in index.owner.values() if fid is not None}) or [1]
+    owners = faction_ids + [None]
+
+    incremental = 0.0
+    for step in range(changes):
+        cid = rng.choice(cities)
+        # Captures mostly come from a neighbour's owner, as in play
+        neighbours = [index.owner[n] for n in index.adjacency[cid]]
+        new_owner = rng.choice(neighbours) if neighbours and rng.random() < 0.8 else rng.choice(owners)
+        make_hq = new_owner is not None and rng.random() < hq_chance
+        start = time.perf_counter()
+        index.set_owner(cid, new_owner, is_hq=make_hq)
+        incremental += time.perf_counter() - start
+
+        bad = check(index, faction_ids)
+        if bad:
+            print(f"MISMATCH after change {step + 1} (city {cid} -> {new_owner}): {bad[:5]}")
+            return False
+
+    # Time a full sweep of queries both ways on the final map
+    start = time.perf_counter()
+    for fid in faction_ids:
+        for cid in cities:
+            is_connected_bfs(index.adjacency, index.owner, index.hq_flags, fid, cid)
+    brute = time.perf_counter() - start
+    start = time.perf_counter()
+    for fid in faction_ids:
+        for cid in cities:
+            index.is_connected(fid, cid)
+    lookup = time.perf_counter() - start
+
+    queries = len(faction_ids) * len(cities)
+    print(f"{changes} ownership changes on {len(cities)} cities / {len(faction_ids)} factions: index matches BFS.")
+    print(f"  update: {incremental / max(changes, 1) * 1e6:8.1f} us per change")
+    print(f"  query:  {lookup / queries * 1e6:8.2f} us (index) vs {brute / queries * 1e6:8.1f} us (BFS)")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cross-check the HQ connectivity index against brute-force BFS.")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite file to read the map from (read only)")
+    parser.add_argument("--changes", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--hq-chance", type=float, default=0.05, help="Chance a change also marks the city as HQ")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        ok = run(conn, args.changes, args.seed, args.hq_chance)
+    finally:
+        conn.close()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,63 @@
+import sys
+import os
+import time
+import argparse
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.database.db_manager import DB_PATH
+from src.simulation.turn_simulator import TurnSimulator
+
+# Runs the same seeded world twice, once with the per-officer officer phase and once
+# with the batched OfficerPhase, and checks the two worlds stay identical day by day.
+# Run from the project root:
+#   python tools/check_officer_phase.py --db tree_kingdoms.db --days 30 --seed 1
+
+TABLES = {
+    "officers": "officer_id",
+    "cities": "city_id",
+    "factions": "faction_id",
+    "officer_relations": "officer_1_id, officer_2_id",
+    "officer_faction_relations": "officer_id, faction_id",
+}
+
+
+def snapshot(sim):
+    return {table: sim.conn.execute(f"SELECT * FROM {table} ORDER BY {key}").fetchall()
+            for table, key in TABLES.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the batched officer phase against the per-officer path.")
+    parser.add_argument("--db", default=DB_PATH, help="Source SQLite file (copied, never modified)")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    reference = TurnSimulator.from_file(args.db, rng_seed=args.seed, batch_officers=False)
+    batched = TurnSimulator.from_file(args.db, rng_seed=args.seed, batch_officers=True)
+    officers = reference.conn.execute("SELECT COUNT(*) FROM officers").fetchone()[0]
+    print(f"{officers} officers, {args.days} days...")
+
+    start = time.perf_counter()
+    for day in range(args.days):
+        reference.step_day()
+        batched.step_day()
+        expected, actual = snapshot(reference), snapshot(batched)
+        for table in TABLES:
+            if expected[table] != actual[table]:
+                print(f"MISMATCH on day {day + 1} in {table}")
+                sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    per_officer = reference.phase_times["officer_phase"]
+    batch = batched.phase_times["officer_phase"]
+    print(f"Identical after {args.days} days ({elapsed:.1f}s total).")
+    print(f"Officer phase: per-officer {per_officer:.3f}s, batched {batch:.3f}s ({per_officer / max(batch, 1e-9):.1f}x)")
+    print("Batched breakdown: " + ", ".join(f"{k} {v:.3f}s" for k, v in batched.officer_phase.timings.items()))
+    print("Actions: " + ", ".join(f"{k} {v:,}" for k, v in sorted(batched.officer_phase.counts.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import sys
+import os
+import time
+import random
+import sqlite3
+import argparse
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.database.db_manager import DB_PATH
+from src.database.migrations import migrate
+from src.simulation.relations import RelationStore, pair_key
+
+# Checks RelationStore against the per-pair queries RelationshipManager and
+# BattleManager.CalculateAvgRelation make. Battle groups are every faction's
+# officers in each city; candidates are everyone else in that city. Works on an
+# in-memory copy. Run from the project root:
+#   python tools/check_relations.py --db tree_kingdoms.db --generate 50000
+
+
+def load_copy(db_path):
+    conn = sqlite3.connect(":memory:")
+    source = sqlite3.connect(db_path)
+    try:
+        source.backup(conn)
+    finally:
+        source.close()
+    migrate(conn)
+    return conn
+
+
+def generate_relations(conn, count, rng):
+    ids = [r[0] for r in conn.execute("SELECT officer_id FROM officers")]
+    rows = {}
+    while len(rows) < min(count, len(ids) * (len(ids) - 1) // 2):
+        a, b = rng.sample(ids, 2)
+        rows[pair_key(a, b)] = rng.randint(-100, 100)
+    conn.executemany("INSERT OR REPLACE INTO officer_relations (officer_1_id, officer_2_id, value) VALUES (?, ?, ?)",
+                     [(a, b, v) for (a, b), v in rows.items()])
+    conn.commit()
+
+
+def get_relation_sql(conn, a, b):
+    if a == b:
+        return 100
+    row = conn.execute("SELECT value FROM officer_relations WHERE officer_1_id = ? AND officer_2_id = ?",
+                       pair_key(a, b)).fetchone()
+    return row[0] if row and row[0] is not None else 0
+
+
+def avg_relation_sql(conn, officer_id, group):
+    if not group:
+        return 0
+    total = sum(get_relation_sql(conn, officer_id, m) for m in group)
+    return int(total / len(group))  # C# integer division truncates toward zero
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the CSR relation store against per-pair queries.")
+    parser.add_argument("--db", default=DB_PATH, help="Source SQLite file (copied, never modified)")
+    parser.add_argument("--generate", type=int, default=0, help="Add N random relations first")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    conn = load_copy(args.db)
+    if args.generate:
+        generate_relations(conn, args.generate, rng)
+
+    # Battle-style groups: per city, each faction's officers vs everyone else present
+    by_city = {}
+    for oid, loc, fid in conn.execute("SELECT officer_id, location_id, faction_id FROM officers"):
+        by_city.setdefault(loc, {}).setdefault(fid or 0, []).append(oid)
+    cases = []
+    for factions in by_city.values():
+        everyone = [o for members in factions.values() for o in members]
+        for fid, members in factions.items():
+            if fid:
+                cases.append(([o for o in everyone if o not in members], members))
+    involved = {o for c, g in cases for o in c + g}
+    pairs = sum(len(c) * len(g) for c, g in cases)
+    print(f"{conn.execute('SELECT COUNT(*) FROM officer_relations').fetchone()[0]:,} relations, "
+          f"{len(cases)} groups, {pairs:,} pair lookups per pass")
+
+    start = time.perf_counter()
+    expected = [[avg_relation_sql(conn, o, g) for o in c] for c, g in cases]
+    per_pair = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store = RelationStore.load(conn, involved)
+    loaded = time.perf_counter()
+    actual = [store.group_affinity(c, g).tolist() for c, g in cases]
+    done = time.perf_counter()
+    print(f"Per-pair queries {per_pair * 1000:.1f}ms; store load {(loaded - start) * 1000:.1f}ms "
+          f"({len(store):,} pairs) + group averages {(done - loaded) * 1000:.1f}ms")
+    if expected != actual:
+        print("MISMATCH in group averages")
+        sys.exit(1)
+
+    # Changes: random modifies (some creating new pairs), one decay step, one UPSERT batch
+    ids = sorted(involved)
+    truth = {}
+    for _ in range(2000):
+        a, b = rng.sample(ids, 2) if len(ids) > 1 else (ids[0], ids[0])
+        truth[pair_key(a, b)] = store.modify(a, b, rng.randint(-30, 30))
+    decayed = store.decay(5)
+    check = [(a, b) for a, b in list(truth)[:500]]
+    expected_after = [store.get(a, b) for a, b in check]
+    start = time.perf_counter()
+    written = store.save(conn)
+    saved = time.perf_counter() - start
+    if [get_relation_sql(conn, a, b) for a, b in check] != expected_after:
+        print("MISMATCH after save")
+        sys.exit(1)
+    fresh = RelationStore.load(conn, involved)
+    if [fresh.get(a, b) for a, b in check] != expected_after or \
+            fresh.group_affinity(cases[0][0], cases[0][1]).tolist() != store.group_affinity(cases[0][0], cases[0][1]).tolist():
+        print("MISMATCH after reload")
+        sys.exit(1)
+    print(f"{decayed:,} pairs decayed; {written:,} rows written in one UPSERT batch in {saved * 1000:.1f}ms")
+    print("Store matches per-pair queries.")
+
+
+if __name__ == "__main__":
+    main()
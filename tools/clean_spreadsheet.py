@@ -1,10 +1,102 @@
 import pandas as pd
 import openpyxl
 import re
+import time
+import argparse
+import tracemalloc
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
 
 INPUT_FILE = 'TreeKingdoms.xlsx'
 OUTPUT_FILE = 'TreeKingdoms_Cleaned.xlsx'
 
+# Name Mapping (detected table title -> cleaned sheet name)
+NAME_MAP = {
+    'UnitStats': 'Unit Stats',
+    'UnitBehaviorStates': 'Unit Behavior',
+    'OfficerTypes': 'Officers',
+    'SupplySources': 'Logistics',
+    'MoraleStates': 'Morale States',
+    'ControlPointAdjacency': 'CP Adjacency',
+    'ControlPointStatus': 'CP Status',
+    'CaptureRules': 'Capture Rules',
+    'ZonePressure': 'Zone Pressure',
+    'HQRules': 'HQ Rules',
+    'BattleVisibility': 'Battle Visibility',
+    'BattleEndConditions': 'End Conditions',
+    'EngagementStates': 'Engagement States',
+    'EngagementParticipants': 'Combat Participants',
+    'DisengagementRules': 'Disengagement Rules',
+    'CasualtyConversion': 'Casualty Rules',
+    'CombatOutcomes': 'Combat Outcomes',
+    'PursuitRules': 'Pursuit Rules',
+    'CombatPhases': 'Combat Phases',
+    'Units': 'Unit Definitions',
+    'BattleMaps': 'Control Points'
+}
+
+def _is_blank(val):
+    # Empty cells are None (openpyxl) or NaN (pandas)
+    return val is None or str(val).strip() == "" or str(val).strip().lower() == 'nan'
+
+def _is_header_row(values):
+    row_str = " ".join(str(v) for v in values)
+    return "Column Name" in row_str and "Type" in row_str
+
+def _detect_title(first_col, row_idx):
+    """Table name from the first-column text above a header row (see extract_tables)."""
+    def find_block_above(start_k):
+        # 1. Skip empty lines going up
+        k = start_k
+        while k >= 0 and _is_blank(first_col[k]):
+            k -= 1
+        if k < 0: return None, -1
+
+        # 2. Find top of this block
+        top = k
+        while top >= 0:
+            if _is_blank(first_col[top]):
+                top += 1
+                break
+            top -= 1
+        if top < 0: top = 0
+
+        # Return content of the FIRST line of this block, and the new scan position (top-1)
+        return str(first_col[top]).strip(), top - 1
+
+    title = f"Table_{row_idx}"
+    block1_text, next_scan = find_block_above(row_idx - 1)
+    if block1_text:
+        is_desc = len(block1_text) > 40 or block1_text.startswith("Defines ") or block1_text.startswith("Tracks ") or block1_text.endswith(".")
+        if is_desc:
+            # Description block: the title is the block above it, if any
+            block2_text, _ = find_block_above(next_scan)
+            title = block2_text if block2_text else block1_text
+        else:
+            title = block1_text
+    return title
+
+def _sheet_name(name):
+    """Cleaned sheet name for a table title: mapped, stripped of invalid chars, max 31 chars."""
+    sheet_name = name
+    if '(' in sheet_name:
+        sheet_name = sheet_name.split('(')[0].strip()
+
+    best_match = None
+    for key, val in NAME_MAP.items():
+        if key == sheet_name:
+            best_match = val
+            break
+        if key in sheet_name and not best_match:
+            best_match = val
+    if best_match:
+        sheet_name = best_match
+
+    invalid_chars = '[]:*?/\\'
+    for c in invalid_chars:
+        sheet_name = sheet_name.replace(c, '')
+    return sheet_name[:31]
+
 def extract_tables(file_path):
     print(f"Reading {file_path}...")
     xl = pd.ExcelFile(file_path)
@@ -19,7 +111,7 @@ def extract_tables(file_path):
         while row_idx < len(df):
             row = df.iloc[row_idx]
             # Convert to string and check for header
-            row_str = " ".join(row.astype(str).values)
+            row_str = " ".join(str(v) for v in row.values)
             
             if "Column Name" in row_str and "Type" in row_str:
                 # Found a table header
@@ -30,62 +122,7 @@ def extract_tables(file_path):
                 # Blocks are separated by empty lines.
                 # Block 1 (closest to table) is usually Description.
                 # Block 2 (above Block 1) is usually Title.
-                
-                scan_k = row_idx - 1
-                title = f"Table_{row_idx}"
-                
-                # We attempt to find up to 2 blocks.
-                # If the first block is short / title-like, use it.
-                # If it is long / description-like, look for the block above it.
-                
-                def find_block_above(start_k):
-                    # 1. Skip empty lines going up
-                    k = start_k
-                    while k >= 0:
-                        val = df.iloc[k, 0]
-                        if pd.notna(val) and str(val).strip() != "" and str(val).strip().lower() != 'nan':
-                            break
-                        k -= 1
-                    
-                    if k < 0: return None, -1
-                    
-                    # 2. Find top of this block
-                    bottom = k
-                    top = k
-                    while top >= 0:
-                        val = df.iloc[top, 0]
-                        if pd.isna(val) or str(val).strip() == "" or str(val).strip().lower() == 'nan':
-                            top += 1
-                            break
-                        top -= 1
-                    if top < 0: top = 0
-                    
-                    # Return content of the FIRST line of this block, and the new scan position (top-1)
-                    val = df.iloc[top, 0]
-                    return str(val).strip(), top - 1
-
-                # Try finding first block
-                block1_text, next_scan = find_block_above(scan_k)
-                if block1_text:
-                    # Check if Description-like
-                    is_desc = False
-                    if len(block1_text) > 40 or block1_text.startswith("Defines ") or block1_text.startswith("Tracks ") or block1_text.endswith("."):
-                        is_desc = True
-                    
-                    if is_desc:
-                        # Look for block above
-                        block2_text, _ = find_block_above(next_scan)
-                        if block2_text:
-                            title = block2_text
-                        else:
-                            # Fallback: maybe the description is all we have? 
-                            # But prefer mapped name using the Description start?
-                            title = block1_text 
-                    else:
-                        title = block1_text
-
-
-
+                title = _detect_title(df.iloc[:, 0].tolist(), row_idx)
 
                 print(f"    Title detected: {title}")
 
@@ -99,7 +136,7 @@ def extract_tables(file_path):
                 
                 while r_scan < len(df):
                     scan_row = df.iloc[r_scan]
-                    scan_str = " ".join(scan_row.astype(str).values)
+                    scan_str = " ".join(str(v) for v in scan_row.values)
                     
                     # Stop if next header found
                     if "Column Name" in scan_str and "Type" in scan_str:
@@ -154,58 +191,14 @@ def clean_and_save(tables):
     elif unit_types_key:
         merged_units = tables.pop(unit_types_key)
 
-    # Name Mapping
-    name_map = {
-        'UnitStats': 'Unit Stats',
-        'UnitBehaviorStates': 'Unit Behavior',
-        'OfficerTypes': 'Officers',
-        'SupplySources': 'Logistics',
-        'MoraleStates': 'Morale States',
-        'ControlPointAdjacency': 'CP Adjacency',
-        'ControlPointStatus': 'CP Status',
-        'CaptureRules': 'Capture Rules',
-        'ZonePressure': 'Zone Pressure',
-        'HQRules': 'HQ Rules',
-        'BattleVisibility': 'Battle Visibility',
-        'BattleEndConditions': 'End Conditions',
-        'EngagementStates': 'Engagement States',
-        'EngagementParticipants': 'Combat Participants',
-        'DisengagementRules': 'Disengagement Rules',
-        'CasualtyConversion': 'Casualty Rules',
-        'CombatOutcomes': 'Combat Outcomes',
-        'PursuitRules': 'Pursuit Rules',
-        'CombatPhases': 'Combat Phases',
-        'Units': 'Unit Definitions',
-        'BattleMaps': 'Control Points'
-    }
-
     print(f"Writing to {OUTPUT_FILE}...")
     with pd.ExcelWriter(OUTPUT_FILE, engine='openpyxl') as writer:
         if not merged_units.empty:
             merged_units.to_excel(writer, sheet_name='Unit Definitions', index=False)
             
         for name, df in tables.items():
-            sheet_name = name
-            
-            if '(' in sheet_name:
-                sheet_name = sheet_name.split('(')[0].strip()
-                
-            best_match = None
-            for key, val in name_map.items():
-                if key == sheet_name:
-                    best_match = val
-                    break
-                if key in sheet_name and not best_match:
-                    best_match = val
-            
-            if best_match:
-                sheet_name = best_match
-            
-            invalid_chars = '[]:*?/\\'
-            for c in invalid_chars:
-                sheet_name = sheet_name.replace(c, '')
-            sheet_name = sheet_name[:31]
-            
+            sheet_name = _sheet_name(name)
+
             try:
                 df.to_excel(writer, sheet_name=sheet_name, index=False)
                 print(f"  Saved sheet: {sheet_name}")
@@ -214,7 +207,148 @@ def clean_and_save(tables):
                 df.to_excel(writer, sheet_name=alt_name, index=False)
                 print(f"  Saved sheet: {alt_name} (renamed from {sheet_name})")
 
+# --- Streaming mode ---
+# extract_tables() parses whole sheets into DataFrames and stringifies every row
+# twice. The streaming path reads rows with openpyxl read_only/values_only, checks
+# each row for a header once, keeps only the first column for title lookback, and
+# yields one table at a time; clean_and_save_streaming() writes each table into a
+# write-only workbook as soon as it arrives.
+
+def _finish_table(title, header, rows):
+    """Trims a streamed table to its widest non-empty cell and drops empty rows."""
+    rows = [r for r in rows if not all(_is_blank(v) for v in r)]
+    width = 0
+    for r in [header] + rows:
+        for i in range(len(r) - 1, -1, -1):
+            if not _is_blank(r[i]):
+                width = max(width, i + 1)
+                break
+    header = list(header[:width]) + [None] * (width - len(header))
+    header = [str(h) if not _is_blank(h) else f"Unnamed_{i}" for i, h in enumerate(header)]
+    rows = [tuple(r[:width]) + (None,) * (width - len(r)) for r in rows]
+    return title, header, rows
+
+def iter_tables(file_path, stats=None):
+    """Yields (title, header, rows) per table, one sheet row at a time.
+
+    If `stats` is a list, a (sheet, tables, seconds, peak_bytes) tuple is appended
+    per sheet; peak memory needs tracemalloc to be running.
+    """
+    print(f"Reading {file_path} (streaming)...")
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            print(f"Parsing sheet: {ws.title}")
+            start = time.perf_counter()
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            count = 0
+            first_col = []  # Title lookback only needs column A
+            current = None
+            for row_idx, values in enumerate(ws.iter_rows(values_only=True)):
+                first_col.append(values[0] if values else None)
+                if _is_header_row(values):
+                    if current:
+                        count += 1
+                        yield _finish_table(*current)
+                    print(f"  Found table header at row {row_idx}")
+                    # Nothing above a first-row header (e.g. an already-cleaned workbook): use the sheet name
+                    title = _detect_title(first_col, row_idx) if row_idx else ws.title
+                    print(f"    Title detected: {title}")
+                    current = (title, values, [])
+                elif current:
+                    current[2].append(values)
+            if current:
+                count += 1
+                yield _finish_table(*current)
+            if stats is not None:
+                peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+                stats.append((ws.title, count, time.perf_counter() - start, peak))
+    finally:
+        wb.close()
+
+def _merge_unit_tables(units, unit_types):
+    """Units + UnitTypes as one table, deduplicated on the 'Column Name' column."""
+    tables = [t for t in (units, unit_types) if t]
+    if len(tables) == 1:
+        return tables[0]
+    header = list(units[0]) + [h for h in unit_types[0] if h not in units[0]]
+    rows = [tuple(dict(zip(h, r)).get(c) for c in header) for h, rs in tables for r in rs]
+    key_cols = [i for i, c in enumerate(header) if 'Column Name' in c]
+    if key_cols:
+        seen, unique = set(), []
+        for r in rows:
+            if r[key_cols[0]] not in seen:
+                seen.add(r[key_cols[0]])
+                unique.append(r)
+        rows = unique
+    return header, rows
+
+def clean_and_save_streaming(tables, output_file=OUTPUT_FILE):
+    """Writes tables from iter_tables() incrementally; only the unit tables are held back to merge."""
+    print(f"Writing to {output_file}...")
+    wb = openpyxl.Workbook(write_only=True)
+    bold = Font(bold=True)
+    # Reserved first, filled once both unit tables have been seen
+    units_ws = wb.create_sheet('Unit Definitions')
+    used = {'Unit Definitions'}
+    units = unit_types = None
+
+    def write(ws, header, rows):
+        cells = []
+        for h in header:
+            cell = WriteOnlyCell(ws, value=h)
+            cell.font = bold
+            cells.append(cell)
+        ws.append(cells)
+        for r in rows:
+            ws.append(r)
+
+    for title, header, rows in tables:
+        if title == 'Units':
+            units = (header, rows)
+            continue
+        if 'UnitTypes' in title:
+            unit_types = (header, rows)
+            continue
+        if not rows:
+            continue
+        sheet_name = _sheet_name(title)
+        if sheet_name in used:
+            alt_name = sheet_name[:28] + "_1"
+            print(f"  Saved sheet: {alt_name} (renamed from {sheet_name})")
+            sheet_name = alt_name
+        else:
+            print(f"  Saved sheet: {sheet_name}")
+        used.add(sheet_name)
+        write(wb.create_sheet(sheet_name), header, rows)
+
+    if units and unit_types:
+        print("  Merging 'Units' and 'UnitTypes'...")
+    merged = _merge_unit_tables(units, unit_types) if units or unit_types else None
+    if merged and merged[1]:
+        write(units_ws, *merged)
+    else:
+        wb.remove(units_ws)
+    wb.save(output_file)
+
 if __name__ == "__main__":
-    tables = extract_tables(INPUT_FILE)
-    clean_and_save(tables)
+    parser = argparse.ArgumentParser(description="Split the design workbook into one sheet per table.")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--stream", action="store_true", help="Stream rows with openpyxl and report time/peak memory per sheet")
+    args = parser.parse_args()
+
+    if args.stream:
+        stats = []
+        tracemalloc.start()
+        clean_and_save_streaming(iter_tables(args.input, stats), args.output)
+        tracemalloc.stop()
+        print("Per-sheet stats (parse + write):")
+        for sheet, count, seconds, peak in stats:
+            print(f"  {sheet:<20} {count:3d} tables {seconds * 1000:8.1f}ms  peak {peak / 1024:8.1f} KiB")
+    else:
+        OUTPUT_FILE = args.output
+        tables = extract_tables(args.input)
+        clean_and_save(tables)
     print("Done processing.")
@@ -0,0 +1,70 @@
+import sys
+import os
+import io
+import time
+import sqlite3
+import argparse
+import contextlib
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.database.db_manager import DB_PATH
+from src.database.design_tables import ensure_meta_tables, parse_columns, table_name_for, compile_table
+from tools.clean_spreadsheet import INPUT_FILE, iter_tables
+
+# Compiles every table of the design workbook into a typed design_* SQLite table
+# (see src/database/design_tables.py). Tables whose spec is unchanged since the last
+# build are skipped by content hash. Run from the project root:
+#   python tools/compile_design.py --input TreeKingdoms.xlsx --db tree_kingdoms.db
+
+
+def compile_workbook(input_file, conn, verbose=False):
+    """Returns {table_name: status} for every table in the workbook."""
+    ensure_meta_tables(conn)
+    results = {}
+    quiet = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        tables = list(iter_tables(input_file))
+    with conn:  # One transaction for the whole build
+        for title, header, rows in tables:
+            name = table_name_for(title)
+            if name in results:
+                # Two workbook tables with the same name: keep both
+                n = 2
+                while f"{name}_{n}" in results:
+                    n += 1
+                name = f"{name}_{n}"
+            results[name] = compile_table(conn, title, parse_columns(rows), name)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the design workbook into typed SQLite lookup tables.")
+    parser.add_argument("--input", default=INPUT_FILE, help="Design workbook (raw or cleaned)")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite file to write design_* tables into")
+    parser.add_argument("--verbose", action="store_true", help="Show the table detection log")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    conn = sqlite3.connect(args.db)
+    try:
+        results = compile_workbook(args.input, conn, args.verbose)
+        known = [r[0] for r in conn.execute("SELECT table_name FROM design_tables ORDER BY table_name")]
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - start
+
+    for name, status in results.items():
+        if status != "unchanged":
+            print(f"  {status:<9} {name}")
+    counts = {s: sum(1 for v in results.values() if v == s) for s in ("compiled", "unchanged", "empty")}
+    print(f"{len(results)} tables in {elapsed:.2f}s: {counts['compiled']} compiled, "
+          f"{counts['unchanged']} unchanged, {counts['empty']} empty")
+    stale = [n for n in known if n not in results]
+    if stale:
+        print(f"Not in the workbook any more (left in place): {', '.join(stale)}")
+
+
+if __name__ == "__main__":
+    main()
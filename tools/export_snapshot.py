@@ -0,0 +1,78 @@
+import sys
+import os
+import time
+import sqlite3
+import argparse
+
+import numpy as np
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.database.db_manager import DB_PATH
+from src.database.snapshots import SNAPSHOT_TABLES, FORMATS, SnapshotWriter, read_columns, default_format
+
+# Dumps the world tables to per-day columnar files (src/database/snapshots.py).
+# The database is opened read-only and read in one transaction. --verify reads every
+# file back and compares it with the database. Run from the project root:
+#   python tools/export_snapshot.py --db tree_kingdoms.db --out snapshots --verify
+# Daily snapshots during a run: python tools/simulate.py --days 360 --snapshot-dir snapshots
+
+
+def verify(conn, paths):
+    """Row counts and every value, file against database. Returns the number of mismatching columns."""
+    bad = 0
+    for table, path in paths.items():
+        cursor = conn.execute(f"SELECT * FROM {table}")
+        names = [d[0] for d in cursor.description]
+        rows = cursor.fetchall()
+        columns = read_columns(path)
+        for i, name in enumerate(names):
+            stored = columns[name]
+            mask = np.ma.getmaskarray(stored)
+            data = np.ma.getdata(stored)
+            expected = [r[i] for r in rows]
+            got = [None if m else (v.item() if hasattr(v, "item") else v) for v, m in zip(data, mask)]
+            if len(expected) != len(got) or any(
+                    (e is None) != (g is None) or (e is not None and (str(e) != str(g) if isinstance(g, str) else e != g))
+                    for e, g in zip(expected, got)):
+                print(f"  MISMATCH {table}.{name}")
+                bad += 1
+    return bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a read-only columnar snapshot of the world tables.")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite file to read (opened read-only)")
+    parser.add_argument("--out", default=os.path.join(os.path.dirname(DB_PATH), "snapshots"))
+    parser.add_argument("--format", choices=FORMATS, default=default_format())
+    parser.add_argument("--tables", nargs="+", default=SNAPSHOT_TABLES)
+    parser.add_argument("--verify", action="store_true", help="Read the files back and compare with the database")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"ERROR: Database not found at {args.db}")
+        sys.exit(1)
+    conn = sqlite3.connect(f"file:{os.path.abspath(args.db)}?mode=ro", uri=True)
+    try:
+        writer = SnapshotWriter(args.out, args.tables, args.format)
+        start = time.perf_counter()
+        paths = writer.write(conn)
+        elapsed = time.perf_counter() - start
+        print(f"Wrote {len(paths)} {args.format} files to {args.out} in {elapsed * 1000:.1f}ms:")
+        for table, path in paths.items():
+            print(f"  {os.path.basename(path):<40} {os.path.getsize(path):>12,} bytes")
+
+        if args.verify:
+            start = time.perf_counter()
+            bad = verify(conn, paths)
+            print(f"Verified against the database in {(time.perf_counter() - start) * 1000:.1f}ms: "
+                  f"{bad} mismatching columns")
+            if bad:
+                sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
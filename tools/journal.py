@@ -0,0 +1,216 @@
+import sys
+import os
+import time
+import sqlite3
+import argparse
+import tempfile
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.database.db_manager import DB_PATH
+from src.simulation.journal import (BASE_NAME, CHECKPOINT, CHECKPOINTS_NAME, DAY, DIGEST, EVENT_NAMES, EVENTS_NAME,
+                                    JournalReader, digest_of, load_state, read_rows, record)
+from src.simulation.tournament import serialize_seeded
+from src.simulation.turn_simulator import TurnSimulator
+from tools.seed_db import seed_bulk
+
+# Records and inspects campaign event journals (src/simulation/journal.py).
+#   --record DIR    simulate --days from --db (never modified) and journal every day
+#   --show DAY      list a day's events (without DAY: events per day)
+#   --replay DAY    rebuild the state at the end of DAY into --out
+#   --repro DAY     rebuild the day before, re-simulate DAY from its journaled RNG
+#                   state and compare with the journal
+#   --bench         record on a copy and compare with a full DB copy per day: disk
+#                   use, recording cost (without digests) and time to rebuild a day;
+#                   a second recording with digests checks every day. With --cities
+#                   the campaign runs on a seed_bulk() world instead of --db
+# Run from the project root:
+#   python tools/journal.py --record journals/seed1 --days 120 --seed 1
+#   python tools/journal.py --dir journals/seed1 --show 17
+#   python tools/journal.py --dir journals/seed1 --repro 17
+#   python tools/journal.py --bench --days 120 --seed 1
+#   python tools/journal.py --bench --days 30 --seed 1 --cities 500 --officers 5000
+
+
+def simulator(args):
+    if args.cities:
+        if args.world is None:
+            args.world = serialize_seeded(seed_bulk, num_cities=args.cities, num_officers=args.officers,
+                                          num_factions=args.factions, rng_seed=0)
+        return TurnSimulator.from_bytes(args.world, rng_seed=args.seed, batch_battles=args.batch_battles)
+    return TurnSimulator.from_file(args.db, rng_seed=args.seed, batch_battles=args.batch_battles)
+
+
+def show(directory, day):
+    reader = JournalReader(os.path.join(directory, EVENTS_NAME))
+    if day is None:
+        for number, counts in reader.days():
+            print(f"  Day {number:>5}: " + ", ".join(f"{n} {name}" for name, n in sorted(counts.items())))
+        return
+    header, events = reader.day_events(day)
+    if header is None:
+        print(f"Day {day} is not in the journal")
+        sys.exit(1)
+    rows = sum(len(event.get("rowids", (None,))) for kind, event in events if kind != DIGEST)
+    print(f"Day {day}: seed {header['seed']}, initiative {header['turn_queue']}, {rows} events")
+    for kind, event in events:
+        if kind == DIGEST:
+            continue
+        if "rowids" not in event:
+            print(f"  {EVENT_NAMES[kind]:<9} {'':<18} {event}")
+            continue
+        # One line per row of the columnar frame
+        for i, rowid in enumerate(event["rowids"]):
+            detail = {"rowid": rowid}
+            if "column" in event:
+                detail["column"] = event["column"]
+            for key in ("old", "values", "rows"):
+                if key in event:
+                    detail["value" if key == "values" else key] = event[key][i]
+            print(f"  {EVENT_NAMES[kind]:<9} {event['table']:<18} {detail}")
+
+
+def repro(directory, day, args):
+    """True when re-simulating `day` from its journaled start reproduces the journaled end state."""
+    reader = JournalReader(os.path.join(directory, EVENTS_NAME))
+    header, _ = reader.day_events(day)
+    if header is None or header["rng_state"] is None:
+        print(f"Day {day} is not in the journal (or was journaled without its RNG state)")
+        return False
+    before = load_state(directory, day - 1)
+    sim = TurnSimulator.from_bytes(before.serialize(), batch_battles=args.batch_battles)
+    sim.restore_loop_state(header["rng_state"], header["turn_queue"])
+    start = time.perf_counter()
+    sim.step_day()
+    elapsed = time.perf_counter() - start
+    expected = load_state(directory, day)
+    same = all(read_rows(sim.conn, t) == read_rows(expected, t) for t in reader.tables)
+    print(f"Day {day} re-simulated in {elapsed * 1000:.1f}ms: {'identical to' if same else 'DIFFERENT from'} the journal")
+    return same
+
+
+def bench(args):
+    with tempfile.TemporaryDirectory() as directory:
+        journal_dir = os.path.join(directory, "journal")
+        copies_dir = os.path.join(directory, "copies")
+        os.makedirs(copies_dir)
+
+        # Full copy per day: what saving each day's state costs without a journal
+        sim = simulator(args)
+        copy_seconds = 0.0
+        for _ in range(args.days):
+            day = sim.current_day()
+            sim.step_day()
+            start = time.perf_counter()
+            target = sqlite3.connect(os.path.join(copies_dir, f"day{day:05d}.db"))
+            sim.conn.backup(target)
+            target.close()
+            copy_seconds += time.perf_counter() - start
+        copies = sorted(os.listdir(copies_dir))
+        copy_bytes = sum(os.path.getsize(os.path.join(copies_dir, f)) for f in copies)
+
+        sim = simulator(args)
+        plain = sim.run(args.days)["seconds"]
+        sim = simulator(args)
+        start = time.perf_counter()
+        writer = record(sim, journal_dir, args.days, seed=args.seed)
+        journal_seconds = time.perf_counter() - start - plain   # Diffing and writing, without the simulation
+        journal_bytes = sum(os.path.getsize(os.path.join(journal_dir, f)) for f in (BASE_NAME, EVENTS_NAME, CHECKPOINTS_NAME))
+        print(f"{args.days} days ({plain:.2f}s of simulation): "
+              f"{sum(n for k, n in writer.events.items() if k not in (DAY, DIGEST, CHECKPOINT)):,} events in "
+              f"{sum(n for k, n in writer.counts.items() if k not in (DAY, DIGEST, CHECKPOINT)):,} frames, "
+              f"{writer.counts.get(CHECKPOINT, 0)} checkpoints")
+        print(f"  Per-day copies: {copy_bytes / 1e6:8.2f}MB, {copy_seconds * 1000:8.1f}ms to write")
+        print(f"  Journal:        {journal_bytes / 1e6:8.2f}MB, {journal_seconds * 1000:8.1f}ms to record "
+              f"({copy_bytes / journal_bytes:.0f}x smaller)")
+
+        # Rebuilding days: load that day's copy vs replay the journal onto the base
+        reader = JournalReader(os.path.join(journal_dir, EVENTS_NAME))
+        days = [header["day"] for kind, header in reader.frames() if kind == DAY]
+        probes = sorted({days[0], days[len(days) // 2], days[-1]})
+        for day in probes:
+            start = time.perf_counter()
+            conn = sqlite3.connect(":memory:")
+            source = sqlite3.connect(os.path.join(copies_dir, f"day{day:05d}.db"))
+            source.backup(conn)
+            source.close()
+            copy_load = time.perf_counter() - start
+            start = time.perf_counter()
+            load_state(journal_dir, day)
+            replay = time.perf_counter() - start
+            print(f"  Rebuild day {day:>4}: copy {copy_load * 1000:7.1f}ms, journal replay {replay * 1000:7.1f}ms")
+
+        # Every day: the state replayed from the base, and the one rebuilt from the nearest
+        # checkpoint, must both hash to the digest taken while simulating
+        record(simulator(args), journal_dir, args.days, seed=args.seed, digests=True)
+        # A world without a game_state row journals day 1 twice, so digests are matched in
+        # order; load_state(day) stops after the last entry of a day, as `expected` does
+        digests = [e["digest"] for kind, e in reader.frames() if kind == DIGEST]
+        expected = {e["day"]: e["digest"] for kind, e in reader.frames() if kind == DIGEST}
+        conn = sqlite3.connect(":memory:")
+        base = sqlite3.connect(os.path.join(journal_dir, BASE_NAME))
+        base.backup(conn)
+        base.close()
+        bad = [day for day, digest in zip(reader.replay_days(conn), digests)
+               if digest_of({t: read_rows(conn, t) for t in reader.tables}) != digest]
+        bad += [day for day in expected if digest_of({t: read_rows(load_state(journal_dir, day), t)
+                                                      for t in reader.tables}) != expected[day]]
+        print(f"Replayed state matches the simulation on {len(expected) - len(set(bad))}/{len(expected)} days "
+              f"(from the base and from checkpoints)")
+        return not bad and repro(journal_dir, days[len(days) // 2], args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record, inspect and replay campaign event journals.")
+    parser.add_argument("--db", default=DB_PATH, help="Source SQLite file (never modified)")
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--batch-battles", action="store_true", help="Resolve each day's battles in one batch")
+    parser.add_argument("--record", metavar="DIR", help="Simulate and journal into DIR")
+    parser.add_argument("--no-digests", action="store_true", help="Record without per-day state digests")
+    parser.add_argument("--dir", help="Journal directory to inspect")
+    parser.add_argument("--show", type=int, nargs="?", const=-1, default=None, metavar="DAY")
+    parser.add_argument("--replay", type=int, metavar="DAY")
+    parser.add_argument("--out", help="SQLite file --replay writes")
+    parser.add_argument("--repro", type=int, metavar="DAY")
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--cities", type=int, default=0, help="Simulate a seed_bulk() world of this many cities")
+    parser.add_argument("--officers", type=int, default=2000)
+    parser.add_argument("--factions", type=int, default=3)
+    args = parser.parse_args()
+    args.world = None
+
+    if args.bench:
+        if not bench(args):
+            sys.exit(1)
+        return
+    if args.record:
+        sim = simulator(args)
+        start = time.perf_counter()
+        writer = record(sim, args.record, args.days, seed=args.seed, digests=not args.no_digests)
+        size = os.path.getsize(os.path.join(args.record, EVENTS_NAME))
+        print(f"Journaled {args.days} days in {time.perf_counter() - start:.2f}s to {args.record} "
+              f"({size / 1e3:,.0f}KB): " + ", ".join(f"{n:,} {EVENT_NAMES[k]}" for k, n in sorted(writer.events.items())
+                                                   if k in EVENT_NAMES))
+        return
+    if not args.dir:
+        parser.error("--dir is required to inspect a journal")
+    if args.show is not None:
+        show(args.dir, None if args.show < 0 else args.show)
+    if args.replay is not None:
+        if not args.out:
+            parser.error("--replay needs --out")
+        if os.path.exists(args.out):
+            os.remove(args.out)
+        conn = load_state(args.dir, args.replay)
+        target = sqlite3.connect(args.out)
+        conn.backup(target)
+        target.close()
+        print(f"State at the end of day {args.replay} written to {args.out}")
+    if args.repro is not None and not repro(args.dir, args.repro, args):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import sys
+import os
+import time
+import sqlite3
+import argparse
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.database.db_manager import DB_PATH
+from src.database.migrations import MIGRATIONS, LATEST_VERSION, current_version, pending_migrations, migrate
+
+# Brings a save up to the latest schema (see src/database/migrations.py).
+# Run from the project root:
+#   python tools/migrate.py --db tree_kingdoms.db --status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply versioned schema migrations to a Tree Kingdoms database.")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite file to migrate")
+    parser.add_argument("--status", action="store_true", help="Show applied and pending migrations only")
+    parser.add_argument("--dry-run", action="store_true", help="Run against an in-memory copy")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"ERROR: Database not found at {args.db}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(args.db)
+    if args.dry_run:
+        memory = sqlite3.connect(":memory:")
+        conn.backup(memory)
+        conn.close()
+        conn = memory
+    try:
+        version = current_version(conn)
+        pending = pending_migrations(conn)
+        print(f"Schema version {version} of {LATEST_VERSION}; {len(pending)} pending.")
+        if args.status:
+            for number, description, _ in MIGRATIONS:
+                print(f"  [{'x' if number <= version else ' '}] {number:>3} {description}")
+            return
+
+        start = time.perf_counter()
+        applied = migrate(conn, verbose=True)
+        elapsed = time.perf_counter() - start
+        print(f"Applied {len(applied)} migrations in {elapsed * 1000:.1f}ms"
+              f"{' (dry run, nothing written)' if args.dry_run else ''}.")
+
+        start = time.perf_counter()
+        migrate(conn)
+        print(f"Startup check when current: {(time.perf_counter() - start) * 1000:.3f}ms")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
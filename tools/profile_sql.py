@@ -0,0 +1,72 @@
+import sys
+import os
+import argparse
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.database.db_manager import DB_PATH, N_PLUS_ONE_THRESHOLD, QueryProfiler
+from src.simulation.turn_simulator import TurnSimulator, PHASES
+
+# Statement profile of the headless day loop (QueryProfiler in src/database/db_manager.py).
+# Simulates --days on an in-memory copy of --db with every statement recorded under
+# its day phase, then prints each phase's statement count and heaviest shapes and
+# the N+1 candidates: shapes run --threshold or more times in one phase of one day.
+# The unprofiled run time is printed too, so the profiler's own overhead is visible.
+# The full report is written as JSON. Run from the project root:
+#   python tools/profile_sql.py --days 30 --seed 1
+#   python tools/profile_sql.py --days 30 --seed 1 --per-officer --out sql_profile.json
+
+
+def shorten(shape, width=96):
+    return shape if len(shape) <= width else shape[:width - 3] + "..."
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the SQL the day loop issues, per phase.")
+    parser.add_argument("--db", default=DB_PATH, help="Source SQLite file (never modified)")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--batch-battles", action="store_true")
+    parser.add_argument("--per-officer", action="store_true", help="Officer phase one UPDATE at a time")
+    parser.add_argument("--threshold", type=int, default=N_PLUS_ONE_THRESHOLD,
+                        help="Runs of one shape in one phase block that flag an N+1 candidate")
+    parser.add_argument("--top", type=int, default=5, help="Shapes listed per phase")
+    parser.add_argument("--out", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"ERROR: Database not found at {args.db}")
+        sys.exit(1)
+    options = {"batch_battles": args.batch_battles, "batch_officers": not args.per_officer}
+    plain = TurnSimulator.from_file(args.db, rng_seed=args.seed, **options).run(args.days)["seconds"]
+    profiler = QueryProfiler(args.threshold)
+    sim = TurnSimulator.from_file(args.db, rng_seed=args.seed, profiler=profiler, **options)
+    profiler.reset()                 # setup (migrations, route table) is not part of a day
+    profiled = sim.run(args.days)["seconds"]
+    report = profiler.report()
+
+    total = sum(p["statements"] for p in report["phases"].values())
+    print(f"{args.days} days: {total:,} statements ({total / args.days:,.0f} per day); "
+          f"{plain:.2f}s unprofiled, {profiled:.2f}s profiled")
+    for name in [p for p in PHASES if p in report["phases"]] + [p for p in report["phases"] if p not in PHASES]:
+        phase = report["phases"][name]
+        print(f"  {name:<15} {phase['statements']:>9,} statements {phase['seconds'] * 1000:>10,.1f}ms "
+              f"{len(phase['shapes']):>4} shapes")
+        for shape in phase["shapes"][:args.top]:
+            print(f"      {shape['count']:>8,}x {shape['total_ms'] or 0:>9,.1f}ms  p95 {shape['p95_ms'] or 0:7.3f}ms "
+                  f"{shape['rows']:>9,} rows  {shorten(shape['shape'])}")
+    if report["n_plus_one"]:
+        print(f"N+1 candidates ({args.threshold}+ runs of one shape in one phase of a day):")
+        for c in report["n_plus_one"]:
+            print(f"  {c['phase']:<15} {c['count']:>8,}x in {c['blocks']:>4} days (max {c['max_per_block']:,}/day)  "
+                  f"{shorten(c['shape'], 80)}")
+    else:
+        print("No N+1 candidates")
+    if args.out:
+        profiler.dump(args.out)
+        print(f"Report written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
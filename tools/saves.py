@@ -0,0 +1,174 @@
+import sys
+import os
+import time
+import hashlib
+import sqlite3
+import argparse
+import tempfile
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.database.db_manager import DB_PATH, DatabaseManager
+from src.database.saves import SAVE_DIR, SAVE_TABLES, SaveManager, read_state
+from src.simulation.tournament import serialize_seeded
+from src.simulation.turn_simulator import TurnSimulator
+from tools.seed_db import seed_bulk
+
+# Save slots of the live database (src/database/saves.py).
+#   --list / --save SLOT / --load SLOT / --delete SLOT   manage --saves for --db
+#   --bench   simulate a copy of --db (or a seed_bulk() world with --cities) and
+#             save a slot every --every days two ways: a full copy of the database
+#             per slot, and SaveManager's base + compressed diffs. Reports save and
+#             load time and disk use; every loaded slot must match the saved state.
+# Run from the project root:
+#   python tools/saves.py --save autosave
+#   python tools/saves.py --list
+#   python tools/saves.py --bench --days 120 --every 10
+#   python tools/saves.py --bench --cities 500 --officers 5000 --days 60 --every 5
+
+
+def fingerprint(conn, tables):
+    columns, rows = read_state(conn, tables)
+    return hashlib.sha1(repr((columns, sorted((t, sorted(r.items())) for t, r in rows.items()))).encode()).digest()
+
+
+def full_copy(conn, path):
+    target = sqlite3.connect(path)
+    try:
+        conn.backup(target)
+    finally:
+        target.close()
+
+
+def bench(args):
+    if args.cities:
+        world = serialize_seeded(seed_bulk, num_cities=args.cities, num_officers=args.officers,
+                                 num_factions=args.factions, rng_seed=0)
+        sim = TurnSimulator.from_bytes(world, rng_seed=args.seed)
+        label = f"bulk world ({args.cities} cities, {args.officers} officers)"
+    else:
+        sim = TurnSimulator.from_file(args.db, rng_seed=args.seed)
+        label = os.path.basename(args.db)
+    conn = sim.conn
+    conn.commit()
+
+    with tempfile.TemporaryDirectory() as directory:
+        copies_dir = os.path.join(directory, "copies")
+        os.makedirs(copies_dir)
+        saves = SaveManager(sim.manager, os.path.join(directory, "saves"), pages=args.pages)
+
+        # Base save in steps: the longest step is the longest the game is held up
+        steps = []
+        last = [time.perf_counter()]
+
+        def progress(remaining, total):
+            now = time.perf_counter()
+            steps.append(now - last[0])
+            last[0] = now
+
+        start = time.perf_counter()
+        saves.take_base(progress)
+        base_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        full_copy(conn, os.path.join(directory, "one_copy.db"))
+        one_copy = time.perf_counter() - start
+        print(f"{label}: base save {base_seconds * 1000:.1f}ms in {len(steps)} steps of {args.pages} pages "
+              f"(longest {max(steps) * 1000:.1f}ms), one-shot copy {one_copy * 1000:.1f}ms")
+
+        expected = {}
+        copy_save = diff_save = 0.0
+        for number in range(1, args.days // args.every + 1):
+            sim.run(args.every)
+            conn.commit()
+            slot = f"day{sim.current_day() - 1:05d}"
+            expected[slot] = fingerprint(conn, SAVE_TABLES)
+            start = time.perf_counter()
+            full_copy(conn, os.path.join(copies_dir, slot + ".db"))
+            copy_save += time.perf_counter() - start
+            diff_save += saves.save(slot)["seconds"]
+        count = len(expected)
+        copy_bytes = sum(os.path.getsize(os.path.join(copies_dir, f)) for f in os.listdir(copies_dir))
+        print(f"{count} saves over {args.days} days:")
+        print(f"  Full copies:   {copy_bytes / 1e6:8.2f}MB, {copy_save / count * 1000:7.1f}ms per save")
+        print(f"  Base + diffs:  {saves.disk_usage() / 1e6:8.2f}MB, {diff_save / count * 1000:7.1f}ms per save "
+              f"({len(saves.bases())} base(s), {copy_bytes / saves.disk_usage():.1f}x smaller)")
+
+        # Load every slot both ways into the running database and compare with what was saved
+        copy_load = diff_load = 0.0
+        bad = []
+        for slot in expected:
+            start = time.perf_counter()
+            source = sqlite3.connect(os.path.join(copies_dir, slot + ".db"))
+            source.backup(conn)
+            source.close()
+            copy_load += time.perf_counter() - start
+            if fingerprint(conn, SAVE_TABLES) != expected[slot]:
+                bad.append(f"{slot} (copy)")
+        for slot in reversed(list(expected)):
+            start = time.perf_counter()
+            saves.load(slot)
+            diff_load += time.perf_counter() - start
+            if fingerprint(conn, SAVE_TABLES) != expected[slot]:
+                bad.append(slot)
+        print(f"  Load: full copy {copy_load / count * 1000:.1f}ms, base + diff {diff_load / count * 1000:.1f}ms per slot")
+        print(f"Loaded state matches the saved state for {count - sum(1 for b in bad if '(' not in b)}/{count} slots"
+              + (f"; DIFFERENT: {', '.join(bad)}" if bad else ""))
+        return not bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage and benchmark incremental save slots.")
+    parser.add_argument("--db", default=DB_PATH, help="Database to save / load")
+    parser.add_argument("--saves", default=SAVE_DIR, help="Save directory")
+    parser.add_argument("--list", action="store_true")
+    parser.add_argument("--save", metavar="SLOT")
+    parser.add_argument("--load", metavar="SLOT", help="Restore SLOT into --db (overwrites its state)")
+    parser.add_argument("--delete", metavar="SLOT")
+    parser.add_argument("--base", action="store_true", help="Take a new full base save first")
+    parser.add_argument("--pages", type=int, default=256, help="Backup pages per step")
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--every", type=int, default=10, help="Days between bench saves")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--cities", type=int, default=0, help="Bench on a seed_bulk() world of this many cities")
+    parser.add_argument("--officers", type=int, default=2000)
+    parser.add_argument("--factions", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.bench:
+        if not bench(args):
+            sys.exit(1)
+        return
+    if not os.path.exists(args.db):
+        print(f"ERROR: Database not found at {args.db}")
+        sys.exit(1)
+    saves = SaveManager(DatabaseManager(f"sqlite:///{args.db}"), args.saves, pages=args.pages)
+    try:
+        if args.base:
+            start = time.perf_counter()
+            print(f"New base {saves.take_base()} in {(time.perf_counter() - start) * 1000:.1f}ms")
+        if args.save:
+            info = saves.save(args.save)
+            print(f"Saved day {info['day']} to slot {args.save}: {info['rows']} changed rows, "
+                  f"{info['bytes'] / 1e3:.1f}KB on {info['base']}, {info['seconds'] * 1000:.1f}ms")
+        if args.load:
+            start = time.perf_counter()
+            day = saves.load(args.load)
+            print(f"Loaded slot {args.load} (day {day}) in {(time.perf_counter() - start) * 1000:.1f}ms")
+        if args.delete:
+            saves.delete(args.delete)
+            print(f"Deleted slot {args.delete}")
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    if args.list or not (args.base or args.save or args.load or args.delete):
+        for info in saves.slots():
+            saved = time.strftime("%Y-%m-%d %H:%M", time.localtime(info["saved_at"]))
+            print(f"  {info['slot']:<20} day {info['day']:>5}  {saved}  {info['rows']:>6} rows  "
+                  f"{info['bytes'] / 1e3:8.1f}KB  {info['base']}")
+        print(f"{len(saves.bases())} base(s), {saves.disk_usage() / 1e6:.2f}MB in {args.saves}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,149 @@
 import sys
 import os
+import time
+import random
+import argparse
 
 # Ensure src is in path
 sys.path.append(os.getcwd())
 
-from src.database.db_manager import db
-from src.database.models import Faction, UnitType, UnitRole, Officer, City, GameState, FactionRelation, PendingBattle, Route, BattleMapTemplate, BattleNodeTemplate, BattleLinkTemplate
+from sqlalchemy import insert
+from src.database.db_manager import db, DatabaseManager, DATABASE_URL
+from src.database.models import Faction, UnitType, UnitRole, Officer, City, GameState, FactionRelation, OfficerRelation, PendingBattle, Route, BattleMapTemplate, BattleNodeTemplate, BattleLinkTemplate
 
-def seed():
+# --- Shared World Data (used by seed() and seed_bulk()) ---
+
+FACTIONS = [
+    ("Imperial Loyalists", "#0000FF", "Preservation"),
+    ("Separatist Union", "#FF0000", "Independence"),
+    ("People's Coalition", "#00FF00", "Equality"),
+]
+
+UNIT_TYPES = [
+    # Infantry Path
+    dict(name="Militia", role=UnitRole.FRONTLINE, is_default=True,
+         base_health=100, base_attack=10, base_defense=10, description="Basic conscripts."),
+    dict(name="Heavy Infantry", role=UnitRole.FRONTLINE, is_default=False,
+         base_health=140, base_attack=15, base_defense=25, description="Iron-clad footmen. Requires Tech 200."),
+    dict(name="Spear Guard", role=UnitRole.FRONTLINE, is_default=False,
+         base_health=160, base_attack=20, base_defense=30, description="Elite anti-cavalry. Requires Tech 500."),
+
+    # Ranged Path
+    dict(name="Archer", role=UnitRole.RANGED, is_default=True,
+         base_health=80, base_attack=12, base_defense=5, description="Standard bowmen."),
+    dict(name="Crossbowman", role=UnitRole.RANGED, is_default=False,
+         base_health=90, base_attack=25, base_defense=10, description="Piercing damage. Requires Tech 400."),
+
+    # Cavalry Path
+    dict(name="Scout Cavalry", role=UnitRole.CAVALRY, is_default=True,
+         base_health=110, base_attack=18, base_defense=8, base_speed=1.5, description="Fast scouts."),
+    dict(name="Lancer Cavalry", role=UnitRole.CAVALRY, is_default=False,
+         base_health=130, base_attack=25, base_defense=15, base_speed=1.3, description="Shock troops. Requires Tech 300."),
+    dict(name="Heavy Cavalry", role=UnitRole.CAVALRY, is_default=False,
+         base_health=160, base_attack=30, base_defense=30, base_speed=1.1, description="Unstoppable force. Requires Tech 600."),
+
+    # Logistics
+    dict(name="Supply Cart", role=UnitRole.LOGISTICS, is_default=True,
+         base_health=100, base_attack=0, base_defense=0, description="Carries army supplies."),
+]
+
+# The Hebei Map: (name, owning faction index or None, ag, com, tech, defense)
+HEBEI_CITIES = [
+    # HQs
+    ("Sun Capital", 0, 400, 400, 150, 500),
+    ("Ironhold", 1, 200, 200, 300, 600),
+    ("Eldershade", 2, 300, 250, 100, 300),
+
+    # Key Locations
+    ("South Fields", 2, 400, 150, 100, 250),
+    ("Tiger Gate", 0, 50, 100, 200, 800),
+    ("River Port", 0, 200, 500, 150, 200),
+    ("Twin Peaks", 1, 100, 100, 100, 400),
+
+    # Neutral/Contested
+    ("Central Plains", None, 200, 200, 50, 100),
+    ("West Hills", None, 150, 100, 80, 200),
+    ("Eastern Bay", None, 180, 300, 100, 150),
+    ("Mistwood", None, 250, 100, 50, 100),
+]
+
+# Faction index -> HQ city name
+HEBEI_HQS = {0: "Sun Capital", 1: "Ironhold", 2: "Eldershade"}
+
+# (city A, city B, distance, route type, chokepoint) - each becomes a route pair A->B and B->A
+HEBEI_ROUTES = [
+    # North (Ironhold) -> Central (Sun Capital)
+    ("Ironhold", "Twin Peaks", 2.0, "Mountain Pass", True),
+    ("Twin Peaks", "Tiger Gate", 1.5, "Road", False),
+    ("Tiger Gate", "Sun Capital", 1.0, "Highway", False),
+
+    ("Eldershade", "Mistwood", 1.5, "Forest Path", False),
+    ("Eldershade", "South Fields", 1.0, "Road", False), # Corrected to match image
+    ("Eldershade", "River Port", 1.5, "Road", False), # New Connection
+
+    # ("Mistwood", "River Port", 2.0, "River", False), # REMOVED: Per User Request
+    ("Mistwood", "South Fields", 2.0, "Road", False), # ADDED: Per User Request
+    ("River Port", "Sun Capital", 1.0, "Highway", False),
+
+    # West/East Flanks
+    # ("Ironhold", "West Hills", 3.0, "Mountain Path", False), # REMOVED: Bypassed Twin Peaks
+    ("Twin Peaks", "West Hills", 2.0, "Mountain Path", False), # Added: Logical flow
+    ("West Hills", "Central Plains", 2.0, "Road", False),
+    ("Central Plains", "Sun Capital", 1.0, "Road", False),
+
+    ("Sun Capital", "Eastern Bay", 2.0, "Road", False),
+    ("Eastern Bay", "River Port", 1.5, "Coast", False),
+]
+
+# Standard Plains battle template (Simple 2 Lane MOBA-ish structure)
+# Attackers Left, Defenders Right
+PLAINS_TEMPLATE = dict(name="Standard Plains", terrain_type="Plains", map_type="Open Field")
+PLAINS_NODES = [
+    # Left Side (Attacker)
+    ("p_hq_blue", dict(name="Blue HQ", x=0, y=50, node_type="HQ", is_attacker_spawn=True)),
+    ("p_cp_b1", dict(name="Forward Camp", x=20, y=50, node_type="Depot")),
+
+    # Center
+    ("p_mid", dict(name="Central Field", x=50, y=50, node_type="Standard")),
+    ("p_top", dict(name="North Ridge", x=50, y=80, node_type="Tower")),
+    ("p_bot", dict(name="South Creek", x=50, y=20, node_type="Standard")),
+
+    # Right Side (Defender)
+    ("p_cp_r1", dict(name="Outer Guard", x=80, y=50, node_type="Depot")),
+    ("p_hq_red", dict(name="Red HQ", x=100, y=50, node_type="HQ", is_defender_spawn=True)),
+]
+PLAINS_LINKS = [
+    # Mid Lane
+    ("p_hq_blue", "p_cp_b1"),
+    ("p_cp_b1", "p_mid"),
+    ("p_mid", "p_cp_r1"),
+    ("p_cp_r1", "p_hq_red"),
+
+    # Flanks
+    ("p_cp_b1", "p_top"),
+    ("p_top", "p_cp_r1"),
+
+    ("p_cp_b1", "p_bot"),
+    ("p_bot", "p_cp_r1"),
+]
+
+ROTTK_NAMES = [
+    "Cao Cao", "Liu Bei", "Sun Quan", "Lu Bu", "Guan Yu", "Zhang Fei", "Zhao Yun", "Zhuge Liang",
+    "Zhou Yu", "Sima Yi", "Yuan Shao", "Dong Zhuo", "Ma Chao", "Huang Zhong", "Sun Ce", "Taishi Ci",
+    "Lu Meng", "Lu Su", "Guo Jia", "Xun Yu", "Xiahou Dun", "Xiahou Yuan", "Zhang Liao", "Xu Huang",
+    "Dian Wei", "Pang Tong", "Wei Yan", "Jiang Wei", "Deng Ai", "Zhong Hui"
+]
+
+def seed(manager=None):
+    manager = manager or db
     print("Initializing Database...")
-    db.init_db()
-    session = db.get_session()
+    manager.init_db()
+    session = manager.get_session()
     
     # 1. Clear existing data
     print("  Clearing existing data...")
     session.query(PendingBattle).delete()
+    session.query(OfficerRelation).delete()
     session.query(FactionRelation).delete()
     session.query(GameState).delete()
     session.query(Route).delete()
@@ -30,42 +159,14 @@ def seed():
 
     # 2. Create Factions
     print("  Creating Factions...")
-    loyalists = Faction(name="Imperial Loyalists", color="#0000FF", ideology="Preservation")
-    separatists = Faction(name="Separatist Union", color="#FF0000", ideology="Independence")
-    coalition = Faction(name="People's Coalition", color="#00FF00", ideology="Equality")
+    loyalists, separatists, coalition = [Faction(name=n, color=c, ideology=i) for n, c, i in FACTIONS]
     
     session.add_all([loyalists, separatists, coalition])
     session.commit() # Commit to get IDs
 
     # 3. Create Unit Types (Roles & Variants)
     print("  Creating Unit Types...")
-    units = [
-        # Infantry Path
-        UnitType(name="Militia", role=UnitRole.FRONTLINE, is_default=True, 
-                 base_health=100, base_attack=10, base_defense=10, description="Basic conscripts."),
-        UnitType(name="Heavy Infantry", role=UnitRole.FRONTLINE, is_default=False, 
-                 base_health=140, base_attack=15, base_defense=25, description="Iron-clad footmen. Requires Tech 200."),
-        UnitType(name="Spear Guard", role=UnitRole.FRONTLINE, is_default=False, 
-                 base_health=160, base_attack=20, base_defense=30, description="Elite anti-cavalry. Requires Tech 500."),
-        
-        # Ranged Path
-        UnitType(name="Archer", role=UnitRole.RANGED, is_default=True,
-                 base_health=80, base_attack=12, base_defense=5, description="Standard bowmen."),
-        UnitType(name="Crossbowman", role=UnitRole.RANGED, is_default=False,
-                 base_health=90, base_attack=25, base_defense=10, description="Piercing damage. Requires Tech 400."),
-                 
-        # Cavalry Path
-        UnitType(name="Scout Cavalry", role=UnitRole.CAVALRY, is_default=True,
-                 base_health=110, base_attack=18, base_defense=8, base_speed=1.5, description="Fast scouts."),
-        UnitType(name="Lancer Cavalry", role=UnitRole.CAVALRY, is_default=False,
-                 base_health=130, base_attack=25, base_defense=15, base_speed=1.3, description="Shock troops. Requires Tech 300."),
-        UnitType(name="Heavy Cavalry", role=UnitRole.CAVALRY, is_default=False,
-                 base_health=160, base_attack=30, base_defense=30, base_speed=1.1, description="Unstoppable force. Requires Tech 600."),
-                 
-        # Logistics
-        UnitType(name="Supply Cart", role=UnitRole.LOGISTICS, is_default=True,
-                 base_health=100, base_attack=0, base_defense=0, description="Carries army supplies.")
-    ]
+    units = [UnitType(**u) for u in UNIT_TYPES]
     session.add_all(units)
 
     # 4. Create Cities (The Hebei Map) - BEFORE Officers so we can place them
@@ -79,38 +180,22 @@ def seed():
         cities[name] = c
         return c
 
-    # HQs
-    c_capital = make_city("Sun Capital", loyalists, 400, 400, 150, 500) 
-    c_ironhold = make_city("Ironhold", separatists, 200, 200, 300, 600)  
-    c_eldershade = make_city("Eldershade", coalition, 300, 250, 100, 300)  
-
-    # Key Locations
-    make_city("South Fields", coalition, 400, 150, 100, 250) 
-    make_city("Tiger Gate", loyalists, 50, 100, 200, 800) 
-    make_city("River Port", loyalists, 200, 500, 150, 200) 
-    make_city("Twin Peaks", separatists, 100, 100, 100, 400) 
-    
-    # Neutral/Contested
-    make_city("Central Plains", None, 200, 200, 50, 100)
-    make_city("West Hills", None, 150, 100, 80, 200)
-    make_city("Eastern Bay", None, 180, 300, 100, 150)
-    make_city("Mistwood", None, 250, 100, 50, 100)
+    faction_list = [loyalists, separatists, coalition]
+    for name, f_idx, ag, com, tech, defense in HEBEI_CITIES:
+        make_city(name, faction_list[f_idx] if f_idx is not None else None, ag, com, tech, defense)
+    c_capital = cities[HEBEI_HQS[0]]
+    c_ironhold = cities[HEBEI_HQS[1]]
+    c_eldershade = cities[HEBEI_HQS[2]]
 
     session.commit()
 
     # 5. Create Officers (Procedural Generation)
     print("  Generating Officers...")
-    import random
     
     first_names = ["Caelum", "Thorne", "Elara", "Vael", "Kael", "Lyra", "Roric", "Sylas", "Mara", "Dorn"]
     # last_names = ["Lightbringer", "Ironheart", "Shadowalker", "Oakenshield", "Stormcaller", "Vane", "Blackwood"]
     
-    rottk_names = [
-        "Cao Cao", "Liu Bei", "Sun Quan", "Lu Bu", "Guan Yu", "Zhang Fei", "Zhao Yun", "Zhuge Liang",
-        "Zhou Yu", "Sima Yi", "Yuan Shao", "Dong Zhuo", "Ma Chao", "Huang Zhong", "Sun Ce", "Taishi Ci",
-        "Lu Meng", "Lu Su", "Guo Jia", "Xun Yu", "Xiahou Dun", "Xiahou Yuan", "Zhang Liao", "Xu Huang",
-        "Dian Wei", "Pang Tong", "Wei Yan", "Jiang Wei", "Deng Ai", "Zhong Hui"
-    ]
+    rottk_names = list(ROTTK_NAMES)
     random.shuffle(rottk_names) # Ensure distinct names each run
     
     def get_name():
@@ -226,27 +311,8 @@ def seed():
         session.add(Route(start_city_id=c2.city_id, end_city_id=c1.city_id, distance=dist, route_type=rtype, is_chokepoint=choke))
 
 
-    # North (Ironhold) -> Central (Sun Capital)
-    connect("Ironhold", "Twin Peaks", 2.0, "Mountain Pass", True)
-    connect("Twin Peaks", "Tiger Gate", 1.5, "Road", False)
-    connect("Tiger Gate", "Sun Capital", 1.0, "Highway", False)
-    
-    connect("Eldershade", "Mistwood", 1.5, "Forest Path", False)
-    connect("Eldershade", "South Fields", 1.0, "Road", False) # Corrected to match image
-    connect("Eldershade", "River Port", 1.5, "Road", False) # New Connection
-    
-    # connect("Mistwood", "River Port", 2.0, "River", False) # REMOVED: Per User Request
-    connect("Mistwood", "South Fields", 2.0, "Road", False) # ADDED: Per User Request
-    connect("River Port", "Sun Capital", 1.0, "Highway", False)
-    
-    # West/East Flanks
-    # connect("Ironhold", "West Hills", 3.0, "Mountain Path", False) # REMOVED: Bypassed Twin Peaks
-    connect("Twin Peaks", "West Hills", 2.0, "Mountain Path", False) # Added: Logical flow
-    connect("West Hills", "Central Plains", 2.0, "Road", False)
-    connect("Central Plains", "Sun Capital", 1.0, "Road", False)
-    
-    connect("Sun Capital", "Eastern Bay", 2.0, "Road", False)
-    connect("Eastern Bay", "River Port", 1.5, "Coast", False)
+    for c1_name, c2_name, dist, rtype, choke in HEBEI_ROUTES:
+        connect(c1_name, c2_name, dist, rtype, choke)
 
     session.commit()
     print("Database seeding with Map complete!")
@@ -255,26 +321,13 @@ def seed():
     print("  Creating Battle Templates...")
     
     # 7a. Template: Standard Plains
-    plains = BattleMapTemplate(name="Standard Plains", terrain_type="Plains", map_type="Open Field")
+    plains = BattleMapTemplate(**PLAINS_TEMPLATE)
     session.add(plains)
     session.flush()
     
-    # Nodes (Simple 2 Lane MOBA-ish structure)
-    # Attackers Left, Defenders Right
     nodes = {}
-    
-    # Left Side (Attacker)
-    nodes["p_hq_blue"] = BattleNodeTemplate(template_id=plains.template_id, name="Blue HQ", x=0, y=50, node_type="HQ", is_attacker_spawn=True)
-    nodes["p_cp_b1"] = BattleNodeTemplate(template_id=plains.template_id, name="Forward Camp", x=20, y=50, node_type="Depot")
-    
-    # Center
-    nodes["p_mid"] = BattleNodeTemplate(template_id=plains.template_id, name="Central Field", x=50, y=50, node_type="Standard")
-    nodes["p_top"] = BattleNodeTemplate(template_id=plains.template_id, name="North Ridge", x=50, y=80, node_type="Tower")
-    nodes["p_bot"] = BattleNodeTemplate(template_id=plains.template_id, name="South Creek", x=50, y=20, node_type="Standard")
-    
-    # Right Side (Defender)
-    nodes["p_cp_r1"] = BattleNodeTemplate(template_id=plains.template_id, name="Outer Guard", x=80, y=50, node_type="Depot")
-    nodes["p_hq_red"] = BattleNodeTemplate(template_id=plains.template_id, name="Red HQ", x=100, y=50, node_type="HQ", is_defender_spawn=True)
+    for key, attrs in PLAINS_NODES:
+        nodes[key] = BattleNodeTemplate(template_id=plains.template_id, **attrs)
     
     for k, n in nodes.items():
         session.add(n)
@@ -285,22 +338,251 @@ def seed():
     def link_nodes(n1_key, n2_key, dist=1.0):
         session.add(BattleLinkTemplate(template_id=plains.template_id, source_node_id=nodes[n1_key].node_id, target_node_id=nodes[n2_key].node_id, distance=dist))
 
-    # Mid Lane
-    link_nodes("p_hq_blue", "p_cp_b1")
-    link_nodes("p_cp_b1", "p_mid")
-    link_nodes("p_mid", "p_cp_r1")
-    link_nodes("p_cp_r1", "p_hq_red")
-    
-    # Flanks
-    link_nodes("p_cp_b1", "p_top")
-    link_nodes("p_top", "p_cp_r1")
-    
-    link_nodes("p_cp_b1", "p_bot")
-    link_nodes("p_bot", "p_cp_r1")
+    for n1_key, n2_key in PLAINS_LINKS:
+        link_nodes(n1_key, n2_key)
     
     session.commit()
     print("Database seeding with Battle Templates complete!")
 
+# --- Bulk World Generator (Stress Saves) ---
+
+# (rank, weight, max troops) - troop caps mirror GameConstants.GetMaxTroopsByLevel
+BULK_RANKS = [
+    ("Recruit", 30, 1000),
+    ("Soldier", 25, 2000),
+    ("Veteran", 18, 3000),
+    ("Sergeant", 12, 4500),
+    ("Lieutenant", 7, 6000),
+    ("Captain", 5, 8000),
+    ("Major", 3, 10000),
+]
+
+CITY_PREFIXES = ["North", "South", "East", "West", "Upper", "Lower", "Old", "New", "High", "Stone", "Jade", "Willow"]
+CITY_SUFFIXES = ["Ford", "Hollow", "Watch", "March", "Vale", "Keep", "Crossing", "Fields", "Harbor", "Ridge", "Gate", "Grove"]
+BULK_ROUTE_TYPES = [("Road", 1.0), ("Road", 1.5), ("Highway", 1.0), ("Forest Path", 1.5), ("River", 2.0), ("Coast", 1.5), ("Mountain Pass", 2.0)]
+BULK_IDEOLOGIES = ["Preservation", "Independence", "Equality", "Conquest", "Prosperity"]
+
+def seed_bulk(num_cities=1000, num_officers=10000, num_factions=3, route_density=3.0, rng_seed=None, manager=None):
+    """
+    Generates a large procedural world for stress saves.
+    All rows are built in memory with preassigned IDs and each table is written with a
+    single executemany inside one transaction.
+    The first cities are the Hebei map (same cities, route pairs and battle template as seed()),
+    procedural cities are laid out on a grid beyond West Hills.
+    route_density is the average number of neighbours per procedural city.
+    """
+    if num_cities < num_factions:
+        raise ValueError("Need at least one city per faction for HQs.")
+
+    rng = random.Random(rng_seed)
+    manager = manager or db
+    manager.init_db()
+
+    print(f"Generating bulk world: {num_cities} cities, {num_officers} officers, {num_factions} factions (seed={rng_seed})...")
+    t_build = time.perf_counter()
+
+    # 1. Factions
+    faction_rows = []
+    for i in range(num_factions):
+        if i < len(FACTIONS):
+            name, color, ideology = FACTIONS[i]
+        else:
+            name = f"Warlord Faction {i + 1}"
+            color = "#%06X" % rng.randrange(0x1000000)
+            ideology = rng.choice(BULK_IDEOLOGIES)
+        faction_rows.append(dict(faction_id=i + 1, name=name, color=color, ideology=ideology))
+
+    # 2. Unit Types
+    unit_rows = [dict(unit_type_id=i + 1, **u) for i, u in enumerate(UNIT_TYPES)]
+
+    # 3. Cities - Hebei block first (when it fits), procedural grid after
+    city_rows = []
+    city_owner = []  # index -> faction_id or None
+    hq_city = {}     # faction_id -> city_id
+    use_hebei = num_cities >= len(HEBEI_CITIES)
+    if use_hebei:
+        for name, f_idx, ag, com, tech, defense in HEBEI_CITIES:
+            fid = f_idx + 1 if f_idx is not None and f_idx < num_factions else None
+            city_rows.append(dict(city_id=len(city_rows) + 1, name=name, faction_id=fid, agriculture=ag,
+                                  commerce=com, technology=tech, defense_level=defense, is_hq=0))
+            city_owner.append(fid)
+        hebei_ids = {row["name"]: row["city_id"] for row in city_rows}
+        for f_idx, hq_name in HEBEI_HQS.items():
+            if f_idx < num_factions:
+                hq_city[f_idx + 1] = hebei_ids[hq_name]
+
+    base = len(city_rows)
+    n_proc = num_cities - base
+    width = max(1, int(n_proc ** 0.5 + 0.999))
+    for k in range(n_proc):
+        name = f"{rng.choice(CITY_PREFIXES)} {rng.choice(CITY_SUFFIXES)} {k + 1}"
+        city_rows.append(dict(city_id=base + k + 1, name=name, faction_id=None,
+                              agriculture=rng.randint(50, 400), commerce=rng.randint(50, 500),
+                              technology=rng.randint(50, 300), defense_level=rng.randint(100, 800), is_hq=0))
+        city_owner.append(None)
+
+    # 4. Routes - every link is stored as a pair (A->B and B->A), like connect() in seed()
+    route_rows = []
+
+    def add_pair(a_id, b_id, dist, rtype, choke):
+        for s_id, e_id in ((a_id, b_id), (b_id, a_id)):
+            route_rows.append(dict(route_id=len(route_rows) + 1, start_city_id=s_id, end_city_id=e_id,
+                                   distance=dist, route_type=rtype, is_chokepoint=choke))
+
+    if use_hebei:
+        for c1_name, c2_name, dist, rtype, choke in HEBEI_ROUTES:
+            add_pair(hebei_ids[c1_name], hebei_ids[c2_name], dist, rtype, choke)
+        if n_proc > 0:
+            add_pair(hebei_ids["West Hills"], base + 1, 2.0, "Road", False)
+
+    # Spanning comb (each row chained, first column chained) keeps the grid connected,
+    # then random extra grid links are added until the requested density is reached.
+    proc_adj = [[] for _ in range(n_proc)]
+    tree_edges = []
+    extra_edges = []
+    for k in range(n_proc):
+        x, y = k % width, k // width
+        if x + 1 < width and k + 1 < n_proc:
+            tree_edges.append((k, k + 1))
+        if k + width < n_proc:
+            (tree_edges if x == 0 else extra_edges).append((k, k + width))
+        if x + 1 < width and k + width + 1 < n_proc:
+            extra_edges.append((k, k + width + 1))
+    rng.shuffle(extra_edges)
+    n_extra = max(0, int(route_density * n_proc / 2) - len(tree_edges))
+    for a, b in tree_edges + extra_edges[:n_extra]:
+        rtype, dist = rng.choice(BULK_ROUTE_TYPES)
+        add_pair(base + a + 1, base + b + 1, dist, rtype, rtype == "Mountain Pass")
+        proc_adj[a].append(b)
+        proc_adj[b].append(a)
+
+    # 5. Territory - every faction gets a seed city on the grid and claims its nearest region (graph Voronoi).
+    # Factions without a Hebei HQ use their seed city as HQ. ~30% of claimed land is left neutral.
+    if n_proc > 0:
+        seeds = rng.sample(range(n_proc), min(num_factions, n_proc))
+        claim = [None] * n_proc
+        frontier = []
+        for i, k in enumerate(seeds):
+            claim[k] = i + 1
+            frontier.append(k)
+        while frontier:
+            next_frontier = []
+            for k in frontier:
+                for nb in proc_adj[k]:
+                    if claim[nb] is None:
+                        claim[nb] = claim[k]
+                        next_frontier.append(nb)
+            frontier = next_frontier
+        seed_set = set(seeds)
+        for k in range(n_proc):
+            if claim[k] is not None and (k in seed_set or rng.random() < 0.7):
+                city_rows[base + k]["faction_id"] = claim[k]
+                city_owner[base + k] = claim[k]
+        for i, k in enumerate(seeds):
+            hq_city.setdefault(i + 1, base + k + 1)
+    # Factions still without an HQ (more factions than procedural seeds) take the first
+    # neutral city, then the first city that is nobody's HQ
+    taken = set(hq_city.values())
+    for fid in range(1, num_factions + 1):
+        if fid not in hq_city:
+            free = [i for i, owner in enumerate(city_owner) if i + 1 not in taken]
+            idx = next((i for i in free if city_owner[i] is None), free[0])
+            city_rows[idx]["faction_id"] = city_owner[idx] = fid
+            hq_city[fid] = idx + 1
+            taken.add(idx + 1)
+    for fid, cid in hq_city.items():
+        city_rows[cid - 1]["is_hq"] = 1
+
+    # 6. Officers - one commander per faction at its HQ, the rest dispersed
+    names = list(ROTTK_NAMES)
+    rng.shuffle(names)
+    rank_names = [r[0] for r in BULK_RANKS]
+    rank_weights = [r[1] for r in BULK_RANKS]
+    rank_troops = {r[0]: r[2] for r in BULK_RANKS}
+
+    officer_rows = []
+
+    def add_officer(fid, loc, rank, lo, hi, reputation, troops, max_troops, ap, is_commander=False):
+        oid = len(officer_rows) + 1
+        stats = dict(leadership=rng.randint(lo, hi), intelligence=rng.randint(lo, hi), strength=rng.randint(lo, hi),
+                     politics=rng.randint(lo, hi), charisma=rng.randint(lo + 10, min(hi + 5, 100)))
+        officer_rows.append(dict(
+            officer_id=oid,
+            name=names.pop() if names else f"Generic Officer {oid}",
+            faction_id=fid, location_id=loc, is_player=False, is_commander=is_commander,
+            rank=rank, reputation=reputation, troops=troops, max_troops=max_troops,
+            current_action_points=ap, max_action_points=ap,
+            base_leadership=stats["leadership"], base_intelligence=stats["intelligence"],
+            base_strength=stats["strength"], base_politics=stats["politics"], base_charisma=stats["charisma"],
+            **stats
+        ))
+
+    for fid in range(1, num_factions + 1):
+        if len(officer_rows) < num_officers:
+            add_officer(fid, hq_city[fid], "General", 80, 92, 50, 5000, 5000, 5, is_commander=True)
+
+    while len(officer_rows) < num_officers:
+        idx = rng.randrange(num_cities)
+        owner = city_owner[idx]
+        if owner is not None and rng.random() < 0.6:
+            rank = rng.choices(rank_names, rank_weights)[0]
+            max_troops = rank_troops[rank]
+            add_officer(owner, idx + 1, rank, 20, 75, rng.randint(10, 500), rng.randint(max_troops // 4, max_troops), max_troops, 3)
+        else:
+            add_officer(None, idx + 1, "Volunteer", 20, 75, 0, 100, 100, 3)
+
+    # 7. Battle Templates
+    template_rows = [dict(template_id=1, **PLAINS_TEMPLATE)]
+    node_ids = {}
+    node_rows = []
+    for key, attrs in PLAINS_NODES:
+        node_ids[key] = len(node_rows) + 1
+        node_rows.append({"is_attacker_spawn": False, "is_defender_spawn": False, **attrs,
+                          "node_id": node_ids[key], "template_id": 1})
+    link_rows = [dict(link_id=i + 1, template_id=1, source_node_id=node_ids[a], target_node_id=node_ids[b], distance=1.0)
+                 for i, (a, b) in enumerate(PLAINS_LINKS)]
+
+    build_secs = time.perf_counter() - t_build
+    print(f"  Built rows in memory in {build_secs:.2f}s")
+
+    # 8. Write everything in one transaction
+    t_write = time.perf_counter()
+    total_rows = 0
+    with manager.engine.begin() as conn:
+        for table in (PendingBattle, OfficerRelation, FactionRelation, GameState, Route, BattleLinkTemplate, BattleNodeTemplate,
+                      BattleMapTemplate, Officer, City, UnitType, Faction):
+            conn.execute(table.__table__.delete())
+
+        for table, rows in ((Faction, faction_rows), (UnitType, unit_rows), (City, city_rows), (Officer, officer_rows),
+                            (Route, route_rows), (BattleMapTemplate, template_rows), (BattleNodeTemplate, node_rows),
+                            (BattleLinkTemplate, link_rows)):
+            t0 = time.perf_counter()
+            if rows:
+                conn.execute(insert(table), rows)
+            secs = time.perf_counter() - t0
+            total_rows += len(rows)
+            print(f"  {table.__tablename__:<22} {len(rows):>8} rows  {len(rows) / max(secs, 1e-9):>12,.0f} rows/sec")
+    write_secs = time.perf_counter() - t_write
+
+    print(f"Bulk seeding complete: {total_rows} rows in {write_secs:.2f}s ({total_rows / max(write_secs, 1e-9):,.0f} rows/sec), "
+          f"{build_secs + write_secs:.2f}s total.")
+    return {"rows": total_rows, "build_seconds": build_secs, "write_seconds": write_secs}
+
 if __name__ == "__main__":
-    seed()
+    parser = argparse.ArgumentParser(description="Seed the Tree Kingdoms database.")
+    parser.add_argument("--bulk", action="store_true", help="Generate a large procedural world instead of the Hebei map")
+    parser.add_argument("--cities", type=int, default=1000)
+    parser.add_argument("--officers", type=int, default=10000)
+    parser.add_argument("--factions", type=int, default=3)
+    parser.add_argument("--route-density", type=float, default=3.0, help="Average neighbours per procedural city")
+    parser.add_argument("--seed", type=int, default=None, help="RNG seed for reproducible worlds")
+    parser.add_argument("--db", default=None, help="Target SQLite file (defaults to the project database)")
+    args = parser.parse_args()
+
+    db_url = f"sqlite:///{os.path.abspath(args.db)}" if args.db else DATABASE_URL
+    if args.bulk:
+        manager = DatabaseManager(db_url, profile="bulk-load")
+        seed_bulk(args.cities, args.officers, args.factions, args.route_density, args.seed, manager)
+    else:
+        seed(DatabaseManager(db_url) if args.db else db)
 
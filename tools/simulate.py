@@ -0,0 +1,66 @@
+import sys
+import os
+import time
+import argparse
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.database.db_manager import DB_PATH
+from src.database.snapshots import FORMATS, SnapshotWriter, default_format
+from src.simulation.turn_simulator import TurnSimulator, PHASES
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the headless day loop against an in-memory copy of a world.")
+    parser.add_argument("--days", type=int, default=360)
+    parser.add_argument("--seed", type=int, default=None, help="RNG seed for reproducible runs")
+    parser.add_argument("--db", default=DB_PATH, help="Source SQLite file (never modified)")
+    parser.add_argument("--report-every", type=int, default=0, help="Print progress every N days")
+    parser.add_argument("--batch-battles", action="store_true", help="Resolve each day's battles in one vectorised batch")
+    parser.add_argument("--per-officer", action="store_true", help="Run the officer phase one UPDATE at a time (reference path)")
+    parser.add_argument("--snapshot-dir", help="Write a columnar snapshot of the world tables here (see export_snapshot.py)")
+    parser.add_argument("--snapshot-every", type=int, default=1, help="Days between snapshots")
+    parser.add_argument("--snapshot-format", choices=FORMATS, default=default_format())
+    args = parser.parse_args()
+
+    sim = TurnSimulator.from_file(args.db, rng_seed=args.seed, batch_battles=args.batch_battles,
+                                batch_officers=not args.per_officer)
+    start_day = sim.current_day()
+    print(f"Simulating {args.days} days from Day {start_day} ({args.db})...")
+
+    after_day, snapshot_seconds = None, [0.0]
+    if args.snapshot_dir:
+        writer = SnapshotWriter(args.snapshot_dir, fmt=args.snapshot_format)
+
+        def after_day(s):
+            if s.days_simulated % args.snapshot_every == 0:
+                started = time.perf_counter()
+                writer.write(s.conn)
+                snapshot_seconds[0] += time.perf_counter() - started
+
+    result = sim.run(args.days, report_every=args.report_every, after_day=after_day)
+
+    print(f"Done: Day {sim.current_day()} reached in {result['seconds']:.2f}s "
+          f"({result['days_per_second']:,.0f} days/sec, {result['days_per_second'] * 60:,.0f} days/min)")
+    total = sum(result["phase_seconds"].values()) or 1.0
+    print("Phase timings:")
+    for name in PHASES:
+        secs = result["phase_seconds"][name]
+        print(f"  {name:<15} {secs:8.3f}s  {secs / total:6.1%}")
+        if name == "officer_phase" and sim.batch_officers:
+            for step, step_secs in sim.officer_phase.timings.items():
+                print(f"    {step:<13} {step_secs:8.3f}s")
+
+    if args.snapshot_dir:
+        days = len({day for day, _, _ in writer.written})
+        print(f"Snapshots: {days} days x {len(writer.tables)} tables written to {args.snapshot_dir} "
+              f"in {snapshot_seconds[0]:.2f}s ({args.snapshot_format})")
+    print(f"Cities captured: {result['captures']}")
+    print("Factions (id, name, treasury, supplies, cities, officers, troops, supplied cities):")
+    for row in sim.summary():
+        print(f"  {row}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import sys
+import os
+import time
+import random
+import argparse
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.database.db_manager import DB_PATH
+from src.simulation.tournament import Tournament, play, seed_list, serialize_file, serialize_seeded
+from tools.seed_db import seed, seed_bulk
+
+# AI self-play across many seeds (src/simulation/tournament.py). Every campaign
+# starts from the same world: a copy of --db, or a seed_db.py world built with a
+# fixed --world-seed. Campaigns run in a process pool. The merged outcomes go to a
+# results database (tables campaigns, captures, treasury), followed by a summary:
+# win rates and the most contested cities. The first --check seeds are replayed in
+# this process and must match the pool's results. --scaling times the same seeds
+# at 1, 2, 4 ... workers. Run from the project root:
+#   python tools/tournament.py --seeds 64 --days 360
+#   python tools/tournament.py --world bulk --cities 200 --officers 2000 --world-seed 3 --seeds 32
+#   python tools/tournament.py --seeds 16 --days 120 --scaling
+
+DEFAULT_RESULTS = os.path.join("tournaments", "results.db")
+
+
+def build_world(args):
+    if args.world == "db":
+        return serialize_file(args.db)
+    if args.world == "hebei":
+        random.seed(args.world_seed)        # seed() rolls officers with the global RNG
+        return serialize_seeded(seed)
+    return serialize_seeded(seed_bulk, num_cities=args.cities, num_officers=args.officers,
+                            num_factions=args.factions, rng_seed=args.world_seed)
+
+
+def timed(tournament, seeds):
+    start = time.perf_counter()
+    outcomes = tournament.run(seeds)
+    return outcomes, time.perf_counter() - start
+
+
+def scaling(world, args, seeds):
+    counts, workers = [], 1
+    while workers < args.workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(args.workers)
+    base = None
+    print(f"Scaling over {len(seeds)} campaigns of {args.days} days ({os.cpu_count()} CPUs):")
+    for workers in counts:
+        _, elapsed = timed(Tournament(world, args.days, workers, args.curve_every, options(args)), seeds)
+        base = base or elapsed
+        speedup = base / elapsed
+        print(f"  {workers:>3} workers: {elapsed:7.2f}s, {len(seeds) / elapsed:6.2f} campaigns/s, "
+              f"{speedup:5.2f}x ({speedup / workers:.0%} efficiency)")
+
+
+def options(args):
+    return {"batch_battles": not args.sequential_battles}
+
+
+def summarize(conn, campaigns):
+    print("Winners (most cities at the end):")
+    for name, wins, cities, conquests, first in conn.execute("""
+            SELECT f.name, COUNT(c.seed), AVG(c.winner_cities), COUNT(c.conquest_day), MIN(c.conquest_day)
+            FROM factions f LEFT JOIN campaigns c ON c.winner_id = f.faction_id
+            GROUP BY f.faction_id ORDER BY COUNT(c.seed) DESC, f.faction_id"""):
+        conquered = f", {conquests} total conquests (earliest day {first})" if conquests else ""
+        print(f"  {name:<24} {wins:>4} wins ({wins / campaigns:6.1%})"
+              f"{f', {cities:.1f} cities when winning' if wins else ''}{conquered}")
+    rows = conn.execute("""
+        SELECT ci.name, COUNT(*), COUNT(DISTINCT k.seed), AVG(k.first_day)
+        FROM (SELECT seed, city_id, MIN(day) AS first_day FROM captures GROUP BY seed, city_id) k
+        JOIN cities ci ON ci.city_id = k.city_id
+        GROUP BY k.city_id ORDER BY COUNT(*) DESC, ci.name LIMIT 10""").fetchall()
+    if rows:
+        print("Most contested cities (campaigns where captured, mean day of first capture):")
+        for name, _, seeds, day in rows:
+            print(f"  {name:<24} {seeds:>4} campaigns ({seeds / campaigns:6.1%}), day {day:,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run AI self-play campaigns across seeds in parallel.")
+    parser.add_argument("--world", choices=["db", "hebei", "bulk"], default="db",
+                        help="Start from --db, seed()'s Hebei map or a seed_bulk() world")
+    parser.add_argument("--db", default=DB_PATH, help="Source SQLite file for --world db (never modified)")
+    parser.add_argument("--world-seed", type=int, default=0, help="RNG seed for building hebei/bulk worlds")
+    parser.add_argument("--cities", type=int, default=200)
+    parser.add_argument("--officers", type=int, default=2000)
+    parser.add_argument("--factions", type=int, default=3)
+    parser.add_argument("--seeds", type=int, default=32, help="Number of campaigns")
+    parser.add_argument("--seed-base", type=int, default=0, help="Derives the campaign seeds")
+    parser.add_argument("--days", type=int, default=360)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--curve-every", type=int, default=1, help="Days between treasury samples")
+    parser.add_argument("--sequential-battles", action="store_true", help="Resolve battles one at a time")
+    parser.add_argument("--results", default=DEFAULT_RESULTS, help="SQLite file the merged results are written to")
+    parser.add_argument("--check", type=int, default=2, help="Replay this many seeds in-process and compare")
+    parser.add_argument("--scaling", action="store_true", help="Time the seeds at 1, 2, 4 ... workers instead")
+    args = parser.parse_args()
+
+    if args.world == "db" and not os.path.exists(args.db):
+        print(f"ERROR: Database not found at {args.db}")
+        sys.exit(1)
+    world = build_world(args)
+    seeds = seed_list(args.seeds, args.seed_base)
+    if args.scaling:
+        scaling(world, args, seeds)
+        return
+
+    print(f"{len(seeds)} campaigns of {args.days} days from {args.world} world "
+          f"({len(world) / 1e6:.1f}MB) on {args.workers} workers...")
+    tournament = Tournament(world, args.days, args.workers, args.curve_every, options(args))
+    outcomes, elapsed = timed(tournament, seeds)
+    print(f"Done in {elapsed:.2f}s: {len(seeds) / elapsed:.2f} campaigns/s, {len(seeds) * args.days / elapsed:,.0f} "
+          f"simulated days/s")
+
+    # Determinism: a replay in this process must give the pool's outcome
+    mismatches = [o[0][0] for o in outcomes[:args.check]
+                  if play(o[0][0], args.days, args.curve_every, options(args), world=world)[1:] != o[1:]]
+
+    os.makedirs(os.path.dirname(args.results) or ".", exist_ok=True)
+    conn = tournament.write(args.results, outcomes)
+    summarize(conn, len(outcomes))
+    conn.close()
+    print(f"Results: {args.results}; in-process replay of {min(args.check, len(outcomes))} seeds: "
+          f"{'identical' if not mismatches else f'DIFFERENT for seeds {mismatches}'}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()